@@ -0,0 +1,139 @@
+"""
+Batched Mistral extraction of several project pages per request.
+
+The extraction instructions are long compared to a compacted project page, so several pages
+are packed into one request, each tagged with an id, and the model answers with a JSON object
+whose "projects" array holds one object per id. Batches are planned by token budget; items missing from or
+invalid in the answer are extracted again with single-project calls by the caller.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set
+from backend.config_manager import config_manager
+from backend.structured_output import (
+    PROJECT_DETAILS_PROPERTIES, REQUIREMENTS_PROPERTIES, object_schema, parse_json_response
+)
+
+DEFAULT_BATCH_MAX_TOKENS = 12000
+DEFAULT_BATCH_MAX_PROJECTS = 5
+
+# Output tokens reserved per project in the answer
+OUTPUT_TOKENS_PER_PROJECT = 500
+
+# Field instructions per schema; "full" when the rules could not fill the structured fields
+SCHEMA_FIELDS = {
+    "full": """- title (string): title of the project
+- description (string): summary of the project in no more than 60 words, focussing on details not in other fields
+- release_date (string, DD.MM.YYYY): date on which the project was published
+- start_date (string, DD.MM.YYYY): date on which the project is expected to start
+- location (string): where the project is fulfilled, e.g. 'Remote', 'Hybrid', 'Berlin'
+- tenderer (string): company offering the project
+- project_id (string): provider-specific id of the project
+- requirements_tf (object): required skills mapped to their number of occurences on the page
+- workload (string): hours per week ('Auslastung')
+- rate (string): payment rate in €/h, €/day, €/month or €/year
+- duration (string): duration, e.g. '3 months'
+- budget (string): total budget in €""",
+    "requirements": """- description (string): summary of the project in no more than 60 words
+- requirements_tf (object): required skills mapped to their number of occurences on the page"""
+}
+
+REQUIREMENTS_RULES = """Requirements ('Anforderungen', 'Qualifikationen', 'Fähigkeiten' or similar) consist of two core words
+at most, e.g. 'Dokumentation' instead of 'Schreiben von Dokumentation'. If no requirements are listed explicitly,
+determine them from the description or title."""
+
+
+def get_batch_settings() -> Dict[str, Any]:
+    """Get the configured batch settings; batch size 1 means single-project extraction."""
+    enabled = bool(config_manager.get("mistral.batch_extraction", True))
+    return {
+        "max_tokens": int(config_manager.get("mistral.batch_max_tokens", DEFAULT_BATCH_MAX_TOKENS)),
+        "max_projects": int(config_manager.get("mistral.batch_max_projects", DEFAULT_BATCH_MAX_PROJECTS)) if enabled else 1
+    }
+
+
+def plan_batches(items: List[Dict[str, Any]], max_tokens: int, max_projects: int) -> List[List[Dict[str, Any]]]:
+    """
+    Group items (with "tokens" and "schema") into batches within the token and size limits.
+
+    Items keep their order; items of different schemas never share a batch.
+    """
+    batches: List[List[Dict[str, Any]]] = []
+    for schema in dict.fromkeys(item["schema"] for item in items):
+        batch: List[Dict[str, Any]] = []
+        batch_tokens = 0
+        for item in (item for item in items if item["schema"] == schema):
+            if batch and (len(batch) >= max_projects or batch_tokens + item["tokens"] > max_tokens):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(item)
+            batch_tokens += item["tokens"]
+        if batch:
+            batches.append(batch)
+    return batches
+
+
+def build_batch_messages(items: List[Dict[str, Any]], schema: str) -> List[Dict[str, str]]:
+    """Build the chat messages for one batch of compacted project texts."""
+    projects = "\n\n".join(f'<project id="{item["id"]}">\n{item["text"]}\n</project>' for item in items)
+    return [
+        {
+            "role": "system",
+            "content": f"""You are a precise data extraction assistant. You receive several project postings, each enclosed in
+<project id="..."> tags. Return ONLY a JSON object without markdown formatting, code blocks or commentary, with the field
+"projects": an array with exactly one object per project. Each object must contain the field "id" (the id of its project
+tag) and these fields:
+{SCHEMA_FIELDS[schema]}
+{REQUIREMENTS_RULES}
+Use an empty string for fields not found. Never mix information of different projects. Preserve all German characters."""
+        },
+        {
+            "role": "user",
+            "content": f"Extract the fields of each of these {len(items)} projects:\n\n{projects}"
+        }
+    ]
+
+
+def batch_output_schema(schema: str) -> Dict[str, Any]:
+    """JSON schema of a batch answer: {"projects": [{"id": ..., <schema fields>}, ...]}."""
+    properties = PROJECT_DETAILS_PROPERTIES if schema == "full" else REQUIREMENTS_PROPERTIES
+    item_schema = object_schema({"id": {"type": "string"}, **properties})
+    return object_schema({"projects": {"type": "array", "items": item_schema}})
+
+
+def _load_json_array(response_text: str) -> Optional[List[Any]]:
+    data = parse_json_response(response_text)
+    if isinstance(data, dict) and isinstance(data.get("projects"), list):
+        return data["projects"]
+    if isinstance(data, list):
+        return data
+    return None
+
+
+def parse_batch_response(response_text: Optional[str], ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Split a batch answer into per-project results.
+
+    Returns:
+        Valid results by id; ids that are missing, duplicated or invalid are left out
+    """
+    wanted: Set[str] = set(ids)
+    if not response_text or not isinstance(response_text, str):
+        return {}
+    items = _load_json_array(response_text)
+    if items is None:
+        return {}
+
+    results: Dict[str, Dict[str, Any]] = {}
+    duplicates: Set[str] = set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        item_id = str(item.get("id", ""))
+        if item_id not in wanted or not isinstance(item.get("requirements_tf"), dict):
+            continue
+        if item_id in results:
+            duplicates.add(item_id)
+        results[item_id] = {key: value for key, value in item.items() if key != "id"}
+    for item_id in duplicates:
+        del results[item_id]  # Ambiguous answer, extract the project again on its own
+    return results
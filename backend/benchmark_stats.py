@@ -0,0 +1,77 @@
+"""
+Timing and memory helpers shared by the benchmarks (scan_benchmark, matching_benchmark).
+"""
+
+import functools
+import inspect
+import statistics
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def max_rss_mb() -> Optional[float]:
+    """Maximum resident set size of the process so far, None where it is not available."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Kilobytes on Linux
+
+
+class StageTimer:
+    """Collects the durations of benchmark stages. Thread-safe."""
+
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.durations[stage].append(seconds)
+
+    def instrument(self, target: Any, method_name: str, stage: str) -> None:
+        """Time every call of a (sync or async) method of an object instance."""
+        method = getattr(target, method_name)
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await method(*args, **kwargs)
+                finally:
+                    self.add(stage, time.perf_counter() - started)
+        else:
+            @functools.wraps(method)
+            def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    self.add(stage, time.perf_counter() - started)
+        setattr(target, method_name, timed)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, total, mean, p50, p95 and max seconds per stage."""
+        with self._lock:
+            durations = {stage: list(values) for stage, values in self.durations.items()}
+        return {
+            stage: {
+                "count": len(values),
+                "total": sum(values),
+                "mean": statistics.fmean(values),
+                "p50": percentile(values, 0.5),
+                "p95": percentile(values, 0.95),
+                "max": max(values)
+            }
+            for stage, values in sorted(durations.items()) if values
+        }
@@ -78,12 +78,60 @@ class ConfigManager:
                 "host": "0.0.0.0",
                 "port": 8000
             },
+            "scan_jobs": {
+                "event_buffer_size": 1000,
+                "finished_jobs_kept": 5,
+                "checkpoint_interval_seconds": 5,
+                "stats_interval_seconds": 10
+            },
+            "scanning": {
+                "incremental": False,
+                "known_streak_to_stop": 5,
+                "high_water_recent_urls": 200,
+                "page_concurrency": 3,
+                "duplicate_suppression": True,
+                "duplicate_title_similarity": 0.9
+            },
+            "page_archive": {
+                "enabled": True,
+                "directory": "page_archive",
+                "codec": "auto",
+                "max_bytes": 524288000,
+                "max_age_days": 90,
+                "reextract_concurrency": 2
+            },
+            "metrics": {
+                "enabled": True,
+                "server_timing": True
+            },
             "logging": {
                 "level": "INFO",
                 "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
                 "file": "app.log",
                 "max_bytes": 10485760,
-                "backup_count": 5
+                "backup_count": 5,
+                "json": False,
+                "queue": True,
+                "rate_limits": {
+                    "scan": {
+                        "records_per_second": 50,
+                        "sample_rate": 1.0
+                    }
+                }
+            },
+            "mistral": {
+                "max_prompt_tokens": 3000,
+                "response_format": "json_schema",
+                "requests_per_second": 1.0,
+                "burst": 2,
+                "max_concurrency": 2,
+                "max_retries": 5,
+                "timeout_seconds": 60,
+                "backoff_base_seconds": 1.0,
+                "backoff_max_seconds": 30,
+                "batch_extraction": True,
+                "batch_max_tokens": 12000,
+                "batch_max_projects": 5
             },
             "distance_model": {
                 "model": "euclidean"
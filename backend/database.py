@@ -47,14 +47,29 @@ def init_db() -> None:
     try:
         # Import all models to ensure they are registered
         try:
-            from backend.models.core_models import Project, Skill, Employee, AppState
+            from backend.models.core_models import Project, ProjectRequirement, Skill, Employee, AppState, ScanRun
         except ImportError:
-            from models.core_models import Project, Skill, Employee, AppState
+            from models.core_models import Project, ProjectRequirement, Skill, Employee, AppState, ScanRun
 
         # Create all tables
         Base.metadata.create_all(bind=engine)
         logger.info("Database tables created successfully")
 
+        # Projects stored before the project_requirements table existed only have the JSON column;
+        # IDF factors and matching read the join table
+        db = SessionLocal()
+        try:
+            try:
+                from backend.requirements_service import requirements_service
+            except ImportError:
+                from requirements_service import requirements_service
+            requirements_service.backfill_from_json(db)
+        except Exception as e:
+            logger.error(f"Error backfilling project requirements: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+
         # Initialize default app state
         db = SessionLocal()
         try:
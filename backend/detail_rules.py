@@ -0,0 +1,212 @@
+"""
+Rule-based extraction of structured fields from project detail pages.
+
+Dates, location, workload, rate, duration and project id appear next to fixed labels on
+most detail pages ("Start: 01.03.2026", "<dt>Laufzeit</dt><dd>6 Monate</dd>"). These are
+filled deterministically from label/selector/regex rules, so Mistral is only needed for
+requirements and description. Site rules are configured in the "level3_rules" block of a
+website config; generic German/English labels are used for fields without site rules.
+
+Example site rules:
+
+    "level3_rules": {
+        "required": ["release_date", "start_date"],
+        "start_date": {"label": "Start"},
+        "rate": {"selector": ".project-rate"},
+        "project_id": {"label": "Projekt-ID", "regex": "\\\\d+"}
+    }
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from bs4 import BeautifulSoup, NavigableString
+from backend.listing_processor import HTML_PARSER
+from backend.utils.date_utils import european_to_iso_date, iso_to_european_date
+
+# Fields the rules can fill, in extraction order
+RULE_FIELDS = ["release_date", "start_date", "location", "workload", "rate", "duration", "project_id"]
+
+# Fields that must be found for the rule fast path, unless the site configures "required"
+DEFAULT_REQUIRED_FIELDS = ["release_date", "start_date"]
+
+# Generic labels (compared case-insensitively, without trailing colon)
+DEFAULT_LABELS = {
+    "release_date": ["veröffentlicht", "veröffentlicht am", "eingestellt", "eingestellt am", "eingetragen am",
+                     "online seit", "datum", "published", "posted"],
+    "start_date": ["start", "startdatum", "projektstart", "beginn", "start date"],
+    "location": ["ort", "einsatzort", "standort", "projektort", "plz", "location"],
+    "workload": ["auslastung", "arbeitsumfang", "workload"],
+    "rate": ["stundensatz", "tagessatz", "vergütung", "honorar", "rate"],
+    "duration": ["laufzeit", "dauer", "projektdauer", "duration"],
+    "project_id": ["projekt-id", "projekt id", "projektnummer", "pr.id", "referenznummer", "project id"]
+}
+
+# Value patterns validating (and trimming) a labelled value
+VALUE_PATTERNS = {
+    "release_date": r"\d{1,2}\.\d{1,2}\.\d{4}|\d{4}-\d{2}-\d{2}",
+    "start_date": r"\d{1,2}\.\d{1,2}\.\d{4}|\d{4}-\d{2}-\d{2}",
+    "workload": r"\d{1,3}(?:[.,]\d+)?\s*(?:%|Std\.?|Stunden|h)(?:\s*(?:/|pro)\s*(?:Woche|Wo\.?|week))?",
+    "rate": r"\d[\d.,]*\s*(?:€|EUR|Euro)(?:\s*(?:/|pro)\s*(?:h|Std\.?|Stunde|Tag|day))?",
+    "duration": r"\d+(?:[.,]\d+)?\s*(?:Monate?|Wochen?|Jahre?|Tage?|months?|weeks?|years?|days?)|unbefristet|langfristig",
+    "project_id": r"[A-Za-z0-9][A-Za-z0-9_./-]{1,40}"
+}
+
+# Longest text of an element that can still be a label
+MAX_LABEL_LENGTH = 40
+
+
+def _normalize_label(text: str) -> str:
+    return " ".join(text.split()).rstrip(":").strip().lower()
+
+
+def _normalize_date(value: str) -> Optional[str]:
+    """Convert a European or ISO date to DD.MM.YYYY."""
+    iso_date = european_to_iso_date(value)
+    if not iso_date:
+        match = re.search(r"\d{4}-\d{2}-\d{2}", value)
+        iso_date = match.group(0) if match else None
+    return iso_to_european_date(iso_date) if iso_date else None
+
+
+def _following_text(label_element) -> str:
+    """Text right after a label element: a following text node or the next element."""
+    for sibling in label_element.next_siblings:
+        if isinstance(sibling, NavigableString):
+            text = str(sibling).strip()
+            if text:
+                return text
+        elif hasattr(sibling, "get_text"):
+            text = sibling.get_text(" ", strip=True)
+            if text:
+                return text
+    return ""
+
+
+class DetailRuleSet:
+    """Extraction rules compiled from the "level3_rules" config of one website."""
+
+    def __init__(self, rules_config: Optional[Dict[str, Any]] = None):
+        self.source = rules_config
+        rules_config = rules_config or {}
+        self.required = list(rules_config.get("required", DEFAULT_REQUIRED_FIELDS))
+        self.rules: Dict[str, List[Tuple[str, Any]]] = {}
+        self.patterns: Dict[str, re.Pattern] = {}
+        self.text_patterns: Dict[str, re.Pattern] = {}  # "Label: value" inside running text
+
+        for field in RULE_FIELDS:
+            field_config = rules_config.get(field) or {}
+            field_rules = []
+            if field_config.get("selector"):
+                field_rules.append(("selector", field_config["selector"]))
+            labels = field_config.get("label") or []
+            if isinstance(labels, str):
+                labels = [labels]
+            for label in list(labels) + DEFAULT_LABELS[field]:
+                field_rules.append(("label", _normalize_label(label)))
+            self.rules[field] = field_rules
+
+            pattern = field_config.get("regex") or VALUE_PATTERNS.get(field)
+            if pattern:
+                self.patterns[field] = re.compile(pattern, re.IGNORECASE)
+                label_alternatives = "|".join(re.escape(label) for rule_type, label in field_rules if rule_type == "label")
+                self.text_patterns[field] = re.compile(
+                    rf"(?<!\w)(?:{label_alternatives})\s*:?\s*({pattern})", re.IGNORECASE
+                )
+
+    @staticmethod
+    def _build_label_map(soup) -> Dict[str, List[str]]:
+        """Map every short element text (a potential label) to the texts following it, in page order."""
+        label_map: Dict[str, List[str]] = {}
+        for element in soup.find_all(True):
+            # Only leaf-like elements: their whole text is the label
+            if element.find(True) is not None and element.name not in ("dt", "th", "label"):
+                continue
+            text = element.get_text(" ", strip=True)
+            if not text or len(text) > MAX_LABEL_LENGTH:
+                continue
+            value = _following_text(element)
+            if value:
+                label_map.setdefault(_normalize_label(text), []).append(value)
+        return label_map
+
+    def _clean_value(self, field: str, value: str) -> Optional[str]:
+        value = " ".join(value.split())
+        if not value:
+            return None
+        pattern = self.patterns.get(field)
+        if pattern:
+            match = pattern.search(value)
+            if not match:
+                return None
+            value = match.group(0).strip()
+        if field in ("release_date", "start_date"):
+            return _normalize_date(value)
+        return value
+
+    def extract(self, html: str, fields: Optional[List[str]] = None) -> Dict[str, str]:
+        """
+        Extract the structured fields a page shows next to known labels or selectors.
+
+        Args:
+            html: Raw HTML of the project detail page
+            fields: Fields to extract (all rule fields if None)
+
+        Returns:
+            Dictionary with the fields that were found
+        """
+        if not html:
+            return {}
+        soup = BeautifulSoup(html, HTML_PARSER)
+        for element in soup(['script', 'style', 'noscript', 'template']):
+            element.decompose()
+
+        label_map = None
+        page_text = None
+        data: Dict[str, str] = {}
+        for field in fields or RULE_FIELDS:
+            for rule_type, rule in self.rules[field]:
+                if rule_type == "selector":
+                    element = soup.select_one(rule)
+                    values = [element.get_text(" ", strip=True)] if element else []
+                else:
+                    if label_map is None:
+                        label_map = self._build_label_map(soup)
+                    values = label_map.get(rule, [])
+                # The same label may also appear in navigation etc.; the first valid value wins
+                cleaned = next(filter(None, (self._clean_value(field, value) for value in values)), None)
+                if cleaned:
+                    data[field] = cleaned
+                    break
+
+            if field not in data and field in self.text_patterns:
+                # Label and value inside the same text, e.g. "<p>Start: 01.03.2026</p>"
+                if page_text is None:
+                    page_text = " ".join(soup.get_text(" ", strip=True).split())
+                match = self.text_patterns[field].search(page_text)
+                cleaned = self._clean_value(field, match.group(1)) if match else None
+                if cleaned:
+                    data[field] = cleaned
+        return data
+
+    def is_complete(self, data: Dict[str, str]) -> bool:
+        """Check whether the rules found every required field."""
+        return all(data.get(field) for field in self.required)
+
+
+_rule_set_cache: Dict[Tuple[str, str], DetailRuleSet] = {}
+
+
+def get_detail_rules(website_config: Optional[Dict[str, Any]]) -> DetailRuleSet:
+    """Get the compiled rules of a website (generic rules if None), recompiling when its config object changed."""
+    if not website_config:
+        key = ("", "")
+        rules_config = None
+    else:
+        level1_config = website_config["level1_search"]
+        key = (level1_config.get("name", ""), level1_config.get("site_url", ""))
+        rules_config = website_config.get("level3_rules")
+    rule_set = _rule_set_cache.get(key)
+    if rule_set is None or rule_set.source is not rules_config:
+        rule_set = DetailRuleSet(rules_config)
+        _rule_set_cache[key] = rule_set
+    return rule_set
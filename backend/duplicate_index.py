@@ -0,0 +1,146 @@
+"""
+Scan-time detection of projects posted on several sites.
+
+The same project is often listed on more than one site. DeduplicationService removes such
+copies after a scan, when both have already been extracted by Mistral. This index catches
+likely duplicates earlier, from level2 data alone: it holds fingerprints of the stored
+projects and of the projects accepted in the running scan, and a card matching one of them
+skips the level3 scan.
+
+Only projects on different hosts are compared, so distinct listings of one site are never
+merged. A card is a duplicate if, after normalizing the title (case, punctuation except
+"+", "#" and ".", gender markers like "(m/w/d)"), it has
+    - the same title and tenderer, or
+    - the same title, location and start date (the criteria of DeduplicationService), or
+    - a similar title (see "scanning.duplicate_title_similarity") and the same location
+      and start date.
+Site default tenderers (level2_search "tenderer", e.g. "Etengo") only name the site and are
+not used as a key. Skipped cards are listed in `suppressed_details`.
+"""
+
+import logging
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+from sqlalchemy.orm import Session
+
+from backend.config_manager import config_manager
+from backend.models.core_models import Project
+from backend.utils.url_utils import normalize_host
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TITLE_SIMILARITY = 0.9
+
+GENDER_MARKER_PATTERN = re.compile(r"\(\s*[mwdfx*]\s*(?:[/|,]\s*[mwdfx*]\s*)+\)")
+# "+", "#" and "." are kept: "C++" and "C#" or ".NET" and "NET" are different skills
+NON_WORD_PATTERN = re.compile(r"[^\w+#.]+|_+")
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lowercase, drop gender markers and punctuation (but "+", "#" and "."), collapse whitespace."""
+    if not value or value == "N/A":
+        return ""
+    value = GENDER_MARKER_PATTERN.sub(" ", value.lower())
+    return NON_WORD_PATTERN.sub(" ", value).strip()
+
+
+class ProjectFingerprint:
+    """Normalized level2 fields of one project."""
+
+    __slots__ = ("title", "tenderer", "location", "start_date", "host", "label")
+
+    def __init__(self, data: Dict[str, Any], ignored_tenderers: Set[str] = frozenset()):
+        self.title = normalize_text(data.get("title"))
+        tenderer = normalize_text(data.get("tenderer"))
+        self.tenderer = "" if tenderer in ignored_tenderers else tenderer
+        self.location = normalize_text(data.get("location"))
+        start_date = data.get("start_date")
+        self.start_date = start_date.strip() if start_date and start_date != "N/A" else ""
+        self.host = normalize_host(urlsplit(data.get("url") or "").netloc)
+        self.label = f"'{data.get('title')}' ({data.get('url')})"
+
+    @property
+    def tenderer_key(self) -> Optional[Tuple[str, str]]:
+        return ("tenderer", self.tenderer) if self.tenderer else None
+
+    @property
+    def place_key(self) -> Optional[Tuple[str, str, str]]:
+        return ("place", self.location, self.start_date) if self.location and self.start_date else None
+
+
+class DuplicateIndex:
+    """Fingerprints of stored projects and of this scan's projects, bucketed for the title comparisons."""
+
+    def __init__(self, title_similarity: float = DEFAULT_TITLE_SIMILARITY, ignored_tenderers: Iterable[str] = ()):
+        self.title_similarity = title_similarity
+        self.ignored_tenderers = {normalize_text(tenderer) for tenderer in ignored_tenderers} - {""}
+        self._buckets: Dict[tuple, List[ProjectFingerprint]] = defaultdict(list)
+        self.suppressed = 0  # Cards skipped as duplicates in this scan
+        self.suppressed_details: List[Dict[str, Any]] = []
+
+    def add(self, data: Dict[str, Any]) -> None:
+        """Add a stored project or a project accepted for the level3 scan (level2 data or Project fields)."""
+        fingerprint = ProjectFingerprint(data, self.ignored_tenderers)
+        if not fingerprint.title:
+            return
+        for key in (fingerprint.tenderer_key, fingerprint.place_key):
+            if key:
+                self._buckets[key].append(fingerprint)
+
+    def _similar_titles(self, title: str, other: str) -> bool:
+        if title == other:
+            return True
+        matcher = SequenceMatcher(None, title, other)
+        return (
+            matcher.real_quick_ratio() >= self.title_similarity
+            and matcher.quick_ratio() >= self.title_similarity
+            and matcher.ratio() >= self.title_similarity
+        )
+
+    def find_duplicate(self, data: Dict[str, Any]) -> Optional[Tuple[ProjectFingerprint, str]]:
+        """Get the fingerprint a card duplicates and the reason, or None."""
+        fingerprint = ProjectFingerprint(data, self.ignored_tenderers)
+        if not fingerprint.title:
+            return None
+        for key, criterion in ((fingerprint.tenderer_key, "tenderer"), (fingerprint.place_key, "location and start date")):
+            if not key:
+                continue
+            for other in self._buckets.get(key, ()):
+                if fingerprint.host and other.host == fingerprint.host:
+                    continue  # Same site: distinct listings, left to DeduplicationService
+                if other.title == fingerprint.title:
+                    return other, f"same title and {criterion}"
+                # A similar title alone is too weak with the tenderer; it needs location and start date
+                if key == fingerprint.place_key and self._similar_titles(fingerprint.title, other.title):
+                    return other, f"similar title and same {criterion}"
+        return None
+
+    def record_suppressed(self, data: Dict[str, Any], original: ProjectFingerprint, reason: str) -> None:
+        """Count a card skipped as a duplicate and keep it for the scan's deduplication report."""
+        self.suppressed += 1
+        self.suppressed_details.append({
+            "title": data.get("title"),
+            "url": data.get("url"),
+            "duplicate_of": original.label,
+            "reason": reason
+        })
+
+
+def get_duplicate_suppression_enabled() -> bool:
+    return bool(config_manager.get("scanning.duplicate_suppression", True))
+
+
+def build_duplicate_index(db: Session) -> DuplicateIndex:
+    """Build the index of a scan from the stored projects (five-column query)."""
+    index = DuplicateIndex(
+        float(config_manager.get("scanning.duplicate_title_similarity", DEFAULT_TITLE_SIMILARITY)),
+        [website.get("level2_search", {}).get("tenderer") or "" for website in config_manager.get_websites()]
+    )
+    rows = db.query(Project.title, Project.tenderer, Project.location, Project.start_date, Project.url).all()
+    for title, tenderer, location, start_date, url in rows:
+        index.add({"title": title, "tenderer": tenderer, "location": location, "start_date": start_date, "url": url})
+    logger.info(f"Duplicate index built from {len(rows)} stored projects")
+    return index
@@ -0,0 +1,189 @@
+"""
+Compiled level2 extraction plans for project cards.
+
+A plan is compiled once per website from its level2_search config. Fields sharing a
+selector (e.g. Etengo's ".box-50 span" for project id, location, duration and start date)
+are grouped, so each selector is run once per card, and labelled fields are resolved
+through a single label -> element map instead of one parent walk per field.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import soupsieve
+
+# Level2 config keys in extraction order, mapped to project data keys
+LEVEL2_FIELD_MAPPINGS = {
+    "project-id-selector": "project_id",
+    "location-selector": "location",
+    "duration-selector": "duration",
+    "start-date-selector": "start_date",
+    "release-date-selector": "release_date",
+    "industry-selector": "industry",
+    "tenderer-selector": "tenderer"
+}
+
+
+class Level2Field:
+    """A single field of a level2 extraction plan."""
+
+    __slots__ = ("data_key", "selector", "label", "kind")
+
+    def __init__(self, data_key: str, selector: str, label: str, kind: str):
+        self.data_key = data_key
+        self.selector = selector
+        self.label = label
+        self.kind = kind  # labelled, industry, location, release_date or text
+
+
+class Level2ExtractionPlan:
+    """Extraction plan compiled from the level2_search config of one website."""
+
+    def __init__(self, website_config: Dict[str, Any]):
+        level2_config = website_config["level2_search"]
+        self.source = level2_config
+        self.title_selector = level2_config.get("title-selector")
+        self.url_selector = level2_config.get("url-selector")
+        self.tenderer = level2_config.get("tenderer", "Unknown")
+        self.rate = level2_config.get("rate", "N/A")
+
+        parsed_url = urlparse(website_config["level1_search"]["site_url"])
+        self.url_prefix = f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+        self.fields: List[Level2Field] = []
+        for selector_key, data_key in LEVEL2_FIELD_MAPPINGS.items():
+            selector = level2_config.get(selector_key)
+            if not selector:
+                continue
+            label = level2_config.get(selector_key.replace("-selector", "-label"), "")
+            if label:
+                kind = "labelled"
+            elif selector_key == "industry-selector":
+                kind = "industry"
+            elif selector_key == "location-selector":
+                kind = "location"
+            elif selector_key == "release-date-selector":
+                kind = "release_date"
+            else:
+                kind = "text"
+            self.fields.append(Level2Field(data_key, selector, label, kind))
+
+        # Selectors needing all matches; all others only need the first match
+        self.multi_selectors = {
+            field.selector for field in self.fields if field.kind in ("labelled", "industry")
+        }
+
+        # CSS selectors are compiled once instead of on every select call
+        selectors = {field.selector for field in self.fields}
+        selectors.update(selector for selector in (self.title_selector, self.url_selector) if selector)
+        self.compiled_selectors = {selector: soupsieve.compile(selector) for selector in selectors}
+
+    def _select(self, card, selector: str, cache: Dict[str, List]) -> List:
+        elements = cache.get(selector)
+        if elements is None:
+            compiled = self.compiled_selectors[selector]
+            if selector in self.multi_selectors:
+                elements = compiled.select(card)
+            else:
+                element = compiled.select_one(card)
+                elements = [element] if element is not None else []
+            cache[selector] = elements
+        return elements
+
+    @staticmethod
+    def _build_label_map(elements: List) -> Dict[str, Any]:
+        """Map the <small> label next to each element to the first element carrying it."""
+        label_map: Dict[str, Any] = {}
+        parent_labels: Dict[int, Optional[str]] = {}
+        for element in elements:
+            parent = element.parent
+            if parent is None:
+                continue
+            key = id(parent)
+            if key not in parent_labels:
+                label_element = parent.find('small')
+                parent_labels[key] = label_element.get_text(strip=True) if label_element else None
+            label_text = parent_labels[key]
+            if label_text is not None and label_text not in label_map:
+                label_map[label_text] = element
+        return label_map
+
+    def extract(self, card) -> Dict[str, Any]:
+        """Extract the project data of one card; tenderer and rate defaults are applied."""
+        data: Dict[str, Any] = {}
+        selected: Dict[str, List] = {}
+
+        if self.title_selector:
+            title_elements = self._select(card, self.title_selector, selected)
+            if title_elements:
+                data['title'] = title_elements[0].get_text(strip=True)
+        if self.url_selector:
+            url_elements = self._select(card, self.url_selector, selected)
+            if url_elements:
+                data['url'] = url_elements[0].get('href')
+                if data['url'] and not data['url'].startswith('http'):
+                    # Handle relative URLs using base URL from config
+                    data['url'] = f"{self.url_prefix}{data['url']}"
+
+        label_maps: Dict[str, Dict[str, Any]] = {}
+
+        for field in self.fields:
+            elements = self._select(card, field.selector, selected)
+
+            if field.kind == "labelled":
+                label_map = label_maps.get(field.selector)
+                if label_map is None:
+                    label_map = label_maps[field.selector] = self._build_label_map(elements)
+                found_element = label_map.get(field.label)
+                if found_element is not None:
+                    data[field.data_key] = found_element.get_text(strip=True)
+                elif field.data_key == "release_date" and elements:
+                    # Release date may carry its label as a text prefix instead of a <small> tag
+                    text_content = elements[0].get_text(strip=True)
+                    if text_content.startswith(field.label):
+                        data[field.data_key] = text_content[len(field.label):].strip()
+                    else:
+                        data[field.data_key] = text_content
+                # If not found, don't set any value - missing fields stay None instead of getting incorrect values
+
+            elif field.kind == "industry":
+                # For industry/keywords, collect all matching elements
+                keywords = []
+                for element in elements:
+                    keyword = element.get_text(strip=True)
+                    if keyword and not keyword.startswith('+'):
+                        keywords.append(keyword)
+                if keywords:
+                    data[field.data_key] = ', '.join(keywords)
+
+            elif field.kind == "location":
+                # For location, join the text parts of nested elements
+                if elements:
+                    location_parts = [
+                        text.strip() for text in elements[0].stripped_strings
+                        if text and not text.startswith('‐') and text.strip()
+                    ]
+                    if location_parts:
+                        data[field.data_key] = ', '.join(location_parts)
+
+            elif elements:
+                data[field.data_key] = elements[0].get_text(strip=True)
+
+        # Set default values
+        if 'tenderer' not in data:
+            data['tenderer'] = self.tenderer
+        data['rate'] = self.rate
+        return data
+
+
+_plan_cache: Dict[Tuple[str, str], Level2ExtractionPlan] = {}
+
+
+def get_level2_plan(website_config: Dict[str, Any]) -> Level2ExtractionPlan:
+    """Get the compiled plan of a website, recompiling it when its config object changed."""
+    level1_config = website_config["level1_search"]
+    key = (level1_config.get("name", ""), level1_config.get("site_url", ""))
+    plan = _plan_cache.get(key)
+    if plan is None or plan.source is not website_config["level2_search"]:
+        plan = Level2ExtractionPlan(website_config)
+        _plan_cache[key] = plan
+    return plan
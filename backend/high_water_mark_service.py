@@ -0,0 +1,130 @@
+"""Per-site high-water marks for incremental scans.
+
+After a website was scanned, its high-water mark is stored in AppState under
+"high_water_mark.<site name>": the newest release date of its stored projects, the oldest
+release date the scans covered without a gap ("covered_from", from their time ranges) and
+the most recent URLs of stored or already known cards (newest first). An incremental scan
+treats a card as already seen when its URL is stored or in the mark and it was not released
+before "covered_from", and stops paginating after a streak of seen non-top projects.
+Cards that were filtered, suppressed as duplicates or failed extraction are never recorded,
+so they can not end a scan early. Marks without "covered_from" never stop a scan.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+
+from backend.config_manager import config_manager
+from backend.models.core_models import AppState
+from backend.utils.date_utils import european_to_iso_date, iso_to_european_date
+
+logger = logging.getLogger(__name__)
+
+HIGH_WATER_MARK_KEY_PREFIX = "high_water_mark."
+DEFAULT_RECENT_URLS = 200
+DEFAULT_KNOWN_STREAK_TO_STOP = 5
+
+
+class HighWaterMark:
+    """High-water mark of one website, updated with the cards of the running scan."""
+
+    def __init__(self, site_name: str, data: Optional[Dict[str, Any]] = None):
+        data = data or {}
+        self.site_name = site_name
+        self.release_date = data.get("release_date")  # DD.MM.YYYY
+        self.covered_from = data.get("covered_from")  # DD.MM.YYYY
+        self.recent_urls: List[str] = list(data.get("recent_urls", []))
+        self._recent_url_set = set(self.recent_urls)
+        self._listed_urls: List[str] = []  # Cards of the running scan, in listing order
+        self._seen_urls: Dict[str, None] = {}  # Stored or known cards of the running scan
+        self._newest_iso_date = european_to_iso_date(self.release_date) if self.release_date else None
+        self._previous_iso_date = self._newest_iso_date
+        self._covered_from_iso = european_to_iso_date(self.covered_from) if self.covered_from else None
+        self._scan_from_iso: Optional[str] = None
+
+    def begin_scan(self, cutoff_date: datetime) -> None:
+        """Set the oldest release date the running scan covers (its time range cutoff)."""
+        self._scan_from_iso = cutoff_date.strftime("%Y-%m-%d")
+
+    def is_seen(self, url: Optional[str], release_date: Optional[str] = None, is_known: bool = False) -> bool:
+        """Check whether a card is stored or was stored by a previous scan, inside the window those scans covered."""
+        if not self._covered_from_iso:
+            return False
+        iso_date = european_to_iso_date(release_date) if release_date else None
+        if iso_date and iso_date < self._covered_from_iso:
+            return False  # Older than anything the previous scans looked at
+        return is_known or bool(url and url in self._recent_url_set)
+
+    def list_card(self, url: Optional[str]) -> None:
+        """Record the listing position of a card of the running scan."""
+        if url:
+            self._listed_urls.append(url)
+
+    def observe(self, url: Optional[str], release_date: Optional[str] = None) -> None:
+        """Record a card of the running scan that was stored or is already known."""
+        if url:
+            self._seen_urls[url] = None
+        iso_date = european_to_iso_date(release_date) if release_date else None
+        if iso_date and (not self._newest_iso_date or iso_date > self._newest_iso_date):
+            self._newest_iso_date = iso_date
+
+    def to_dict(self, max_urls: int) -> Dict[str, Any]:
+        """The updated mark: newest release date, covered window and the most recent URLs of this and earlier scans."""
+        seen_urls = [url for url in self._listed_urls if url in self._seen_urls] + list(self._seen_urls)
+        recent_urls = list(dict.fromkeys(seen_urls + self.recent_urls))[:max_urls]
+        covered_from_iso = self._scan_from_iso or self._covered_from_iso
+        if (self._scan_from_iso and self._covered_from_iso and self._previous_iso_date
+                and self._scan_from_iso <= self._previous_iso_date):
+            # This scan reached back into the previous window, so both windows form one
+            covered_from_iso = min(self._scan_from_iso, self._covered_from_iso)
+        return {
+            "release_date": iso_to_european_date(self._newest_iso_date) if self._newest_iso_date else None,
+            "covered_from": iso_to_european_date(covered_from_iso) if covered_from_iso else None,
+            "recent_urls": recent_urls,
+            "updated_at": datetime.now().isoformat()
+        }
+
+
+class HighWaterMarkService:
+    """Loads and stores the high-water marks of the configured websites."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def _key(site_name: str) -> str:
+        return f"{HIGH_WATER_MARK_KEY_PREFIX}{site_name}"
+
+    def get_known_streak_to_stop(self) -> int:
+        """Number of consecutive seen non-top projects after which an incremental scan stops paginating."""
+        return max(int(config_manager.get("scanning.known_streak_to_stop", DEFAULT_KNOWN_STREAK_TO_STOP)), 1)
+
+    def load(self, db: Session, site_name: str) -> HighWaterMark:
+        state = db.query(AppState).filter(AppState.key == self._key(site_name)).first()
+        data = state.get_value() if state else None
+        return HighWaterMark(site_name, data if isinstance(data, dict) else None)
+
+    def save(self, db: Session, mark: HighWaterMark) -> None:
+        """Store the updated mark of a completely scanned website."""
+        max_urls = int(config_manager.get("scanning.high_water_recent_urls", DEFAULT_RECENT_URLS))
+        try:
+            state = db.query(AppState).filter(AppState.key == self._key(mark.site_name)).first()
+            if state is None:
+                state = AppState(key=self._key(mark.site_name))
+                db.add(state)
+            state.set_value(mark.to_dict(max_urls))
+            db.commit()
+        except Exception as e:
+            self.logger.error(f"Error saving high-water mark of {mark.site_name}: {str(e)}")
+            db.rollback()
+
+    def reset(self, db: Session) -> int:
+        """Delete all high-water marks (e.g. after clearing the projects); returns the number deleted."""
+        count = db.query(AppState).filter(AppState.key.like(f"{HIGH_WATER_MARK_KEY_PREFIX}%")).delete(synchronize_session=False)
+        db.commit()
+        return count
+
+
+# Global high-water mark service instance
+high_water_mark_service = HighWaterMarkService()
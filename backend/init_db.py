@@ -7,6 +7,7 @@ from backend.database import SessionLocal, init_db
 from backend.models.core_models import Project, Employee, AppState, Skill
 from backend.logger_config import setup_logging
 from backend.tfidf_service import tfidf_service
+from backend.requirements_service import requirements_service
 from datetime import datetime
 
 # Setup logging
@@ -104,7 +105,7 @@ def create_test_data(db: Session) -> None:
                 budget=project_data["budget"],
                 duration=project_data["duration"]
             )
-            project.set_requirements_tf(project_data["requirements_tf"])
+            requirements_service.set_project_requirements(db, project, project_data["requirements_tf"])
             db.add(project)
 
         # Create test employees
@@ -0,0 +1,124 @@
+"""
+Incremental processing of project listing pages.
+
+Load-more listings keep growing in the browser. Instead of re-parsing the whole page source
+after every click, cards are counted in the browser and only the outer HTML of newly
+appended cards is transferred and parsed. Cards already seen in the session (by URL) are
+skipped, so a load-more session with many clicks does linear instead of quadratic work.
+"""
+
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Set
+from bs4 import BeautifulSoup
+from backend.extraction_plan import get_level2_plan
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+logger = logging.getLogger(__name__)
+
+# Number of cards inside the project list, or -1 if the list is missing
+COUNT_CARDS_SCRIPT = """
+const grid = document.querySelector(arguments[0]);
+if (!grid) { return -1; }
+return grid.querySelectorAll(arguments[1]).length;
+"""
+
+# Outer HTML of all cards inside the project list starting at the given index
+CARD_FRAGMENTS_SCRIPT = """
+const grid = document.querySelector(arguments[0]);
+if (!grid) { return []; }
+return Array.from(grid.querySelectorAll(arguments[1])).slice(arguments[2]).map(card => card.outerHTML);
+"""
+
+
+class ListingProcessor:
+    """Tracks the cards of one listing session and returns only new ones."""
+
+    def __init__(self, driver, website_config: Dict[str, Any], logger_: Optional[logging.Logger] = None):
+        level1_config = website_config["level1_search"]
+        self.driver = driver
+        self.project_list_selector = level1_config["project-list-selector"]
+        self.project_entry_selector = level1_config["project-entry-selector"]
+        self.url_selector = get_level2_plan(website_config).url_selector
+        self.logger = logger_ or logger
+        self.processed_count = 0  # Cards of the current page that were already returned
+        self.seen_card_keys: Set[str] = set()  # Card URLs seen in this session (across pages)
+        self.parsed_fragments = 0
+
+    def reset_page(self) -> None:
+        """Start counting cards from the top after navigating; seen card URLs are kept."""
+        self.processed_count = 0
+
+    def count_cards(self) -> int:
+        """Count the cards in the browser without transferring or parsing the page."""
+        try:
+            count = self.driver.execute_script(
+                COUNT_CARDS_SCRIPT, self.project_list_selector, self.project_entry_selector
+            )
+            return max(int(count), 0)
+        except Exception as e:
+            self.logger.warning(f"Browser-side card count failed, parsing page source instead: {e}")
+            return len(self._cards_from_page_source())
+
+    def _cards_from_page_source(self) -> List:
+        soup = BeautifulSoup(self.driver.page_source, HTML_PARSER)
+        project_grid = soup.select_one(self.project_list_selector)
+        return project_grid.select(self.project_entry_selector) if project_grid else []
+
+    def _card_key(self, card, fragment: str) -> str:
+        if self.url_selector:
+            url_element = card.select_one(self.url_selector)
+            if url_element and url_element.get('href'):
+                return url_element.get('href')
+        return hashlib.sha1(fragment.encode("utf-8")).hexdigest()
+
+    def fetch_new_cards(self) -> List:
+        """
+        Get the cards appended since the last call, parsed from their own HTML fragment.
+
+        Cards whose URL was already returned in this session are skipped.
+        """
+        try:
+            fragments = self.driver.execute_script(
+                CARD_FRAGMENTS_SCRIPT, self.project_list_selector, self.project_entry_selector, self.processed_count
+            )
+            if fragments is None:
+                raise ValueError("no card fragments returned")
+        except Exception as e:
+            self.logger.warning(f"Browser-side card extraction failed, parsing page source instead: {e}")
+            fragments = [str(card) for card in self._cards_from_page_source()[self.processed_count:]]
+
+        self.processed_count += len(fragments)
+
+        new_cards = []
+        for fragment in fragments:
+            self.parsed_fragments += 1
+            fragment_soup = BeautifulSoup(fragment, HTML_PARSER)
+            container = fragment_soup.body or fragment_soup  # lxml wraps fragments in html/body
+            card = container.find(True)
+            if card is not None and self._is_new(card, fragment):
+                new_cards.append(card)
+
+        return new_cards
+
+    def cards_from_html(self, page_source: str) -> List:
+        """
+        Get the cards of a listing page loaded outside the session's browser (numbered pages).
+
+        Cards whose URL was already returned in this session are skipped.
+        """
+        project_grid = BeautifulSoup(page_source, HTML_PARSER).select_one(self.project_list_selector) if page_source else None
+        cards = project_grid.select(self.project_entry_selector) if project_grid else []
+        return [card for card in cards if self._is_new(card, str(card))]
+
+    def _is_new(self, card, fragment: str) -> bool:
+        key = self._card_key(card, fragment)
+        if key in self.seen_card_keys:
+            return False
+        self.seen_card_keys.add(key)
+        return True
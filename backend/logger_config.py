@@ -1,15 +1,114 @@
 """Logging configuration for the Project Finder application."""
 
+import atexit
+import json
 import logging
 import logging.handlers
 import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, Dict, Optional
 from backend.config_manager import config_manager
 
+# Listener writing queued records to the console and file handlers in a background thread
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatter writing each record as a single JSON line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Filter sampling and rate limiting records of one logger hierarchy (e.g. "scan" for scan.*).
+
+    Records at WARNING and above always pass. Below that, a record first has to pass the
+    sample rate, then at most records_per_second records are let through per second. The
+    number of dropped records is attached to the next record that passes as "suppressed".
+    """
+
+    def __init__(self, prefix: str, records_per_second: float = 0, sample_rate: float = 1.0):
+        super().__init__()
+        self.prefix = prefix
+        self.records_per_second = records_per_second
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._window_start = 0.0
+        self._window_count = 0
+        self._sample_counter = 0.0
+        self._suppressed = 0
+
+    def _applies_to(self, name: str) -> bool:
+        return name == self.prefix or name.startswith(self.prefix + ".")
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self._applies_to(record.name):
+            return True
+
+        with self._lock:
+            # Deterministic sampling: keep every (1 / sample_rate)-th record
+            if self.sample_rate < 1.0:
+                self._sample_counter += self.sample_rate
+                if self._sample_counter < 1.0:
+                    self._suppressed += 1
+                    return False
+                self._sample_counter -= 1.0
+
+            if self.records_per_second > 0:
+                now = time.monotonic()
+                if now - self._window_start >= 1.0:
+                    self._window_start = now
+                    self._window_count = 0
+                if self._window_count >= self.records_per_second:
+                    self._suppressed += 1
+                    return False
+                self._window_count += 1
+
+            if self._suppressed:
+                record.suppressed = self._suppressed
+                record.msg = f"{record.msg} ({self._suppressed} earlier {self.prefix}.* messages suppressed)"
+                self._suppressed = 0
+        return True
+
+
+def _stop_queue_listener() -> None:
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
 
 def setup_logging() -> None:
-    """Setup logging configuration."""
+    """
+    Setup logging configuration.
+
+    Records are put on a queue by a QueueHandler and written to the console and file handlers
+    by a QueueListener thread, so logging never blocks on disk or console I/O. Configuration
+    keys in the "logging" section:
+        json: write structured JSON lines instead of the text format
+        queue: use the background writer (default true)
+        rate_limits: {logger prefix: {"records_per_second": n, "sample_rate": r}}
+    """
     log_config = config_manager.get_logging_config()
+    level = getattr(logging, log_config.get("level", "INFO"))
 
     # Create logs directory if it doesn't exist
     log_file = log_config.get("file", "app.log")
@@ -18,21 +117,25 @@ def setup_logging() -> None:
 
     # Configure root logger
     root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, log_config.get("level", "INFO")))
+    root_logger.setLevel(level)
 
-    # Clear existing handlers
+    # Clear existing handlers and stop a previously started writer thread
     root_logger.handlers.clear()
+    _stop_queue_listener()
 
     # Create formatter
-    formatter = logging.Formatter(
-        log_config.get("format", "%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-    )
+    use_json = str(os.getenv("LOG_JSON", log_config.get("json", False))).lower() in ("1", "true", "yes")
+    if use_json:
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            log_config.get("format", "%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        )
 
     # Console handler
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
 
     # File handler with rotation
     file_handler = logging.handlers.RotatingFileHandler(
@@ -41,9 +144,34 @@ def setup_logging() -> None:
         backupCount=log_config.get("backup_count", 5),
         encoding='utf-8'
     )
-    file_handler.setLevel(getattr(logging, log_config.get("level", "INFO")))
+    file_handler.setLevel(level)
     file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
+
+    def add_rate_limit_filters(handler: logging.Handler) -> None:
+        # Sampling and rate limits for high-volume logger hierarchies
+        for prefix, limits in log_config.get("rate_limits", {}).items():
+            handler.addFilter(RateLimitFilter(
+                prefix,
+                records_per_second=limits.get("records_per_second", 0),
+                sample_rate=limits.get("sample_rate", 1.0)
+            ))
+
+    if log_config.get("queue", True):
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setLevel(level)
+        add_rate_limit_filters(queue_handler)
+        root_logger.addHandler(queue_handler)
+
+        global _queue_listener
+        _queue_listener = logging.handlers.QueueListener(
+            log_queue, console_handler, file_handler, respect_handler_level=True
+        )
+        _queue_listener.start()
+    else:
+        for handler in (console_handler, file_handler):
+            add_rate_limit_filters(handler)
+            root_logger.addHandler(handler)
 
     # Set specific logger levels
     logging.getLogger("uvicorn").setLevel(logging.WARNING)
@@ -55,4 +183,8 @@ def setup_logging() -> None:
 
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance with the given name."""
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
+
+
+# Flush queued records on interpreter exit
+atexit.register(_stop_queue_listener)
@@ -1,9 +1,9 @@
 """Main FastAPI application for Project Finder."""
 
 import os
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, Header, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Any
 import logging
@@ -13,7 +13,7 @@ from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
 # Import local modules
-from backend.database import get_db, init_db
+from backend.database import engine, get_db, init_db
 from backend.logger_config import setup_logging
 from backend.config_manager import config_manager
 from backend.models.schemas import (
@@ -23,14 +23,23 @@ from backend.models.schemas import (
     AppStateCreate, AppStateUpdate, AppStateResponse,
     ScanResponse, EmployeeMatchResponse
 )
-from backend.models.core_models import Project, Employee, AppState
+from backend.models.core_models import Project, ProjectRequirement, Employee, AppState, Skill
 from backend.web_scraper import WebScraper
 from backend.matching_service import MatchingService
 from backend.scan_service import scan_service
+from backend.scan_job_service import scan_job_service
+from backend.scan_checkpoint_service import scan_checkpoint_service, RESUMABLE_STATUSES
+from backend.scan_telemetry_service import scan_telemetry_service
+from backend.refresh_service import refresh_service
+from backend.page_archive import page_archive
 from backend.utils.date_utils import european_to_iso_date
 from backend.matching_service import MatchingService
 from backend.tfidf_service import TFIDFService
+from backend.requirements_service import requirements_service
+from backend.project_index_service import project_index_service
+from backend.high_water_mark_service import high_water_mark_service
 from backend.openai_handler import OpenAIHandler
+from backend.metrics_service import metrics_service, TimingMiddleware
 
 # Setup logging
 setup_logging()
@@ -64,8 +73,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Request latency, query counts and the Server-Timing header (outermost, so it covers the whole request)
+app.add_middleware(TimingMiddleware)
+metrics_service.instrument_engine(engine)
+
 # Initialize services
 web_scraper = WebScraper()
 matching_service = MatchingService()
@@ -95,6 +109,14 @@ async def health_check():
     return {"status": "healthy", "message": "Project Finder API is running"}
 
 
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Metrics of requests, database queries, LLM/embedding calls and browser page loads in the Prometheus text format."""
+    if not metrics_service.enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled")
+    return PlainTextResponse(metrics_service.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 # Project endpoints
 @app.get("/api/projects", response_model=List[ProjectResponse])
 async def get_projects(
@@ -180,11 +202,16 @@ async def get_projects(
 
                 projects = sorted(projects, key=get_sort_key, reverse=True)
 
+        # Load all requirements with a single indexed query on project_requirements
+        requirements_map = requirements_service.get_requirements_map(db, [p.id for p in projects])
+
         # Convert to response models with proper field conversion
         response_projects = []
         for project in projects:
             # Convert datetime to ISO string for JSON serialization
             last_scan_str = project.last_scan.isoformat() if project.last_scan else None
+            # Fall back to the JSON mirror for projects not yet migrated to the join table
+            requirements_tf = requirements_map.get(project.id) or project.get_requirements_tf()
 
             response_project = ProjectResponse(
                 id=project.id,
@@ -195,7 +222,7 @@ async def get_projects(
                 location=project.location,
                 tenderer=project.tenderer,
                 project_id=project.project_id,
-                requirements_tf=project.get_requirements_tf(),  # Include term frequency data
+                requirements_tf=requirements_tf,  # Include term frequency data
                 rate=project.rate,
                 url=project.url,
                 budget=project.budget,
@@ -279,7 +306,7 @@ async def update_project(
         update_data = project_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             if field == "requirements_tf" and value is not None:
-                project.set_requirements_tf(value)
+                requirements_service.set_project_requirements(db, project, value)
             else:
                 setattr(project, field, value)
 
@@ -539,6 +566,71 @@ async def delete_employee(employee_id: int, db: Session = Depends(get_db)):
 
 
 # Scanning endpoints
+@app.post("/api/scan/refresh")
+async def refresh_projects(limit: Optional[int] = None):
+    """
+    Start re-checking stored projects in the background; only those whose page content changed are re-extracted.
+
+    The refresh runs as a scan job: watch it with /api/scan/jobs/{scan_id}/events and stop it with /api/scan/cancel/{scan_id}.
+    """
+    if limit is not None and limit < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="limit must be at least 1"
+        )
+    if scan_job_service.get_running_job() or scan_service.is_scan_active():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another scan is already in progress. Please wait for it to complete."
+        )
+    try:
+        return scan_job_service.start_refresh_job(limit).to_dict()
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error during project refresh: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to start project refresh"
+        )
+
+
+@app.post("/api/scan/reextract")
+async def reextract_projects(
+    limit: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Re-run the extraction of stored projects from their archived pages, without re-scanning the websites."""
+    if limit is not None and limit < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="limit must be at least 1"
+        )
+    try:
+        return await refresh_service.reextract_projects(db, limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error during project re-extraction: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to re-extract projects"
+        )
+
+
+@app.get("/api/scan/archive")
+async def get_page_archive_stats():
+    """Get the size of the archive of fetched pages."""
+    try:
+        return await asyncio.to_thread(page_archive.stats)
+    except Exception as e:
+        logger.error(f"Error getting page archive stats: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get page archive stats"
+        )
+
+
 @app.post("/api/scan/{time_range}", response_model=ScanResponse)
 async def scan_projects(
     time_range: int,
@@ -563,8 +655,12 @@ async def clear_projects(db: Session = Depends(get_db)):
     """Clear all projects from database."""
     try:
         count = db.query(Project).count()
+        # Bulk deletes bypass ORM cascades, so clear the join table explicitly
+        db.query(ProjectRequirement).delete()
         db.query(Project).delete()
         db.commit()
+        project_index_service.invalidate()  # Bulk deletes do not fire per-row events
+        high_water_mark_service.reset(db)  # Projects seen before must be scanned again
 
         logger.info(f"Cleared {count} projects from database")
         return {"message": f"Cleared {count} projects from database"}
@@ -597,11 +693,29 @@ async def run_deduplication(db: Session = Depends(get_db)):
 
 
 # Matching endpoints
-@app.get("/api/matches/{employee_id}", response_model=EmployeeMatchResponse)
-async def get_matches(employee_id: int, db: Session = Depends(get_db)):
-    """Get project matches for an employee."""
+@app.get("/api/matches/{employee_id}", response_model=EmployeeMatchResponse, response_model_exclude_none=True)
+async def get_matches(
+    employee_id: int,
+    min_percentage: Optional[float] = None,
+    top_k: Optional[int] = None,
+    explain: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Get project matches for an employee.
+
+    Optionally only the top_k best matches and/or only matches reaching min_percentage are returned.
+    With explain=true every match includes the decision made for each requirement.
+    """
+    if top_k is not None and top_k < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="top_k must be at least 1"
+        )
     try:
-        result = await matching_service.match_employee_to_projects(db, employee_id)
+        result = await matching_service.match_employee_to_projects(
+            db, employee_id, min_percentage=min_percentage, top_k=top_k, explain=explain
+        )
         return EmployeeMatchResponse(**result)
 
     except ValueError as e:
@@ -767,26 +881,41 @@ async def get_table_data(table_name: str, db: Session = Depends(get_db)):
         )
 
 
+SSE_HEADERS = {
+    "Cache-Control": "no-cache, no-store, must-revalidate",
+    "Pragma": "no-cache",
+    "Expires": "0",
+    "Connection": "keep-alive",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "*",
+    "Access-Control-Allow-Methods": "GET",
+    "X-Accel-Buffering": "no",  # Disable nginx buffering
+}
+
+
 @app.get("/api/scan/stream/{time_range}")
 async def scan_projects_stream(
     time_range: int,
-    db: Session = Depends(get_db)
+    last_event_id: Optional[str] = Header(None),
+    after: Optional[str] = None,
+    incremental: Optional[bool] = None
 ):
-    """Scan for new projects and stream results using Server-Sent Events."""
+    """
+    Start a scan job (or attach to the running one) and stream its events using Server-Sent Events.
+
+    The scan runs in the background; a reconnecting client (Last-Event-ID header or "after"
+    parameter) resumes its scan after the last event it received instead of starting a new one.
+    An incremental scan (default from "scanning.incremental") stops paginating each website at
+    its high-water mark; incremental=false walks the whole time range.
+    """
     try:
+        job, after_sequence = scan_job_service.parse_event_id(last_event_id or after)
+        if job is None:
+            job = scan_job_service.start_job(time_range, incremental)
         return StreamingResponse(
-            scan_service.scan_projects_stream(time_range, db),
+            job.subscribe(after_sequence),
             media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache, no-store, must-revalidate",
-                "Pragma": "no-cache",
-                "Expires": "0",
-                "Connection": "keep-alive",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "Access-Control-Allow-Methods": "GET",
-                "X-Accel-Buffering": "no",  # Disable nginx buffering
-            }
+            headers=SSE_HEADERS
         )
     except HTTPException:
         raise
@@ -798,6 +927,98 @@ async def scan_projects_stream(
         )
 
 
+@app.get("/api/scan/checkpoints")
+async def get_scan_checkpoints(db: Session = Depends(get_db)):
+    """List the durable records of recent scans and whether they can be resumed."""
+    try:
+        return scan_checkpoint_service.list_records(db)
+    except Exception as e:
+        logger.error(f"Error getting scan checkpoints: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get scan checkpoints"
+        )
+
+
+@app.get("/api/scan/runs")
+async def get_scan_runs(limit: int = 20, scan_id: Optional[str] = None, db: Session = Depends(get_db)):
+    """List finished scan runs, newest first, with throughput and per-phase timings per website."""
+    try:
+        return scan_telemetry_service.list_runs(db, limit, scan_id)
+    except Exception as e:
+        logger.error(f"Error getting scan runs: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get scan runs"
+        )
+
+
+@app.get("/api/scan/resume/{scan_id}")
+async def resume_scan(
+    scan_id: str,
+    db: Session = Depends(get_db)
+):
+    """Resume a cancelled, failed or interrupted scan from its last checkpoint and stream its events (SSE)."""
+    checkpoint = scan_checkpoint_service.load(db, scan_id)
+    if checkpoint is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Scan {scan_id} not found"
+        )
+    running_job = scan_job_service.get_running_job()
+    if running_job and running_job.scan_id != scan_id:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Scan {running_job.scan_id} is running"
+        )
+    if checkpoint.status not in RESUMABLE_STATUSES and not running_job:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Scan {scan_id} is {checkpoint.status} and cannot be resumed"
+        )
+    job = scan_job_service.resume_job(scan_id, checkpoint.time_range)
+    return StreamingResponse(
+        job.subscribe(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+@app.get("/api/scan/jobs/{scan_id}")
+async def get_scan_job(scan_id: str):
+    """Get the status of a scan job."""
+    job = scan_job_service.get_job(scan_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Scan {scan_id} not found"
+        )
+    return job.to_dict()
+
+
+@app.get("/api/scan/jobs/{scan_id}/events")
+async def scan_job_events(
+    scan_id: str,
+    last_event_id: Optional[str] = Header(None),
+    after: Optional[str] = None
+):
+    """Watch a scan job using Server-Sent Events, from the start or after Last-Event-ID (header or "after" parameter)."""
+    job = scan_job_service.get_job(scan_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Scan {scan_id} not found"
+        )
+    resumed_job, after_sequence = scan_job_service.parse_event_id(last_event_id or after)
+    if resumed_job is not job:
+        after_sequence = 0
+    return StreamingResponse(
+        job.subscribe(after_sequence),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
 @app.post("/api/scan/cancel/{scan_id}")
 async def cancel_scan(scan_id: str):
     """Cancel an active scan by its ID."""
@@ -825,7 +1046,8 @@ async def get_scan_status():
     """Get the current scan status."""
     try:
         is_active = scan_service.is_scan_active()
-        return {"is_active": is_active}
+        running_job = scan_job_service.get_running_job()
+        return {"is_active": is_active, "scan_id": running_job.scan_id if running_job else None}
     except Exception as e:
         logger.error(f"Error getting scan status: {str(e)}")
         raise HTTPException(
@@ -0,0 +1,535 @@
+"""
+Matching benchmark on a synthetic corpus.
+
+Generates projects, skills with random or clustered embeddings and employees in a fresh
+SQLite database and measures the operations that scale with the corpus:
+
+    operation       measured around
+    tfidf           TFIDFService.update_skills_idf_factors
+    matching        MatchingService.match_employee_to_projects, once per employee
+    deduplication   DeduplicationService.run_deduplication (runs last, it deletes projects)
+
+Every operation reports latency percentiles, the number of SQL statements and the peak
+Python heap. Results are plain JSON and carry the git commit, so the results of two
+commits can be compared with compare_results.
+"""
+
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend.benchmark_stats import StageTimer, max_rss_mb
+from backend.config_manager import config_manager
+from backend.deduplication_service import DeduplicationService
+from backend.matching_service import MatchingService
+from backend.models.core_models import Base, Employee, Project, ProjectRequirement, Skill
+from backend.skill_index_service import skill_index_service
+from backend.tfidf_service import TFIDFService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULTS_DIRECTORY = "benchmark_results"
+OPERATIONS = ("tfidf", "matching", "deduplication")
+EMBEDDING_MODES = ("random", "clustered")
+# Dimensions of text-embedding-3-large, the model of OpenAIHandler
+DEFAULT_DIMENSIONS = 3072
+
+_INSERT_CHUNK_SIZE = 10000
+_LOCATIONS = ["Berlin", "Hamburg", "München", "Köln", "Frankfurt", "Stuttgart", "Düsseldorf", "Leipzig", "Remote"]
+
+
+def _unit_vectors(rng: np.random.Generator, count: int, dimensions: int) -> np.ndarray:
+    vectors = rng.standard_normal((count, dimensions))
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _skill_embeddings(rng: np.random.Generator, skill_clusters: List[int], clusters: int, dimensions: int,
+                      mode: str, cluster_spread: float) -> np.ndarray:
+    """
+    Random mode: independent unit vectors (almost no embedding neighbours).
+    Clustered mode: noise of norm cluster_spread around one centre per cluster, so skills of a
+    cluster have a cosine similarity of about 1 / (1 + cluster_spread²) to each other.
+    """
+    if mode == "random":
+        return _unit_vectors(rng, len(skill_clusters), dimensions)
+    centres = _unit_vectors(rng, clusters, dimensions)
+    noise = _unit_vectors(rng, len(skill_clusters), dimensions) * cluster_spread
+    vectors = centres[skill_clusters] + noise
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _insert(db, table, rows: List[Dict[str, Any]]) -> None:
+    for i in range(0, len(rows), _INSERT_CHUNK_SIZE):
+        db.execute(table.insert(), rows[i:i + _INSERT_CHUNK_SIZE])
+
+
+def generate_corpus(db, projects: int = 1000, skills: Optional[int] = None, employees: int = 10,
+                    embedding: str = "clustered", clusters: int = 20, dimensions: int = DEFAULT_DIMENSIONS,
+                    cluster_spread: float = 0.35, requirements_per_project: Tuple[int, int] = (3, 12),
+                    skills_per_employee: Tuple[int, int] = (5, 15), duplicate_fraction: float = 0.02,
+                    seed: int = 42) -> Dict[str, Any]:
+    """
+    Fill an empty database with a synthetic corpus.
+
+    Skill popularity follows a Zipf distribution, so IDF factors spread like in real data.
+    In clustered mode most requirements of a project and the skills of an employee come from
+    one to three clusters. duplicate_fraction of the projects repeat an earlier project's
+    project_id, URL or title and tenderer, which run_deduplication removes.
+
+    Args:
+        db: Session of an empty database with the application schema
+        projects: Number of projects (including duplicates)
+        skills: Number of distinct skills (default: projects / 20, at least 200)
+        employees: Number of employees
+        embedding: "random" or "clustered"
+        clusters: Number of skill clusters (clustered mode)
+        dimensions: Embedding dimensions
+        cluster_spread: Distance of the skills from their cluster centre (clustered mode)
+        requirements_per_project: Minimum and maximum number of requirements of a project
+        skills_per_employee: Minimum and maximum number of skills of an employee
+        duplicate_fraction: Fraction of projects that duplicate an earlier project
+        seed: Seed of the generator; equal parameters and seed give an equal corpus
+
+    Returns:
+        The corpus parameters and counts, as stored in the benchmark result
+    """
+    if embedding not in EMBEDDING_MODES:
+        raise ValueError(f"Unknown embedding mode '{embedding}', expected one of {', '.join(EMBEDDING_MODES)}")
+    skills = skills or max(200, projects // 20)
+    clusters = max(1, min(clusters, skills))
+    rng = random.Random(seed)
+    vector_rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+
+    # Skills: names carry their cluster, popularity is Zipf over a shuffled rank order
+    skill_clusters = [i % clusters for i in range(skills)]
+    skill_names = [f"skill-{cluster:03d}-{i:05d}" for i, cluster in enumerate(skill_clusters)]
+    ranks = list(range(skills))
+    rng.shuffle(ranks)
+    popularity = list(itertools.accumulate(1.0 / (rank + 1) for rank in ranks))
+    cluster_members: Dict[int, List[int]] = {}
+    for i, cluster in enumerate(skill_clusters):
+        cluster_members.setdefault(cluster, []).append(i)
+
+    vectors = _skill_embeddings(vector_rng, skill_clusters, clusters, dimensions, embedding, cluster_spread)
+    _insert(db, Skill.__table__, [
+        {"id": i + 1, "skill_name": name, "embedding": json.dumps(np.round(vectors[i], 6).tolist())}
+        for i, name in enumerate(skill_names)
+    ])
+    del vectors
+
+    def sample_skills(count: int, home_clusters: List[int]) -> List[int]:
+        chosen = set()
+        while len(chosen) < count:
+            if embedding == "clustered" and rng.random() < 0.7:
+                chosen.add(rng.choice(cluster_members[rng.choice(home_clusters)]))
+            else:
+                chosen.add(rng.choices(range(skills), cum_weights=popularity)[0])
+        return list(chosen)
+
+    # Projects, some of them duplicates of earlier ones
+    today = datetime.now()
+    tenderers = [f"Kunde {i}" for i in range(max(10, projects // 50))]
+    project_rows: List[Dict[str, Any]] = []
+    originals: List[Dict[str, Any]] = []
+    requirement_rows: List[Dict[str, Any]] = []
+    duplicates = 0
+    for i in range(projects):
+        project_id = i + 1
+        count = min(rng.randint(*requirements_per_project), skills)
+        skill_ids = sample_skills(count, [rng.randrange(clusters)])
+        requirements_tf = {skill_names[skill]: rng.choice((1, 1, 1, 2, 2, 3)) for skill in skill_ids}
+        row = {
+            "id": project_id,
+            "title": f"Projekt {i}: {skill_names[skill_ids[0]]}",
+            "description": None,
+            "release_date": (today - timedelta(days=rng.randrange(60))).strftime("%d.%m.%Y"),
+            "start_date": (today + timedelta(days=rng.randrange(90))).strftime("%d.%m.%Y"),
+            "location": rng.choice(_LOCATIONS),
+            "tenderer": rng.choice(tenderers),
+            "project_id": f"BM-{i}",
+            "url": f"https://projects.example.com/{i}",
+            "requirements_tf": json.dumps(requirements_tf, ensure_ascii=False)
+        }
+        if originals and rng.random() < duplicate_fraction:
+            # Cycle through the criteria of DeduplicationService._are_projects_duplicates
+            original = rng.choice(originals)
+            criterion = duplicates % 3
+            if criterion == 0:
+                row["project_id"] = original["project_id"]
+            elif criterion == 1:
+                row["url"] = original["url"]
+            else:
+                row["title"], row["tenderer"] = original["title"], original["tenderer"]
+            duplicates += 1
+        else:
+            originals.append(row)
+        project_rows.append(row)
+        requirement_rows.extend(
+            {"project_id": project_id, "skill_id": skill + 1, "tf": requirements_tf[skill_names[skill]]}
+            for skill in skill_ids
+        )
+    _insert(db, Project.__table__, project_rows)
+    _insert(db, ProjectRequirement.__table__, requirement_rows)
+
+    employee_rows = []
+    for i in range(employees):
+        home_clusters = rng.sample(range(clusters), min(clusters, rng.randint(1, 3)))
+        count = min(rng.randint(*skills_per_employee), skills)
+        employee_rows.append({
+            "id": i + 1,
+            "name": f"Mitarbeiter {i}",
+            "skill_list": json.dumps([skill_names[skill] for skill in sample_skills(count, home_clusters)]),
+            "experience_years": rng.randint(1, 25)
+        })
+    _insert(db, Employee.__table__, employee_rows)
+    db.commit()
+
+    corpus = {
+        "projects": projects,
+        "skills": skills,
+        "employees": employees,
+        "embedding": embedding,
+        "clusters": clusters,
+        "dimensions": dimensions,
+        "cluster_spread": cluster_spread,
+        "requirements_per_project": list(requirements_per_project),
+        "skills_per_employee": list(skills_per_employee),
+        "duplicate_fraction": duplicate_fraction,
+        "seed": seed,
+        "requirements": len(requirement_rows),
+        "duplicates": duplicates,
+        "generate_seconds": time.perf_counter() - started
+    }
+    logger.info(f"Generated {projects} projects, {skills} skills and {employees} employees "
+                f"in {corpus['generate_seconds']:.1f}s")
+    return corpus
+
+
+class CorpusEmbeddingHandler:
+    """
+    Stands in for OpenAIHandler during the benchmark. Every corpus skill has its embedding in
+    the skills table, so the matching never asks for a new one; requests are counted and
+    answered like a failed API call.
+    """
+
+    def __init__(self):
+        self.requests = 0
+
+    async def get_embedding(self, text: str) -> List[float]:
+        self.requests += 1
+        return []
+
+    def calculate_distance(self, embedding1: List[float], embedding2: List[float], method: str = None) -> float:
+        if not embedding1 or not embedding2:
+            return float("inf")
+        return float(np.linalg.norm(np.array(embedding1) - np.array(embedding2)))
+
+
+class QueryCounter:
+    """Counts the SQL statements executed on an engine."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.count += 1
+
+    def remove(self) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._count)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+async def _measure(name: str, calls: Iterable, counter: QueryCounter, trace_memory: bool) -> Dict[str, Any]:
+    """Run the calls of one operation and collect latency, query count and peak heap."""
+    timer = StageTimer()
+    queries_before = counter.count
+    if trace_memory:
+        tracemalloc.reset_peak()
+        heap_before = tracemalloc.get_traced_memory()[0]
+    results = []
+    for call in calls:
+        started = time.perf_counter()
+        results.append(await call())
+        timer.add(name, time.perf_counter() - started)
+    queries = counter.count - queries_before
+    calls_made = len(results)
+    measured = {
+        "calls": calls_made,
+        "latency": timer.summary().get(name, {}),
+        "queries": queries,
+        "queries_per_call": queries / calls_made if calls_made else 0.0,
+        "peak_memory_mb": (tracemalloc.get_traced_memory()[1] - heap_before) / (1024 * 1024) if trace_memory else None
+    }
+    logger.info(f"Benchmark: {calls_made} {name} calls, {queries} queries")
+    return {**measured, "results": results}
+
+
+async def run_matching_benchmark(projects: int = 1000, skills: Optional[int] = None, employees: int = 10,
+                                 embedding: str = "clustered", dimensions: int = DEFAULT_DIMENSIONS,
+                                 operations: Iterable[str] = OPERATIONS, repeat: int = 1,
+                                 top_k: Optional[int] = None, min_percentage: Optional[float] = None,
+                                 threshold: Optional[float] = None, database_path: Optional[str] = None,
+                                 trace_memory: bool = True, seed: int = 42, **corpus_options) -> Dict[str, Any]:
+    """
+    Generate a corpus and measure the matching operations on it.
+
+    Args:
+        projects, skills, employees, embedding, dimensions, seed, **corpus_options: Corpus (see generate_corpus)
+        operations: Operations to run, in the order of OPERATIONS
+        repeat: How often every operation runs (matching runs once per employee and repetition)
+        top_k, min_percentage, threshold: Passed to match_employee_to_projects
+        database_path: SQLite file for the corpus; must not exist (default: a temporary file)
+        trace_memory: Measure the peak Python heap with tracemalloc (slows the operations down somewhat)
+
+    Returns:
+        Commit, environment, corpus, parameters and per operation the call count,
+        latency percentiles, query counts and peak heap
+    """
+    unknown = set(operations) - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"Unknown operations: {', '.join(sorted(unknown))}")
+    if database_path and os.path.exists(database_path):
+        raise ValueError(f"Database {database_path} already exists, the benchmark needs a new one")
+
+    temporary_directory = None if database_path else tempfile.mkdtemp(prefix="matching_benchmark_")
+    database_path = database_path or os.path.join(temporary_directory, "corpus.db")
+    engine = create_engine(f"sqlite:///{database_path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    counter = None
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    skill_index_service.invalidate()
+    try:
+        corpus = generate_corpus(db, projects, skills, employees, embedding, dimensions=dimensions, seed=seed,
+                                 **corpus_options)
+        employee_ids = [employee_id for (employee_id,) in db.query(Employee.id).order_by(Employee.id)]
+
+        tfidf_service = TFIDFService()
+        deduplication_service = DeduplicationService()
+        matching_service = MatchingService()
+        matching_service.openai_handler = CorpusEmbeddingHandler()
+        threshold = threshold if threshold is not None else config_manager.get_matching_threshold()
+
+        async def update_idf():
+            return tfidf_service.update_skills_idf_factors(db)
+
+        def match(employee_id):
+            async def call():
+                return await matching_service.match_employee_to_projects(
+                    db, employee_id, threshold=threshold, min_percentage=min_percentage, top_k=top_k
+                )
+            return call
+
+        async def deduplicate():
+            return deduplication_service.run_deduplication(db)
+
+        counter = QueryCounter(engine)
+        if started_tracing:
+            tracemalloc.start()
+        result_operations: Dict[str, Any] = {}
+        for operation in OPERATIONS:
+            if operation not in operations:
+                continue
+            if operation == "tfidf":
+                measured = await _measure(operation, [update_idf] * repeat, counter, trace_memory)
+                measured["skills_updated"] = len(measured.pop("results")[-1])
+            elif operation == "matching":
+                calls = [match(employee_id) for _ in range(repeat) for employee_id in employee_ids]
+                measured = await _measure(operation, calls, counter, trace_memory)
+                match_counts = [len(result["matches"]) for result in measured.pop("results")]
+                measured["matches_per_call"] = sum(match_counts) / len(match_counts) if match_counts else 0.0
+            else:
+                # Only the first run finds duplicates, later runs measure the check of a clean table
+                measured = await _measure(operation, [deduplicate] * repeat, counter, trace_memory)
+                measured["removed"] = sum(result["total_removed"] for result in measured.pop("results"))
+            result_operations[operation] = measured
+
+        return {
+            "benchmark": "matching",
+            "commit": _git_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "corpus": corpus,
+            "parameters": {
+                "operations": [operation for operation in OPERATIONS if operation in operations],
+                "repeat": repeat,
+                "top_k": top_k,
+                "min_percentage": min_percentage,
+                "threshold": threshold,
+                "distance_model": config_manager.get_distance_model(),
+                "trace_memory": trace_memory
+            },
+            "operations": result_operations,
+            "embedding_requests": matching_service.openai_handler.requests,
+            "max_rss_mb": max_rss_mb()
+        }
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        if counter:
+            counter.remove()
+        skill_index_service.invalidate()
+        db.close()
+        engine.dispose()
+        if temporary_directory:
+            shutil.rmtree(temporary_directory, ignore_errors=True)
+
+
+def default_results_path(result: Dict[str, Any], directory: str = DEFAULT_RESULTS_DIRECTORY) -> str:
+    """Results file named after the commit and corpus size, e.g. benchmark_results/matching-e0d367f-1000.json."""
+    corpus = result["corpus"]
+    return os.path.join(directory, f"matching-{result['commit'] or 'worktree'}-{corpus['projects']}-{corpus['embedding']}.json")
+
+
+def save_result(result: Dict[str, Any], path: Optional[str] = None) -> str:
+    """Write a benchmark result as JSON and return the path."""
+    path = path or default_results_path(result)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as result_file:
+        json.dump(result, result_file, indent=2)
+    return path
+
+
+def load_result(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as result_file:
+        return json.load(result_file)
+
+
+# Metrics compared between two results; all of them are "lower is better"
+_COMPARED_METRICS = (
+    ("latency", "p50"),
+    ("latency", "p95"),
+    ("latency", "mean"),
+    ("queries_per_call", None),
+    ("peak_memory_mb", None)
+)
+# Keys of the corpus that only describe the generated data, not its parameters
+_CORPUS_COUNTS = ("requirements", "duplicates", "generate_seconds")
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Compare the operations of two benchmark results.
+
+    Args:
+        baseline: Result of the reference commit
+        current: Result to check
+        tolerance: Relative increase of a metric that still counts as unchanged
+
+    Returns:
+        One entry per operation and metric with both values, the relative change and
+        whether it is a regression
+
+    Raises:
+        ValueError: If the results were measured on different corpora
+    """
+    corpus_parameters = [
+        {key: value for key, value in result["corpus"].items() if key not in _CORPUS_COUNTS}
+        for result in (baseline, current)
+    ]
+    if corpus_parameters[0] != corpus_parameters[1] or baseline["parameters"] != current["parameters"]:
+        raise ValueError("The results were measured on different corpora or parameters and are not comparable")
+
+    comparison = []
+    for operation, current_stats in current["operations"].items():
+        baseline_stats = baseline["operations"].get(operation)
+        if not baseline_stats:
+            continue
+        for metric, key in _COMPARED_METRICS:
+            before, after = baseline_stats.get(metric), current_stats.get(metric)
+            if key:
+                before, after = (before or {}).get(key), (after or {}).get(key)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before if before else (0.0 if after == before else float("inf"))
+            comparison.append({
+                "operation": operation,
+                "metric": f"{metric}.{key}" if key else metric,
+                "baseline": before,
+                "current": after,
+                "change": change,
+                "regression": change > tolerance
+            })
+    return comparison
+
+
+def format_report(result: Dict[str, Any]) -> str:
+    """Plain text report of a benchmark result."""
+    corpus = result["corpus"]
+    parameters = result["parameters"]
+    lines = [
+        f"Matching benchmark at {result['commit'] or 'uncommitted tree'} ({result['created_at']})",
+        f"Corpus: {corpus['projects']} projects ({corpus['duplicates']} duplicates), {corpus['skills']} skills, "
+        f"{corpus['employees']} employees, {corpus['requirements']} requirements, {corpus['embedding']} embeddings "
+        f"({corpus['dimensions']} dimensions), generated in {corpus['generate_seconds']:.1f}s",
+        f"Matching: threshold {parameters['threshold']}, top_k {parameters['top_k']}, "
+        f"min_percentage {parameters['min_percentage']}, {parameters['distance_model']} distance",
+        "",
+        f"  {'operation':<15} {'calls':>6} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10} "
+        f"{'queries/call':>13} {'peak MB':>9}"
+    ]
+    for operation, stats in result["operations"].items():
+        latency = stats["latency"]
+        peak_memory = stats["peak_memory_mb"]
+        if not latency:
+            lines.append(f"  {operation:<15} {stats['calls']:>6}")
+            continue
+        lines.append(
+            f"  {operation:<15} {stats['calls']:>6} {latency['mean'] * 1000:>10.1f} {latency['p50'] * 1000:>10.1f} "
+            f"{latency['p95'] * 1000:>10.1f} {latency['max'] * 1000:>10.1f} {stats['queries_per_call']:>13.1f} "
+            + (f"{peak_memory:>9.1f}" if peak_memory is not None else f"{'-':>9}")
+        )
+    lines.append("")
+    if "matching" in result["operations"]:
+        lines.append(f"Matches per employee: {result['operations']['matching']['matches_per_call']:.1f}")
+    if "deduplication" in result["operations"]:
+        lines.append(f"Duplicates removed: {result['operations']['deduplication']['removed']}")
+    if result["max_rss_mb"] is not None:
+        lines.append(f"Max resident set size of the process: {result['max_rss_mb']:.1f} MB")
+    return "\n".join(lines)
+
+
+def format_comparison(comparison: List[Dict[str, Any]], baseline: Dict[str, Any], current: Dict[str, Any]) -> str:
+    """Plain text table of compare_results."""
+    lines = [
+        f"{baseline['commit'] or 'uncommitted tree'} -> {current['commit'] or 'uncommitted tree'}",
+        f"  {'operation':<15} {'metric':<18} {'baseline':>12} {'current':>12} {'change':>9}"
+    ]
+    for entry in comparison:
+        lines.append(
+            f"  {entry['operation']:<15} {entry['metric']:<18} {entry['baseline']:>12.4f} {entry['current']:>12.4f} "
+            f"{entry['change'] * 100:>+8.1f}%" + ("  REGRESSION" if entry["regression"] else "")
+        )
+    regressions = sum(entry["regression"] for entry in comparison)
+    lines.append(f"{regressions} regression(s)" if regressions else "No regressions")
+    return "\n".join(lines)
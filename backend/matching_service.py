@@ -4,6 +4,7 @@ Project matching service for comparing employee skills with project requirements
 This file is now considered STABLE and should not be changed unless explicitly requested.
 """
 
+import heapq
 import logging
 from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
@@ -11,6 +12,9 @@ from backend.models.core_models import Project, Employee, Skill
 from backend.openai_handler import OpenAIHandler
 from backend.config_manager import config_manager
 from backend.tfidf_service import tfidf_service
+from backend.skill_index_service import skill_index_service
+from backend.requirements_service import requirements_service
+from backend.metrics_service import metrics_service
 
 logger = logging.getLogger(__name__)
 
@@ -105,12 +109,20 @@ class MatchingService:
         self,
         db: Session,
         employee_id: int,
-        threshold: float = None  # Use config threshold if not provided
+        threshold: float = None,  # Use config threshold if not provided
+        min_percentage: Optional[float] = None,
+        top_k: Optional[int] = None,
+        explain: bool = False
     ) -> Dict[str, Any]:
         """
         Match an employee to all available projects.
         - Prioritizes exact string matches for skills.
         - Uses embedding similarity only for non-exact matches, with a strict threshold.
+        - If min_percentage is given, only projects sharing at least one candidate skill (exact, synonym
+          or embedding neighbour) are scored, and only matches reaching min_percentage are returned.
+        - If top_k is given, only the top_k best matches are returned. Projects whose upper bound
+          cannot beat the current k-th best match are not scored at all.
+        - If explain is True, every match carries an explanation of its per-requirement decisions.
         - Returns a list of compatible projects with match percentages and missing skills.
         """
         try:
@@ -128,9 +140,9 @@ class MatchingService:
             if not employee:
                 raise ValueError(f"Employee with ID {employee_id} not found")
 
-            # Get all projects
-            projects = db.query(Project).all()
-            if not projects:
+            # Count all projects
+            total_projects = db.query(Project).count()
+            if not total_projects:
                 return {
                     "employee_id": employee_id,
                     "employee_name": employee.name,
@@ -147,34 +159,42 @@ class MatchingService:
                     "employee_name": employee.name,
                     "matches": [],
                     "missing_skills_summary": ["No skills defined for employee"],
-                    "total_projects_checked": len(projects)
+                    "total_projects_checked": total_projects
                 }
 
             # Get or create employee skill embeddings
             employee_embeddings = await self._get_employee_embeddings(db, employee)
 
-            # Match against each project
-            matches = []
-            missing_skills_summary = {}
-
-            for project in projects:
-                self.logger.debug(f"Matching employee {employee_id} against project {project.id} ({project.title})")
-                self.logger.debug(f"Employee skills: {employee_skills}")
-                self.logger.debug(f"Project requirements: {project.get_requirements_list()}")
+            # Get the projects worth scoring
+            projects = self._get_candidate_projects(db, employee_skills, employee_embeddings, threshold, min_percentage)
+            requirements_map = self._get_requirements_map(db, projects)
 
-                match_result = await self._match_project(
-                    db, project, employee_skills, employee_embeddings, threshold
+            if top_k:
+                matches = await self._match_top_k(
+                    db, projects, requirements_map, employee_skills, employee_embeddings, threshold, top_k, min_percentage, explain
                 )
+            else:
+                # Match against each project
+                matches = []
+
+                for project in projects:
+                    match_result = await self._match_project(
+                        db, project, employee_skills, employee_embeddings, threshold, explain, requirements_map[project.id]
+                    )
 
-                if match_result:
-                    matches.append(match_result)
+                    if match_result:
+                        if min_percentage is not None and match_result["match_percentage"] < min_percentage:
+                            continue
+                        matches.append(match_result)
 
-                    # Track missing skills
-                    for skill in match_result["missing_skills"]:
-                        missing_skills_summary[skill] = missing_skills_summary.get(skill, 0) + 1
+                # Sort matches by percentage (descending)
+                matches.sort(key=lambda x: x["match_percentage"], reverse=True)
 
-            # Sort matches by percentage (descending)
-            matches.sort(key=lambda x: x["match_percentage"], reverse=True)
+            # Track missing skills
+            missing_skills_summary = {}
+            for match_result in matches:
+                for skill in match_result["missing_skills"]:
+                    missing_skills_summary[skill] = missing_skills_summary.get(skill, 0) + 1
 
             # Get top missing skills
             top_missing_skills = sorted(
@@ -190,13 +210,208 @@ class MatchingService:
                 "employee_name": employee.name,
                 "matches": matches,
                 "missing_skills_summary": missing_skills_list,
-                "total_projects_checked": len(projects)
+                "total_projects_checked": total_projects
             }
 
         except Exception as e:
             self.logger.error(f"Error matching employee {employee_id}: {str(e)}")
             raise
 
+    def _get_candidate_skill_names(self, employee_skills: List[str]) -> List[str]:
+        """
+        Get the employee skills plus all their synonyms, i.e. every requirement name that
+        can produce an exact or synonym match.
+        """
+        names = []
+        for skill in employee_skills:
+            normalized = skill.strip().strip('"').strip("'").lower()
+            names.append(normalized)
+            names.extend(self.SKILL_SYNONYMS.get(normalized, []))
+            names.extend(key for key, synonyms in self.SKILL_SYNONYMS.items() if normalized in synonyms)
+        return names
+
+    def _get_candidate_projects(
+        self,
+        db: Session,
+        employee_skills: List[str],
+        employee_embeddings: Dict[str, List[float]],
+        threshold: float,
+        min_percentage: Optional[float]
+    ) -> List[Project]:
+        """
+        Get the projects to score. Without a positive min_percentage every project is scored.
+        Otherwise the inverted skill index restricts scoring to projects sharing at least one
+        candidate skill with the employee, since all other projects score 0%.
+        """
+        if not min_percentage or min_percentage <= 0:
+            return db.query(Project).all()
+
+        # Embedding neighbourhoods are only valid for the cosine distance model
+        if config_manager.get_distance_model().lower() != "cosine":
+            self.logger.debug("Skill index pre-filter requires the cosine distance model, scoring all projects")
+            return db.query(Project).all()
+
+        candidate_ids = skill_index_service.get_candidate_project_ids(
+            db,
+            self._get_candidate_skill_names(employee_skills),
+            employee_embeddings,
+            threshold
+        )
+        self.logger.info(f"Skill index pre-filter selected {len(candidate_ids)} candidate projects")
+
+        projects = []
+        candidate_list = sorted(candidate_ids)
+        for i in range(0, len(candidate_list), 500):
+            projects.extend(db.query(Project).filter(Project.id.in_(candidate_list[i:i + 500])).all())
+        return projects
+
+    def _get_requirements_map(self, db: Session, projects: List[Project]) -> Dict[int, Dict[str, int]]:
+        """
+        Get the requirements of all projects to score from the project_requirements table in one query.
+        Projects without rows there (not migrated yet) fall back to their requirements_tf JSON.
+        """
+        requirements_map = requirements_service.get_requirements_map(db, [project.id for project in projects])
+        for project in projects:
+            if project.id not in requirements_map:
+                requirements_tf = project.get_requirements_tf()
+                requirements_map[project.id] = requirements_tf if isinstance(requirements_tf, dict) else {}
+        return requirements_map
+
+    def _get_match_upper_bounds(
+        self,
+        db: Session,
+        projects: List[Project],
+        requirements_map: Dict[int, Dict[str, int]],
+        employee_skills: List[str],
+        employee_embeddings: Dict[str, List[float]],
+        threshold: float
+    ) -> List[float]:
+        """
+        Get an upper bound of the match percentage of each project without scoring it.
+
+        The bound assumes that every requirement which could match (exact, synonym or embedding
+        neighbour) matches with score 1.0, using the same TF-IDF weights as _match_project.
+        Requirements that are not in the skills table yet get a bound of 100%, because their
+        embedding is only created while scoring.
+        """
+        candidate_names = set(self._get_candidate_skill_names(employee_skills))
+
+        requirement_names = set()
+        for project in projects:
+            requirement_names.update(requirements_map[project.id].keys())
+
+        skill_info = {}
+        name_list = list(requirement_names)
+        for i in range(0, len(name_list), 500):
+            rows = db.query(Skill.id, Skill.skill_name, Skill.idf_factor).filter(
+                Skill.skill_name.in_(name_list[i:i + 500])
+            ).all()
+            for skill_id, skill_name, idf_factor in rows:
+                skill_info[skill_name] = (skill_id, idf_factor if idf_factor is not None else 0.0)
+
+        embedded_ids = skill_index_service.get_embedded_skill_ids(
+            db, (skill_id for skill_id, _ in skill_info.values())
+        )
+
+        # Embedding neighbourhoods are only valid for the cosine distance model
+        neighbour_ids = None
+        if config_manager.get_distance_model().lower() == "cosine" and threshold > 0:
+            neighbour_ids = set()
+            for embedding in employee_embeddings.values():
+                neighbour_ids.update(skill_index_service.get_neighbour_skill_ids(db, embedding, threshold))
+
+        bounds = []
+        for project in projects:
+            requirements_tf = requirements_map[project.id]
+            if not requirements_tf:
+                bounds.append(0.0)  # _match_project returns no result for these
+                continue
+
+            possible_weight = 0.0
+            total_weight = 0.0
+            unbounded = False
+            for req, tf_weight in requirements_tf.items():
+                if req not in skill_info:
+                    unbounded = True
+                    break
+                skill_id, idf_factor = skill_info[req]
+                if skill_id not in embedded_ids:
+                    continue  # Requirements without embedding are skipped by _match_project
+
+                tfidf_weight = tf_weight * idf_factor
+                total_weight += tfidf_weight
+
+                normalized = req.strip().strip('"').strip("'").lower()
+                if normalized in candidate_names:
+                    possible_weight += tfidf_weight
+                elif not self._is_soft_skill(normalized) and (neighbour_ids is None or skill_id in neighbour_ids):
+                    possible_weight += tfidf_weight
+
+            if unbounded:
+                bounds.append(100.0)
+            elif total_weight > 0:
+                bounds.append(possible_weight / total_weight * 100)
+            else:
+                bounds.append(0.0)
+
+        return bounds
+
+    async def _match_top_k(
+        self,
+        db: Session,
+        projects: List[Project],
+        requirements_map: Dict[int, Dict[str, int]],
+        employee_skills: List[str],
+        employee_embeddings: Dict[str, List[float]],
+        threshold: float,
+        top_k: int,
+        min_percentage: Optional[float],
+        explain: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the top_k best matches, equal to the first top_k entries of the full sorted match list.
+
+        Projects are scored in order of decreasing upper bound, and scoring stops as soon as the
+        bound of the next project cannot beat the k-th best match (or reach min_percentage).
+        Ties keep the project order of the full computation.
+        """
+        bounds = self._get_match_upper_bounds(db, projects, requirements_map, employee_skills, employee_embeddings, threshold)
+        order = sorted(range(len(projects)), key=lambda index: bounds[index], reverse=True)
+
+        # Min-heap of (match_percentage, -project_index, match_result); the root is the k-th best match
+        heap: List[Tuple[float, int, Dict[str, Any]]] = []
+        scored = 0
+
+        for index in order:
+            # Percentages are rounded to two decimals, so compare against the rounded bound
+            bound = round(bounds[index] + 1e-9, 2)
+            if min_percentage is not None and bound < min_percentage:
+                break
+            if len(heap) >= top_k and bound < heap[0][0]:
+                break
+
+            match_result = await self._match_project(
+                db, projects[index], employee_skills, employee_embeddings, threshold, explain,
+                requirements_map[projects[index].id]
+            )
+            scored += 1
+            if not match_result:
+                continue
+
+            match_percentage = match_result["match_percentage"]
+            if min_percentage is not None and match_percentage < min_percentage:
+                continue
+
+            entry = (match_percentage, -index, match_result)
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+        self.logger.info(f"Top-{top_k} matching scored {scored} of {len(projects)} projects")
+
+        return [match_result for _, _, match_result in sorted(heap, key=lambda entry: (-entry[0], -entry[1]))]
+
     async def _get_employee_embeddings(
         self,
         db: Session,
@@ -219,6 +434,7 @@ class MatchingService:
                     Skill.skill_name == skill
                 ).first()
 
+                metrics_service.record_embedding_lookup(hit=existing_skill is not None)
                 if existing_skill:
                     embeddings[skill] = existing_skill.get_embedding()
                     self.logger.debug(f"Found existing embedding for skill: {skill}")
@@ -269,7 +485,9 @@ class MatchingService:
         project: Project,
         employee_skills: List[str],
         employee_embeddings: Dict[str, List[float]],
-        threshold: float
+        threshold: float,
+        explain: bool = False,
+        requirements_tf: Optional[Dict[str, int]] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Match a single project against employee skills with TF-IDF weighting.
@@ -279,28 +497,30 @@ class MatchingService:
         - Uses embedding similarity for non-exact matches, with strict normalization.
         - Weights each match by its TF-IDF factor for more accurate scoring.
         - Returns match percentage and lists of matching/missing skills.
+        - If explain is True, the decision for every requirement is recorded in an
+          "explanation" entry instead of being logged.
+        - requirements_tf (from _get_requirements_map) avoids parsing the project's JSON column.
         """
         try:
-            project_requirements = project.get_requirements_list()
+            # Get TF-IDF weights for each requirement
+            if requirements_tf is None:
+                requirements_tf = project.get_requirements_tf()
+            project_requirements = list(requirements_tf)
             if not project_requirements:
                 return None
 
-            self.logger.debug(f"Matching project {project.id} ({project.title})")
-            self.logger.debug(f"Project requirements: {project_requirements}")
-            self.logger.debug(f"Employee skills: {employee_skills}")
-
-            project_embeddings = await self._get_project_embeddings(db, project)
-
-            # Get TF-IDF weights for each requirement
-            requirements_tf = project.get_requirements_tf()
-            if not requirements_tf:
-                # Fallback: if no TF data, use equal weights
-                requirements_tf = {req: 1 for req in project_requirements}
+            project_embeddings = await self._get_project_embeddings(db, project, project_requirements)
 
             matching_skills = []
             missing_skills = []
             weighted_total_score = 0.0
             total_tfidf_weight = 0.0
+            decisions = [] if explain else None
+
+            def normalize_skill(s):
+                return s.strip().strip('"').strip("'").lower()
+
+            distance_model = config_manager.get_distance_model().lower()
 
             for req in project_requirements:
                 req_embedding = project_embeddings.get(req)
@@ -313,12 +533,7 @@ class MatchingService:
                 tfidf_weight = tf_weight * idf_factor
                 total_tfidf_weight += tfidf_weight
 
-                self.logger.debug(f"Requirement '{req}': TF={tf_weight}, IDF={idf_factor:.4f}, TF-IDF weight={tfidf_weight:.4f}")
-
                 # 1. Exact string match (case-insensitive, quote/whitespace-insensitive)
-                def normalize_skill(s):
-                    return s.strip().strip('"').strip("'").lower()
-
                 exact_match = None
                 for emp_skill in employee_skills:
                     if normalize_skill(req) == normalize_skill(emp_skill):
@@ -326,13 +541,14 @@ class MatchingService:
                         break
                 if exact_match:
                     if self._is_hardcoded_exception(req, exact_match):
-                        self.logger.info(f"[BLOCKED] {req} <-> {exact_match} (hardcoded exception after exact match)")
                         missing_skills.append(req)
-                        self.logger.info(f"[NO MATCH] {req} (blocked by hardcoded exception, weight: {tfidf_weight:.4f})")
+                        if decisions is not None:
+                            decisions.append(self._decision(req, "blocked", tfidf_weight, "exact", exact_match, 1.0))
                         continue
                     matching_skills.append(req)  # Store project requirement, not employee skill
                     weighted_total_score += 1.0 * tfidf_weight
-                    self.logger.info(f"[MATCH] {req} <-> {exact_match} (type: exact, score: 1.0, weight: {tfidf_weight:.4f})")
+                    if decisions is not None:
+                        decisions.append(self._decision(req, "match", tfidf_weight, "exact", exact_match, 1.0))
                     continue
 
                 # 2. Synonym match (case-insensitive, quote/whitespace-insensitive)
@@ -343,29 +559,29 @@ class MatchingService:
                         break
                 if synonym_match:
                     if self._is_hardcoded_exception(req, synonym_match):
-                        self.logger.info(f"[BLOCKED] {req} <-> {synonym_match} (hardcoded exception after synonym match)")
                         missing_skills.append(req)
-                        self.logger.info(f"[NO MATCH] {req} (blocked by hardcoded exception, weight: {tfidf_weight:.4f})")
+                        if decisions is not None:
+                            decisions.append(self._decision(req, "blocked", tfidf_weight, "synonym", synonym_match, 0.95))
                         continue
                     matching_skills.append(req)  # Store project requirement, not employee skill
                     weighted_total_score += 0.95 * tfidf_weight
-                    self.logger.info(f"[MATCH] {req} <-> {synonym_match} (type: synonym, score: 0.95, weight: {tfidf_weight:.4f})")
+                    if decisions is not None:
+                        decisions.append(self._decision(req, "match", tfidf_weight, "synonym", synonym_match, 0.95))
                     continue
 
                 # 3. For soft skills, skip embedding similarity
                 if self._is_soft_skill(normalize_skill(req)):
                     missing_skills.append(req)
-                    self.logger.info(f"[NO MATCH] {req} (soft skill, no embedding match allowed, weight: {tfidf_weight:.4f})")
+                    if decisions is not None:
+                        decisions.append(self._decision(req, "no_match", tfidf_weight, "soft_skill"))
                     continue
 
                 # 4. Embedding similarity (configurable: euclidean or cosine)
                 best_match_score = 0.0
                 best_match_skill = None
-                best_match_type = None
                 for emp_skill, emp_embedding in employee_embeddings.items():
                     if not emp_embedding:
                         continue
-                    distance_model = config_manager.get_distance_model().lower()
                     if distance_model == "cosine":
                         similarity = self._cosine_similarity(req_embedding, emp_embedding)
                     else:
@@ -374,19 +590,26 @@ class MatchingService:
                     if similarity > best_match_score:
                         best_match_score = similarity
                         best_match_skill = emp_skill
-                        best_match_type = distance_model
                 if best_match_score >= threshold and best_match_skill is not None:
                     if self._is_hardcoded_exception(req, best_match_skill):
-                        self.logger.info(f"[BLOCKED] {req} <-> {best_match_skill} (hardcoded exception after embedding match)")
                         missing_skills.append(req)
-                        self.logger.info(f"[NO MATCH] {req} (blocked by hardcoded exception, weight: {tfidf_weight:.4f})")
+                        if decisions is not None:
+                            decisions.append(self._decision(
+                                req, "blocked", tfidf_weight, distance_model, best_match_skill, best_match_score
+                            ))
                     else:
                         matching_skills.append(req)  # Store project requirement, not employee skill
                         weighted_total_score += 1.0 * tfidf_weight
-                        self.logger.info(f"[MATCH] {req} <-> {best_match_skill} (type: {best_match_type}, score: {best_match_score:.3f}, weight: {tfidf_weight:.4f})")
+                        if decisions is not None:
+                            decisions.append(self._decision(
+                                req, "match", tfidf_weight, distance_model, best_match_skill, best_match_score
+                            ))
                 else:
                     missing_skills.append(req)
-                    self.logger.info(f"[NO MATCH] {req} (best score: {best_match_score:.3f}, threshold: {threshold}, weight: {tfidf_weight:.4f})")
+                    if decisions is not None:
+                        decisions.append(self._decision(
+                            req, "no_match", tfidf_weight, distance_model, best_match_skill, best_match_score
+                        ))
 
             # Remove duplicates from matching_skills while preserving order
             seen = set()
@@ -403,23 +626,50 @@ class MatchingService:
             else:
                 match_percentage = 0.0
 
-            self.logger.info(f"Project {project.id} match calculation: weighted_score={weighted_total_score:.4f}, total_weight={total_tfidf_weight:.4f}, percentage={match_percentage:.2f}%")
-
-            return {
+            match_result = {
                 "project_id": project.id,
                 "project_title": project.title,
                 "match_percentage": round(match_percentage, 2),
                 "matching_skills": matching_skills,
                 "missing_skills": missing_skills
             }
+            if decisions is not None:
+                match_result["explanation"] = {
+                    "threshold": threshold,
+                    "distance_model": distance_model,
+                    "weighted_score": weighted_total_score,
+                    "total_weight": total_tfidf_weight,
+                    "decisions": decisions
+                }
+            return match_result
         except Exception as e:
             self.logger.error(f"Error matching project {project.id}: {str(e)}")
             return None
 
+    @staticmethod
+    def _decision(
+        requirement: str,
+        decision: str,
+        weight: float,
+        match_type: str,
+        employee_skill: Optional[str] = None,
+        score: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Build one entry of a match explanation."""
+        return {
+            "requirement": requirement,
+            "decision": decision,
+            "match_type": match_type,
+            "employee_skill": employee_skill,
+            "score": score,
+            "weight": weight
+        }
+
     async def _get_project_embeddings(
         self,
         db: Session,
-        project: Project
+        project: Project,
+        project_requirements: Optional[List[str]] = None
     ) -> Dict[str, List[float]]:
         """
         Get embeddings for project requirements through skills table lookup.
@@ -429,7 +679,8 @@ class MatchingService:
             if not self.openai_handler:
                 raise ValueError("OpenAI handler not available")
 
-            project_requirements = project.get_requirements_list()
+            if project_requirements is None:
+                project_requirements = project.get_requirements_list()
             embeddings = {}
 
             for req in project_requirements:
@@ -438,9 +689,9 @@ class MatchingService:
                     Skill.skill_name == req
                 ).first()
 
+                metrics_service.record_embedding_lookup(hit=existing_skill is not None)
                 if existing_skill:
                     embeddings[req] = existing_skill.get_embedding()
-                    self.logger.debug(f"Found existing embedding for requirement: {req}")
                 else:
                     # Create new embedding and store in skills table
                     embedding = await self.openai_handler.get_embedding(req)
@@ -0,0 +1,321 @@
+"""
+In-process metrics: request latency, database queries, LLM and embedding calls, browser page loads.
+
+Counters and histograms are kept in memory and rendered in the Prometheus text format by
+GET /api/metrics. TimingMiddleware measures every HTTP request and adds a Server-Timing
+header with the time the request spent in the database, in LLM and embedding calls and in
+browser page loads. Work running outside of a request (e.g. a background scan) only counts
+towards the totals.
+"""
+
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from backend.config_manager import config_manager
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+# name: (type, help, buckets)
+METRICS: Dict[str, Tuple[str, str, Optional[Tuple[float, ...]]]] = {
+    "http_requests_total": ("counter", "HTTP requests by route template and status code", None),
+    "http_request_duration_seconds": ("histogram", "Latency of HTTP requests until the response starts", SECONDS_BUCKETS),
+    "http_request_db_queries": ("histogram", "Database queries per HTTP request", QUERY_COUNT_BUCKETS),
+    "db_queries_total": ("counter", "Database queries", None),
+    "db_query_duration_seconds": ("histogram", "Latency of database queries", SECONDS_BUCKETS),
+    "llm_requests_total": ("counter", "LLM chat completions by outcome", None),
+    "llm_request_duration_seconds": ("histogram", "Latency of LLM chat completions including rate limiting and retries", SECONDS_BUCKETS),
+    "llm_retries_total": ("counter", "Retried LLM requests", None),
+    "llm_tokens_total": ("counter", "Tokens reported by the LLM and embedding APIs", None),
+    "embedding_requests_total": ("counter", "Embedding API requests by outcome", None),
+    "embedding_request_duration_seconds": ("histogram", "Latency of embedding API requests", SECONDS_BUCKETS),
+    "embedding_cache_lookups_total": ("counter", "Skill embedding lookups in the skills table (hit) or the API (miss)", None),
+    "browser_page_loads_total": ("counter", "Browser page loads by page kind", None),
+    "browser_page_load_duration_seconds": ("histogram", "Latency of browser page loads", SECONDS_BUCKETS)
+}
+
+# Components of the Server-Timing header and their descriptions
+TIMING_COMPONENTS = {
+    "db": "queries",
+    "llm": "LLM calls",
+    "embedding": "embedding calls",
+    "browser": "page loads"
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class RequestTiming:
+    """Time and counts one HTTP request spent per component (see TIMING_COMPONENTS)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.seconds: Dict[str, float] = {component: 0.0 for component in TIMING_COMPONENTS}
+        self.counts: Dict[str, int] = {component: 0 for component in TIMING_COMPONENTS}
+        self.recorded = False  # Set once the request has been recorded in the metrics
+        self._lock = threading.Lock()
+
+    def add(self, component: str, seconds: float) -> None:
+        with self._lock:
+            self.seconds[component] += seconds
+            self.counts[component] += 1
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Server-Timing header value, e.g. 'app;dur=12.5, db;desc="queries: 4";dur=3.1'."""
+        entries = [f"app;dur={total_seconds * 1000:.1f}"]
+        with self._lock:
+            for component, description in TIMING_COMPONENTS.items():
+                if self.counts[component]:
+                    entries.append(
+                        f'{component};desc="{description}: {self.counts[component]}";dur={self.seconds[component] * 1000:.1f}'
+                    )
+        return ", ".join(entries)
+
+
+_current_request: contextvars.ContextVar[Optional[RequestTiming]] = contextvars.ContextVar("request_timing", default=None)
+
+
+class MetricsService:
+    """Thread-safe registry of counters and histograms with helpers for the instrumented components."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        # name -> labels -> [bucket counts..., sum, count]
+        self._histograms: Dict[str, Dict[LabelKey, List[float]]] = {}
+        self._instrumented_engines = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(config_manager.get("metrics.enabled", True))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def increment(self, name: str, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        buckets = METRICS[name][2]
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            values = series.get(key)
+            if values is None:
+                values = series[key] = [0] * (len(buckets) + 2)
+            index = bisect.bisect_left(buckets, value)
+            if index < len(buckets):
+                values[index] += 1
+            values[-2] += value
+            values[-1] += 1
+
+    def get_counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def get_histogram_count(self, name: str, **labels) -> int:
+        with self._lock:
+            values = self._histograms.get(name, {}).get(_label_key(labels))
+            return int(values[-1]) if values else 0
+
+    # Request context
+
+    def start_request(self) -> Tuple[RequestTiming, contextvars.Token]:
+        timing = RequestTiming()
+        return timing, _current_request.set(timing)
+
+    def end_request(self, token: contextvars.Token) -> None:
+        _current_request.reset(token)
+
+    @staticmethod
+    def current_request() -> Optional[RequestTiming]:
+        return _current_request.get()
+
+    def _add_to_request(self, component: str, seconds: float) -> None:
+        timing = _current_request.get()
+        if timing is not None:
+            timing.add(component, seconds)
+
+    # Instrumented components
+
+    def record_request(self, method: str, route: str, status_code: int, seconds: float, db_queries: int) -> None:
+        self.increment("http_requests_total", method=method, route=route, status=status_code)
+        self.observe("http_request_duration_seconds", seconds, method=method, route=route)
+        self.observe("http_request_db_queries", db_queries, method=method, route=route)
+
+    def record_query(self, seconds: float) -> None:
+        self.increment("db_queries_total")
+        self.observe("db_query_duration_seconds", seconds)
+        self._add_to_request("db", seconds)
+
+    def record_llm_call(self, provider: str, seconds: float, outcome: str = "ok",
+                        prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        self.increment("llm_requests_total", provider=provider, outcome=outcome)
+        self.observe("llm_request_duration_seconds", seconds, provider=provider)
+        if prompt_tokens:
+            self.increment("llm_tokens_total", prompt_tokens, provider=provider, type="prompt")
+        if completion_tokens:
+            self.increment("llm_tokens_total", completion_tokens, provider=provider, type="completion")
+        self._add_to_request("llm", seconds)
+
+    def record_llm_retry(self, provider: str) -> None:
+        self.increment("llm_retries_total", provider=provider)
+
+    def record_embedding_call(self, provider: str, seconds: float, outcome: str = "ok", tokens: int = 0) -> None:
+        self.increment("embedding_requests_total", provider=provider, outcome=outcome)
+        self.observe("embedding_request_duration_seconds", seconds, provider=provider)
+        if tokens:
+            self.increment("llm_tokens_total", tokens, provider=provider, type="embedding")
+        self._add_to_request("embedding", seconds)
+
+    def record_embedding_lookup(self, hit: bool) -> None:
+        self.increment("embedding_cache_lookups_total", result="hit" if hit else "miss")
+
+    def record_page_load(self, kind: str, seconds: float) -> None:
+        self.increment("browser_page_loads_total", kind=kind)
+        self.observe("browser_page_load_duration_seconds", seconds, kind=kind)
+        self._add_to_request("browser", seconds)
+
+    @contextmanager
+    def page_load(self, kind: str) -> Iterator[None]:
+        """Time a browser page load (e.g. driver.get) of the given page kind."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_page_load(kind, time.perf_counter() - started)
+
+    def instrument_engine(self, engine) -> None:
+        """Count and time every query of a SQLAlchemy engine."""
+        if id(engine) in self._instrumented_engines:
+            return
+        self._instrumented_engines.add(id(engine))
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info["query_started"].pop()
+            self.record_query(time.perf_counter() - started)
+
+        @event.listens_for(engine, "handle_error")
+        def _handle_error(exception_context):
+            connection = exception_context.connection
+            if connection is not None and connection.info.get("query_started"):
+                connection.info["query_started"].pop()
+
+    # Exposition
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {key: list(values) for key, values in series.items()} for name, series in self._histograms.items()}
+
+        lines = []
+        for name, (metric_type, help_text, buckets) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            if metric_type == "counter":
+                for key, value in sorted(counters.get(name, {}).items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_number(value)}")
+                continue
+            for key, values in sorted(histograms.get(name, {}).items()):
+                cumulative = 0
+                for bound, count in zip(buckets, values):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', _format_number(bound)))} {int(cumulative)}")
+                lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {int(values[-1])}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_number(values[-2])}")
+                lines.append(f"{name}_count{_format_labels(key)} {int(values[-1])}")
+        return "\n".join(lines) + "\n"
+
+
+metrics_service = MetricsService()
+
+
+class TimingMiddleware:
+    """
+    ASGI middleware recording the latency and database queries of every HTTP request per route
+    template and adding a Server-Timing header (if metrics.server_timing is enabled).
+
+    Latency is measured until the response starts, so streamed responses (SSE) count the time
+    until their first byte.
+    """
+
+    def __init__(self, app, service: MetricsService = metrics_service):
+        self.app = app
+        self.service = service
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.service.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        timing, token = self.service.start_request()
+        server_timing = config_manager.get("metrics.server_timing", True)
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                seconds = time.perf_counter() - timing.started
+                self._record(scope, status_code, seconds, timing)
+                if server_timing:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", timing.server_timing(seconds).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        except Exception:
+            if not timing.recorded:
+                self._record(scope, status_code, time.perf_counter() - timing.started, timing)
+            raise
+        finally:
+            self.service.end_request(token)
+
+    def _record(self, scope, status_code: int, seconds: float, timing: RequestTiming) -> None:
+        timing.recorded = True
+        route = scope.get("route")
+        # Route templates keep the label set small; unmatched paths are not labelled individually
+        route_path = getattr(route, "path", None) or "unmatched"
+        self.service.record_request(scope["method"], route_path, status_code, seconds, timing.counts["db"])
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Migration script to create the normalized project_requirements table and populate it
+from the requirements_tf JSON column of the projects table.
+"""
+
+import sys
+import os
+from sqlalchemy import inspect
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import engine, SessionLocal
+from backend.models.core_models import ProjectRequirement
+from backend.requirements_service import requirements_service
+
+
+def migrate_add_project_requirements_table():
+    """Create the project_requirements table (with indexes) and migrate JSON requirements into it."""
+    try:
+        inspector = inspect(engine)
+
+        if not inspector.has_table("projects"):
+            print("❌ Projects table does not exist. Cannot perform migration.")
+            return False
+
+        if inspector.has_table("project_requirements"):
+            print("✅ project_requirements table already exists, refreshing its content")
+        else:
+            print("🔄 Creating project_requirements table...")
+            ProjectRequirement.__table__.create(bind=engine)
+
+        indexes = [index['name'] for index in inspect(engine).get_indexes("project_requirements")]
+        print(f"Indexes on project_requirements: {indexes}")
+
+        db = SessionLocal()
+        try:
+            migrated = requirements_service.rebuild_from_json(db)
+            row_count = db.query(ProjectRequirement).count()
+            print(f"✅ Migrated requirements of {migrated} projects ({row_count} requirement rows)")
+            return True
+        except Exception as e:
+            print(f"❌ Error during migration: {e}")
+            db.rollback()
+            return False
+        finally:
+            db.close()
+
+    except Exception as e:
+        print(f"❌ Error connecting to database: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    print("🚀 Starting migration: Add project_requirements join table")
+    success = migrate_add_project_requirements_table()
+    if success:
+        print("🎉 Migration completed successfully!")
+        sys.exit(0)
+    else:
+        print("💥 Migration failed!")
+        sys.exit(1)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Migration script to add content hash and HTTP validator columns to projects table."""
+
+import sqlite3
+import os
+import sys
+
+NEW_COLUMNS = {
+    "content_hash": "VARCHAR(64)",
+    "content_hash_source": "VARCHAR(20)",
+    "http_etag": "VARCHAR(200)",
+    "http_last_modified": "VARCHAR(100)",
+}
+
+
+def migrate_add_refresh_columns():
+    """Add content_hash, content_hash_source, http_etag and http_last_modified columns to projects table."""
+    # Use database file in root directory
+    db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'project_finder.db')
+
+    if not os.path.exists(db_path):
+        print(f"❌ Database file not found: {db_path}")
+        return False
+
+    try:
+        # Connect to database
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        # Check which columns already exist
+        cursor.execute("PRAGMA table_info(projects)")
+        columns = [col[1] for col in cursor.fetchall()]
+
+        missing = {name: column_type for name, column_type in NEW_COLUMNS.items() if name not in columns}
+        if not missing:
+            print("✅ Refresh columns already exist in projects table")
+            conn.close()
+            return True
+
+        # Add missing columns
+        for name, column_type in missing.items():
+            print(f"🔄 Adding {name} column to projects table...")
+            cursor.execute(f"ALTER TABLE projects ADD COLUMN {name} {column_type}")
+
+        # Commit changes
+        conn.commit()
+
+        # Verify the columns were added
+        cursor.execute("PRAGMA table_info(projects)")
+        columns = [col[1] for col in cursor.fetchall()]
+
+        if all(name in columns for name in NEW_COLUMNS):
+            print("✅ Refresh columns successfully added to projects table")
+            conn.close()
+            return True
+        else:
+            print("❌ Failed to add refresh columns")
+            conn.close()
+            return False
+
+    except Exception as e:
+        print(f"❌ Error during migration: {str(e)}")
+        if 'conn' in locals():
+            conn.close()
+        return False
+
+if __name__ == "__main__":
+    print("🚀 Starting migration: Add refresh columns to projects table")
+    success = migrate_add_refresh_columns()
+    if success:
+        print("🎉 Migration completed successfully!")
+        sys.exit(0)
+    else:
+        print("💥 Migration failed!")
+        sys.exit(1)
@@ -0,0 +1,178 @@
+"""
+Async Mistral client wrapper with rate limiting, bounded concurrency and retries.
+
+All chat completions go through one wrapper per handler:
+
+- a token bucket limits the request rate (Mistral rate limits are per API key),
+- a semaphore bounds the number of requests in flight,
+- every attempt has a timeout,
+- 429, 5xx, timeouts and connection errors are retried with exponential backoff and
+  jitter (honouring Retry-After); other errors are raised immediately.
+
+When all retries are used up, MistralUnavailableError is raised so that callers can keep
+the project for a later scan instead of storing it without requirements.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Dict, Optional
+import httpx
+
+from backend.config_manager import config_manager
+from backend.metrics_service import metrics_service
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CLIENT_CONFIG = {
+    "requests_per_second": 1.0,
+    "burst": 2,
+    "max_concurrency": 2,
+    "max_retries": 5,
+    "timeout_seconds": 60.0,
+    "backoff_base_seconds": 1.0,
+    "backoff_max_seconds": 30.0
+}
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class MistralUnavailableError(Exception):
+    """Raised when a request still fails after all retries (rate limited, server errors or timeouts)."""
+
+
+class TokenBucket:
+    """Async token bucket allowing `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, lock: asyncio.Lock) -> None:
+        """Wait until a token is available and take it."""
+        async with lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int) and status_code > 0:
+        return status_code
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code
+    return None
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds to wait as requested by the server, if any."""
+    response = getattr(error, "raw_response", None) or getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return max(float(headers.get("Retry-After")), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class MistralClientWrapper:
+    """Rate-limited, retrying access to the async chat completion API of a Mistral client."""
+
+    def __init__(self, client, config: Optional[Dict[str, Any]] = None):
+        self.client = client
+        config = {**DEFAULT_CLIENT_CONFIG, **(config or {})}
+        self.max_concurrency = max(int(config["max_concurrency"]), 1)
+        self.max_retries = max(int(config["max_retries"]), 0)
+        self.timeout = float(config["timeout_seconds"])
+        self.backoff_base = float(config["backoff_base_seconds"])
+        self.backoff_max = float(config["backoff_max_seconds"])
+        self.bucket = TokenBucket(float(config["requests_per_second"]), float(config["burst"]))
+        self.logger = logging.getLogger(__name__)
+        self.retries = 0  # Retried attempts over the lifetime of the wrapper
+        # asyncio primitives are bound to an event loop, so they are created per loop
+        self._loop = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._bucket_lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def from_config(cls, client) -> "MistralClientWrapper":
+        """Create a wrapper with the settings of the "mistral" config block."""
+        return cls(client, config_manager.get("mistral", {}))
+
+    def _primitives(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._bucket_lock = asyncio.Lock()
+        return self._semaphore, self._bucket_lock
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)  # Equal jitter
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, (asyncio.TimeoutError, httpx.TransportError)):
+            return True
+        return _status_code(error) in RETRYABLE_STATUS_CODES
+
+    async def complete(self, call_logger: Optional[logging.Logger] = None, **kwargs):
+        """
+        Run a chat completion with rate limiting, bounded concurrency, timeouts and retries.
+
+        Args:
+            call_logger: Logger for retry messages (e.g. the scan logger)
+            **kwargs: Arguments of client.chat.complete_async (model, messages, ...)
+
+        Returns:
+            The chat completion response
+
+        Raises:
+            MistralUnavailableError: A retryable error persisted after all retries
+        """
+        call_logger = call_logger or self.logger
+        semaphore, bucket_lock = self._primitives()
+        started = time.perf_counter()
+
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire(bucket_lock)
+            try:
+                async with semaphore:
+                    response = await asyncio.wait_for(self.client.chat.complete_async(**kwargs), self.timeout)
+                usage = getattr(response, "usage", None)
+                metrics_service.record_llm_call(
+                    "mistral", time.perf_counter() - started,
+                    prompt_tokens=getattr(usage, "prompt_tokens", None) or 0,
+                    completion_tokens=getattr(usage, "completion_tokens", None) or 0
+                )
+                return response
+            except Exception as e:
+                if not self._is_retryable(e):
+                    metrics_service.record_llm_call("mistral", time.perf_counter() - started, outcome="error")
+                    raise
+                if attempt == self.max_retries:
+                    metrics_service.record_llm_call("mistral", time.perf_counter() - started, outcome="unavailable")
+                    raise MistralUnavailableError(f"Mistral request failed after {attempt + 1} attempts: {e!r}") from e
+                delay = self._backoff(attempt, e)
+                self.retries += 1
+                metrics_service.record_llm_retry("mistral")
+                status_code = _status_code(e)
+                reason = f"status {status_code}" if status_code else type(e).__name__
+                call_logger.warning(f"Mistral request failed ({reason}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
@@ -8,46 +8,58 @@ from mistralai import Mistral
 import logging
 from typing import List, Dict, Any, Optional
 from bs4 import BeautifulSoup
-import json
-import re
+import os
+import time
+from backend.config_manager import config_manager
+from backend.mistral_client import MistralClientWrapper, MistralUnavailableError
+from backend.batch_extraction import (
+    OUTPUT_TOKENS_PER_PROJECT, batch_output_schema, build_batch_messages, get_batch_settings, parse_batch_response, plan_batches
+)
+from backend.structured_output import (
+    PROJECT_DETAILS_SCHEMA, RELEASE_DATE_SCHEMA, REQUIREMENTS_SCHEMA, RESPONSE_FORMAT_MODES,
+    build_response_format, get_response_format_mode, parse_json_response
+)
+from backend.prompt_compactor import CompactedPage, compact_page
 
 logger = logging.getLogger(__name__)
 
+# Words of a 400/422 error body saying that the response format itself is not supported
+RESPONSE_FORMAT_ERROR_MARKERS = ("response_format", "response format", "json_schema", "json_object", "structured output")
+# Rejections of a response format by a call that then succeeded in a weaker mode before it is dropped for good
+RESPONSE_FORMAT_REJECTIONS_TO_DOWNGRADE = 3
+
+
+def _is_response_format_error(error: Exception) -> bool:
+    text = f"{getattr(error, 'body', '') or ''} {error}".lower()
+    return any(marker in text for marker in RESPONSE_FORMAT_ERROR_MARKERS)
+
+
 class MistralHandler:
     """Handler for Mistral AI API interactions."""
 
-    def __init__(self, api_key: str):
-        """Initialize the Mistral handler with API key."""
+    def __init__(self, api_key: str, server_url: Optional[str] = None):
+        """Initialize the Mistral handler with API key (and optionally another API server, e.g. a local fake)."""
         try:
-            self.client = Mistral(api_key=api_key)
+            server_url = server_url or os.getenv("MISTRAL_SERVER_URL") or config_manager.get("mistral.server_url")
+            self.client = Mistral(api_key=api_key, server_url=server_url) if server_url else Mistral(api_key=api_key)
+            # Rate-limited, retrying async access to the chat API
+            self.api = MistralClientWrapper.from_config(self.client)
             self.logger = logging.getLogger(__name__)
+            # Token counts of all calls of this handler (prompt/completion as reported by the API)
+            self.token_usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "estimated_page_tokens": 0, "latency_seconds": 0.0}
+            # Structured output mode of extraction calls and the number of answers without usable JSON
+            self.response_format_mode = get_response_format_mode()
+            self.response_format_rejections = 0
+            self.parse_failures = 0
         except Exception as e:
             self.logger = logging.getLogger(__name__)
             self.logger.error(f"Error initializing Mistral client: {e}")
             self.logger.error("Please ensure your API key is valid.")
             raise
 
-    def _clean_json_string(self, json_str: str) -> str:
-        """
-        Clean and normalize JSON string to handle common formatting issues.
-
-        Args:
-            json_str (str): Raw JSON string
-
-        Returns:
-            str: Cleaned JSON string
-        """
-        # Remove trailing commas before closing braces/brackets
-        json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
-
-        # Remove any leading/trailing whitespace
-        json_str = json_str.strip()
-
-        return json_str
-
     def _extract_json_from_response(self, response_text: str) -> Optional[Dict[str, Any]]:
         """
-        Extract JSON from various response formats including markdown code blocks.
+        Extract the JSON object from a response, counting answers without one.
 
         Args:
             response_text (str): The raw response text from Mistral API
@@ -55,44 +67,58 @@ class MistralHandler:
         Returns:
             Optional[Dict[str, Any]]: Parsed JSON data or None if parsing fails
         """
-        if not response_text or not isinstance(response_text, str):
-            return None
-
-        # Clean the response text
-        text = response_text.strip()
-
-        # Try to extract JSON from markdown code blocks
-        # Pattern for ```json ... ``` or ``` ... ```
-        json_block_pattern = r'```(?:json)?\s*(\{.*?\})\s*```'
-        match = re.search(json_block_pattern, text, re.DOTALL)
-
-        if match:
-            json_str = match.group(1)
-            json_str = self._clean_json_string(json_str)
-            try:
-                return json.loads(json_str)
-            except json.JSONDecodeError as e:
-                self.logger.warning(f"Failed to parse JSON from code block: {e}")
-
-        # Try to find JSON object directly in the text
-        # Look for content that starts with { and ends with }
-        json_pattern = r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}'
-        matches = re.findall(json_pattern, text, re.DOTALL)
-
-        for match in matches:
-            match = self._clean_json_string(match)
-            try:
-                return json.loads(match)
-            except json.JSONDecodeError:
-                continue
+        parsed_data = parse_json_response(response_text)
+        if isinstance(parsed_data, dict):
+            return parsed_data
+        self.parse_failures += 1
+        self.logger.warning(f"No valid JSON found in response ({self.parse_failures} parse failures so far)")
+        return None
+
+    async def _complete(self, mistral_logger, messages: List[Dict[str, str]], max_tokens: int, schema_name: str, schema: Dict[str, Any],
+                        mode: Optional[str] = None):
+        """
+        Run an extraction call with structured JSON output in the configured response format mode.
 
-        # If no JSON found, try to parse the entire text as JSON
-        text = self._clean_json_string(text)
+        A 400/422 error naming the response format drops to the next weaker mode for good. Other
+        400/422 errors may be about the request itself (e.g. an oversized prompt), so only this call
+        is retried in the weaker mode; the configured mode is dropped after
+        RESPONSE_FORMAT_REJECTIONS_TO_DOWNGRADE such calls in a row succeeded in the weaker mode.
+        """
+        mode = mode or self.response_format_mode
+        response_format = build_response_format(mode, schema_name, schema)
+        kwargs = {"model": "mistral-large-latest", "messages": messages, "temperature": 0.3, "max_tokens": max_tokens}
+        if response_format is None:
+            return await self.api.complete(call_logger=mistral_logger, **kwargs)
         try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            self.logger.warning("No valid JSON found in response")
-            return None
+            response = await self.api.complete(call_logger=mistral_logger, response_format=response_format, **kwargs)
+        except MistralUnavailableError:
+            raise
+        except Exception as e:
+            if getattr(e, "status_code", None) not in (400, 422):
+                raise
+            fallback_mode = RESPONSE_FORMAT_MODES[RESPONSE_FORMAT_MODES.index(mode) + 1]
+            if _is_response_format_error(e):
+                # Model or API without this response format: use the next weaker mode from now on
+                mistral_logger.warning(f"Response format {mode} rejected ({e.status_code}), using {fallback_mode}")
+                self._downgrade_response_format(mode, fallback_mode)
+                return await self._complete(mistral_logger, messages, max_tokens, schema_name, schema, fallback_mode)
+            mistral_logger.warning(f"Request with response format {mode} failed ({e.status_code}: {e}), retrying it with {fallback_mode}")
+            response = await self._complete(mistral_logger, messages, max_tokens, schema_name, schema, fallback_mode)
+            if mode == self.response_format_mode:
+                self.response_format_rejections += 1
+                if self.response_format_rejections >= RESPONSE_FORMAT_REJECTIONS_TO_DOWNGRADE:
+                    mistral_logger.warning(f"Response format {mode} rejected by {self.response_format_rejections} calls in a row, using {fallback_mode}")
+                    self._downgrade_response_format(mode, fallback_mode)
+            return response
+        if mode == self.response_format_mode:
+            self.response_format_rejections = 0
+        return response
+
+    def _downgrade_response_format(self, mode: str, fallback_mode: str) -> None:
+        """Use fallback_mode from now on if mode is still the configured one (not a retry or already dropped by a concurrent call)."""
+        if self.response_format_mode == mode:
+            self.response_format_mode = fallback_mode
+            self.response_format_rejections = 0
 
     def preprocess_text(self, text: str) -> str:
         """Preprocess text for better requirement extraction."""
@@ -138,7 +164,22 @@ class MistralHandler:
         clean_text = ' '.join(text.split())
         return clean_text
 
-    async def extract_project_details(self, text: str, scan_id: str = None) -> Dict[str, Any]:
+    def _record_usage(self, response, page, latency: float, call_name: str, call_logger) -> None:
+        """Record and log the token counts of one API call."""
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+        completion_tokens = getattr(usage, "completion_tokens", None) or 0
+        self.token_usage["calls"] += 1
+        self.token_usage["prompt_tokens"] += prompt_tokens
+        self.token_usage["completion_tokens"] += completion_tokens
+        self.token_usage["estimated_page_tokens"] += page.tokens
+        self.token_usage["latency_seconds"] += latency
+        call_logger.info(
+            f"Mistral {call_name}: {prompt_tokens} prompt tokens, {completion_tokens} completion tokens, {latency:.2f}s "
+            f"(page text: {page.source}, ~{page.tokens} of ~{page.original_tokens} tokens{', truncated' if page.truncated else ''})"
+        )
+
+    async def extract_project_details(self, text: str, scan_id: str = None, content_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Extract requirements from text using Mistral AI."""
         # Create structured logger for this scan
         if scan_id:
@@ -150,8 +191,9 @@ class MistralHandler:
             if not text:
                 return {}
 
-            # Preprocess the text
-            processed_text = self.preprocess_text(self.extract_clean_text(text))
+            # Reduce the page to its content region within the token budget, then preprocess
+            page = compact_page(text, content_config)
+            processed_text = self.preprocess_text(page.text)
 
             messages = [
                 {
@@ -205,13 +247,12 @@ class MistralHandler:
             ]
 
             try:
-                response = self.client.chat.complete(
-                    model="mistral-large-latest",
-                    messages=messages,
-                    temperature=0.3,
-                    max_tokens=2000
-                )
+                started = time.perf_counter()
+                response = await self._complete(mistral_logger, messages, 2000, "project_details", PROJECT_DETAILS_SCHEMA)
+                self._record_usage(response, page, time.perf_counter() - started, "project details", mistral_logger)
                 project_data = response.choices[0].message.content
+            except MistralUnavailableError:
+                raise
             except Exception as e:
                 mistral_logger.error(f"Error calling Mistral API: {str(e)}")
                 return {}
@@ -224,11 +265,151 @@ class MistralHandler:
                 mistral_logger.warning("Could not extract valid JSON from response, returning fallback")
                 return {}
 
+        except MistralUnavailableError:
+            raise
         except Exception as e:
             mistral_logger.error(f"Error extracting project details with Mistral: {str(e)}")
             return {}
 
-    async def extract_release_date(self, text: str, scan_id: str = None) -> Dict[str, Any]:
+    async def extract_requirements_and_description(self, text: str, scan_id: str = None, content_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Extract only requirements and description; structured fields come from the rule-based extractor."""
+        # Create structured logger for this scan
+        if scan_id:
+            mistral_logger = logging.getLogger(f"scan.{scan_id}.mistral")
+        else:
+            mistral_logger = self.logger
+
+        try:
+            if not text:
+                return {}
+
+            page = compact_page(text, content_config)
+            processed_text = self.preprocess_text(page.text)
+
+            messages = [
+                {
+                    "role": "system",
+                    "content": """You are a precise data extraction assistant. Return ONLY a JSON object without markdown
+                    formatting, code blocks or commentary. Preserve all German characters exactly as they appear.
+                    The JSON must include these exact fields:
+                    - description (string)
+                    - requirements_tf (dictionary of strings (requirement) and integers (number of occurences))"""
+                },
+                {
+                    "role": "user",
+                    "content": f"""Extract from this project posting:
+                    - description: summary of the project in no more than 60 words
+                    - requirements_tf: the required skills ('Anforderungen', 'Qualifikationen', 'Fähigkeiten' or similar),
+                        at most two core words each (e.g. 'Dokumentation' instead of 'Schreiben von Dokumentation'); if none
+                        are listed explicitly, determine them from the description or title. Map each requirement to the
+                        number of its occurences on the page.
+                    \n\n{processed_text}"""
+                }
+            ]
+
+            try:
+                started = time.perf_counter()
+                response = await self._complete(mistral_logger, messages, 1000, "requirements", REQUIREMENTS_SCHEMA)
+                self._record_usage(response, page, time.perf_counter() - started, "requirements", mistral_logger)
+                requirements_data = response.choices[0].message.content
+            except MistralUnavailableError:
+                raise
+            except Exception as e:
+                mistral_logger.error(f"Error calling Mistral API: {str(e)}")
+                return {}
+
+            parsed_data = self._extract_json_from_response(requirements_data)
+            if parsed_data:
+                mistral_logger.info("Successfully parsed requirements and description.")
+                return parsed_data
+            else:
+                mistral_logger.warning("Could not extract valid JSON from response, returning fallback")
+                return {}
+
+        except MistralUnavailableError:
+            raise
+        except Exception as e:
+            mistral_logger.error(f"Error extracting requirements with Mistral: {str(e)}")
+            return {}
+
+    async def _extract_batch(self, batch: List[Dict[str, Any]], mistral_logger) -> Dict[str, Dict[str, Any]]:
+        """Extract one planned batch with a single request; returns the valid results by id."""
+        schema = batch[0]["schema"]
+        batch_page = CompactedPage(
+            " ".join(item["text"] for item in batch),
+            f"batch of {len(batch)}",
+            sum(item["page"].original_tokens for item in batch),
+            any(item["page"].truncated for item in batch)
+        )
+        try:
+            started = time.perf_counter()
+            response = await self._complete(
+                mistral_logger,
+                build_batch_messages(batch, schema),
+                OUTPUT_TOKENS_PER_PROJECT * len(batch),
+                f"project_batch_{schema}",
+                batch_output_schema(schema)
+            )
+            self._record_usage(response, batch_page, time.perf_counter() - started, f"batch ({schema})", mistral_logger)
+            results = parse_batch_response(response.choices[0].message.content, [item["id"] for item in batch])
+        except MistralUnavailableError:
+            raise
+        except Exception as e:
+            mistral_logger.error(f"Error calling Mistral API for batch: {str(e)}")
+            return {}
+
+        if not results:
+            self.parse_failures += 1
+        if len(results) < len(batch):
+            mistral_logger.warning(f"Batch answer contained {len(results)} of {len(batch)} projects, extracting the rest one by one")
+        return results
+
+    async def extract_project_details_batch(self, pages: List[Dict[str, Any]], scan_id: str = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Extract several project pages with as few requests as possible.
+
+        Args:
+            pages: Dictionaries with "id", "html", optional "content_config" and "schema"
+                   ("full", or "requirements" when the structured fields are already known)
+            scan_id: Scan ID for structured logging
+
+        Returns:
+            Extracted project data by page id; items that failed in a batch are extracted
+            with single-project calls
+        """
+        if scan_id:
+            mistral_logger = logging.getLogger(f"scan.{scan_id}.mistral")
+        else:
+            mistral_logger = self.logger
+
+        items = []
+        for page_item in pages:
+            page = compact_page(page_item["html"], page_item.get("content_config"))
+            items.append({
+                "id": str(page_item["id"]),
+                "schema": page_item.get("schema", "full"),
+                "text": self.preprocess_text(page.text),
+                "tokens": page.tokens,
+                "page": page,
+                "source": page_item
+            })
+
+        settings = get_batch_settings()
+        results: Dict[str, Dict[str, Any]] = {}
+        for batch in plan_batches(items, settings["max_tokens"], settings["max_projects"]):
+            if len(batch) > 1:
+                results.update(await self._extract_batch(batch, mistral_logger))
+            for item in batch:
+                if item["id"] in results:
+                    continue
+                source = item["source"]
+                if item["schema"] == "requirements":
+                    results[item["id"]] = await self.extract_requirements_and_description(source["html"], scan_id, source.get("content_config"))
+                else:
+                    results[item["id"]] = await self.extract_project_details(source["html"], scan_id, source.get("content_config"))
+        return results
+
+    async def extract_release_date(self, text: str, scan_id: str = None, content_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Extract release date from text using Mistral AI."""
         # Create structured logger for this scan
         if scan_id:
@@ -240,7 +421,8 @@ class MistralHandler:
             if not text:
                 return {}
 
-            processed_text = self.extract_clean_text(text)
+            page = compact_page(text, content_config)
+            processed_text = page.text
 
             messages = [
                 {
@@ -262,13 +444,12 @@ class MistralHandler:
             ]
 
             try:
-                response = self.client.chat.complete(
-                    model="mistral-large-latest",
-                    messages=messages,
-                    temperature=0.3,
-                    max_tokens=500
-                )
+                started = time.perf_counter()
+                response = await self._complete(mistral_logger, messages, 500, "release_date", RELEASE_DATE_SCHEMA)
+                self._record_usage(response, page, time.perf_counter() - started, "release date", mistral_logger)
                 release_date_data = response.choices[0].message.content
+            except MistralUnavailableError:
+                raise
             except Exception as e:
                 mistral_logger.error(f"Error calling Mistral API: {str(e)}")
                 return {}
@@ -279,6 +460,8 @@ class MistralHandler:
             else:
                 return {}
 
+        except MistralUnavailableError:
+            raise
         except Exception as e:
             mistral_logger.error(f"Error extracting release date with Mistral: {str(e)}")
             return {}
\ No newline at end of file
@@ -1,4 +1,4 @@
-from .core_models import Project, Skill, Employee, AppState
+from .core_models import Project, ProjectRequirement, Skill, Employee, AppState, ScanRun
 from .schemas import (
     ProjectCreate, ProjectUpdate, ProjectResponse,
     EmployeeCreate, EmployeeUpdate, EmployeeResponse,
@@ -8,7 +8,7 @@ from .schemas import (
 )
 
 __all__ = [
-    'Project', 'Skill', 'Employee', 'AppState',
+    'Project', 'ProjectRequirement', 'Skill', 'Employee', 'AppState', 'ScanRun',
     'ProjectCreate', 'ProjectUpdate', 'ProjectResponse',
     'EmployeeCreate', 'EmployeeUpdate', 'EmployeeResponse',
     'SkillCreate', 'SkillResponse',
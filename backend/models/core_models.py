@@ -31,6 +31,17 @@ class Project(Base):
     workload = Column(String(100), nullable=True)  # Workload in hours per week
     sort_order = Column(Integer, nullable=True, index=True)  # For efficient ordering by release date
     last_scan = Column(DateTime(timezone=True), server_default=func.now())
+    content_hash = Column(String(64), nullable=True)  # SHA-256 of the cleaned page text at the last extraction/refresh
+    content_hash_source = Column(String(20), nullable=True)  # How the hashed page was fetched ("http" or "browser")
+    http_etag = Column(String(200), nullable=True)  # Validators for conditional refresh requests
+    http_last_modified = Column(String(100), nullable=True)
+
+    # Normalized requirements (project_requirements join table)
+    requirements = relationship(
+        "ProjectRequirement",
+        back_populates="project",
+        cascade="all, delete-orphan"
+    )
 
     def get_requirements_list(self) -> List[str]:
         """Get requirements as a list of strings from requirements_tf."""
@@ -74,6 +85,19 @@ class Skill(Base):
         self.embedding = json.dumps(embedding, ensure_ascii=False)
 
 
+class ProjectRequirement(Base):
+    """Database model linking a project to a required skill with its term frequency."""
+
+    __tablename__ = "project_requirements"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True, index=True)
+    skill_id = Column(Integer, ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True, index=True)
+    tf = Column(Integer, nullable=False, default=1)  # Term frequency on the project page
+
+    project = relationship("Project", back_populates="requirements")
+    skill = relationship("Skill", lazy="joined")
+
+
 class Employee(Base):
     """Database model for employee information."""
 
@@ -131,4 +155,52 @@ class AppState(Base):
         if isinstance(value, (dict, list)):
             self.value = json.dumps(value, ensure_ascii=False)
         else:
-            self.value = str(value)
\ No newline at end of file
+            self.value = str(value)
+
+
+class ScanRun(Base):
+    """Database model for a finished scan run with its throughput and per-phase telemetry."""
+
+    __tablename__ = "scan_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    scan_id = Column(String(50), nullable=False, index=True)
+    status = Column(String(20), nullable=False)  # complete, cancelled, failed or interrupted
+    time_range = Column(Integer, nullable=True)
+    incremental = Column(Boolean, default=False)
+    resumed = Column(Boolean, default=False)
+    started_at = Column(DateTime, nullable=False, index=True)
+    finished_at = Column(DateTime, nullable=True)
+    duration_seconds = Column(Float, default=0.0)
+    projects = Column(Integer, default=0)
+    projects_per_minute = Column(Float, default=0.0)
+    telemetry = Column(Text, nullable=True)  # JSON: per-phase statistics in total, per website and of the slowest projects
+
+    def get_telemetry(self) -> Dict[str, Any]:
+        """Get telemetry as dictionary."""
+        if not self.telemetry:
+            return {}
+        try:
+            return json.loads(self.telemetry)
+        except json.JSONDecodeError:
+            return {}
+
+    def set_telemetry(self, telemetry: Dict[str, Any]) -> None:
+        """Set telemetry from dictionary."""
+        self.telemetry = json.dumps(telemetry, ensure_ascii=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Run as a JSON serializable dictionary."""
+        return {
+            "scan_id": self.scan_id,
+            "status": self.status,
+            "time_range": self.time_range,
+            "incremental": bool(self.incremental),
+            "resumed": bool(self.resumed),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_seconds": self.duration_seconds,
+            "projects": self.projects,
+            "projects_per_minute": self.projects_per_minute,
+            **self.get_telemetry()
+        }
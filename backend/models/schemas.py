@@ -190,6 +190,27 @@ class ScanResponse(BaseModel):
     duration: float
 
 
+class MatchDecision(BaseModel):
+    """Schema for the match decision of a single project requirement."""
+
+    requirement: str
+    decision: str  # match, no_match or blocked
+    match_type: str  # exact, synonym, soft_skill or the distance model
+    employee_skill: Optional[str] = None
+    score: Optional[float] = None
+    weight: float
+
+
+class MatchExplanation(BaseModel):
+    """Schema for the explanation of a match result."""
+
+    threshold: float
+    distance_model: str
+    weighted_score: float
+    total_weight: float
+    decisions: List[MatchDecision]
+
+
 class MatchResult(BaseModel):
     """Schema for match result."""
 
@@ -198,6 +219,7 @@ class MatchResult(BaseModel):
     match_percentage: float
     matching_skills: List[str]
     missing_skills: List[str]
+    explanation: Optional[MatchExplanation] = None  # Only present when explain is requested
 
 
 class EmployeeMatchResponse(BaseModel):
@@ -0,0 +1,41 @@
+"""
+Page URLs of listings with numbered pages.
+
+Sites whose listing pages are addressed by number (e.g. "?pagenr=3") can declare a
+"page-url-template" in their level1_search config, with "{page}" standing for the page
+number. The scraper then derives the page URLs itself and loads up to "page-concurrency"
+listing pages at once, instead of discovering each next page from the pagination links
+after the current page was processed completely.
+"""
+
+import re
+from typing import Any, Dict, Optional
+from backend.config_manager import config_manager
+
+PAGE_PLACEHOLDER = "{page}"
+DEFAULT_PAGE_CONCURRENCY = 3
+
+
+def get_page_url_template(website_config: Dict[str, Any]) -> Optional[str]:
+    """Get the site's page URL template, or None if its pages are found through the pagination links."""
+    template = website_config["level1_search"].get("page-url-template")
+    return template if template and PAGE_PLACEHOLDER in template else None
+
+
+def get_page_concurrency(website_config: Dict[str, Any]) -> int:
+    """Number of listing pages loaded at once for the site (site setting, else "scanning.page_concurrency")."""
+    concurrency = website_config["level1_search"].get(
+        "page-concurrency", config_manager.get("scanning.page_concurrency", DEFAULT_PAGE_CONCURRENCY)
+    )
+    return max(int(concurrency), 1)
+
+
+def page_url(template: str, number: int) -> str:
+    return template.replace(PAGE_PLACEHOLDER, str(number))
+
+
+def page_number(template: str, url: Optional[str]) -> Optional[int]:
+    """Get the page number of a URL built from the template, or None if the URL does not match it."""
+    prefix, _, suffix = template.partition(PAGE_PLACEHOLDER)
+    match = re.fullmatch(re.escape(prefix) + r"(\d+)" + re.escape(suffix), url or "")
+    return int(match.group(1)) if match else None
@@ -2,9 +2,11 @@
 
 import openai
 import logging
+import time
 from typing import List, Dict, Any
 import numpy as np
 from backend.config_manager import config_manager
+from backend.metrics_service import metrics_service
 
 logger = logging.getLogger(__name__)
 
@@ -29,16 +31,25 @@ class OpenAIHandler:
         self.model = "text-embedding-3-large"
         self.logger.info("OpenAI legacy API key set successfully")
 
+    def _create_embeddings(self, texts):
+        """Call the embeddings API and record the call in the metrics."""
+        started = time.perf_counter()
+        try:
+            response = self.client.embeddings.create(model=self.model, input=texts)
+        except Exception:
+            metrics_service.record_embedding_call("openai", time.perf_counter() - started, outcome="error")
+            raise
+        usage = getattr(response, "usage", None)
+        metrics_service.record_embedding_call("openai", time.perf_counter() - started, tokens=getattr(usage, "total_tokens", None) or 0)
+        return response
+
     async def get_embedding(self, text: str) -> List[float]:
         """Get embedding for a single text string."""
         try:
             if not text or not text.strip():
                 return []
 
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=text.strip()
-            )
+            response = self._create_embeddings(text.strip())
 
             embedding = response.data[0].embedding
             self.logger.debug(f"Generated embedding for text: {text[:50]}...")
@@ -60,10 +71,7 @@ class OpenAIHandler:
             if not valid_texts:
                 return []
 
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=valid_texts
-            )
+            response = self._create_embeddings(valid_texts)
 
             embeddings = [data.embedding for data in response.data]
             self.logger.debug(f"Generated {len(embeddings)} embeddings in batch")
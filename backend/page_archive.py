@@ -0,0 +1,269 @@
+"""
+Compressed, content-addressed archive of fetched pages.
+
+Every listing and detail page loaded by a scan is kept, so extraction can be re-run
+offline after a prompt, schema or consolidation change instead of re-scanning live:
+
+    page_archive/
+        objects/3f/3fa4...c2.html.zst   # Page HTML, named by the SHA-256 of its content
+        index.jsonl                     # One line per fetch: url, kind, site, sha256, codec, fetched_at
+
+Pages are compressed with zstd when the zstandard package is installed and with gzip
+otherwise. Identical content is stored once, however often it was fetched. The index is
+append-only; the latest fetch of a URL wins. prune() (run after every scan) drops fetches
+older than "page_archive.max_age_days" and then the oldest fetches until the blobs fit into
+"page_archive.max_bytes". Storing compresses and writes files, so async code calls it in a
+worker thread.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from backend.config_manager import config_manager
+from backend.utils.url_utils import normalize_project_url
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIRECTORY = "page_archive"
+INDEX_FILE = "index.jsonl"
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 90
+
+# File extension per codec
+CODEC_EXTENSIONS = {"zstd": "zst", "gzip": "gz"}
+
+
+def get_archive_codec() -> str:
+    """Configured codec ("page_archive.codec": auto, zstd or gzip); auto prefers zstd when installed."""
+    codec = config_manager.get("page_archive.codec", "auto")
+    if codec == "zstd" and zstandard is None:
+        logger.warning("zstandard is not installed, archiving pages with gzip")
+        return "gzip"
+    if codec not in CODEC_EXTENSIONS:
+        return "zstd" if zstandard is not None else "gzip"
+    return codec
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class PageArchive:
+    """Content-addressed page store with an index by URL and fetch time. Thread-safe."""
+
+    def __init__(self, directory: Optional[str] = None, codec: Optional[str] = None, enabled: Optional[bool] = None):
+        self._directory = directory
+        self._codec = codec
+        self._enabled = enabled  # None follows "page_archive.enabled"
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, List[Dict[str, Any]]]] = None  # Normalized URL -> fetches, oldest first
+
+    @property
+    def directory(self) -> Path:
+        return Path(self._directory or config_manager.get("page_archive.directory", DEFAULT_DIRECTORY))
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled is not None:
+            return self._enabled
+        return bool(config_manager.get("page_archive.enabled", True))
+
+    def _blob_path(self, digest: str, codec: str) -> Path:
+        return self.directory / "objects" / digest[:2] / f"{digest}.html.{CODEC_EXTENSIONS[codec]}"
+
+    def _find_blob(self, digest: str) -> Optional[tuple]:
+        for codec in CODEC_EXTENSIONS:
+            path = self._blob_path(digest, codec)
+            if path.exists():
+                return path, codec
+        return None
+
+    def _load_index(self) -> Dict[str, List[Dict[str, Any]]]:
+        if self._index is None:
+            index: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            index_path = self.directory / INDEX_FILE
+            if index_path.exists():
+                with open(index_path, encoding="utf-8") as index_file:
+                    for line in index_file:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # Line cut off by a crash while appending
+                        index[normalize_project_url(record["url"]) or record["url"]].append(record)
+            self._index = index
+        return self._index
+
+    def store(self, url: str, html: Optional[str], kind: str, site: Optional[str] = None) -> Optional[str]:
+        """
+        Archive a fetched page.
+
+        Args:
+            url: URL the page was fetched from
+            html: Page source
+            kind: "listing" or "detail"
+            site: Name of the configured website, if known
+
+        Returns:
+            SHA-256 of the content, or None if archiving is disabled or the page is empty
+        """
+        if not self.enabled or not html or not url:
+            return None
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        record = {
+            "url": url,
+            "kind": kind,
+            "site": site,
+            "sha256": digest,
+            "fetched_at": datetime.now().isoformat(),
+            "size": len(data)
+        }
+        try:
+            with self._lock:
+                existing = self._find_blob(digest)
+                if existing:
+                    record["codec"] = existing[1]
+                else:
+                    codec = self._codec or get_archive_codec()
+                    path = self._blob_path(digest, codec)
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    temp_path = path.with_suffix(path.suffix + ".tmp")
+                    temp_path.write_bytes(_compress(data, codec))
+                    os.replace(temp_path, path)  # Readers never see a partly written blob
+                    record["codec"] = codec
+                with open(self.directory / INDEX_FILE, "a", encoding="utf-8") as index_file:
+                    index_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                if self._index is not None:
+                    self._index[normalize_project_url(url) or url].append(record)
+            return digest
+        except OSError as e:
+            logger.error(f"Error archiving page {url}: {str(e)}")
+            return None
+
+    def prune(self, max_bytes: Optional[int] = None, max_age_days: Optional[int] = None) -> Dict[str, int]:
+        """
+        Drop old fetches and the blobs no remaining fetch refers to.
+
+        Args:
+            max_bytes: Compressed size the blobs must fit into, oldest fetches dropped first
+                (default "page_archive.max_bytes"; 0 for no limit)
+            max_age_days: Fetches older than this are dropped (default "page_archive.max_age_days"; 0 for no limit)
+
+        Returns:
+            Numbers of removed fetches and blobs and the freed bytes
+        """
+        if max_bytes is None:
+            max_bytes = int(config_manager.get("page_archive.max_bytes", DEFAULT_MAX_BYTES))
+        if max_age_days is None:
+            max_age_days = int(config_manager.get("page_archive.max_age_days", DEFAULT_MAX_AGE_DAYS))
+        result = {"removed_fetches": 0, "removed_blobs": 0, "freed_bytes": 0}
+        try:
+            with self._lock:
+                if not (self.directory / INDEX_FILE).exists():
+                    return result
+                records = sorted((record for records in self._load_index().values() for record in records),
+                                 key=lambda record: record["fetched_at"])
+                blobs = {blob.name.split(".", 1)[0]: blob for blob in (self.directory / "objects").glob("*/*.html.*")
+                         if not blob.name.endswith(".tmp")}
+                sizes = {digest: blob.stat().st_size for digest, blob in blobs.items()}
+
+                kept = records
+                if max_age_days > 0:
+                    cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+                    kept = [record for record in kept if record["fetched_at"] >= cutoff]
+                if max_bytes > 0:
+                    references = Counter(record["sha256"] for record in kept)
+                    total = sum(sizes.get(digest, 0) for digest in references)
+                    first_kept = 0
+                    while total > max_bytes and first_kept < len(kept):
+                        digest = kept[first_kept]["sha256"]
+                        references[digest] -= 1
+                        if references[digest] == 0:
+                            total -= sizes.get(digest, 0)
+                        first_kept += 1
+                    kept = kept[first_kept:]
+
+                referenced = {record["sha256"] for record in kept}
+                unreferenced = [digest for digest in blobs if digest not in referenced]
+                if len(kept) == len(records) and not unreferenced:
+                    return result
+
+                index_path = self.directory / INDEX_FILE
+                temp_path = index_path.with_suffix(".jsonl.tmp")
+                with open(temp_path, "w", encoding="utf-8") as index_file:
+                    for record in kept:
+                        index_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                os.replace(temp_path, index_path)
+                self._index = None
+                for digest in unreferenced:
+                    blobs[digest].unlink()
+                    result["freed_bytes"] += sizes[digest]
+                result["removed_fetches"] = len(records) - len(kept)
+                result["removed_blobs"] = len(unreferenced)
+            logger.info(f"Page archive pruned: {result['removed_fetches']} fetches, {result['removed_blobs']} blobs, {result['freed_bytes']} bytes")
+        except OSError as e:
+            logger.error(f"Error pruning page archive: {str(e)}")
+        return result
+
+    def load(self, digest: str) -> Optional[str]:
+        """Get the archived content with this SHA-256, or None."""
+        blob = self._find_blob(digest)
+        if blob is None:
+            return None
+        path, codec = blob
+        return _decompress(path.read_bytes(), codec).decode("utf-8")
+
+    def history(self, url: str, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Index records of the fetches of a URL, newest first."""
+        with self._lock:
+            records = list(self._load_index().get(normalize_project_url(url) or url, ()))
+        return [record for record in reversed(records) if kind is None or record["kind"] == kind]
+
+    def latest(self, url: str, kind: Optional[str] = "detail") -> Optional[str]:
+        """Get the most recently fetched content of a URL, or None if it was never archived."""
+        for record in self.history(url, kind):
+            html = self.load(record["sha256"])
+            if html is not None:
+                return html
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of archived fetches, URLs and stored blobs with their compressed size."""
+        with self._lock:
+            index = self._load_index()
+            fetches = sum(len(records) for records in index.values())
+            urls = len(index)
+        blobs = list((self.directory / "objects").glob("*/*.html.*")) if (self.directory / "objects").exists() else []
+        return {
+            "directory": str(self.directory),
+            "fetches": fetches,
+            "urls": urls,
+            "blobs": len(blobs),
+            "compressed_bytes": sum(blob.stat().st_size for blob in blobs),
+            "codec": self._codec or get_archive_codec()
+        }
+
+
+# Global page archive instance
+page_archive = PageArchive()
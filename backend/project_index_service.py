@@ -0,0 +1,161 @@
+"""
+Known-project index used by scans to skip projects that are already stored.
+
+Scans only need to know whether a listing card is already in the database, so instead of
+loading every Project row (including descriptions) at the start of each scan, this service
+keeps a set of normalized project URLs and site-specific project ids. It is loaded once with
+a two-column query and then kept current from Project insert/update/delete events, which are
+applied when the session commits (and discarded on rollback).
+"""
+
+import logging
+import threading
+from collections import Counter
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session, object_session
+from backend.models.core_models import Project
+from backend.utils.url_utils import normalize_host, normalize_project_url
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "project_index_changes"
+
+
+class KnownProjectIndex:
+    """Set of normalized project URLs and (site, project id) keys."""
+
+    def __init__(self):
+        # Counters, so deleting one of two rows with the same key keeps the key known
+        self._urls: Counter = Counter()
+        self._site_ids: Counter = Counter()
+
+    @staticmethod
+    def _site_id_key(url: Optional[str], project_id: Optional[str]) -> Optional[Tuple[str, str]]:
+        if not url or not project_id:
+            return None
+        project_id = str(project_id).strip()
+        if not project_id or project_id == "N/A":
+            return None
+        host = normalize_host(urlsplit(url.strip()).netloc)
+        return (host, project_id) if host else None
+
+    def add(self, url: Optional[str], project_id: Optional[str] = None) -> None:
+        """Add a stored project."""
+        url_key = normalize_project_url(url)
+        if url_key:
+            self._urls[url_key] += 1
+        site_id_key = self._site_id_key(url, project_id)
+        if site_id_key:
+            self._site_ids[site_id_key] += 1
+
+    def discard(self, url: Optional[str], project_id: Optional[str] = None) -> None:
+        """Remove a stored project; unknown keys are ignored."""
+        for counter, key in ((self._urls, normalize_project_url(url)), (self._site_ids, self._site_id_key(url, project_id))):
+            if key and counter[key] > 0:
+                counter[key] -= 1
+                if counter[key] == 0:
+                    del counter[key]
+
+    def is_known(self, url: Optional[str], project_id: Optional[str] = None) -> bool:
+        """Check whether a project with this URL (or this project id on the same site) is stored."""
+        url_key = normalize_project_url(url)
+        if url_key and url_key in self._urls:
+            return True
+        site_id_key = self._site_id_key(url, project_id)
+        return site_id_key is not None and site_id_key in self._site_ids
+
+    def __contains__(self, url: Optional[str]) -> bool:
+        return self.is_known(url)
+
+    def __len__(self) -> int:
+        return sum(self._urls.values())
+
+    @classmethod
+    def from_urls(cls, urls) -> "KnownProjectIndex":
+        """Build an index from plain URLs, e.g. the keys of a legacy existing-project dict."""
+        index = cls()
+        for url in urls:
+            index.add(url)
+        return index
+
+
+class ProjectIndexService:
+    """Service maintaining the process-wide known-project index."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._index: Optional[KnownProjectIndex] = None
+
+    def invalidate(self) -> None:
+        """Drop the index; it is reloaded on next use (needed after bulk deletes)."""
+        with self._lock:
+            self._index = None
+
+    def get_index(self, db: Session) -> KnownProjectIndex:
+        """Get the known-project index, loading it on first use."""
+        with self._lock:
+            if self._index is None:
+                index = KnownProjectIndex()
+                for url, project_id in db.query(Project.url, Project.project_id).all():
+                    index.add(url, project_id)
+                self._index = index
+                self.logger.info(f"Known-project index loaded: {len(index)} projects")
+            return self._index
+
+    def apply_changes(self, changes: List[Tuple[str, Optional[str], Optional[str]]]) -> None:
+        """Apply committed (action, url, project_id) changes to a loaded index."""
+        with self._lock:
+            if self._index is None:
+                return
+            for action, url, project_id in changes:
+                if action == "add":
+                    self._index.add(url, project_id)
+                else:
+                    self._index.discard(url, project_id)
+
+
+# Global instance
+project_index_service = ProjectIndexService()
+
+
+def _record_change(target, *changes: Tuple[str, Optional[str], Optional[str]]) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, []).extend(changes)
+
+
+@event.listens_for(Project, "after_insert")
+def _project_inserted(mapper, connection, target) -> None:
+    _record_change(target, ("add", target.url, target.project_id))
+
+
+@event.listens_for(Project, "after_update")
+def _project_updated(mapper, connection, target) -> None:
+    state = sa_inspect(target)
+    url_history = state.attrs.url.history
+    project_id_history = state.attrs.project_id.history
+    if not (url_history.has_changes() or project_id_history.has_changes()):
+        return
+    old_url = url_history.deleted[0] if url_history.deleted else target.url
+    old_project_id = project_id_history.deleted[0] if project_id_history.deleted else target.project_id
+    _record_change(target, ("discard", old_url, old_project_id), ("add", target.url, target.project_id))
+
+
+@event.listens_for(Project, "after_delete")
+def _project_deleted(mapper, connection, target) -> None:
+    _record_change(target, ("discard", target.url, target.project_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _session_committed(session) -> None:
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        project_index_service.apply_changes(changes)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _session_rolled_back(session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,126 @@
+"""
+Prompt compaction for Mistral extraction.
+
+The visible text of a project page contains navigation, footers, cookie banners and
+related-project teasers next to the actual posting. Before extraction, the page is reduced
+to its content region (per-site "content-region-selectors" in the "level3_content" config
+block, most specific first) or, if no region is configured or found, to the page without
+typical boilerplate elements. The result is then cut to a hard token budget.
+"""
+
+import math
+from typing import Any, Dict, Optional
+from bs4 import BeautifulSoup
+from backend.config_manager import config_manager
+from backend.listing_processor import HTML_PARSER
+
+DEFAULT_MAX_PROMPT_TOKENS = 3000
+
+# Conservative characters-per-token ratio for German/English page text
+CHARS_PER_TOKEN = 3.0
+
+# A region with less text than this is assumed to be a wrong match (e.g. an empty container)
+MIN_REGION_TEXT_LENGTH = 200
+
+# Never part of the visible text
+NON_TEXT_TAGS = ['script', 'style', 'meta', 'noscript', 'iframe', 'svg', 'template']
+
+# Removed from the whole page when no content region is available
+BOILERPLATE_SELECTORS = [
+    "nav", "header", "footer", "aside", "form",
+    "[role=navigation]", "[role=banner]", "[role=contentinfo]", "[role=dialog]",
+    "[id*=cookie]", "[class*=cookie]", "[id*=consent]", "[class*=consent]",
+    "[class*=breadcrumb]", "[class*=related]", "[class*=teaser]", "[class*=newsletter]"
+]
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of prompt tokens of a text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def _visible_text(element) -> str:
+    return ' '.join(element.get_text(separator=' ', strip=True).split())
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut a text to the token budget, at a word boundary where possible."""
+    max_chars = int(max_tokens * CHARS_PER_TOKEN)
+    if len(text) <= max_chars:
+        return text
+    truncated = text[:max_chars]
+    last_space = truncated.rfind(' ')
+    if last_space > max_chars // 2:
+        truncated = truncated[:last_space]
+    return truncated
+
+
+def get_max_prompt_tokens() -> int:
+    """Get the configured prompt token budget for page text."""
+    return int(config_manager.get("mistral.max_prompt_tokens", DEFAULT_MAX_PROMPT_TOKENS))
+
+
+class CompactedPage:
+    """Page text prepared for a Mistral prompt."""
+
+    __slots__ = ("text", "source", "original_tokens", "tokens", "truncated")
+
+    def __init__(self, text: str, source: str, original_tokens: int, truncated: bool):
+        self.text = text
+        self.source = source  # region, boilerplate_removed, full_text or empty
+        self.original_tokens = original_tokens  # Estimated tokens of the full visible text
+        self.tokens = estimate_tokens(text)
+        self.truncated = truncated
+
+
+def compact_page(html: str, content_config: Optional[Dict[str, Any]] = None, max_tokens: Optional[int] = None) -> CompactedPage:
+    """
+    Reduce a page to the text worth sending to Mistral.
+
+    Args:
+        html: Raw HTML of the project page
+        content_config: "level3_content" block of the website config, if any
+        max_tokens: Token budget for the text (configured budget if None)
+
+    Returns:
+        CompactedPage with the compacted text and its estimated token counts
+    """
+    if not html:
+        return CompactedPage("", "empty", 0, False)
+    if max_tokens is None:
+        max_tokens = get_max_prompt_tokens()
+
+    soup = BeautifulSoup(html, HTML_PARSER)
+    for element in soup(NON_TEXT_TAGS):
+        element.decompose()
+    full_text = _visible_text(soup.body or soup)
+    original_tokens = estimate_tokens(full_text)
+
+    text = ""
+    source = "region"
+    region_selectors = (content_config or {}).get("content-region-selectors", [])
+    if isinstance(region_selectors, str):
+        region_selectors = [region_selectors]
+    # Selectors are tried from most to least specific, the first one with enough text wins
+    for region_selector in region_selectors:
+        regions = soup.select(region_selector)
+        # Nested matches would repeat their text
+        region_ids = {id(region) for region in regions}
+        regions = [region for region in regions if not any(id(parent) in region_ids for parent in region.parents)]
+        text = ' '.join(_visible_text(region) for region in regions)
+        if len(text) >= MIN_REGION_TEXT_LENGTH:
+            break
+
+    if len(text) < MIN_REGION_TEXT_LENGTH:
+        source = "boilerplate_removed"
+        for selector in BOILERPLATE_SELECTORS:
+            for element in soup.select(selector):
+                element.decompose()
+        text = _visible_text(soup.body or soup)
+        if len(text) < MIN_REGION_TEXT_LENGTH:
+            # Pages wrapped in a form or header element would lose everything
+            source = "full_text"
+            text = full_text
+
+    compacted = truncate_to_tokens(text, max_tokens)
+    return CompactedPage(compacted, source, original_tokens, len(compacted) < len(text))
@@ -0,0 +1,385 @@
+"""
+Refresh service for keeping known projects up to date.
+
+Regular scans skip projects that are already stored, so later edits of a posting are never
+picked up. A refresh re-fetches the pages of stored projects, cheapest check first:
+
+1. A conditional HTTP request with the ETag/Last-Modified validators of the last refresh;
+   a 304 response means the page is unchanged.
+2. Otherwise the SHA-256 of the cleaned page text is compared with the stored hash.
+
+Only projects whose content actually changed go through the (expensive) level3 Mistral
+extraction and are updated. A project refreshed for the first time has no stored hash; its
+current hash is recorded as the baseline without re-extraction. Pages are fetched over plain
+HTTP or, when that yields too little text, rendered in the browser; the two give different
+text for the same posting, so the hash is stored with its source and a hash from the other
+source is replaced by a new baseline instead of being compared.
+
+A refresh runs as a background scan job (see scan_job_service) reporting its progress as
+SSE events.
+
+A re-extraction runs the level3 extraction again on the archived pages of stored projects
+(see page_archive), e.g. after a prompt or schema change, without network or browser cost.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import requests
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from backend.batch_extraction import get_batch_settings
+from backend.config_manager import config_manager
+from backend.metrics_service import metrics_service
+from backend.models.core_models import Project
+from backend.page_archive import page_archive
+from backend.requirements_service import requirements_service
+from backend.scan_service import scan_service
+from backend.tfidf_service import tfidf_service
+from backend.utils.content_utils import clean_page_text, content_hash
+from backend.utils.url_utils import normalize_host
+
+logger = logging.getLogger(__name__)
+
+# Project fields taken over from a new extraction when it returns a non-empty value
+REFRESHED_FIELDS = [
+    "title", "description", "release_date", "start_date", "location", "tenderer",
+    "project_id", "rate", "budget", "duration", "workload"
+]
+
+# Pages with less visible text than this are assumed to be rendered by JavaScript
+MIN_HTTP_TEXT_LENGTH = 200
+
+DEFAULT_REEXTRACT_CONCURRENCY = 2
+
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
+}
+
+
+class RefreshService:
+    """Service for re-checking stored projects and re-extracting changed ones."""
+
+    def __init__(self, web_scraper=None, archive=None):
+        self.web_scraper = web_scraper or scan_service.web_scraper
+        self.page_archive = archive or page_archive
+        self.logger = logging.getLogger(__name__)
+
+    def _fetch_http(self, url: str, etag: Optional[str], last_modified: Optional[str]) -> Dict[str, Any]:
+        """Fetch a page with a conditional GET request (blocking)."""
+        headers = dict(HTTP_HEADERS)
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        response = requests.get(url, headers=headers, timeout=15)
+        return {
+            "status": response.status_code,
+            "html": response.text if response.status_code == 200 else None,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified")
+        }
+
+    def _fetch_browser(self, url: str) -> str:
+        """Fetch the rendered page with the scraper's browser (blocking)."""
+        driver = self.web_scraper.setup_driver()
+        try:
+            with metrics_service.page_load("refresh"):
+                driver.get(url)
+            time.sleep(2)
+            return driver.page_source
+        finally:
+            driver.quit()
+
+    async def fetch_page(self, project: Project, refresh_logger) -> Dict[str, Any]:
+        """
+        Fetch the current page of a project.
+
+        Returns:
+            Dictionary with "unchanged" (True on 304), "html", "source" ("http" or "browser"),
+            "etag" and "last_modified"
+        """
+        try:
+            result = await asyncio.to_thread(self._fetch_http, project.url, project.http_etag, project.http_last_modified)
+            if result["status"] == 304:
+                # A 304 response may omit the validators; keep the stored ones then
+                return {
+                    "unchanged": True,
+                    "html": None,
+                    "source": "http",
+                    "etag": result["etag"] or project.http_etag,
+                    "last_modified": result["last_modified"] or project.http_last_modified
+                }
+            if result["status"] == 200 and len(clean_page_text(result["html"])) >= MIN_HTTP_TEXT_LENGTH:
+                return {"unchanged": False, "source": "http", **result}
+            refresh_logger.info(f"HTTP fetch of {project.url} returned status {result['status']} or too little text, using browser")
+        except requests.RequestException as e:
+            refresh_logger.info(f"HTTP fetch of {project.url} failed ({e}), using browser")
+
+        html = await asyncio.to_thread(self._fetch_browser, project.url)
+        return {"unchanged": False, "html": html, "source": "browser", "etag": None, "last_modified": None}
+
+    @staticmethod
+    def _get_website_config(url: str) -> Optional[Dict[str, Any]]:
+        """Find the configured website a project URL belongs to."""
+        host = normalize_host(urlsplit(url).netloc)
+        for website_config in config_manager.get_websites():
+            if normalize_host(urlsplit(website_config["level1_search"]["site_url"]).netloc) == host:
+                return website_config
+        return None
+
+    def _apply_extraction(self, db: Session, project: Project, project_data: Dict[str, Any]) -> bool:
+        """Update a project from a new level3 extraction; returns False if the extraction was empty."""
+        requirements_data = project_data.get("requirements_tf", project_data.get("requirements"))
+        if not project_data.get("title") and not requirements_data:
+            return False
+
+        for field in REFRESHED_FIELDS:
+            value = project_data.get(field)
+            if value is not None and str(value).strip() and str(value).strip().lower() != "n/a":
+                setattr(project, field, str(value).strip())
+        if requirements_data:
+            requirements_service.set_project_requirements(db, project, requirements_data)
+        return True
+
+    async def refresh_project(self, db: Session, project: Project, scan_id: str = None) -> str:
+        """
+        Refresh a single stored project.
+
+        Returns:
+            "unchanged", "baseline" (hash recorded for the first time or for another fetch source),
+            "updated" or "failed"
+        """
+        refresh_logger = logging.getLogger(f"scan.{scan_id}.refresh" if scan_id else __name__)
+
+        page = await self.fetch_page(project, refresh_logger)
+        outcome = "unchanged"
+        if not page["unchanged"]:
+            new_hash = content_hash(page["html"])
+            if project.content_hash is None or project.content_hash_source != page["source"]:
+                # Text of the plain and the rendered page differs even if the posting did not change
+                project.content_hash = new_hash
+                project.content_hash_source = page["source"]
+                outcome = "baseline"
+            elif new_hash != project.content_hash:
+                website_config = self._get_website_config(project.url)
+                project_data = await self.web_scraper.level3_scan(project.url, scan_id, website_config)
+                if not self._apply_extraction(db, project, project_data or {}):
+                    # Keep the old hash, so the next refresh tries the extraction again
+                    refresh_logger.warning(f"Re-extraction of changed project {project.url} returned no data")
+                    return "failed"
+                project.content_hash = new_hash
+                project.content_hash_source = page["source"]
+                outcome = "updated"
+
+        project.http_etag = page["etag"]
+        project.http_last_modified = page["last_modified"]
+        project.last_scan = datetime.now()
+        refresh_logger.info(f"Refreshed project {project.id} ({project.url}): {outcome}")
+        return outcome
+
+    async def refresh_projects_stream(self, db: Session, limit: Optional[int] = None,
+                                      scan_id: str = None) -> AsyncGenerator[str, None]:
+        """
+        Refresh stored projects, least recently scanned first, streaming the progress as SSE messages.
+
+        Args:
+            db: Database session
+            limit: Maximum number of projects to check (all if None)
+            scan_id: ID of the refresh (generated if None); it can be cancelled like a scan
+
+        Yields:
+            "start", one "project_refreshed" per project and a final "complete" (or "cancelled")
+            event with the refresh counts and errors
+        """
+        if not scan_service._acquire_scan_lock():
+            yield f"data: {json.dumps({'type': 'error', 'message': 'Another scan is already in progress. Please wait for it to complete.'}, ensure_ascii=False)}\n\n"
+            return
+
+        scan_id = scan_id or str(uuid.uuid4())[:8]
+        refresh_logger = logging.getLogger(f"scan.{scan_id}.refresh")
+        counts = {"checked": 0, "unchanged": 0, "baseline": 0, "updated": 0, "failed": 0}
+        errors = []
+        final_type = "complete"
+
+        try:
+            scan_service._register_scan(scan_id)
+            query = db.query(Project).filter(Project.url.isnot(None)).order_by(Project.last_scan.asc(), Project.id.asc())
+            if limit is not None:
+                query = query.limit(limit)
+            projects = query.all()
+            refresh_logger.info(f"Starting refresh of {len(projects)} projects")
+            yield f"data: {json.dumps({'type': 'start', 'message': 'Refresh started', 'scan_id': scan_id, 'projects': len(projects)}, ensure_ascii=False)}\n\n"
+
+            for project in projects:
+                if scan_service.is_scan_cancelled(scan_id):
+                    refresh_logger.info(f"Refresh {scan_id} was cancelled, stopping")
+                    final_type = "cancelled"
+                    break
+                counts["checked"] += 1
+                try:
+                    outcome = await self.refresh_project(db, project, scan_id)
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    outcome = "failed"
+                    errors.append(f"Failed to refresh project {project.id}: {str(e)}")
+                    refresh_logger.error(f"Error refreshing project {project.id}: {str(e)}")
+                counts[outcome] += 1
+                yield f"data: {json.dumps({'type': 'project_refreshed', 'project_id': project.id, 'url': project.url, 'outcome': outcome}, ensure_ascii=False)}\n\n"
+
+            # Changed requirements change the document frequencies
+            if counts["updated"] > 0:
+                try:
+                    idf_factors = tfidf_service.update_skills_idf_factors(db)
+                    refresh_logger.info(f"TF/IDF calculation completed. Updated {len(idf_factors)} skills with IDF factors")
+                except Exception as e:
+                    refresh_logger.error(f"Error during TF/IDF calculation: {str(e)}")
+                    errors.append(f"TF/IDF calculation failed: {str(e)}")
+
+            refresh_logger.info(f"Refresh {final_type}: {counts}")
+            yield f"data: {json.dumps({'type': final_type, 'scan_id': scan_id, **counts, 'errors': errors}, ensure_ascii=False)}\n\n"
+
+        finally:
+            scan_service._unregister_scan(scan_id)
+            scan_service._release_scan_lock()
+
+    async def refresh_projects(self, db: Session, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Refresh stored projects and wait for the result (outside of a scan job).
+
+        Args:
+            db: Database session
+            limit: Maximum number of projects to check (all if None)
+
+        Returns:
+            Dictionary with the refresh counts and errors
+        """
+        if scan_service.is_scan_active():
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Another scan is already in progress. Please wait for it to complete."
+            )
+
+        result = {}
+        async for message in self.refresh_projects_stream(db, limit):
+            event = json.loads(message[len("data: "):])
+            if event["type"] in ("complete", "cancelled"):
+                result = {key: value for key, value in event.items() if key != "type"}
+        return result
+
+    async def reextract_projects(self, db: Session, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Re-run the level3 extraction of stored projects from their latest archived pages.
+
+        Pages are extracted per website in batches (see batch_extraction), with up to
+        "page_archive.reextract_concurrency" batches in flight. Projects without an archived
+        page are counted as missing and left unchanged.
+
+        Args:
+            db: Database session
+            limit: Maximum number of projects to re-extract (all if None)
+
+        Returns:
+            Dictionary with the re-extraction counts and errors
+        """
+        if not scan_service._acquire_scan_lock():
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Another scan is already in progress. Please wait for it to complete."
+            )
+
+        scan_id = str(uuid.uuid4())[:8]
+        reextract_logger = logging.getLogger(f"scan.{scan_id}.reextract")
+        counts = {"checked": 0, "updated": 0, "missing": 0, "failed": 0}
+        errors = []
+
+        try:
+            scan_service._register_scan(scan_id)
+            query = db.query(Project).filter(Project.url.isnot(None)).order_by(Project.id.asc())
+            if limit is not None:
+                query = query.limit(limit)
+            projects = query.all()
+            reextract_logger.info(f"Starting re-extraction of {len(projects)} projects from the page archive")
+
+            # Archived pages grouped by the site config that applies to them (None for external pages)
+            groups: Dict[Optional[str], Tuple[Optional[Dict[str, Any]], List[Tuple[Project, str]]]] = {}
+            for project in projects:
+                counts["checked"] += 1
+                html = await asyncio.to_thread(self.page_archive.latest, project.url)
+                if html is None:
+                    counts["missing"] += 1
+                    continue
+                website_config = self._get_website_config(project.url)
+                if website_config and website_config.get("level3_search"):
+                    website_config = None  # The archived page is the external project page
+                name = website_config["level1_search"]["name"] if website_config else None
+                groups.setdefault(name, (website_config, []))[1].append((project, html))
+
+            batch_size = get_batch_settings()["max_projects"]
+            batches = [
+                (website_config, items[start:start + batch_size])
+                for website_config, items in groups.values()
+                for start in range(0, len(items), batch_size)
+            ]
+            semaphore = asyncio.Semaphore(max(int(config_manager.get("page_archive.reextract_concurrency", DEFAULT_REEXTRACT_CONCURRENCY)), 1))
+
+            async def extract(website_config, items):
+                async with semaphore:
+                    if scan_service.is_scan_cancelled(scan_id):
+                        return None
+                    return await self.web_scraper.extract_page_sources(
+                        [project.url for project, _ in items], [html for _, html in items], scan_id, website_config
+                    )
+
+            results = await asyncio.gather(*(extract(website_config, items) for website_config, items in batches), return_exceptions=True)
+
+            for (_, items), batch_result in zip(batches, results):
+                if batch_result is None:
+                    continue  # Cancelled
+                if isinstance(batch_result, Exception):
+                    counts["failed"] += len(items)
+                    errors.append(f"Failed to re-extract {len(items)} projects: {str(batch_result)}")
+                    reextract_logger.error(f"Error re-extracting batch: {str(batch_result)}")
+                    continue
+                for (project, html), project_data in zip(items, batch_result):
+                    try:
+                        if project_data.get("extraction_failed") or not self._apply_extraction(db, project, project_data):
+                            counts["failed"] += 1
+                            reextract_logger.warning(f"Re-extraction of project {project.id} ({project.url}) returned no data")
+                            continue
+                        project.content_hash = content_hash(html)
+                        project.content_hash_source = "browser"  # Archived pages are rendered pages
+                        db.commit()
+                        counts["updated"] += 1
+                    except Exception as e:
+                        db.rollback()
+                        counts["failed"] += 1
+                        errors.append(f"Failed to re-extract project {project.id}: {str(e)}")
+                        reextract_logger.error(f"Error re-extracting project {project.id}: {str(e)}")
+
+            # Changed requirements change the document frequencies
+            if counts["updated"] > 0:
+                try:
+                    idf_factors = tfidf_service.update_skills_idf_factors(db)
+                    reextract_logger.info(f"TF/IDF calculation completed. Updated {len(idf_factors)} skills with IDF factors")
+                except Exception as e:
+                    reextract_logger.error(f"Error during TF/IDF calculation: {str(e)}")
+                    errors.append(f"TF/IDF calculation failed: {str(e)}")
+
+            reextract_logger.info(f"Re-extraction completed: {counts}")
+            return {"scan_id": scan_id, **counts, "errors": errors}
+
+        finally:
+            scan_service._unregister_scan(scan_id)
+            scan_service._release_scan_lock()
+
+
+# Global refresh service instance
+refresh_service = RefreshService()
@@ -0,0 +1,616 @@
+"""
+Record/replay harness for scanning the configured sites offline.
+
+Recording runs a live scan and keeps everything the scan received from outside:
+
+    fixtures/replay/
+        pages/          # Every page the browser loaded, as it was when the browser left it (a PageArchive)
+        manifest.json   # Recorded sites, time and time range, load-more behaviour of listings
+        mistral.jsonl   # Chat completion answers by request, answers of batched projects also by project
+        openai.jsonl    # Embeddings by text
+
+Replay serves the fixtures from a local HTTP server: pages for ReplayBrowser (a WebDriver
+stand-in used instead of Chrome) and the Mistral and OpenAI APIs for the real handlers, each
+with a configurable latency. A replayed scan runs the same scraper code as a live one, so its
+behaviour and speed can be tested and measured repeatably (see scan_benchmark).
+
+Mistral answers are looked up by model and prompt; a batch request is also answered when
+each of its projects was recorded in some batch. After a change to prompts or page
+compaction the fixtures have to be recorded again; unknown requests are answered with 404.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import re
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.error import HTTPError
+from urllib.parse import parse_qs, urlencode, urlsplit
+from urllib.request import urlopen
+
+import httpx
+import openai
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+
+from backend.batch_extraction import parse_batch_response
+from backend.config_manager import config_manager
+from backend.listing_processor import CARD_FRAGMENTS_SCRIPT, COUNT_CARDS_SCRIPT, HTML_PARSER
+from backend.mistral_handler import MistralHandler
+from backend.openai_handler import OpenAIHandler
+from backend.page_archive import PageArchive
+from backend.utils.url_utils import normalize_project_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIXTURE_DIRECTORY = "fixtures/replay"
+MANIFEST_FILE = "manifest.json"
+MISTRAL_FILE = "mistral.jsonl"
+OPENAI_FILE = "openai.jsonl"
+
+CLICK_SCRIPT = "arguments[0].click();"
+PAGE_KIND = "page"
+
+
+# A project of a batch request (see batch_extraction.build_batch_messages)
+BATCH_PROJECT_PATTERN = re.compile(r'<project id="([^"]*)">\n(.*?)\n</project>', re.S)
+
+
+def mistral_request_key(model: str, messages: List[Dict[str, Any]]) -> str:
+    """Key of a chat completion request: its model and the role and content of its messages."""
+    request = [model] + [[message.get("role"), message.get("content")] for message in messages]
+    return hashlib.sha256(json.dumps(request, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _batch_projects(messages: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """(id, text) of the projects of a batch request; empty for single-project requests."""
+    return BATCH_PROJECT_PATTERN.findall(messages[-1].get("content") or "") if messages else []
+
+
+def _batch_item_key(model: str, messages: List[Dict[str, Any]], project_text: str) -> str:
+    # Same system prompt (schema) and project text, whatever else was in the batch
+    return mistral_request_key(model, [messages[0], {"role": "project", "content": project_text}])
+
+
+def _site_config(site: Optional[str]) -> Optional[Dict[str, Any]]:
+    return next((website for website in config_manager.get_websites() if website["level1_search"]["name"] == site), None)
+
+
+class FixtureSet:
+    """Recorded pages and API answers of one or more sites. Thread-safe."""
+
+    def __init__(self, directory: str = DEFAULT_FIXTURE_DIRECTORY):
+        self.directory = Path(directory)
+        self.pages = PageArchive(str(self.directory / "pages"), enabled=True)
+        self._lock = threading.Lock()
+        self.manifest: Dict[str, Any] = {"recorded_at": None, "time_range": None, "sites": [], "load_more": {}}
+        self.mistral_responses: Dict[str, Dict[str, Any]] = {}
+        self.embeddings: Dict[str, List[float]] = {}
+
+        manifest_path = self.directory / MANIFEST_FILE
+        if manifest_path.exists():
+            self.manifest.update(json.loads(manifest_path.read_text(encoding="utf-8")))
+        for record in self._read_lines(MISTRAL_FILE):
+            self.mistral_responses[record["key"]] = record
+        for record in self._read_lines(OPENAI_FILE):
+            self.embeddings[record["text"]] = record["embedding"]
+
+    def _read_lines(self, name: str) -> List[Dict[str, Any]]:
+        path = self.directory / name
+        if not path.exists():
+            return []
+        with open(path, encoding="utf-8") as fixture_file:
+            return [json.loads(line) for line in fixture_file if line.strip()]
+
+    def _write_lines(self, name: str, records) -> None:
+        with open(self.directory / name, "w", encoding="utf-8") as fixture_file:
+            for record in records:
+                fixture_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def add_page(self, url: str, html: Optional[str], site: Optional[str] = None, load_more: Optional[Dict[str, int]] = None) -> None:
+        """Record a loaded page; load_more holds initial_cards and cards_per_click of an expanded listing."""
+        self.pages.store(url, html, PAGE_KIND, site)
+        if load_more:
+            with self._lock:
+                self.manifest["load_more"][normalize_project_url(url) or url] = load_more
+
+    def page(self, url: str) -> Optional[Tuple[str, Optional[str], Optional[Dict[str, int]]]]:
+        """Get the recorded HTML, site and load-more behaviour of a URL, or None if it was not recorded."""
+        history = self.pages.history(url, PAGE_KIND)
+        html = self.pages.latest(url, PAGE_KIND) if history else None
+        if html is None:
+            return None
+        return html, history[0].get("site"), self.manifest["load_more"].get(normalize_project_url(url) or url)
+
+    def add_mistral_response(self, model: str, messages: List[Dict[str, Any]], content: str, usage: Dict[str, int]) -> None:
+        """Record an answer; the projects of a batch answer are also recorded one by one."""
+        key = mistral_request_key(model, messages)
+        records = [{"key": key, "content": content, "usage": usage}]
+        projects = _batch_projects(messages)
+        if projects:
+            # Which projects share a batch depends on page load timing, so a replay may batch them differently
+            results = parse_batch_response(content, [project_id for project_id, _ in projects])
+            item_usage = {name: count // len(projects) for name, count in usage.items()}
+            records += [
+                {"key": _batch_item_key(model, messages, text), "item": results[project_id], "usage": item_usage}
+                for project_id, text in projects if project_id in results
+            ]
+        with self._lock:
+            for record in records:
+                self.mistral_responses[record["key"]] = record
+
+    def mistral_response(self, model: str, messages: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Get the recorded content and usage for a request (batches composed from their projects), or None."""
+        recorded = self.mistral_responses.get(mistral_request_key(model, messages))
+        if recorded and "content" in recorded:
+            return recorded
+        projects = _batch_projects(messages)
+        items = [(project_id, self.mistral_responses.get(_batch_item_key(model, messages, text))) for project_id, text in projects]
+        if not items or any(item is None for _, item in items):
+            return None
+        usage: Dict[str, int] = defaultdict(int)
+        for _, item in items:
+            for name, count in item["usage"].items():
+                usage[name] += count
+        return {"content": json.dumps({"projects": [{"id": project_id, **item["item"]} for project_id, item in items]}), "usage": dict(usage)}
+
+    def add_embedding(self, text: str, embedding: List[float]) -> None:
+        with self._lock:
+            self.embeddings[text] = embedding
+
+    def save(self) -> None:
+        """Write the manifest and the recorded API answers (pages are written when recorded)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            (self.directory / MANIFEST_FILE).write_text(json.dumps(self.manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+            self._write_lines(MISTRAL_FILE, self.mistral_responses.values())
+            self._write_lines(OPENAI_FILE, ({"text": text, "embedding": embedding} for text, embedding in self.embeddings.items()))
+
+
+class RecordingBrowser:
+    """Wraps a live WebDriver and records every page it loaded, as it was when the browser left it."""
+
+    def __init__(self, driver, fixtures: FixtureSet, site: Optional[str] = None):
+        self._driver = driver
+        self._fixtures = fixtures
+        self._site = site
+        self._url: Optional[str] = None
+        self._initial_cards: Optional[int] = None
+        self._cards = 0
+        self._clicks = 0
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def _record(self) -> None:
+        if self._url is None:
+            return
+        load_more = None
+        if self._clicks and self._initial_cards:
+            load_more = {
+                "initial_cards": self._initial_cards,
+                "cards_per_click": max(1, math.ceil((self._cards - self._initial_cards) / self._clicks))
+            }
+        try:
+            self._fixtures.add_page(self._url, self._driver.page_source, self._site, load_more)
+        except WebDriverException as e:
+            logger.warning(f"Could not record {self._url}: {e}")
+        self._url = None
+
+    def get(self, url: str) -> None:
+        # Pages are recorded under the requested URL, which is what a replayed scan asks for
+        self._record()
+        self._driver.get(url)
+        self._url = url
+        self._initial_cards = None
+        self._cards = 0
+        self._clicks = 0
+
+    def execute_script(self, script: str, *args):
+        result = self._driver.execute_script(script, *args)
+        if script == COUNT_CARDS_SCRIPT and isinstance(result, int) and result >= 0:
+            if self._initial_cards is None:
+                self._initial_cards = result
+            self._cards = max(self._cards, result)
+        elif script == CLICK_SCRIPT:
+            self._clicks += 1
+        return result
+
+    def quit(self) -> None:
+        self._record()
+        self._driver.quit()
+
+
+class RecordingMistralApi:
+    """Wraps a MistralClientWrapper and records the answer of every chat completion."""
+
+    def __init__(self, api, fixtures: FixtureSet):
+        self._api = api
+        self._fixtures = fixtures
+
+    def __getattr__(self, name):
+        return getattr(self._api, name)
+
+    async def complete(self, call_logger: Optional[logging.Logger] = None, **kwargs):
+        response = await self._api.complete(call_logger=call_logger, **kwargs)
+        usage = getattr(response, "usage", None)
+        self._fixtures.add_mistral_response(kwargs["model"], kwargs["messages"], response.choices[0].message.content, {
+            "prompt_tokens": getattr(usage, "prompt_tokens", None) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", None) or 0
+        })
+        return response
+
+
+class _RecordingEmbeddings:
+    def __init__(self, embeddings, fixtures: FixtureSet):
+        self._embeddings = embeddings
+        self._fixtures = fixtures
+
+    def create(self, model: str, input):
+        response = self._embeddings.create(model=model, input=input)
+        texts = [input] if isinstance(input, str) else list(input)
+        for text, data in zip(texts, response.data):
+            self._fixtures.add_embedding(text, list(data.embedding))
+        return response
+
+
+class RecordingOpenAIClient:
+    """Wraps the OpenAI client of an OpenAIHandler and records every embedding."""
+
+    def __init__(self, client, fixtures: FixtureSet):
+        self._client = client
+        self.embeddings = _RecordingEmbeddings(client.embeddings, fixtures)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+async def record_fixtures(directory: str = DEFAULT_FIXTURE_DIRECTORY, site_names: Optional[List[str]] = None,
+                          time_range: int = 7, scraper=None) -> FixtureSet:
+    """
+    Scan the configured sites live and record their pages and the API answers.
+
+    Needs Chrome and the Mistral API key (or a scraper whose browser and Mistral handler
+    stand in for them); embeddings of the extracted requirements are recorded if an OpenAI
+    key is configured. Nothing is written to the database.
+    """
+    from backend.web_scraper import WebScraper
+
+    fixtures = FixtureSet(directory)
+    scraper = scraper or WebScraper()
+    if not scraper.mistral_handler:
+        raise ValueError("Recording needs the Mistral API key")
+    scraper.mistral_handler.api = RecordingMistralApi(scraper.mistral_handler.api, fixtures)
+    live_driver = scraper.setup_driver
+
+    websites = [website for website in config_manager.get_websites()
+                if site_names is None or website["level1_search"]["name"] in site_names]
+    skills = set()
+    for website_config in websites:
+        site = website_config["level1_search"]["name"]
+        scraper.setup_driver = lambda site=site: RecordingBrowser(live_driver(), fixtures, site)
+        projects = 0
+        async for project in scraper.scan_website_stream(website_config, time_range):
+            projects += 1
+            skills.update(project.get("requirements_tf", {}).keys())
+        logger.info(f"Recorded {projects} projects of {site}")
+        if site not in fixtures.manifest["sites"]:
+            fixtures.manifest["sites"].append(site)
+
+    if skills and config_manager.get_api_keys().get("openai"):
+        openai_handler = OpenAIHandler(config_manager.get_api_keys()["openai"])
+        openai_handler.client = RecordingOpenAIClient(openai_handler.client, fixtures)
+        await openai_handler.get_embeddings_batch(sorted(skills))
+
+    fixtures.manifest["recorded_at"] = datetime.now().isoformat()
+    fixtures.manifest["time_range"] = time_range
+    fixtures.save()
+    return fixtures
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Serves a FixtureSet on localhost:
+        GET  /page?url=...            recorded page (site and load-more behaviour in X-Replay-* headers)
+        POST /v1/chat/completions     recorded Mistral answer
+        POST /v1/embeddings           recorded OpenAI embeddings
+    """
+
+    daemon_threads = True
+
+    def __init__(self, fixtures: FixtureSet, page_latency: float = 0.0, mistral_latency: float = 0.0,
+                 openai_latency: float = 0.0, port: int = 0):
+        super().__init__(("127.0.0.1", port), ReplayRequestHandler)
+        self.fixtures = fixtures
+        self.page_latency = page_latency
+        self.mistral_latency = mistral_latency
+        self.openai_latency = openai_latency
+        self.stats = {"pages": 0, "page_misses": 0, "mistral_calls": 0, "mistral_misses": 0, "embedding_calls": 0, "embedding_misses": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def start(self) -> "ReplayServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+class ReplayRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        self._send(status, json.dumps(body).encode("utf-8"), "application/json")
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        if parts.path != "/page":
+            self._send_json(404, {"message": f"Unknown path {parts.path}"})
+            return
+        url = parse_qs(parts.query).get("url", [""])[0]
+        time.sleep(server.page_latency)
+        server.count("pages")
+        page = server.fixtures.page(url)
+        if page is None:
+            server.count("page_misses")
+            self._send(404, b"", "text/html")
+            return
+        html, site, load_more = page
+        headers = {"X-Replay-Site": site or ""}
+        if load_more:
+            headers["X-Replay-Load-More"] = f"{load_more['initial_cards']},{load_more['cards_per_click']}"
+        self._send(200, html.encode("utf-8"), "text/html; charset=utf-8", headers)
+
+    def do_POST(self):
+        server = self.server
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path.endswith("/chat/completions"):
+            time.sleep(server.mistral_latency)
+            server.count("mistral_calls")
+            recorded = server.fixtures.mistral_response(request.get("model"), request.get("messages", []))
+            if recorded is None:
+                server.count("mistral_misses")
+                self._send_json(404, {"message": "No recorded answer for this request"})
+                return
+            usage = recorded.get("usage", {})
+            self._send_json(200, {
+                "id": "replay",
+                "object": "chat.completion",
+                "model": request.get("model"),
+                "created": 0,
+                "usage": {
+                    "prompt_tokens": usage.get("prompt_tokens", 0),
+                    "completion_tokens": usage.get("completion_tokens", 0),
+                    "total_tokens": usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0)
+                },
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": recorded["content"]}}]
+            })
+        elif self.path.endswith("/embeddings"):
+            time.sleep(server.openai_latency)
+            server.count("embedding_calls")
+            texts = request.get("input")
+            texts = [texts] if isinstance(texts, str) else texts or []
+            embeddings = [server.fixtures.embeddings.get(text) for text in texts]
+            if any(embedding is None for embedding in embeddings):
+                server.count("embedding_misses")
+                self._send_json(404, {"error": {"message": "No recorded embedding for this text"}})
+                return
+            self._send_json(200, {
+                "object": "list",
+                "model": request.get("model"),
+                "data": [{"object": "embedding", "index": index, "embedding": embedding} for index, embedding in enumerate(embeddings)],
+                "usage": {"prompt_tokens": 0, "total_tokens": 0}
+            })
+        else:
+            self._send_json(404, {"message": f"Unknown path {self.path}"})
+
+
+class ReplayElement:
+    """Element of a replayed page."""
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.tag_name = tag.name
+        self.text = tag.get_text(" ", strip=True)
+
+    def get_attribute(self, name: str):
+        value = self.tag.get(name)
+        return " ".join(value) if isinstance(value, list) else value
+
+    def is_displayed(self) -> bool:
+        return True
+
+    def click(self) -> None:
+        pass
+
+
+class LoadMoreControl(ReplayElement):
+    """The load more button of a replayed listing: shows the next recorded cards when clicked."""
+
+    def __init__(self, browser: "ReplayBrowser", tag=None):
+        self.browser = browser
+        self.tag = tag
+        self.tag_name = tag.name if tag is not None else "button"
+        self.text = tag.get_text(" ", strip=True) if tag is not None else "load more"
+
+    def is_displayed(self) -> bool:
+        return self.browser.visible_cards < self.browser.total_cards
+
+    def click(self) -> None:
+        self.browser.show_more()
+
+
+class ReplayBrowser:
+    """
+    WebDriver stand-in that loads pages from a ReplayServer.
+
+    Supports what the scraper uses: navigation, page source, CSS and tag lookups, the listing
+    scripts of ListingProcessor and clicking the load more button, which reveals the cards of
+    the recorded (fully expanded) listing in the recorded steps. A page that was never recorded
+    has no elements and fails waits at once instead of after their timeout.
+    """
+
+    def __init__(self, server_url: str, timer=None):
+        self.server_url = server_url
+        self.timer = timer  # Optional, gets add("page_fetch", seconds) for every page load
+        self.current_url: Optional[str] = None
+        self._html = ""
+        self._recorded = False
+        self._site_config: Optional[Dict[str, Any]] = None
+        self._load_more: Optional[Tuple[int, int]] = None
+        self._cards: List = []
+        self.visible_cards = 0
+        self._soup = None
+
+    @property
+    def total_cards(self) -> int:
+        return len(self._cards)
+
+    def set_page_load_timeout(self, seconds: float) -> None:
+        pass
+
+    def get(self, url: str) -> None:
+        started = time.perf_counter()
+        try:
+            with urlopen(f"{self.server_url}/page?{urlencode({'url': url})}", timeout=30) as response:
+                self._html = response.read().decode("utf-8")
+                site = response.headers.get("X-Replay-Site")
+                load_more = response.headers.get("X-Replay-Load-More")
+            self._recorded = True
+        except HTTPError as e:
+            if e.code != 404:
+                raise
+            self._html, site, load_more = "<html><body></body></html>", None, None
+            self._recorded = False
+        if self.timer:
+            self.timer.add("page_fetch", time.perf_counter() - started)
+
+        self.current_url = url
+        self._soup = None
+        self._site_config = _site_config(site)
+        self._load_more = tuple(int(value) for value in load_more.split(",")) if load_more else None
+        self._cards = []
+        if self._load_more and self._site_config:
+            level1_config = self._site_config["level1_search"]
+            grid = BeautifulSoup(self._html, HTML_PARSER).select_one(level1_config["project-list-selector"])
+            self._cards = grid.select(level1_config["project-entry-selector"]) if grid else []
+            self.visible_cards = min(self._load_more[0], len(self._cards))
+
+    def show_more(self) -> None:
+        if self._load_more:
+            self.visible_cards = min(self.visible_cards + self._load_more[1], len(self._cards))
+            self._soup = None
+
+    def _document(self):
+        """The page as shown: a load-more listing without the cards not revealed yet."""
+        if self._soup is None:
+            soup = BeautifulSoup(self._html, HTML_PARSER)
+            if self._load_more and self._site_config:
+                level1_config = self._site_config["level1_search"]
+                grid = soup.select_one(level1_config["project-list-selector"])
+                for card in (grid.select(level1_config["project-entry-selector"]) if grid else [])[self.visible_cards:]:
+                    card.decompose()
+            self._soup = soup
+        return self._soup
+
+    @property
+    def page_source(self) -> str:
+        return str(self._document()) if self._load_more else self._html
+
+    def find_elements(self, by: str, value: str) -> List[ReplayElement]:
+        if self._load_more and self._site_config and by == By.CSS_SELECTOR and value == self._site_config["level1_search"].get("load-more-selector"):
+            return [LoadMoreControl(self, self._document().select_one(value))]
+        if by == By.CSS_SELECTOR:
+            tags = self._document().select(value)
+        elif by == By.TAG_NAME:
+            tags = self._document().find_all(value)
+        elif by == By.ID:
+            tags = self._document().select(f"#{value}")
+        elif by == By.CLASS_NAME:
+            tags = self._document().select(f".{value}")
+        else:
+            raise NotImplementedError(f"ReplayBrowser does not support {by} lookups")
+        return [ReplayElement(tag) for tag in tags]
+
+    def find_element(self, by: str, value: str) -> ReplayElement:
+        elements = self.find_elements(by, value)
+        if elements:
+            return elements[0]
+        if not self._recorded:
+            raise TimeoutException(f"{self.current_url} was not recorded")
+        raise NoSuchElementException(f"No element matches {value}")
+
+    def execute_script(self, script: str, *args):
+        if script == CLICK_SCRIPT:
+            args[0].click()
+            return None
+        if script in (COUNT_CARDS_SCRIPT, CARD_FRAGMENTS_SCRIPT):
+            grid = self._document().select_one(args[0])
+            if script == COUNT_CARDS_SCRIPT:
+                return len(grid.select(args[1])) if grid else -1
+            return [str(card) for card in grid.select(args[1])[args[2]:]] if grid else []
+        raise NotImplementedError("ReplayBrowser only runs the scraper's listing scripts")
+
+    def quit(self) -> None:
+        pass
+
+
+def replay_scraper(server: ReplayServer, archive_directory: Optional[str] = None, timer=None):
+    """
+    Create a WebScraper that scans through a ReplayServer: pages from ReplayBrowser, Mistral
+    answers from the server (through the real handler and client), no waits after page loads.
+
+    Pages the scan archives go to archive_directory (a new temporary directory by default).
+    """
+    from backend.web_scraper import WebScraper
+
+    scraper = WebScraper()
+    scraper.setup_driver = lambda: ReplayBrowser(server.url, timer)
+    scraper.mistral_handler = MistralHandler(api_key="replay", server_url=server.url)
+    scraper.page_archive = PageArchive(archive_directory or tempfile.mkdtemp(prefix="replay_archive_"))
+    scraper.page_settle_seconds = 0
+    return scraper
+
+
+def replay_openai_handler(server: ReplayServer) -> OpenAIHandler:
+    """Create an OpenAIHandler that gets its embeddings from a ReplayServer."""
+    api_key = openai.api_key
+    handler = OpenAIHandler(api_key="replay")
+    openai.api_key = api_key  # The handler sets the module-wide key; keep the configured one
+    handler.client = openai.OpenAI(api_key="replay", base_url=f"{server.url}/v1", http_client=httpx.Client())
+    return handler
@@ -0,0 +1,244 @@
+"""
+Service for the normalized project_requirements join table.
+
+Project requirements are stored as (project_id, skill_id, tf) rows so that document
+frequencies, requirement lookups and candidate pre-filtering are plain indexed queries
+instead of json.loads over every project. The requirements_tf JSON column is still
+written as a mirror for backward compatibility of the API and helper scripts. Projects
+stored before the join table existed are backfilled from the JSON column on startup
+(see database.init_db).
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from backend.models.core_models import Project, ProjectRequirement, Skill
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement
+_IN_CLAUSE_CHUNK_SIZE = 500
+
+# requirements_tf values without any requirement
+_EMPTY_REQUIREMENTS_JSON = ("", "{}", "[]", "null")
+
+
+def _chunked(values: List, size: int = _IN_CLAUSE_CHUNK_SIZE) -> Iterable[List]:
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+class RequirementsService:
+    """Service for reading and writing normalized project requirements."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def normalize_requirements(self, requirements_data: Union[Dict[str, int], List[str], None]) -> Dict[str, int]:
+        """
+        Normalize requirements into a {skill_name: tf} dictionary.
+
+        Accepts the new requirements_tf dictionary format as well as the old list-of-strings format.
+        """
+        if not requirements_data:
+            return {}
+
+        if isinstance(requirements_data, dict):
+            items = requirements_data.items()
+        else:
+            items = ((req, 1) for req in requirements_data)
+
+        normalized: Dict[str, int] = {}
+        for skill_name, tf in items:
+            if not isinstance(skill_name, str) or not skill_name.strip():
+                continue
+            try:
+                tf_value = int(tf)
+            except (TypeError, ValueError):
+                tf_value = 1
+            normalized[skill_name] = normalized.get(skill_name, 0) + max(tf_value, 1)
+        return normalized
+
+    def get_or_create_skills(self, db: Session, skill_names: Iterable[str]) -> Dict[str, Skill]:
+        """
+        Get skill rows by name, creating missing ones with an empty embedding.
+
+        New skills are flushed immediately so that their ids are available and a
+        subsequent lookup in the same transaction finds them.
+        """
+        names = list(dict.fromkeys(skill_names))
+        skills: Dict[str, Skill] = {}
+        for chunk in _chunked(names):
+            for skill in db.query(Skill).filter(Skill.skill_name.in_(chunk)).all():
+                skills[skill.skill_name] = skill
+
+        missing = [name for name in names if name not in skills]
+        if missing:
+            for name in missing:
+                skill = Skill(
+                    skill_name=name,
+                    embedding="[]",  # Empty embedding, will be populated later if needed
+                )
+                db.add(skill)
+                skills[name] = skill
+            db.flush()
+            self.logger.debug(f"Created {len(missing)} new skills for project requirements")
+
+        return skills
+
+    def set_project_requirements(
+        self,
+        db: Session,
+        project: Project,
+        requirements_data: Union[Dict[str, int], List[str], None]
+    ) -> Dict[str, int]:
+        """
+        Replace the requirements of a project in the join table and the JSON mirror.
+
+        Args:
+            db: Database session
+            project: Project (transient or persistent)
+            requirements_data: requirements_tf dictionary or list of requirement strings
+
+        Returns:
+            The normalized requirements dictionary that was stored
+        """
+        requirements_tf = self.normalize_requirements(requirements_data)
+        project.set_requirements_tf(requirements_tf)
+
+        skills = self.get_or_create_skills(db, requirements_tf.keys())
+        existing = {req.skill_id: req for req in project.requirements if req.skill_id is not None}
+
+        wanted_skill_ids = set()
+        for skill_name, tf in requirements_tf.items():
+            skill = skills[skill_name]
+            wanted_skill_ids.add(skill.id)
+            requirement = existing.get(skill.id)
+            if requirement:
+                requirement.tf = tf
+            else:
+                project.requirements.append(ProjectRequirement(skill=skill, skill_id=skill.id, tf=tf))
+
+        for skill_id, requirement in existing.items():
+            if skill_id not in wanted_skill_ids:
+                project.requirements.remove(requirement)
+
+        return requirements_tf
+
+    def get_requirements_map(self, db: Session, project_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, int]]:
+        """
+        Get requirements for many projects with a single indexed query.
+
+        Args:
+            db: Database session
+            project_ids: Restrict to these project ids (all projects if None)
+
+        Returns:
+            Dictionary mapping project id to {skill_name: tf}
+        """
+        base_query = db.query(
+            ProjectRequirement.project_id, Skill.skill_name, ProjectRequirement.tf
+        ).join(Skill, Skill.id == ProjectRequirement.skill_id)
+
+        if project_ids is None:
+            rows = base_query.order_by(ProjectRequirement.project_id, ProjectRequirement.tf.desc(), Skill.skill_name).all()
+        else:
+            rows = []
+            for chunk in _chunked(list(project_ids)):
+                rows.extend(
+                    base_query.filter(ProjectRequirement.project_id.in_(chunk))
+                    .order_by(ProjectRequirement.project_id, ProjectRequirement.tf.desc(), Skill.skill_name)
+                    .all()
+                )
+
+        requirements_map: Dict[int, Dict[str, int]] = {}
+        for project_id, skill_name, tf in rows:
+            requirements_map.setdefault(project_id, {})[skill_name] = tf
+        return requirements_map
+
+    def get_document_frequencies(self, db: Session) -> Tuple[int, Dict[str, int]]:
+        """
+        Get the number of projects with requirements and the document frequency of each skill.
+
+        Returns:
+            Tuple of (total_documents, {skill_name: documents_containing_skill})
+        """
+        total_documents = db.query(func.count(func.distinct(ProjectRequirement.project_id))).scalar() or 0
+        rows = db.query(
+            Skill.skill_name, func.count(ProjectRequirement.project_id)
+        ).join(
+            ProjectRequirement, ProjectRequirement.skill_id == Skill.id
+        ).group_by(Skill.id, Skill.skill_name).all()
+        return total_documents, {skill_name: count for skill_name, count in rows}
+
+    def get_project_ids_for_skills(self, db: Session, skill_names: Iterable[str]) -> Set[int]:
+        """Get the ids of all projects that require at least one of the given skills."""
+        names = list(dict.fromkeys(skill_names))
+        project_ids: Set[int] = set()
+        for chunk in _chunked(names):
+            rows = db.query(ProjectRequirement.project_id).join(
+                Skill, Skill.id == ProjectRequirement.skill_id
+            ).filter(Skill.skill_name.in_(chunk)).distinct().all()
+            project_ids.update(row[0] for row in rows)
+        return project_ids
+
+    def get_project_ids_for_skill_ids(self, db: Session, skill_ids: Iterable[int]) -> Set[int]:
+        """Get the ids of all projects that require at least one of the given skill ids."""
+        project_ids: Set[int] = set()
+        for chunk in _chunked(list(set(skill_ids))):
+            rows = db.query(ProjectRequirement.project_id).filter(
+                ProjectRequirement.skill_id.in_(chunk)
+            ).distinct().all()
+            project_ids.update(row[0] for row in rows)
+        return project_ids
+
+    def get_unmigrated_project_ids(self, db: Session) -> Set[int]:
+        """Get the ids of projects with requirements in the requirements_tf JSON column but no join table rows."""
+        has_rows = db.query(ProjectRequirement.project_id).filter(ProjectRequirement.project_id == Project.id).exists()
+        rows = db.query(Project.id).filter(
+            Project.requirements_tf.isnot(None),
+            Project.requirements_tf.notin_(_EMPTY_REQUIREMENTS_JSON),
+            ~has_rows
+        ).all()
+        return {row[0] for row in rows}
+
+    def backfill_from_json(self, db: Session) -> int:
+        """
+        Populate the join table for projects that only have requirements in the JSON column.
+
+        Returns:
+            Number of projects whose requirements were written
+        """
+        project_ids = list(self.get_unmigrated_project_ids(db))
+        migrated = 0
+        for chunk in _chunked(project_ids):
+            for project in db.query(Project).filter(Project.id.in_(chunk)).all():
+                if self.set_project_requirements(db, project, project.get_requirements_tf()):
+                    migrated += 1
+        if project_ids:
+            db.commit()
+            self.logger.info(f"Backfilled project_requirements for {migrated} projects from requirements_tf")
+        return migrated
+
+    def rebuild_from_json(self, db: Session) -> int:
+        """
+        Populate the join table from the requirements_tf JSON column of all projects.
+
+        Returns:
+            Number of projects whose requirements were written
+        """
+        projects = db.query(Project).filter(Project.requirements_tf.isnot(None)).all()
+        migrated = 0
+        for project in projects:
+            requirements_tf = project.get_requirements_tf()
+            self.set_project_requirements(db, project, requirements_tf)
+            if requirements_tf:
+                migrated += 1
+        db.commit()
+        self.logger.info(f"Rebuilt project_requirements for {migrated} projects")
+        return migrated
+
+
+# Global instance
+requirements_service = RequirementsService()
@@ -0,0 +1,156 @@
+"""
+Offline scan benchmark on recorded fixtures (see replay_harness).
+
+Runs scan_website_stream for the recorded sites against a ReplayServer and reports
+projects per minute, time to the first project, per-stage latency and peak memory.
+Stages overlap: a level3 batch includes the detail page loads and Mistral calls it makes.
+
+    stage           measured around
+    page_fetch      every page load of a ReplayBrowser
+    listing_page    WebScraper._load_listing_page (numbered pages)
+    level2          WebScraper.level2_scan
+    level3_batch    WebScraper.level3_scan_batch
+    external_url    WebScraper._extract_external_url (sites with external project pages)
+    detail_page     WebScraper._load_page_source
+    mistral_call    one chat completion, including rate limiting and retries
+"""
+
+import logging
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from backend.benchmark_stats import StageTimer, max_rss_mb
+from backend.config_manager import config_manager
+from backend.replay_harness import DEFAULT_FIXTURE_DIRECTORY, FixtureSet, ReplayServer, replay_scraper
+
+logger = logging.getLogger(__name__)
+
+# WebScraper methods timed as stages
+SCRAPER_STAGES = {
+    "_load_listing_page": "listing_page",
+    "level2_scan": "level2",
+    "level3_scan_batch": "level3_batch",
+    "_extract_external_url": "external_url",
+    "_load_page_source": "detail_page"
+}
+
+
+def _replay_time_range(fixtures: FixtureSet) -> int:
+    """The recorded time range, extended by the days since recording so the same projects are in range."""
+    time_range = fixtures.manifest.get("time_range") or 7
+    recorded_at = fixtures.manifest.get("recorded_at")
+    if recorded_at:
+        time_range += max((datetime.now() - datetime.fromisoformat(recorded_at)).days, 0) + 1
+    return time_range
+
+
+async def run_benchmark(fixture_directory: str = DEFAULT_FIXTURE_DIRECTORY, site_names: Optional[List[str]] = None,
+                        time_range: Optional[int] = None, page_latency: float = 0.0, mistral_latency: float = 0.0,
+                        trace_memory: bool = True) -> Dict[str, Any]:
+    """
+    Scan the recorded sites through the replay harness and measure the scan.
+
+    Args:
+        fixture_directory: Directory of the recorded FixtureSet
+        site_names: Sites to scan (default: all recorded sites)
+        time_range: Time range of the scans (default: the recorded one, shifted to today)
+        page_latency: Seconds the replay server waits before serving a page
+        mistral_latency: Seconds the replay server waits before a Mistral answer
+        trace_memory: Measure the peak Python heap with tracemalloc (slows the scan down somewhat)
+
+    Returns:
+        Projects, duration and projects per minute in total and per site, stage latencies,
+        peak memory and the request counts of the replay server
+    """
+    fixtures = FixtureSet(fixture_directory)
+    sites = site_names or fixtures.manifest["sites"]
+    websites = [website for website in config_manager.get_websites() if website["level1_search"]["name"] in sites]
+    if not websites:
+        raise ValueError(f"No configured websites recorded in {fixture_directory}")
+    time_range = time_range or _replay_time_range(fixtures)
+
+    timer = StageTimer()
+    result: Dict[str, Any] = {"fixtures": str(fixtures.directory), "time_range": time_range, "sites": {}}
+    with ReplayServer(fixtures, page_latency=page_latency, mistral_latency=mistral_latency) as server:
+        scraper = replay_scraper(server, timer=timer)
+        for method_name, stage in SCRAPER_STAGES.items():
+            timer.instrument(scraper, method_name, stage)
+        timer.instrument(scraper.mistral_handler.api, "complete", "mistral_call")
+
+        started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if trace_memory:
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            for website_config in websites:
+                site = website_config["level1_search"]["name"]
+                site_started = time.perf_counter()
+                first_project = None
+                projects = 0
+                async for _ in scraper.scan_website_stream(website_config, time_range):
+                    projects += 1
+                    if first_project is None:
+                        first_project = time.perf_counter() - site_started
+                seconds = time.perf_counter() - site_started
+                result["sites"][site] = {
+                    "projects": projects,
+                    "seconds": seconds,
+                    "projects_per_minute": projects * 60 / seconds if seconds else 0.0,
+                    "first_project_seconds": first_project
+                }
+                logger.info(f"Benchmark: {projects} projects of {site} in {seconds:.2f}s")
+            seconds = time.perf_counter() - started
+            peak_memory = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+
+        projects = sum(site_result["projects"] for site_result in result["sites"].values())
+        result.update({
+            "projects": projects,
+            "seconds": seconds,
+            "projects_per_minute": projects * 60 / seconds if seconds else 0.0,
+            "stages": timer.summary(),
+            "peak_memory_mb": peak_memory / (1024 * 1024) if peak_memory is not None else None,
+            "max_rss_mb": max_rss_mb(),
+            "mistral_usage": dict(scraper.mistral_handler.token_usage),
+            "server": dict(server.stats)
+        })
+    return result
+
+
+def format_report(result: Dict[str, Any]) -> str:
+    """Plain text report of a benchmark result."""
+    lines = [
+        f"Scan benchmark on {result['fixtures']} (time range {result['time_range']} days)",
+        f"{result['projects']} projects in {result['seconds']:.2f}s: {result['projects_per_minute']:.1f} projects/minute",
+        ""
+    ]
+    for site, site_result in result["sites"].items():
+        first_project = site_result["first_project_seconds"]
+        lines.append(
+            f"  {site:<15} {site_result['projects']:>5} projects {site_result['seconds']:>8.2f}s "
+            f"{site_result['projects_per_minute']:>8.1f}/min  first after "
+            + (f"{first_project:.2f}s" if first_project is not None else "-")
+        )
+    lines += ["", f"  {'stage':<15} {'count':>6} {'total s':>9} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+    for stage, stats in result["stages"].items():
+        lines.append(
+            f"  {stage:<15} {stats['count']:>6} {stats['total']:>9.2f} {stats['mean'] * 1000:>9.1f} "
+            f"{stats['p50'] * 1000:>9.1f} {stats['p95'] * 1000:>9.1f} {stats['max'] * 1000:>9.1f}"
+        )
+    lines.append("")
+    if result["peak_memory_mb"] is not None:
+        lines.append(f"Peak Python heap: {result['peak_memory_mb']:.1f} MB")
+    if result["max_rss_mb"] is not None:
+        lines.append(f"Max resident set size of the process: {result['max_rss_mb']:.1f} MB")
+    server = result["server"]
+    lines.append(
+        f"Replayed {server['pages']} pages ({server['page_misses']} not recorded), "
+        f"{server['mistral_calls']} Mistral calls ({server['mistral_misses']} not recorded)"
+    )
+    return "\n".join(lines)
@@ -0,0 +1,207 @@
+"""Durable scan job records with per-site checkpoints.
+
+The progress of a streaming scan is stored in AppState under "scan_job.<scan_id>":
+
+    {
+        "scan_id": "a1b2c3d4",
+        "time_range": 8,
+        "incremental": true,             # Sites stop at their high-water marks
+        "status": "running",            # running, cancelled, failed or complete
+        "started_at": "...", "updated_at": "...",
+        "websites": {
+            "Etengo": {
+                "status": "running",    # pending, running or done
+                "listing_url": "...",   # listing page being processed
+                "processed_urls": [...],# cards handled completely (stored, known or filtered)
+                "pending": [...],       # level2 data of cards waiting for the level3 scan
+                "projects": 12
+            }
+        }
+    }
+
+A scan that was cancelled, failed or interrupted by a backend restart can be resumed: done
+sites are skipped, the pending level3 queue is processed first and processed cards are not
+scanned again.
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy.orm import Session
+
+from backend.config_manager import config_manager
+from backend.models.core_models import AppState
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_KEY_PREFIX = "scan_job."
+RESUMABLE_STATUSES = {"running", "cancelled", "failed"}
+DEFAULT_SAVE_INTERVAL_SECONDS = 5.0
+DEFAULT_COMPLETED_RECORDS_KEPT = 5
+
+
+class SiteCheckpoint:
+    """Progress of one website within a scan; changes are saved through the scan checkpoint."""
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, on_change: Callable[[bool], None] = None):
+        data = data or {}
+        self.status = data.get("status", "pending")
+        self.listing_url = data.get("listing_url")
+        self.processed_urls = set(data.get("processed_urls", []))
+        self.pending: List[Dict[str, Any]] = list(data.get("pending", []))
+        self.projects = data.get("projects", 0)
+        self._on_change = on_change
+
+    def _changed(self, force: bool = False) -> None:
+        if self._on_change:
+            self._on_change(force)
+
+    def set_listing_url(self, url: str) -> None:
+        self.listing_url = url
+        self._changed(force=True)
+
+    def mark_processed(self, url: Optional[str]) -> None:
+        if url:
+            self.processed_urls.add(url)
+            self._changed()
+
+    def set_pending(self, pending: List[Dict[str, Any]]) -> None:
+        self.pending = list(pending)
+        self._changed()
+
+    def set_status(self, status: str) -> None:
+        self.status = status
+        self._changed(force=True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "listing_url": self.listing_url,
+            "processed_urls": sorted(self.processed_urls),
+            "pending": self.pending,
+            "projects": self.projects
+        }
+
+
+class ScanCheckpoint:
+    """Job record of one scan, saved to AppState at most every save interval (or when forced)."""
+
+    def __init__(self, db: Session, data: Dict[str, Any]):
+        self.db = db
+        self.scan_id = data["scan_id"]
+        self.time_range = data["time_range"]
+        self.incremental = data.get("incremental", False)
+        self.status = data.get("status", "running")
+        self.started_at = data.get("started_at") or datetime.now().isoformat()
+        self.sites: Dict[str, SiteCheckpoint] = {
+            name: SiteCheckpoint(site_data, self._site_changed) for name, site_data in data.get("websites", {}).items()
+        }
+        self.save_interval = float(config_manager.get("scan_jobs.checkpoint_interval_seconds", DEFAULT_SAVE_INTERVAL_SECONDS))
+        self._last_save = 0.0
+
+    @property
+    def key(self) -> str:
+        return f"{CHECKPOINT_KEY_PREFIX}{self.scan_id}"
+
+    def site(self, name: str) -> SiteCheckpoint:
+        if name not in self.sites:
+            self.sites[name] = SiteCheckpoint(on_change=self._site_changed)
+        return self.sites[name]
+
+    def _site_changed(self, force: bool) -> None:
+        if force or time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "scan_id": self.scan_id,
+            "time_range": self.time_range,
+            "incremental": self.incremental,
+            "status": self.status,
+            "started_at": self.started_at,
+            "updated_at": datetime.now().isoformat(),
+            "websites": {name: site.to_dict() for name, site in self.sites.items()}
+        }
+
+    def save(self) -> None:
+        """Write the record to AppState and commit."""
+        try:
+            state = self.db.query(AppState).filter(AppState.key == self.key).first()
+            if state is None:
+                state = AppState(key=self.key)
+                self.db.add(state)
+            state.set_value(self.to_dict())
+            self.db.commit()
+            self._last_save = time.monotonic()
+        except Exception as e:
+            logger.error(f"Error saving checkpoint of scan {self.scan_id}: {str(e)}")
+            self.db.rollback()
+
+    def set_status(self, status: str) -> None:
+        self.status = status
+        if status == "complete":
+            # Nothing to resume; keep only the summary
+            for site in self.sites.values():
+                site.processed_urls.clear()
+                site.pending = []
+        self.save()
+
+
+class ScanCheckpointService:
+    """Creates, loads and lists durable scan job records."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def create(self, db: Session, scan_id: str, time_range: int, incremental: bool = False) -> ScanCheckpoint:
+        """Create and save the record of a new scan."""
+        self._prune_completed(db)
+        checkpoint = ScanCheckpoint(db, {"scan_id": scan_id, "time_range": time_range, "incremental": incremental})
+        checkpoint.save()
+        return checkpoint
+
+    def load(self, db: Session, scan_id: str) -> Optional[ScanCheckpoint]:
+        state = db.query(AppState).filter(AppState.key == f"{CHECKPOINT_KEY_PREFIX}{scan_id}").first()
+        data = state.get_value() if state else None
+        if not isinstance(data, dict):
+            return None
+        return ScanCheckpoint(db, data)
+
+    def list_records(self, db: Session) -> List[Dict[str, Any]]:
+        """Summaries of all stored scan records, newest first."""
+        records = []
+        for state in db.query(AppState).filter(AppState.key.like(f"{CHECKPOINT_KEY_PREFIX}%")).all():
+            data = state.get_value()
+            if not isinstance(data, dict):
+                continue
+            records.append({
+                "scan_id": data["scan_id"],
+                "time_range": data["time_range"],
+                "incremental": data.get("incremental", False),
+                "status": data.get("status"),
+                "resumable": data.get("status") in RESUMABLE_STATUSES,
+                "started_at": data.get("started_at"),
+                "updated_at": data.get("updated_at"),
+                "websites": {
+                    name: {
+                        "status": site.get("status"),
+                        "projects": site.get("projects", 0),
+                        "pending": len(site.get("pending", []))
+                    }
+                    for name, site in data.get("websites", {}).items()
+                }
+            })
+        return sorted(records, key=lambda record: record["started_at"] or "", reverse=True)
+
+    def _prune_completed(self, db: Session) -> None:
+        keep = int(config_manager.get("scan_jobs.finished_jobs_kept", DEFAULT_COMPLETED_RECORDS_KEPT))
+        completed = [record for record in self.list_records(db) if record["status"] == "complete"]
+        for record in completed[keep:]:
+            db.query(AppState).filter(AppState.key == f"{CHECKPOINT_KEY_PREFIX}{record['scan_id']}").delete()
+        if len(completed) > keep:
+            db.commit()
+
+
+# Global scan checkpoint service instance
+scan_checkpoint_service = ScanCheckpointService()
@@ -0,0 +1,225 @@
+"""Scan jobs running independently of the SSE connections watching them.
+
+A scan runs as a background task that writes its events into a bounded per-scan ring
+buffer with sequential event ids. Any number of SSE subscribers read from the buffer at
+their own pace, so a slow or disconnected client never throttles or stalls the scan.
+Event ids have the form "<scan_id>-<sequence>"; a client reconnecting with Last-Event-ID
+gets the events it missed (as long as they are still in the buffer).
+While a scan runs, its phase timings and throughput are published every
+"scan_jobs.stats_interval_seconds" as "stats" events (see scan_telemetry_service).
+Refreshes of stored projects (see refresh_service) run as jobs of kind "refresh" the same way.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import deque
+from typing import Any, AsyncGenerator, Callable, Deque, Dict, Optional, Tuple
+
+from backend.config_manager import config_manager
+from backend.database import SessionLocal
+from backend.scan_telemetry_service import scan_telemetry_service, DEFAULT_STATS_INTERVAL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EVENT_BUFFER_SIZE = 1000
+DEFAULT_FINISHED_JOBS_KEPT = 5
+
+# Event types ending a scan
+FINAL_EVENT_TYPES = {"complete", "cancelled"}
+
+
+class ScanJob:
+    """One scan with its ring buffer of SSE events."""
+
+    def __init__(self, scan_id: str, time_range: Optional[int], buffer_size: int, resume: bool = False,
+                 incremental: Optional[bool] = None, kind: str = "scan", limit: Optional[int] = None):
+        self.scan_id = scan_id
+        self.kind = kind  # "scan" or "refresh"
+        self.time_range = time_range
+        self.limit = limit  # Maximum number of projects a refresh checks (None: all)
+        self.resume = resume  # Continue from the scan's last checkpoint
+        self.incremental = incremental  # Stop at the sites' high-water marks (None: configured default)
+        self.status = "running"  # running, complete, cancelled or failed
+        self.events: Deque[Tuple[int, str]] = deque(maxlen=buffer_size)
+        self.last_sequence = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.status != "running"
+
+    def event_id(self, sequence: int) -> str:
+        return f"{self.scan_id}-{sequence}"
+
+    async def publish(self, payload: str) -> None:
+        """Append an event (JSON payload) and wake up the subscribers; never waits for them."""
+        self.last_sequence += 1
+        self.events.append((self.last_sequence, payload))
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def finish(self, status: str) -> None:
+        self.status = status
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def subscribe(self, after_sequence: int = 0) -> AsyncGenerator[str, None]:
+        """
+        Stream the events after `after_sequence` as SSE messages until the scan has ended.
+
+        A subscriber that fell behind by more than the buffer continues with the oldest
+        buffered event.
+        """
+        sequence = after_sequence
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: self.last_sequence > sequence or self.done)
+            pending = [(event_sequence, payload) for event_sequence, payload in self.events if event_sequence > sequence]
+            if pending and pending[0][0] > sequence + 1:
+                logger.warning(f"Subscriber of scan {self.scan_id} missed events {sequence + 1}-{pending[0][0] - 1} (buffer overrun)")
+            for event_sequence, payload in pending:
+                sequence = event_sequence
+                yield f"id: {self.event_id(event_sequence)}\ndata: {payload}\n\n"
+            if self.done and sequence >= self.last_sequence:
+                return
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "scan_id": self.scan_id,
+            "kind": self.kind,
+            "time_range": self.time_range,
+            "limit": self.limit,
+            "status": self.status,
+            "resumed": self.resume,
+            "incremental": self.incremental,
+            "events": self.last_sequence
+        }
+
+
+class ScanJobService:
+    """Starts scan jobs and hands out subscriptions to them."""
+
+    def __init__(self, scan_service=None, session_factory: Callable = None, refresh_service=None):
+        self._scan_service = scan_service
+        self._refresh_service = refresh_service
+        self.session_factory = session_factory or SessionLocal
+        self.jobs: Dict[str, ScanJob] = {}  # In start order
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def scan_service(self):
+        if self._scan_service is None:
+            from backend.scan_service import scan_service
+            self._scan_service = scan_service
+        return self._scan_service
+
+    @property
+    def refresh_service(self):
+        if self._refresh_service is None:
+            from backend.refresh_service import refresh_service
+            self._refresh_service = refresh_service
+        return self._refresh_service
+
+    def get_job(self, scan_id: str) -> Optional[ScanJob]:
+        return self.jobs.get(scan_id)
+
+    def get_running_job(self) -> Optional[ScanJob]:
+        return next((job for job in self.jobs.values() if not job.done), None)
+
+    def parse_event_id(self, event_id: Optional[str]) -> Tuple[Optional[ScanJob], int]:
+        """Resolve a Last-Event-ID to its job and sequence number ((None, 0) if unknown)."""
+        if not event_id or "-" not in event_id:
+            return None, 0
+        scan_id, _, sequence = event_id.rpartition("-")
+        job = self.jobs.get(scan_id)
+        if job is None or not sequence.isdigit():
+            return None, 0
+        return job, int(sequence)
+
+    def start_job(self, time_range: int, incremental: Optional[bool] = None) -> ScanJob:
+        """Start a scan job in the background, or return the running one (a running refresh makes the new scan fail)."""
+        running_job = self.get_running_job()
+        if running_job and running_job.kind == "scan":
+            self.logger.info(f"Scan {running_job.scan_id} already running, attaching instead of starting a new scan")
+            return running_job
+
+        return self._launch(str(uuid.uuid4())[:8], time_range, incremental=incremental)
+
+    def start_refresh_job(self, limit: Optional[int] = None) -> ScanJob:
+        """Start a refresh of stored projects in the background (callers make sure no scan is running)."""
+        return self._launch(str(uuid.uuid4())[:8], None, kind="refresh", limit=limit)
+
+    def resume_job(self, scan_id: str, time_range: int) -> ScanJob:
+        """Continue an interrupted scan from its last checkpoint, under the same scan_id."""
+        running_job = self.get_running_job()
+        if running_job and running_job.scan_id == scan_id:
+            return running_job
+        # The finished job of the interrupted run is replaced
+        self.jobs.pop(scan_id, None)
+        return self._launch(scan_id, time_range, resume=True)
+
+    def _launch(self, scan_id: str, time_range: Optional[int], resume: bool = False, incremental: Optional[bool] = None,
+                kind: str = "scan", limit: Optional[int] = None) -> ScanJob:
+        self._prune_finished_jobs()
+        buffer_size = int(config_manager.get("scan_jobs.event_buffer_size", DEFAULT_EVENT_BUFFER_SIZE))
+        job = ScanJob(scan_id, time_range, buffer_size, resume, incremental, kind, limit)
+        self.jobs[job.scan_id] = job
+        job.task = asyncio.create_task(self._run(job))
+        return job
+
+    def _prune_finished_jobs(self) -> None:
+        finished = [scan_id for scan_id, job in self.jobs.items() if job.done]
+        keep = int(config_manager.get("scan_jobs.finished_jobs_kept", DEFAULT_FINISHED_JOBS_KEPT))
+        for scan_id in finished[:max(len(finished) - keep, 0)]:
+            del self.jobs[scan_id]
+
+    def _stream(self, job: ScanJob, db) -> AsyncGenerator[str, None]:
+        """The SSE message stream of the job's scan or refresh."""
+        if job.kind == "refresh":
+            return self.refresh_service.refresh_projects_stream(db, job.limit, job.scan_id)
+        return self.scan_service.scan_projects_stream(
+            job.time_range, db, job.scan_id, resume=job.resume, incremental=job.incremental
+        )
+
+    async def _run(self, job: ScanJob) -> None:
+        """Run the scan to its end, whoever is (or is not) listening."""
+        job_logger = logging.getLogger(f"scan.{job.scan_id}")
+        db = self.session_factory()
+        status = "failed"
+        stats_task = asyncio.create_task(self._publish_stats(job))
+        try:
+            async for message in self._stream(job, db):
+                payload = message[len("data: "):].strip() if message.startswith("data: ") else message.strip()
+                await job.publish(payload)
+                try:
+                    event_type = json.loads(payload).get("type")
+                except (ValueError, AttributeError):
+                    event_type = None
+                if event_type in FINAL_EVENT_TYPES:
+                    status = event_type
+        except Exception as e:
+            job_logger.error(f"Scan job failed: {str(e)}")
+            await job.publish(json.dumps({"type": "error", "message": f"Scan failed: {str(e)}"}, ensure_ascii=False))
+        finally:
+            stats_task.cancel()
+            db.close()
+            await job.finish(status)
+            job_logger.info(f"Scan job finished with status {status} after {job.last_sequence} events")
+
+    async def _publish_stats(self, job: ScanJob) -> None:
+        """Publish the telemetry of the job's scan as a "stats" event at a fixed interval (0 disables)."""
+        interval = float(config_manager.get("scan_jobs.stats_interval_seconds", DEFAULT_STATS_INTERVAL_SECONDS))
+        if interval <= 0:
+            return
+        while True:
+            await asyncio.sleep(interval)
+            run = scan_telemetry_service.active
+            if run is not None and run.scan_id == job.scan_id:
+                await job.publish(scan_telemetry_service.stats_payload(run))
+
+
+# Global scan job service instance
+scan_job_service = ScanJobService()
@@ -3,6 +3,7 @@
 This file is now considered STABLE and should not be changed unless explicitly requested.
 """
 
+import asyncio
 import logging
 import json
 import uuid
@@ -17,6 +18,12 @@ from backend.models.schemas import ProjectResponse
 from backend.web_scraper import WebScraper
 from backend.deduplication_service import deduplication_service
 from backend.tfidf_service import tfidf_service
+from backend.requirements_service import requirements_service
+from backend.project_index_service import project_index_service
+from backend.scan_checkpoint_service import scan_checkpoint_service, RESUMABLE_STATUSES
+from backend.high_water_mark_service import high_water_mark_service
+from backend.duplicate_index import build_duplicate_index, get_duplicate_suppression_enabled
+from backend.scan_telemetry_service import scan_telemetry_service
 
 logger = logging.getLogger(__name__)
 
@@ -83,25 +90,8 @@ class ScanService:
             self._register_scan(scan_id)
             scan_logger.info(f"Starting project scan with time_range: {time_range}")
 
-            # Collect existing projects data once at the beginning
-            existing_projects = db.query(Project).all()
-            existing_project_data = {
-                project.url: {
-                    'id': project.id,
-                    'title': project.title,
-                    'url': project.url,
-                    'release_date': project.release_date,
-                    'start_date': project.start_date,
-                    'duration': project.duration,
-                    'location': project.location,
-                    'tenderer': project.tenderer,
-                    'rate': project.rate,
-                    'description': project.description,
-                    'project_id': project.project_id,
-                    'budget': project.budget,
-                    'workload': project.workload
-                } for project in existing_projects
-            }
+            # Known-project index (normalized URLs and site project ids), loaded once per process
+            existing_project_data = project_index_service.get_index(db)
 
             # Get website configurations
             websites = config_manager.get_websites()
@@ -144,13 +134,8 @@ class ScanService:
                             # Handle requirements_tf field (new format) or fallback to requirements (old format)
                             requirements_data = project_data.get("requirements_tf", project_data.get("requirements"))
                             if requirements_data:
-                                if isinstance(requirements_data, dict):
-                                    # Store term frequency data
-                                    project.set_requirements_tf(requirements_data)
-                                else:
-                                    # Fallback for old format (list of strings) - convert to TF format
-                                    requirements_dict = {req: 1 for req in requirements_data}
-                                    project.set_requirements_tf(requirements_dict)
+                                # Store in the project_requirements join table (and the JSON mirror)
+                                requirements_service.set_project_requirements(db, project, requirements_data)
 
                             db.add(project)
                             total_projects += 1
@@ -170,6 +155,9 @@ class ScanService:
             # Update last scan timestamp
             self._update_last_scan_timestamp(db)
 
+            # Keep the page archive within its size and age limits
+            await asyncio.to_thread(self.web_scraper.page_archive.prune)
+
             # Call deduplication service only if projects were found
             if total_projects > 0:
                 deduplication_result = deduplication_service.run_deduplication(db)
@@ -217,8 +205,18 @@ class ScanService:
             self._unregister_scan(scan_id)
             self._release_scan_lock()
 
-    async def scan_projects_stream(self, time_range: int, db: Session) -> AsyncGenerator[str, None]:
-        """Scan for new projects and stream results using Server-Sent Events."""
+    async def scan_projects_stream(self, time_range: int, db: Session, scan_id: str = None, resume: bool = False,
+                                   incremental: bool = None) -> AsyncGenerator[str, None]:
+        """
+        Scan for new projects and stream results using Server-Sent Events.
+
+        Progress is checkpointed per website (see scan_checkpoint_service); with resume=True the
+        scan given by scan_id continues from its last checkpoint instead of starting over.
+        An incremental scan (default: "scanning.incremental") stops paginating each website
+        at its high-water mark from the previous scan (see high_water_mark_service).
+        Phase timings are reported as "stats" messages after each website and stored with
+        the run in scan_runs when the scan ends (see scan_telemetry_service).
+        """
         # Check if a scan is already active
         if not self._acquire_scan_lock():
             error_message = f"data: {json.dumps({'type': 'error', 'message': 'Another scan is already in progress. Please wait for it to complete.'}, ensure_ascii=False)}\n\n"
@@ -226,33 +224,36 @@ class ScanService:
             return
 
         # Generate unique scan ID for correlation
-        scan_id = str(uuid.uuid4())[:8]  # e.g., "a1b2c3d4"
+        scan_id = scan_id or str(uuid.uuid4())[:8]  # e.g., "a1b2c3d4"
         scan_logger = logging.getLogger(f"scan.{scan_id}")
+        checkpoint = None
+        telemetry = None
 
         try:
             # Register this scan as active
             self._register_scan(scan_id)
-            scan_logger.info(f"Starting streaming project scan with time_range: {time_range}")
-
-            # Collect existing projects data once at the beginning
-            existing_projects = db.query(Project).all()
-            existing_project_data = {
-                project.url: {
-                    'id': project.id,
-                    'title': project.title,
-                    'url': project.url,
-                    'release_date': project.release_date,
-                    'start_date': project.start_date,
-                    'duration': project.duration,
-                    'location': project.location,
-                    'tenderer': project.tenderer,
-                    'rate': project.rate,
-                    'description': project.description,
-                    'project_id': project.project_id,
-                    'budget': project.budget,
-                    'workload': project.workload
-                } for project in existing_projects
-            }
+
+            # Durable job record with per-site checkpoints
+            if resume:
+                checkpoint = scan_checkpoint_service.load(db, scan_id)
+                if checkpoint is None or checkpoint.status not in RESUMABLE_STATUSES:
+                    yield f"data: {json.dumps({'type': 'error', 'message': f'Scan {scan_id} cannot be resumed'}, ensure_ascii=False)}\n\n"
+                    return
+                time_range = checkpoint.time_range
+                incremental = checkpoint.incremental
+                checkpoint.set_status("running")
+                scan_logger.info(f"Resuming streaming project scan with time_range: {time_range}")
+            else:
+                if incremental is None:
+                    incremental = bool(config_manager.get("scanning.incremental", False))
+                checkpoint = scan_checkpoint_service.create(db, scan_id, time_range, incremental)
+                scan_logger.info(f"Starting streaming project scan with time_range: {time_range} (incremental: {incremental})")
+            telemetry = scan_telemetry_service.start(scan_id, time_range, incremental, resume)
+
+            # Known-project index (normalized URLs and site project ids), loaded once per process
+            existing_project_data = project_index_service.get_index(db)
+            # Fingerprints of stored projects, extended with this scan's, to skip cross-site copies before level3
+            duplicate_index = build_duplicate_index(db) if get_duplicate_suppression_enabled() else None
 
             # Get website configurations
             websites = config_manager.get_websites()
@@ -266,7 +267,7 @@ class ScanService:
             errors = []
 
             # Send start message
-            start_message = f"data: {json.dumps({'type': 'start', 'message': 'Scan started', 'scan_id': scan_id}, ensure_ascii=False)}\n\n"
+            start_message = f"data: {json.dumps({'type': 'start', 'message': 'Scan resumed' if resume else 'Scan started', 'scan_id': scan_id, 'resumed': resume, 'incremental': incremental}, ensure_ascii=False)}\n\n"
             scan_logger.info(f"Sending start message: {start_message.strip()}")
             yield start_message
 
@@ -275,6 +276,7 @@ class ScanService:
                 # Check for cancellation before starting each website
                 if self.is_scan_cancelled(scan_id):
                     scan_logger.info(f"Scan {scan_id} was cancelled, stopping")
+                    checkpoint.set_status("cancelled")
                     yield f"data: {json.dumps({'type': 'cancelled', 'message': 'Scan was cancelled by user'}, ensure_ascii=False)}\n\n"
                     return
 
@@ -282,6 +284,14 @@ class ScanService:
                     website_name = website_config['level1_search']['name']
                     website_logger = logging.getLogger(f"scan.{scan_id}.website.{website_name}")
 
+                    site_checkpoint = checkpoint.site(website_name)
+                    if site_checkpoint.status == "done":
+                        website_logger.info(f"Website {website_name} already completed before the scan was resumed, skipping")
+                        yield f"data: {json.dumps({'type': 'website_complete', 'website': website_name, 'projects': site_checkpoint.projects}, ensure_ascii=False)}\n\n"
+                        continue
+                    site_checkpoint.set_status("running")
+                    telemetry.start_site(website_name)
+
                     website_logger.info("=========================================================================")
                     website_logger.info(f"Started processing website: {website_name}")
                     website_logger.info("=========================================================================")
@@ -291,6 +301,9 @@ class ScanService:
                     website_logger.info(f"Sending website start message: {website_start_msg.strip()}")
                     yield website_start_msg
 
+                    # Newest release date and recent URLs of the previous scan of this website
+                    high_water_mark = high_water_mark_service.load(db, website_name) if incremental else None
+
                     # Use streaming web scraper logic
                     website_logger.info("Calling streaming web scraper...")
                     project_count = 0
@@ -298,11 +311,15 @@ class ScanService:
                         website_config,
                         time_range,
                         existing_project_data,
-                        scan_id  # Pass scan_id for cancellation checks
+                        scan_id,  # Pass scan_id for cancellation checks
+                        site_checkpoint,
+                        high_water_mark,
+                        duplicate_index
                     ):
                         # Check for cancellation before processing each project
                         if self.is_scan_cancelled(scan_id):
                             scan_logger.info(f"Scan {scan_id} was cancelled during project processing, stopping")
+                            checkpoint.set_status("cancelled")
                             yield f"data: {json.dumps({'type': 'cancelled', 'message': 'Scan was cancelled by user'}, ensure_ascii=False)}\n\n"
                             return
 
@@ -322,35 +339,33 @@ class ScanService:
                                 project_logger.info(f"Using current date as fallback for start_date: {start_date}")
 
                             # Create project using existing logic
-                            project = Project(
-                                title=project_data.get("title", ""),
-                                description=project_data.get("description"),
-                                release_date=project_data.get("release_date"),
-                                start_date=start_date,
-                                location=project_data.get("location"),
-                                tenderer=project_data.get("tenderer"),
-                                project_id=project_data.get("project_id"),
-                                rate=project_data.get("rate"),
-                                url=project_data.get("url"),
-                                budget=project_data.get("budget"),
-                                duration=project_data.get("duration"),
-                                workload=project_data.get("workload")
-                            )
-
-                            # Handle requirements_tf field (new format) or fallback to requirements (old format)
-                            requirements_data = project_data.get("requirements_tf", project_data.get("requirements"))
-                            if requirements_data:
-                                if isinstance(requirements_data, dict):
-                                    # Store term frequency data
-                                    project.set_requirements_tf(requirements_data)
-                                else:
-                                    # Fallback for old format (list of strings) - convert to TF format
-                                    requirements_dict = {req: 1 for req in requirements_data}
-                                    project.set_requirements_tf(requirements_dict)
-
-                            db.add(project)
-                            db.flush()  # Get the ID without committing
-                            total_projects += 1
+                            with scan_telemetry_service.project(project_data.get("url")), scan_telemetry_service.phase("persist"):
+                                project = Project(
+                                    title=project_data.get("title", ""),
+                                    description=project_data.get("description"),
+                                    release_date=project_data.get("release_date"),
+                                    start_date=start_date,
+                                    location=project_data.get("location"),
+                                    tenderer=project_data.get("tenderer"),
+                                    project_id=project_data.get("project_id"),
+                                    rate=project_data.get("rate"),
+                                    url=project_data.get("url"),
+                                    budget=project_data.get("budget"),
+                                    duration=project_data.get("duration"),
+                                    workload=project_data.get("workload")
+                                )
+
+                                # Handle requirements_tf field (new format) or fallback to requirements (old format)
+                                requirements_data = project_data.get("requirements_tf", project_data.get("requirements"))
+                                if requirements_data:
+                                    # Store in the project_requirements join table (and the JSON mirror)
+                                    requirements_service.set_project_requirements(db, project, requirements_data)
+
+                                db.add(project)
+                                db.flush()  # Get the ID without committing
+                                total_projects += 1
+                                site_checkpoint.projects += 1
+                            telemetry.project_stored()
 
                             # Send project data immediately - include full data to avoid API calls
                             project_display_data = {
@@ -375,7 +390,10 @@ class ScanService:
                             yield project_message
 
                             # Commit each project immediately to ensure it's saved
-                            db.commit()
+                            with scan_telemetry_service.project(project_data.get("url")), scan_telemetry_service.phase("persist"):
+                                db.commit()
+                            # Only a stored project is skipped when the scan is resumed
+                            site_checkpoint.mark_processed(project_data.get("url"))
 
                         except Exception as e:
                             logger.error(f"Error saving project: {str(e)}")
@@ -385,6 +403,8 @@ class ScanService:
                             yield error_message
 
                     website_logger.info(f"Web scraper processed {project_count} projects")
+                    if high_water_mark:
+                        high_water_mark_service.save(db, high_water_mark)
 
                     # Send immediate feedback about found projects
                     if project_count > 0:
@@ -393,9 +413,12 @@ class ScanService:
                         yield info_message
 
                     # No need for final commit since we commit after each project
+                    telemetry.finish_site()
                     yield f"data: {json.dumps({'type': 'website_complete', 'website': website_name, 'projects': project_count}, ensure_ascii=False)}\n\n"
+                    yield scan_telemetry_service.stats_message(telemetry)
 
                 except Exception as e:
+                    telemetry.finish_site()
                     error_msg = f"Error scanning website: {str(e)}"
                     logger.error(error_msg)
                     errors.append(error_msg)
@@ -406,21 +429,27 @@ class ScanService:
             # Check for cancellation before final steps
             if self.is_scan_cancelled(scan_id):
                 scan_logger.info(f"Scan {scan_id} was cancelled before final steps")
+                checkpoint.set_status("cancelled")
                 yield f"data: {json.dumps({'type': 'cancelled', 'message': 'Scan was cancelled by user'}, ensure_ascii=False)}\n\n"
                 return
 
             # Update last scan timestamp
             self._update_last_scan_timestamp(db)
 
+            # Keep the page archive within its size and age limits
+            await asyncio.to_thread(self.web_scraper.page_archive.prune)
+
             # Call deduplication service only if projects were found
             if total_projects > 0:
-                deduplication_result = deduplication_service.run_deduplication(db)
+                with scan_telemetry_service.phase("dedup"):
+                    deduplication_result = deduplication_service.run_deduplication(db)
                 logger.info(f"Deduplication result: {deduplication_result}")
 
                 # Calculate and update IDF factors after deduplication
                 try:
                     scan_logger.info("Starting TF/IDF calculation...")
-                    idf_factors = tfidf_service.update_skills_idf_factors(db)
+                    with scan_telemetry_service.phase("idf"):
+                        idf_factors = tfidf_service.update_skills_idf_factors(db)
                     scan_logger.info(f"TF/IDF calculation completed. Updated {len(idf_factors)} skills with IDF factors")
 
                     # Send TF/IDF completion message
@@ -441,25 +470,40 @@ class ScanService:
                 }
                 logger.info("No projects found, skipping deduplication")
 
+            # Likely duplicates skipped before their level3 scan
+            deduplication_result["suppressed_during_scan"] = duplicate_index.suppressed if duplicate_index else 0
+            deduplication_result["suppressed_details"] = duplicate_index.suppressed_details if duplicate_index else []
+
             # Send deduplication message
             dedup_message = f"data: {json.dumps({'type': 'deduplication', 'result': deduplication_result}, ensure_ascii=False)}\n\n"
             scan_logger.info(f"Sending deduplication message: {dedup_message.strip()}")
             yield dedup_message
 
+            # Final phase timings and throughput of the run
+            yield scan_telemetry_service.stats_message(telemetry)
+
             # Send completion message
+            checkpoint.set_status("complete")
             complete_message = f"data: {json.dumps({'type': 'complete', 'total_projects': total_projects, 'errors': errors, 'deduplication': deduplication_result}, ensure_ascii=False)}\n\n"
             scan_logger.info(f"Sending complete message: {complete_message.strip()}")
             yield complete_message
 
         except HTTPException:
+            if checkpoint:
+                checkpoint.set_status("failed")
             raise
         except Exception as e:
             logger.error(f"Error during streaming project scan: {str(e)}")
+            if checkpoint:
+                checkpoint.set_status("failed")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to scan projects"
             )
         finally:
+            # Store the run with its telemetry; a checkpoint still running means the stream was closed mid-scan
+            if telemetry:
+                scan_telemetry_service.finish(db, telemetry, "interrupted" if checkpoint.status == "running" else checkpoint.status)
             # Always unregister the scan and release the lock when done
             self._unregister_scan(scan_id)
             self._release_scan_lock()
@@ -0,0 +1,287 @@
+"""Per-phase telemetry of scans and the scan history (scan_runs table).
+
+While a scan runs, the time spent in each phase is recorded per website:
+
+    phase           measured around
+    listing_load    loading a listing page in the browser
+    load_more       clicking a load more button and waiting for the new cards
+    level2_parse    parsing a project card of the listing (level2_scan)
+    external_url    loading a project page to find its external URL (sites with level3_search)
+    detail_fetch    loading a project detail page in the browser
+    settle          waiting for a loaded page to render (time.sleep)
+    llm_extraction  Mistral extraction of one page or a batch of pages
+    persist         storing a project and committing it
+    dedup           deduplication after all websites (scan-wide)
+    idf             IDF update after the deduplication (scan-wide)
+
+Phase times are busy times: work running concurrently (e.g. several LLM batches) is summed,
+so phases can add up to more than the wall time of a site. Only one scan runs at a time
+(see scan_service), so phases are recorded on the active scan run; outside of a scan
+recording is a no-op. The scan stream reports the telemetry as "stats" events and the
+finished run is stored in scan_runs.
+
+Samples recorded inside project(url) are also attributed to that project (a batch LLM
+extraction is split evenly over the projects of the batch), so slow projects can be told
+apart; the telemetry lists the SLOWEST_PROJECTS projects with the most busy time and their
+phases. Listing phases (listing_load, load_more, level2_parse) happen before a card has a
+URL and stay per website.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend.benchmark_stats import StageTimer
+from backend.models.core_models import ScanRun
+
+logger = logging.getLogger(__name__)
+
+PHASES = (
+    "listing_load", "load_more", "level2_parse", "external_url", "detail_fetch", "settle",
+    "llm_extraction", "persist", "dedup", "idf"
+)
+DEFAULT_STATS_INTERVAL_SECONDS = 10.0
+SLOWEST_PROJECTS = 10
+
+# URLs of the projects the work of the current task belongs to (see ScanTelemetryService.project)
+_current_projects: ContextVar[Tuple[str, ...]] = ContextVar("scan_telemetry_projects", default=())
+
+
+def _rounded(summary: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    return {
+        phase: {key: value if key == "count" else round(value, 4) for key, value in stats.items()}
+        for phase, stats in summary.items()
+    }
+
+
+def _per_minute(projects: int, seconds: float) -> float:
+    return round(projects * 60 / seconds, 2) if seconds else 0.0
+
+
+class ScanRunTelemetry:
+    """Phase timings, project counts and wall times of one scan run, per website."""
+
+    def __init__(self, scan_id: str, time_range: Optional[int] = None, incremental: bool = False, resumed: bool = False):
+        self.scan_id = scan_id
+        self.time_range = time_range
+        self.incremental = incremental
+        self.resumed = resumed
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self.current_site: Optional[str] = None
+        self._site_started: Optional[float] = None
+        self.site_timers: Dict[str, StageTimer] = {}
+        self.site_projects: Dict[str, int] = {}
+        self.site_seconds: Dict[str, float] = {}
+        self.scan_timer = StageTimer()  # Scan-wide phases (dedup, idf)
+        self.project_phases: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))  # url -> phase -> seconds
+        self.project_sites: Dict[str, Optional[str]] = {}
+        self.projects = 0
+        self._lock = threading.Lock()
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.perf_counter() - self._started
+
+    def start_site(self, site: str) -> None:
+        with self._lock:
+            self.current_site = site
+            self._site_started = time.perf_counter()
+            self.site_timers.setdefault(site, StageTimer())
+            self.site_projects.setdefault(site, 0)
+
+    def finish_site(self) -> None:
+        with self._lock:
+            if self.current_site is not None and self._site_started is not None:
+                seconds = time.perf_counter() - self._site_started
+                self.site_seconds[self.current_site] = self.site_seconds.get(self.current_site, 0.0) + seconds
+            self.current_site = None
+            self._site_started = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Record one sample of a phase on the current website (scan-wide between websites) and project(s)."""
+        projects = _current_projects.get()
+        with self._lock:
+            site = self.current_site
+            for url in projects:
+                self.project_phases[url][phase] += seconds / len(projects)
+                self.project_sites.setdefault(url, site)
+        if site is None:
+            self.scan_timer.add(phase, seconds)
+        else:
+            self.site_timers[site].add(phase, seconds)
+
+    def project_stored(self) -> None:
+        with self._lock:
+            self.projects += 1
+            if self.current_site is not None:
+                self.site_projects[self.current_site] += 1
+
+    def _site_wall_seconds(self, site: str) -> float:
+        seconds = self.site_seconds.get(site, 0.0)
+        if site == self.current_site and self._site_started is not None:
+            seconds += time.perf_counter() - self._site_started
+        return seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Throughput and per-phase statistics of the run so far, in total and per website."""
+        with self._lock:
+            sites = list(self.site_timers)
+            site_projects = dict(self.site_projects)
+            current_site = self.current_site
+            wall_seconds = {site: self._site_wall_seconds(site) for site in sites}
+            projects = self.projects
+            project_phases = {url: dict(phases) for url, phases in self.project_phases.items()}
+            project_sites = dict(self.project_sites)
+
+        total = StageTimer()
+        for timer in [self.scan_timer] + [self.site_timers[site] for site in sites]:
+            with timer._lock:
+                durations = {phase: list(values) for phase, values in timer.durations.items()}
+            for phase, values in durations.items():
+                for value in values:
+                    total.add(phase, value)
+
+        slowest = sorted(project_phases.items(), key=lambda item: sum(item[1].values()), reverse=True)[:SLOWEST_PROJECTS]
+        elapsed = self.elapsed_seconds
+        return {
+            "scan_id": self.scan_id,
+            "elapsed_seconds": round(elapsed, 3),
+            "projects": projects,
+            "projects_per_minute": _per_minute(projects, elapsed),
+            "current_site": current_site,
+            "phases": _rounded(total.summary()),
+            "sites": {
+                site: {
+                    "projects": site_projects.get(site, 0),
+                    "seconds": round(wall_seconds[site], 3),
+                    "projects_per_minute": _per_minute(site_projects.get(site, 0), wall_seconds[site]),
+                    "phases": _rounded(self.site_timers[site].summary())
+                }
+                for site in sites
+            },
+            "slowest_projects": [
+                {
+                    "url": url,
+                    "site": project_sites.get(url),
+                    "seconds": round(sum(phases.values()), 4),
+                    "phases": {phase: round(value, 4) for phase, value in phases.items()}
+                }
+                for url, phases in slowest
+            ]
+        }
+
+
+class ScanTelemetryService:
+    """Holds the telemetry of the active scan run and stores finished runs in scan_runs."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.active: Optional[ScanRunTelemetry] = None
+
+    def start(self, scan_id: str, time_range: Optional[int] = None, incremental: bool = False,
+              resumed: bool = False) -> ScanRunTelemetry:
+        """Start recording a scan run; phases are recorded on it until finish()."""
+        self.active = ScanRunTelemetry(scan_id, time_range, incremental, resumed)
+        return self.active
+
+    @contextmanager
+    def project(self, *urls: Optional[str]) -> Iterator[None]:
+        """Attribute the phases recorded in a block to the given project(s) as well."""
+        token = _current_projects.set(tuple(url for url in urls if url))
+        try:
+            yield
+        finally:
+            _current_projects.reset(token)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a block as one sample of a phase of the active scan run (no-op without one)."""
+        run = self.active
+        if run is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            run.add(name, time.perf_counter() - started)
+
+    def stats_payload(self, run: ScanRunTelemetry) -> str:
+        """The run's telemetry as the JSON payload of a "stats" event."""
+        return json.dumps({"type": "stats", **run.to_dict()}, ensure_ascii=False)
+
+    def stats_message(self, run: ScanRunTelemetry) -> str:
+        """The run's telemetry as a "stats" SSE message."""
+        return f"data: {self.stats_payload(run)}\n\n"
+
+    def finish(self, db: Session, run: ScanRunTelemetry, status: str) -> Optional[ScanRun]:
+        """Stop recording and store the run with its final telemetry in scan_runs."""
+        if self.active is run:
+            self.active = None
+        run.finish_site()
+        telemetry = run.to_dict()
+        try:
+            scan_run = ScanRun(
+                scan_id=run.scan_id,
+                status=status,
+                time_range=run.time_range,
+                incremental=run.incremental,
+                resumed=run.resumed,
+                started_at=run.started_at,
+                finished_at=datetime.now(),
+                duration_seconds=telemetry["elapsed_seconds"],
+                projects=telemetry["projects"],
+                projects_per_minute=telemetry["projects_per_minute"]
+            )
+            scan_run.set_telemetry({
+                "phases": telemetry["phases"],
+                "sites": telemetry["sites"],
+                "slowest_projects": telemetry["slowest_projects"]
+            })
+            db.add(scan_run)
+            db.commit()
+            self.logger.info(f"Stored run of scan {run.scan_id}: {status}, {scan_run.projects} projects in {scan_run.duration_seconds:.1f}s")
+            return scan_run
+        except Exception as e:
+            self.logger.error(f"Error storing run of scan {run.scan_id}: {str(e)}")
+            db.rollback()
+            return None
+
+    def list_runs(self, db: Session, limit: int = 20, scan_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Stored scan runs, newest first."""
+        query = db.query(ScanRun)
+        if scan_id:
+            query = query.filter(ScanRun.scan_id == scan_id)
+        return [scan_run.to_dict() for scan_run in query.order_by(ScanRun.started_at.desc(), ScanRun.id.desc()).limit(limit)]
+
+
+# Global scan telemetry service instance
+scan_telemetry_service = ScanTelemetryService()
+
+
+def timed_phase(name: str):
+    """Decorator timing every call of a (sync or async) function as a phase of the active scan run."""
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def timed(*args, **kwargs):
+                with scan_telemetry_service.phase(name):
+                    return await function(*args, **kwargs)
+        else:
+            @functools.wraps(function)
+            def timed(*args, **kwargs):
+                with scan_telemetry_service.phase(name):
+                    return function(*args, **kwargs)
+        return timed
+    return decorator
@@ -0,0 +1,238 @@
+"""
+Inverted skill index for pre-filtering candidate projects before matching.
+
+The skill -> project direction is the indexed project_requirements table, which ScanService
+and update_project keep current transactionally. This service adds the in-memory part:
+a normalized skill name index and a matrix of normalized skill embeddings used to find the
+embedding neighbourhood of an employee skill. Both are loaded once and then updated
+incrementally from Skill insert/update events, which are applied when the session commits
+(and discarded on rollback).
+"""
+
+import json
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session, object_session
+from backend.models.core_models import Skill
+from backend.requirements_service import requirements_service
+
+logger = logging.getLogger(__name__)
+
+# Safety margin so float32 rounding never drops a neighbour the float64 matcher would accept
+_SIMILARITY_EPSILON = 1e-4
+
+_PENDING_KEY = "skill_index_changes"
+
+
+def normalize_skill_name(skill_name: str) -> str:
+    """Normalize a skill name the same way the matcher does for exact matches."""
+    return skill_name.strip().strip('"').strip("'").lower()
+
+
+class SkillIndexService:
+    """Service maintaining the skill name and embedding-neighbourhood index."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._name_index: Dict[str, Set[int]] = {}
+        self._skill_ids: List[int] = []
+        self._row_of: Dict[int, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._embedded_ids: Set[int] = set()
+        self._pending: List[Tuple[int, str, str]] = []
+
+    def invalidate(self) -> None:
+        """Drop the in-memory index; it is reloaded on next use."""
+        with self._lock:
+            self._loaded = False
+            self._pending = []
+
+    def record_skill_changes(self, changes: List[Tuple[int, str, str]]) -> None:
+        """Queue committed (skill_id, skill_name, embedding) changes to be applied to the index on next use."""
+        with self._lock:
+            if self._loaded:
+                self._pending.extend(changes)
+
+    @staticmethod
+    def _to_unit_vector(values) -> Optional[np.ndarray]:
+        try:
+            vector = np.asarray(values, dtype=np.float32)
+        except (TypeError, ValueError):
+            return None
+        if vector.ndim != 1 or vector.size == 0:
+            return None
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
+
+    @staticmethod
+    def _decode_embedding(embedding: str):
+        """Decode a stored embedding the same way Skill.get_embedding does."""
+        if not embedding:
+            return None
+        try:
+            return json.loads(embedding)
+        except json.JSONDecodeError:
+            return None
+
+    def _load(self, db: Session) -> None:
+        name_index: Dict[str, Set[int]] = {}
+        skill_ids: List[int] = []
+        vectors: List[np.ndarray] = []
+        embedded_ids: Set[int] = set()
+
+        for skill_id, skill_name, embedding in db.query(Skill.id, Skill.skill_name, Skill.embedding).all():
+            name_index.setdefault(normalize_skill_name(skill_name), set()).add(skill_id)
+            values = self._decode_embedding(embedding)
+            if not values:
+                continue
+            embedded_ids.add(skill_id)
+            vector = self._to_unit_vector(values)
+            if vector is None:
+                continue
+            if vectors and vector.shape != vectors[0].shape:
+                continue  # Embeddings of another model can never reach the similarity threshold
+            skill_ids.append(skill_id)
+            vectors.append(vector)
+
+        self._name_index = name_index
+        self._skill_ids = skill_ids
+        self._row_of = {skill_id: row for row, skill_id in enumerate(skill_ids)}
+        self._matrix = np.vstack(vectors) if vectors else None
+        self._embedded_ids = embedded_ids
+        self._pending = []
+        self._loaded = True
+        self.logger.info(f"Skill index loaded: {len(name_index)} skill names, {len(skill_ids)} embeddings")
+
+    def _apply_pending(self) -> None:
+        pending, self._pending = self._pending, []
+        new_ids: List[int] = []
+        new_vectors: List[np.ndarray] = []
+
+        for skill_id, skill_name, embedding in pending:
+            self._name_index.setdefault(normalize_skill_name(skill_name), set()).add(skill_id)
+            values = self._decode_embedding(embedding)
+            if not values:
+                self._embedded_ids.discard(skill_id)
+                continue
+            self._embedded_ids.add(skill_id)
+            vector = self._to_unit_vector(values)
+            if vector is None:
+                continue
+            if self._matrix is not None and vector.shape[0] != self._matrix.shape[1]:
+                continue
+            row = self._row_of.get(skill_id)
+            if row is not None:
+                self._matrix[row] = vector
+            else:
+                new_ids.append(skill_id)
+                new_vectors.append(vector)
+
+        if new_vectors:
+            stacked = np.vstack(new_vectors)
+            self._matrix = stacked if self._matrix is None else np.vstack([self._matrix, stacked])
+            for skill_id in new_ids:
+                self._row_of[skill_id] = len(self._skill_ids)
+                self._skill_ids.append(skill_id)
+
+    def _ensure_current(self, db: Session) -> None:
+        if not self._loaded:
+            self._load(db)
+        elif self._pending:
+            self._apply_pending()
+
+    def get_skill_ids_by_names(self, db: Session, names: Iterable[str]) -> Set[int]:
+        """Get the ids of all skills whose normalized name is in the given names."""
+        with self._lock:
+            self._ensure_current(db)
+            skill_ids: Set[int] = set()
+            for name in names:
+                skill_ids.update(self._name_index.get(normalize_skill_name(name), ()))
+            return skill_ids
+
+    def get_embedded_skill_ids(self, db: Session, skill_ids: Iterable[int]) -> Set[int]:
+        """Get those of the given skill ids that have a non-empty embedding."""
+        with self._lock:
+            self._ensure_current(db)
+            return {skill_id for skill_id in skill_ids if skill_id in self._embedded_ids}
+
+    def get_neighbour_skill_ids(self, db: Session, embedding: List[float], threshold: float) -> Set[int]:
+        """Get the ids of all skills whose cosine similarity to the embedding reaches the threshold."""
+        query = self._to_unit_vector(embedding) if embedding else None
+        if query is None:
+            return set()
+        with self._lock:
+            self._ensure_current(db)
+            if self._matrix is None or query.shape[0] != self._matrix.shape[1]:
+                return set()
+            similarities = self._matrix @ query
+            rows = np.nonzero(similarities >= threshold - _SIMILARITY_EPSILON)[0]
+            return {self._skill_ids[row] for row in rows}
+
+    def get_candidate_project_ids(
+        self,
+        db: Session,
+        candidate_names: Iterable[str],
+        employee_embeddings: Dict[str, List[float]],
+        threshold: float
+    ) -> Set[int]:
+        """
+        Get the ids of all projects that require at least one skill which could match the employee.
+
+        Projects whose requirements are only in the requirements_tf JSON column (not backfilled
+        into the join table yet) cannot be looked up by skill and are always included.
+
+        Args:
+            db: Database session
+            candidate_names: Employee skill names plus their synonyms (exact/synonym matches)
+            employee_embeddings: Employee skill embeddings (embedding-neighbourhood matches)
+            threshold: Cosine similarity threshold used by the matcher
+
+        Returns:
+            Set of project ids worth scoring
+        """
+        skill_ids = self.get_skill_ids_by_names(db, candidate_names)
+        for embedding in employee_embeddings.values():
+            skill_ids.update(self.get_neighbour_skill_ids(db, embedding, threshold))
+        project_ids = requirements_service.get_project_ids_for_skill_ids(db, skill_ids)
+        return project_ids | requirements_service.get_unmigrated_project_ids(db)
+
+
+# Global instance
+skill_index_service = SkillIndexService()
+
+
+def _record_change(target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, []).append((target.id, target.skill_name, target.embedding))
+
+
+@event.listens_for(Skill, "after_insert")
+def _skill_inserted(mapper, connection, target) -> None:
+    _record_change(target)
+
+
+@event.listens_for(Skill, "after_update")
+def _skill_updated(mapper, connection, target) -> None:
+    state = sa_inspect(target)
+    if state.attrs.embedding.history.has_changes() or state.attrs.skill_name.history.has_changes():
+        _record_change(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _session_committed(session) -> None:
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        skill_index_service.record_skill_changes(changes)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _session_rolled_back(session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,165 @@
+"""
+Structured JSON output of Mistral extraction calls.
+
+Extraction requests ask the API for JSON output with a declared schema (response_format
+"json_schema"), so answers are plain JSON objects instead of prose or markdown-wrapped JSON.
+The mode is configured with "mistral.response_format":
+
+- "json_schema": JSON with the declared schema (default)
+- "json_object": JSON mode without a schema
+- "text": no response format, the prompt alone asks for JSON
+
+Answers are still parsed tolerantly, as a truncated answer (max_tokens reached) or a
+model without structured output can return broken JSON.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+from backend.config_manager import config_manager
+
+RESPONSE_FORMAT_MODES = ["json_schema", "json_object", "text"]
+DEFAULT_RESPONSE_FORMAT = "json_schema"
+
+_STRING = {"type": "string"}
+_STRING_OR_NUMBER = {"type": ["string", "number"]}
+# Requirement -> number of occurences; a free-form map, so the schemas are not strict
+_REQUIREMENTS_TF = {"type": "object", "additionalProperties": {"type": "integer"}}
+
+
+def object_schema(properties: Dict[str, Any], required: Optional[List[str]] = None) -> Dict[str, Any]:
+    """JSON schema of an object with the given properties (all required by default)."""
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties) if required is None else required,
+        "additionalProperties": False
+    }
+
+
+PROJECT_DETAILS_PROPERTIES = {
+    "title": _STRING,
+    "description": _STRING,
+    "release_date": _STRING,
+    "start_date": _STRING,
+    "location": _STRING,
+    "tenderer": _STRING,
+    "project_id": _STRING,
+    "requirements_tf": _REQUIREMENTS_TF,
+    "workload": _STRING,
+    "rate": _STRING_OR_NUMBER,
+    "duration": _STRING,
+    "budget": _STRING_OR_NUMBER
+}
+
+REQUIREMENTS_PROPERTIES = {
+    "description": _STRING,
+    "requirements_tf": _REQUIREMENTS_TF
+}
+
+PROJECT_DETAILS_SCHEMA = object_schema(PROJECT_DETAILS_PROPERTIES)
+REQUIREMENTS_SCHEMA = object_schema(REQUIREMENTS_PROPERTIES)
+# An empty object is a valid answer when the page shows no release date
+RELEASE_DATE_SCHEMA = object_schema({"release_date": _STRING}, required=[])
+
+
+def get_response_format_mode() -> str:
+    """Get the configured response format mode."""
+    mode = config_manager.get("mistral.response_format", DEFAULT_RESPONSE_FORMAT)
+    return mode if mode in RESPONSE_FORMAT_MODES else DEFAULT_RESPONSE_FORMAT
+
+
+def build_response_format(mode: str, name: str, schema: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Build the response_format argument of a chat completion.
+
+    Args:
+        mode: One of RESPONSE_FORMAT_MODES
+        name: Name of the schema (letters, digits and underscores)
+        schema: JSON schema of the answer
+
+    Returns:
+        The response_format dictionary, or None for "text"
+    """
+    if mode == "json_schema":
+        return {"type": "json_schema", "json_schema": {"name": name, "schema": schema, "strict": False}}
+    if mode == "json_object":
+        return {"type": "json_object"}
+    return None
+
+
+def _repair_json(text: str) -> Optional[Any]:
+    """
+    Parse JSON starting at text[0] in one scan, dropping trailing commas and anything after
+    the closing bracket, and closing strings and brackets of a truncated answer.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = escaped = False
+    last_comma = None  # Output length and open brackets at the last comma between values
+    for char in text:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if stack:
+                stack.pop()
+            out.append(char)
+            if not stack:
+                break
+            continue
+        elif char == ",":
+            last_comma = (len(out), list(stack))
+        out.append(char)
+
+    if not stack:
+        candidates = ["".join(out)]
+    else:
+        # Truncated: close the open string and brackets, or cut back to the last complete value
+        tail = "".join(out[:-1] if escaped else out) + ('"' if in_string else "")
+        candidates = [tail.rstrip().rstrip(",") + "".join(reversed(stack))]
+        if last_comma:
+            position, open_brackets = last_comma
+            candidates.append("".join(out[:position]) + "".join(reversed(open_brackets)))
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def parse_json_response(response_text: Optional[str]) -> Optional[Any]:
+    """
+    Parse the JSON object or array in a model answer.
+
+    Text around the JSON (prose, markdown fences) is ignored. Broken JSON (trailing commas,
+    truncated output) is repaired where possible.
+
+    Returns:
+        The parsed value, or None if the answer contains no usable JSON
+    """
+    if not response_text or not isinstance(response_text, str):
+        return None
+    starts = [position for position in (response_text.find("{"), response_text.find("[")) if position != -1]
+    if not starts:
+        return None
+    start = min(starts)
+    try:
+        value, _ = json.JSONDecoder().raw_decode(response_text, start)
+        return value
+    except json.JSONDecodeError:
+        return _repair_json(response_text[start:])
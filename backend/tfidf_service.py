@@ -9,6 +9,7 @@ from typing import Dict, List, Set
 from sqlalchemy.orm import Session
 from backend.models.core_models import Project, Skill
 from backend.database import SessionLocal
+from backend.requirements_service import requirements_service
 
 logger = logging.getLogger(__name__)
 
@@ -40,26 +41,14 @@ class TFIDFService:
         try:
             self.logger.info("Starting IDF factor calculation...")
 
-            # Get all projects with requirements
-            projects = db.query(Project).filter(Project.requirements_tf.isnot(None)).all()
-            total_documents = len(projects)
+            # Document frequencies come straight from the indexed project_requirements table
+            total_documents, skill_document_counts = requirements_service.get_document_frequencies(db)
 
             if total_documents == 0:
                 self.logger.warning("No projects with requirements found for IDF calculation")
                 return {}
 
             self.logger.info(f"Found {total_documents} projects with requirements")
-
-            # Count documents containing each skill
-            skill_document_counts: Dict[str, int] = {}
-
-            for project in projects:
-                requirements_tf = project.get_requirements_tf()
-                if requirements_tf:
-                    # Add each skill to the document count
-                    for skill in requirements_tf.keys():
-                        skill_document_counts[skill] = skill_document_counts.get(skill, 0) + 1
-
             self.logger.info(f"Found {len(skill_document_counts)} unique skills across all projects")
 
             # Calculate IDF factors
@@ -0,0 +1,38 @@
+"""
+Content utility functions for detecting whether a project page has changed
+"""
+
+import hashlib
+from bs4 import BeautifulSoup
+
+
+def clean_page_text(html: str) -> str:
+    """
+    Extracts the visible text of a page, as sent to Mistral for extraction
+
+    Args:
+        html: Raw HTML as a string
+
+    Returns:
+        str: Visible text with normalized whitespace
+    """
+    soup = BeautifulSoup(html or "", 'html.parser')
+
+    # Remove script, style, and meta tags
+    for element in soup(['script', 'style', 'meta', 'noscript', 'iframe']):
+        element.decompose()
+
+    return ' '.join(soup.get_text(separator=' ', strip=True).split())
+
+
+def content_hash(html: str) -> str:
+    """
+    Hashes the visible text of a page, so markup-only changes do not count as changes
+
+    Args:
+        html: Raw HTML as a string
+
+    Returns:
+        str: Hex SHA-256 digest of the cleaned text
+    """
+    return hashlib.sha256(clean_page_text(html).encode("utf-8")).hexdigest()
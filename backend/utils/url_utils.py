@@ -0,0 +1,60 @@
+"""
+URL utility functions for recognising the same project page behind different URL variants
+"""
+
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Query parameters that only track the visitor and never select a different page
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "_ga", "_gl", "ref", "referrer"}
+TRACKING_PARAM_PREFIXES = ("utm_",)
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PARAM_PREFIXES)
+
+
+def normalize_host(netloc: str) -> str:
+    """
+    Normalizes a network location to a bare lowercase host name
+
+    Args:
+        netloc: Network location, e.g. "WWW.Etengo.de:443"
+
+    Returns:
+        str: Host without "www." prefix, credentials and port, e.g. "etengo.de"
+    """
+    host = netloc.rsplit("@", 1)[-1].split(":", 1)[0].lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def normalize_project_url(url: str) -> Optional[str]:
+    """
+    Normalizes a project URL so that variants of the same page compare equal
+
+    Scheme, "www." prefix, port, fragment, trailing slashes and tracking parameters
+    are ignored, remaining query parameters are sorted.
+
+    Args:
+        url: Project URL as found on a listing page
+
+    Returns:
+        str: Normalized URL key, or None for empty or relative URLs
+    """
+    if not url or not isinstance(url, str):
+        return None
+
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return None
+
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name)
+    )
+    key = f"{normalize_host(parts.netloc)}{path}"
+    if query:
+        key += f"?{urlencode(query)}"
+    return key
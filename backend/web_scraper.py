@@ -1,14 +1,17 @@
 """Web scraper for project data extraction."""
 
 import logging
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Deque, Optional, Tuple, Union
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException
+import asyncio
 import time
+from collections import deque
+from contextlib import aclosing
 from urllib.parse import urlparse, urljoin
 
 # Suppress noisy logging from external libraries
@@ -22,6 +25,17 @@ try:
 except ImportError:
     from config_manager import config_manager
 from backend.mistral_handler import MistralHandler
+from backend.mistral_client import MistralUnavailableError
+from backend.batch_extraction import get_batch_settings
+from backend.extraction_plan import get_level2_plan
+from backend.detail_rules import get_detail_rules
+from backend.project_index_service import KnownProjectIndex
+from backend.high_water_mark_service import high_water_mark_service
+from backend.listing_processor import ListingProcessor, HTML_PARSER
+from backend.page_archive import page_archive
+from backend.metrics_service import metrics_service
+from backend.scan_telemetry_service import scan_telemetry_service, timed_phase
+from backend.numbered_pagination import get_page_url_template, get_page_concurrency, page_url, page_number
 from bs4 import BeautifulSoup
 from backend.utils.date_utils import european_to_iso_date, compare_european_dates
 from datetime import datetime, timedelta
@@ -29,6 +43,9 @@ from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
+# Scan telemetry phase of each kind of page load
+PAGE_LOAD_PHASES = {"listing": "listing_load", "detail": "detail_fetch", "external": "external_url"}
+
 def ensure_parsed_json(input_data: Union[str, dict]) -> dict:
     if isinstance(input_data, dict):
         return input_data
@@ -45,6 +62,8 @@ class WebScraper:
         api_keys = config_manager.get_api_keys()
         if api_keys.get("mistral"):
             self.mistral_handler = MistralHandler(api_keys["mistral"])
+        self.page_archive = page_archive  # Every fetched listing and detail page is kept for re-extraction
+        self.page_settle_seconds: Optional[float] = None  # Overrides the fixed waits after page loads (e.g. 0 for replayed pages)
         self.logger = logging.getLogger(__name__)
 
     def setup_driver(self) -> webdriver.Chrome:
@@ -71,6 +90,16 @@ class WebScraper:
         driver.set_page_load_timeout(30)
         return driver
 
+    def _open_page(self, driver, url: str, kind: str) -> None:
+        """Load a URL in the browser, timed as a page load of the given kind ("listing", "detail" or "external"). Blocking."""
+        with metrics_service.page_load(kind), scan_telemetry_service.phase(PAGE_LOAD_PHASES[kind]):
+            driver.get(url)
+
+    @timed_phase("settle")
+    def _settle(self, seconds: float) -> None:
+        """Wait for a loaded page to render (page_settle_seconds replaces the default if set). Blocking."""
+        time.sleep(seconds if self.page_settle_seconds is None else self.page_settle_seconds)
+
     def _get_time_range_date(self, time_range: int) -> datetime:
         """Calculate the cutoff date based on time range."""
         today = datetime.now()
@@ -193,7 +222,7 @@ class WebScraper:
             project_entry_selector = website_config["level1_search"]["project-entry-selector"]
             next_page_selector = website_config["level1_search"].get("next-page-selector")
 
-            driver.get(current_url)
+            self._open_page(driver, current_url, "listing")
             wait = WebDriverWait(driver, 10)
             wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, project_list_selector)))
 
@@ -285,7 +314,7 @@ class WebScraper:
             project_list_selector = website_config["level1_search"]["project-list-selector"]
             project_entry_selector = website_config["level1_search"]["project-entry-selector"]
 
-            driver.get(site_url)
+            self._open_page(driver, site_url, "listing")
             wait = WebDriverWait(driver, 10)
             wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, project_list_selector)))
             soup = BeautifulSoup(driver.page_source, 'html.parser')
@@ -303,6 +332,7 @@ class WebScraper:
             if driver:
                 driver.quit()
 
+    @timed_phase("level2_parse")
     async def level2_scan(self, project_card, website_config: Dict[str, Any], scan_id: str = None) -> Dict[str, Any]:
         """Extract project data from a single card element using config, return project dict."""
         # Check for cancellation at the start of level2 scan
@@ -311,197 +341,10 @@ class WebScraper:
             if scan_service.is_scan_cancelled(scan_id):
                 raise Exception("Scan was cancelled during level2 scan")
 
-        level2_config = website_config["level2_search"]
         data = {}
         try:
-            # Extract title and URL
-            title_selector = level2_config.get("title-selector")
-            url_selector = level2_config.get("url-selector")
-            if title_selector:
-                title_element = project_card.select_one(title_selector)
-                if title_element:
-                    data['title'] = title_element.get_text(strip=True)
-            if url_selector:
-                url_element = project_card.select_one(url_selector)
-                if url_element:
-                    data['url'] = url_element.get('href')
-                    if data['url'] and not data['url'].startswith('http'):
-                        # Handle relative URLs using base URL from config
-                        base_url = website_config["level1_search"]["site_url"]
-                        parsed_url = urlparse(base_url)
-                        data['url'] = f"{parsed_url.scheme}://{parsed_url.netloc}{data['url']}"
-
-            # Check for cancellation after basic extraction
-            if scan_id:
-                from backend.scan_service import scan_service
-                if scan_service.is_scan_cancelled(scan_id):
-                    raise Exception("Scan was cancelled during level2 scan")
-
-            # Extract all possible fields from config
-            field_mappings = {
-                "project-id-selector": "project_id",
-                "location-selector": "location",
-                "duration-selector": "duration",
-                "start-date-selector": "start_date",
-                "release-date-selector": "release_date",
-                "industry-selector": "industry",
-                "tenderer-selector": "tenderer"
-            }
-
-            for selector_key, data_key in field_mappings.items():
-                selector = level2_config.get(selector_key)
-                if selector:
-                    # For fields that might share the same selector, we need to find the right element
-                    label = level2_config.get(f"{selector_key.replace('-selector', '-label')}", "")
-
-                    if label:
-                        # Find all elements with this selector and look for the one with the matching label
-                        elements = project_card.select(selector)
-                        found_element = None
-
-                        for element in elements:
-                            # Check if this element or its parent contains the label
-                            parent = element.parent
-                            if parent:
-                                # Look for the label in the parent element (usually in a <small> tag)
-                                label_element = parent.find('small')
-                                try:
-                                    if label_element and isinstance(label_element.get_text(strip=True), str) and label_element.get_text(strip=True) == label:
-                                        found_element = element
-                                        break
-                                except Exception as e:
-                                    if scan_id:
-                                        scraper_logger = logging.getLogger(f"scan.{scan_id}.webscraper")
-                                    else:
-                                        scraper_logger = logging.getLogger(__name__)
-                                    scraper_logger.warning(f"Error processing label_element: {e}")
-
-                        if found_element:
-                            try:
-                                text_content = found_element.get_text(strip=True)
-                                if isinstance(text_content, str):
-                                    data[data_key] = text_content
-                                else:
-                                    data[data_key] = str(text_content) if text_content else None
-                            except Exception as e:
-                                if scan_id:
-                                    scraper_logger = logging.getLogger(f"scan.{scan_id}.webscraper")
-                                else:
-                                    scraper_logger = logging.getLogger(__name__)
-                                scraper_logger.warning(f"Error processing found_element for {data_key}: {e}")
-                        elif selector_key == "release-date-selector":
-                            # Special handling for release date with label
-                            element = project_card.select_one(selector)
-                            if element:
-                                try:
-                                    text_content = element.get_text(strip=True)
-                                    if isinstance(text_content, str):
-                                        if label and text_content.startswith(label):
-                                            # Extract date part after the label
-                                            date_part = text_content[len(label):].strip()
-                                            data[data_key] = date_part
-                                        else:
-                                            data[data_key] = text_content
-                                    else:
-                                        data[data_key] = str(text_content) if text_content else None
-                                except Exception as e:
-                                    if scan_id:
-                                        scraper_logger = logging.getLogger(f"scan.{scan_id}.webscraper")
-                                    else:
-                                        scraper_logger = logging.getLogger(__name__)
-                                    scraper_logger.warning(f"Error processing release-date element: {e}")
-                        # If not found, don't set any value - this prevents fallback to incorrect values
-                        # This ensures that missing fields remain None instead of getting incorrect values
-                    else:
-                        # No label specified, handle special cases
-                        if selector_key == "industry-selector":
-                            # For industry/keywords, collect all matching elements
-                            elements = project_card.select(selector)
-                            keywords = []
-                            for element in elements:
-                                try:
-                                    keyword = element.get_text(strip=True)
-                                    if isinstance(keyword, str) and keyword and not keyword.startswith('+'):
-                                        keywords.append(keyword)
-                                except Exception as e:
-                                    if scan_id:
-                                        scraper_logger = logging.getLogger(f"scan.{scan_id}.webscraper")
-                                    else:
-                                        scraper_logger = logging.getLogger(__name__)
-                                    scraper_logger.warning(f"Error processing keyword element: {e}")
-                            if keywords:
-                                data[data_key] = ', '.join(keywords)
-                        elif selector_key == "location-selector":
-                            # For location, get the full text content
-                            element = project_card.select_one(selector)
-                            if element:
-                                # Extract location text, handling nested elements
-                                location_parts = []
-                                try:
-                                    for text in element.stripped_strings:
-                                        # Ensure text is actually a string before calling strip()
-                                        if isinstance(text, str) and text and not text.startswith('‐'):
-                                            location_parts.append(text)
-                                except Exception as e:
-                                    if scan_id:
-                                        scraper_logger = logging.getLogger(f"scan.{scan_id}.webscraper")
-                                    else:
-                                        scraper_logger = logging.getLogger(__name__)
-                                    scraper_logger.warning(f"Error processing stripped_strings: {e}")
-                                    # Fallback: try get_text instead
-                                    try:
-                                        text_content = element.get_text(strip=True)
-                                        if isinstance(text_content, str) and text_content:
-                                            location_parts = [text_content]
-                                    except Exception as e2:
-                                        scraper_logger.warning(f"Fallback get_text also failed: {e2}")
-
-                                if location_parts:
-                                    # Clean up the location text by removing empty parts
-                                    cleaned_parts = []
-                                    for part in location_parts:
-                                        if isinstance(part, str):
-                                            stripped_part = part.strip()
-                                            if stripped_part:
-                                                cleaned_parts.append(stripped_part)
-                                    if cleaned_parts:
-                                        data[data_key] = ', '.join(cleaned_parts)
-                        elif selector_key == "release-date-selector":
-                            # For release date, handle label-based extraction
-                            element = project_card.select_one(selector)
-                            if element:
-                                text_content = element.get_text(strip=True)
-                                if label and text_content.startswith(label):
-                                    # Extract date part after the label
-                                    if isinstance(text_content, str):
-                                        date_part = text_content[len(label):].strip()
-                                        data[data_key] = date_part
-                                    else:
-                                        data[data_key] = text_content
-                                else:
-                                    data[data_key] = text_content
-                        else:
-                            # Default behavior for other fields
-                            element = project_card.select_one(selector)
-                            if element:
-                                try:
-                                    text_content = element.get_text(strip=True)
-                                    if isinstance(text_content, str):
-                                        data[data_key] = text_content
-                                    else:
-                                        # If not a string, convert to string or skip
-                                        data[data_key] = str(text_content) if text_content else None
-                                except Exception as e:
-                                    if scan_id:
-                                        scraper_logger = logging.getLogger(f"scan.{scan_id}.webscraper")
-                                    else:
-                                        scraper_logger = logging.getLogger(__name__)
-                                    scraper_logger.warning(f"Error processing element for {data_key}: {e}")
-
-            # Set default values
-            if 'tenderer' not in data:
-                data['tenderer'] = level2_config.get("tenderer", "Unknown")
-            data['rate'] = level2_config.get("rate", "N/A")
+            # The compiled plan selects each shared selector once and resolves labels in one pass
+            data = get_level2_plan(website_config).extract(project_card)
 
             # Log extracted data
             title = data.get('title', 'Unknown')
@@ -544,8 +387,9 @@ class WebScraper:
             try:
                 external_url = await self._extract_external_url(project_url, website_config, scan_id)
                 if external_url:
-                    # Use the external URL for the actual level3 scan
-                    return await self._extract_project_data_with_mistral(external_url, scan_id)
+                    # Use the external URL for the actual level3 scan (site content and rule config do not apply there);
+                    # the page is archived under the project URL, so re-extraction finds it
+                    return await self._extract_project_data_with_mistral(external_url, scan_id, archive_url=project_url)
                 else:
                     # Fallback to original URL if external URL extraction fails
                     if scan_id:
@@ -553,17 +397,17 @@ class WebScraper:
                     else:
                         scraper_logger = logging.getLogger(__name__)
                     scraper_logger.warning(f"Failed to extract external URL from {project_url}, using original URL")
-                    return await self._extract_project_data_with_mistral(project_url, scan_id)
+                    return await self._extract_project_data_with_mistral(project_url, scan_id, website_config)
             except Exception as e:
                 if scan_id:
                     scraper_logger = logging.getLogger(f"scan.{scan_id}.webscraper")
                 else:
                     scraper_logger = logging.getLogger(__name__)
                 scraper_logger.error(f"Error extracting external URL: {e}, using original URL")
-                return await self._extract_project_data_with_mistral(project_url, scan_id)
+                return await self._extract_project_data_with_mistral(project_url, scan_id, website_config)
 
         # Default behavior for other websites
-        return await self._extract_project_data_with_mistral(project_url, scan_id)
+        return await self._extract_project_data_with_mistral(project_url, scan_id, website_config)
 
     async def _extract_external_url(self, project_url: str, website_config: Dict[str, Any], scan_id: str = None) -> str:
         """Extract the external project URL from the project detail page."""
@@ -577,10 +421,10 @@ class WebScraper:
 
             # Load the project detail page
             driver = self.setup_driver()
-            driver.get(project_url)
+            self._open_page(driver, project_url, "external")
 
             # Wait for page to load
-            time.sleep(3)
+            self._settle(3)
 
             # Get the page source
             page_source = driver.page_source
@@ -635,49 +479,165 @@ class WebScraper:
             scraper_logger.error(f"Error extracting external URL: {e}")
             return None
 
-    async def _extract_project_data_with_mistral(self, project_url: str, scan_id: str = None) -> Dict[str, Any]:
-        """Extract project data using Mistral AI from a project URL."""
+    async def _archive_page(self, url: str, page_source: Optional[str], kind: str, site: Optional[str] = None) -> None:
+        """Archive a fetched page in a worker thread (compression and file writes would block the event loop)."""
+        await asyncio.to_thread(self.page_archive.store, url, page_source, kind, site)
+
+    def _load_page_source(self, project_url: str) -> str:
+        """Load a project page in a fresh browser and return its HTML."""
+        # Get the page content
+        driver = self.setup_driver()
         try:
-            # Get the page content
-            driver = self.setup_driver()
-            driver.get(project_url)
+            self._open_page(driver, project_url, "detail")
 
             # Wait for page to load
-            time.sleep(2)
+            self._settle(2)
 
             # Get the page source
             page_source = driver.page_source
-
+        finally:
             # Close the driver
             driver.quit()
+        return page_source
+
+    async def level3_scan_batch(self, project_urls: List[str], scan_id: str = None, website_config: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Take several URLs, return their level3 data in the same order.
 
-            # Extract project details using Mistral
-            project_data = await self.mistral_handler.extract_project_details(page_source, scan_id)
+        The pages are extracted with as few Mistral requests as possible (see batch_extraction).
+        Sites with external project pages (level3_search) are scanned one by one.
+        """
+        if not self.mistral_handler or len(project_urls) < 2 or (website_config and website_config.get("level3_search")):
+            results = []
+            for project_url in project_urls:
+                with scan_telemetry_service.project(project_url):
+                    results.append(await self.level3_scan(project_url, scan_id, website_config))
+            return results
+
+        if scan_id:
+            scraper_logger = logging.getLogger(f"scan.{scan_id}.webscraper")
+        else:
+            scraper_logger = logging.getLogger(__name__)
+
+        site = website_config["level1_search"]["name"] if website_config else None
+        page_sources: List[str] = []
+        for project_url in project_urls:
+            try:
+                with scan_telemetry_service.project(project_url):
+                    page_sources.append(self._load_page_source(project_url))
+                await self._archive_page(project_url, page_sources[-1], "detail", site)
+            except Exception as e:
+                scraper_logger.error(f"Error loading project page {project_url}: {e}")
+                page_sources.append(None)
+        return await self.extract_page_sources(project_urls, page_sources, scan_id, website_config)
+
+    async def extract_page_sources(self, project_urls: List[str], page_sources: List[Optional[str]], scan_id: str = None,
+                                   website_config: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Extract the level3 data of already loaded project pages (live or from the page archive).
+
+        Pages that could not be loaded (None) get empty requirements. Results keep the order of the URLs.
+        """
+        if scan_id:
+            scraper_logger = logging.getLogger(f"scan.{scan_id}.webscraper")
+        else:
+            scraper_logger = logging.getLogger(__name__)
+
+        content_config = website_config.get("level3_content") if website_config else None
+        detail_rules = get_detail_rules(website_config)
+        results: Dict[int, Dict[str, Any]] = {}
+        rule_data: Dict[str, Dict[str, str]] = {}
+        pages = []
+        for index, (project_url, page_source) in enumerate(zip(project_urls, page_sources)):
+            if page_source is None:
+                results[index] = {"requirements": [], "url": project_url}
+                continue
+            # As in the single extraction, complete rule fields only leave requirements and description to Mistral
+            rule_data[str(index)] = detail_rules.extract(page_source)
+            pages.append({
+                "id": str(index),
+                "html": page_source,
+                "content_config": content_config,
+                "schema": "requirements" if detail_rules.is_complete(rule_data[str(index)]) else "full"
+            })
+
+        try:
+            if not pages:
+                extracted = {}
+            elif len(pages) == 1:
+                with scan_telemetry_service.project(project_urls[int(pages[0]["id"])]):
+                    extracted = {pages[0]["id"]: await self._extract_page_details(pages[0]["html"], pages[0]["schema"], scan_id, content_config)}
+            else:
+                batch_urls = [project_urls[int(page["id"])] for page in pages]
+                with scan_telemetry_service.project(*batch_urls), scan_telemetry_service.phase("llm_extraction"):
+                    extracted = await self.mistral_handler.extract_project_details_batch(pages, scan_id)
+        except MistralUnavailableError as e:
+            scraper_logger.warning(f"Mistral unavailable for {len(project_urls)} projects, projects left for a later scan: {e}")
+            return [{"requirements": [], "url": project_url, "extraction_failed": True} for project_url in project_urls]
+        except Exception as e:
+            scraper_logger.error(f"Error extracting project data with Mistral: {e}")
+            extracted = {}
+
+        for page in pages:
+            project_data = dict(extracted.get(page["id"]) or {"requirements": []})
+            # Deterministic values win over the model's
+            project_data.update(rule_data[page["id"]])
+            project_data["url"] = project_urls[int(page["id"])]
+            results[int(page["id"])] = project_data
+        return [results[index] for index in range(len(project_urls))]
+
+    @timed_phase("llm_extraction")
+    async def _extract_page_details(self, page_source: str, schema: str, scan_id: str = None, content_config=None) -> Dict[str, Any]:
+        """Single-page Mistral extraction: "requirements" (rules found the structured fields) or "full"."""
+        if schema == "requirements":
+            return await self.mistral_handler.extract_requirements_and_description(page_source, scan_id, content_config)
+        return await self.mistral_handler.extract_project_details(page_source, scan_id, content_config)
+
+    async def _extract_project_data_with_mistral(self, project_url: str, scan_id: str = None, website_config: Dict[str, Any] = None,
+                                                 archive_url: str = None) -> Dict[str, Any]:
+        """Extract project data using Mistral AI from a project URL (archived under archive_url if given)."""
+        try:
+            site = website_config["level1_search"]["name"] if website_config else None
+            page_source = self._load_page_source(project_url)
+            await self._archive_page(archive_url or project_url, page_source, "detail", site)
+
+            # Structured fields come from the site's label/selector rules; Mistral is only needed for
+            # requirements and description unless a required field could not be found
+            content_config = website_config.get("level3_content") if website_config else None
+            detail_rules = get_detail_rules(website_config)
+            rule_data = detail_rules.extract(page_source)
+            schema = "requirements" if detail_rules.is_complete(rule_data) else "full"
+            project_data = await self._extract_page_details(page_source, schema, scan_id, content_config)
+            # Deterministic values win over the model's
+            project_data.update(rule_data)
 
             # Add the URL to the project data
             project_data['url'] = project_url
 
             return project_data
 
-        except Exception as e:
+        except MistralUnavailableError as e:
             if scan_id:
                 scraper_logger = logging.getLogger(f"scan.{scan_id}.webscraper")
             else:
                 scraper_logger = logging.getLogger(__name__)
-            scraper_logger.error(f"Error extracting project data with Mistral: {e}")
-            return {"requirements": [], "url": project_url}
+            scraper_logger.warning(f"Mistral unavailable for {project_url}, project left for a later scan: {e}")
+            return {"requirements": [], "url": project_url, "extraction_failed": True}
 
-    async def quick_level3_scan(self, project_url: str, scan_id: str = None, website_config: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Quick level3 scan to get just the release date for filtering."""
-        if not self.mistral_handler:
+        except Exception as e:
             if scan_id:
                 scraper_logger = logging.getLogger(f"scan.{scan_id}.webscraper")
             else:
                 scraper_logger = logging.getLogger(__name__)
-            scraper_logger.warning("Mistral handler not available for quick Level 3 scan")
-            return {"release_date": None}
+            scraper_logger.error(f"Error extracting project data with Mistral: {e}")
+            return {"requirements": [], "url": project_url}
 
+    async def quick_level3_scan(self, project_url: str, scan_id: str = None, website_config: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Quick level3 scan to get just the release date for filtering."""
         try:
+            # Site config of the page that is actually loaded (None for external pages)
+            page_config = website_config
+
             # Check if this is a Randstad project that needs external URL extraction
             if website_config and website_config.get("level3_search"):
                 try:
@@ -685,6 +645,7 @@ class WebScraper:
                     if external_url:
                         # Use the external URL for the quick level3 scan
                         project_url = external_url
+                        page_config = None
                     else:
                         # Fallback to original URL if external URL extraction fails
                         if scan_id:
@@ -701,19 +662,34 @@ class WebScraper:
 
             # Get the page content
             driver = self.setup_driver()
-            driver.get(project_url)
+            self._open_page(driver, project_url, "detail")
 
             # Wait for page to load
-            time.sleep(2)
+            self._settle(2)
 
             # Get the page source
             page_source = driver.page_source
 
             # Close the driver
             driver.quit()
+            await self._archive_page(project_url, page_source, "detail", page_config["level1_search"]["name"] if page_config else None)
+
+            # A labelled release date on the page makes the Mistral call unnecessary
+            rule_data = get_detail_rules(page_config).extract(page_source, ["release_date"])
+            if rule_data.get("release_date"):
+                return {"release_date": rule_data["release_date"]}
+
+            if not self.mistral_handler:
+                if scan_id:
+                    scraper_logger = logging.getLogger(f"scan.{scan_id}.webscraper")
+                else:
+                    scraper_logger = logging.getLogger(__name__)
+                scraper_logger.warning("Mistral handler not available for quick Level 3 scan")
+                return {"release_date": None}
 
             # Extract just the release date using Mistral
-            release_date = await self.mistral_handler.extract_release_date(page_source, scan_id)
+            content_config = page_config.get("level3_content") if page_config else None
+            release_date = await self.mistral_handler.extract_release_date(page_source, scan_id, content_config)
 
             return {"release_date": release_date}
 
@@ -789,19 +765,268 @@ class WebScraper:
 
         return consolidated
 
-    async def scan_website_stream(self, website_config: Dict[str, Any], time_range: int = 1, existing_project_data=None, scan_id: str = None):
+    async def _process_pending(self, pending: List[tuple], website_config: Dict[str, Any], scan_id: str, scraper_logger, page_count: int,
+                               high_water_mark=None, duplicate_index=None) -> List[Dict[str, Any]]:
+        """
+        Run the level3 scan for filtered projects and return their consolidated data, in card order.
+
+        Returned projects are recorded in the high-water mark and the duplicate index; dropped ones are
+        not, so a later copy on another site is still extracted.
+        """
+        if not pending:
+            return []
+        with_url = [(project_index, level2_data) for project_index, level2_data in pending if level2_data.get('url')]
+        level3_results = await self.level3_scan_batch([level2_data['url'] for _, level2_data in with_url], scan_id, website_config)
+        level3_by_index = {project_index: level3_data for (project_index, _), level3_data in zip(with_url, level3_results)}
+
+        projects = []
+        for project_index, project_level_2_data in pending:
+            project_level_3_data = level3_by_index.get(project_index, {"requirements_tf": {}})
+            title = project_level_2_data.get('title', 'Unknown')
+
+            if project_level_3_data.get("extraction_failed"):
+                # Not stored, so the next scan picks it up again instead of keeping it without requirements
+                scraper_logger.warning(f"Page {page_count}, Project {project_index}: Skipping {title}, extraction failed after retries")
+                continue
+
+            try:
+                # Consolidate all data (level2 + full level3)
+                consolidated_data = self._consolidate_data(project_level_2_data, project_level_3_data, scan_id)
+            except Exception as e:
+                scraper_logger.error(f"Page {page_count}, Project {project_index}: Error processing project card: {e}")
+                continue
+            if "url" not in consolidated_data and project_level_2_data.get('url'):
+                consolidated_data["url"] = project_level_2_data['url']
+            if high_water_mark:
+                high_water_mark.observe(project_level_2_data.get('url'), project_level_2_data.get('release_date'))
+            if duplicate_index:
+                duplicate_index.add(project_level_2_data)
+            projects.append(consolidated_data)
+        return projects
+
+    @timed_phase("load_more")
+    def _click_load_more(self, driver, listing: ListingProcessor, load_more_selector: str, attempt: int, scraper_logger) -> bool:
+        """Click the load more button once and wait for new cards. Blocking; returns True if cards were added."""
+        try:
+            # Get current project count before clicking (counted in the browser, no page parse)
+            current_project_count = listing.count_cards()
+
+            scraper_logger.info(f"Current project count: {current_project_count}")
+
+            # Debug: Check if load more button exists in the HTML
+            load_more_elements = driver.find_elements(By.CSS_SELECTOR, load_more_selector)
+            scraper_logger.info(f"Found {len(load_more_elements)} load more elements with selector: {load_more_selector}")
+
+            if len(load_more_elements) == 0:
+                scraper_logger.info("No load more button found in HTML, all projects loaded")
+                return False
+
+            # Try to find and click the load more button using Selenium
+            try:
+                load_more_button = driver.find_element(By.CSS_SELECTOR, load_more_selector)
+                scraper_logger.info(f"Found load more button: {load_more_button.text}")
+
+                if not load_more_button.is_displayed():
+                    scraper_logger.info("Load more button is not visible, all projects loaded")
+                    return False
+
+                # Click the load more button
+                driver.execute_script("arguments[0].click();", load_more_button)
+                scraper_logger.info(f"Clicked load more button (attempt {attempt + 1})")
+
+            except Exception as button_error:
+                scraper_logger.warning(f"Error finding/clicking load more button: {button_error}")
+                # Try alternative approach - find by text content
+                try:
+                    buttons = driver.find_elements(By.TAG_NAME, "button")
+                    load_more_button = None
+                    for button in buttons:
+                        if "weitere Projekte laden" in button.text or "load more" in button.text.lower():
+                            load_more_button = button
+                            break
+
+                    if load_more_button and load_more_button.is_displayed():
+                        driver.execute_script("arguments[0].click();", load_more_button)
+                        scraper_logger.info(f"Clicked load more button by text (attempt {attempt + 1})")
+                    else:
+                        scraper_logger.info("No load more button found by text, all projects loaded")
+                        return False
+                except Exception as text_error:
+                    scraper_logger.warning(f"Error with text-based button search: {text_error}")
+                    return False
+
+            # Wait for new content to load
+            try:
+                WebDriverWait(driver, 10, poll_frequency=0.5).until(
+                    lambda d: listing.count_cards() > current_project_count
+                )
+            except TimeoutException:
+                pass
+
+            # Check if new projects were loaded
+            new_project_count = listing.count_cards()
+
+            scraper_logger.info(f"New project count: {new_project_count}")
+
+            if new_project_count <= current_project_count:
+                scraper_logger.info(f"No new projects loaded (prev: {current_project_count}, new: {new_project_count}), stopping load more")
+                return False
+
+            scraper_logger.info(f"Successfully loaded {new_project_count - current_project_count} new projects")
+            return True
+
+        except Exception as e:
+            scraper_logger.warning(f"Error during load more attempt {attempt + 1}: {e}")
+            return False
+
+    async def _expand_load_more(self, driver, listing: ListingProcessor, website_config: Dict[str, Any], scraper_logger, scan_id: str = None):
+        """
+        Yield batches of new project cards while the listing is expanded with the load more button.
+
+        The click loading the next batch runs in a worker thread while the caller processes the
+        current batch, so cards are dispatched as soon as they appear. Closing the generator (e.g.
+        once the release-date cutoff is passed) stops the expansion.
+        """
+        load_more_selector = website_config['level1_search']['load-more-selector']
+        load_more_attempts = 0
+        max_load_more_attempts = 50  # Prevent infinite loops
+        pending_click = None
+
+        project_cards = await asyncio.to_thread(listing.fetch_new_cards)
+        try:
+            while True:
+                # Start loading the next batch before handing out the current one
+                if load_more_attempts < max_load_more_attempts and not self._is_cancelled(scan_id):
+                    pending_click = asyncio.ensure_future(asyncio.to_thread(
+                        self._click_load_more, driver, listing, load_more_selector, load_more_attempts, scraper_logger
+                    ))
+
+                scraper_logger.info(f"Found {len(project_cards)} new project cards on current page")
+                if project_cards:
+                    yield project_cards
+
+                if pending_click is None:
+                    break
+                loaded = await pending_click
+                pending_click = None
+                if not loaded:
+                    break
+                load_more_attempts += 1
+                project_cards = await asyncio.to_thread(listing.fetch_new_cards)
+
+            scraper_logger.info(f"Load more process completed after {load_more_attempts} attempts")
+        finally:
+            if pending_click is not None:
+                # A click still running in the worker thread must finish before the driver is reused or closed
+                await asyncio.wait([pending_click])
+                scraper_logger.info(f"Load more stopped early after {load_more_attempts + 1} attempts")
+
+    async def _current_cards(self, listing: ListingProcessor, scraper_logger):
+        """Yield the not yet processed cards of the current page as a single batch."""
+        project_cards = listing.fetch_new_cards()
+        scraper_logger.info(f"Found {len(project_cards)} new project cards on current page")
+        yield project_cards
+
+    def _load_listing_page(self, url: str, project_list_selector: str) -> str:
+        """Load a listing page in a fresh browser and return its HTML ("" if it has no project list). Blocking."""
+        driver = self.setup_driver()
+        try:
+            self._open_page(driver, url, "listing")
+            try:
+                WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, project_list_selector)))
+            except TimeoutException:
+                return ""  # Past the last page
+            return driver.page_source
+        finally:
+            driver.quit()
+
+    async def _fan_out_numbered_pages(self, listing: ListingProcessor, website_config: Dict[str, Any], start_url: str, scraper_logger,
+                                      scan_id: str = None, checkpoint=None):
+        """
+        Yield the cards of numbered listing pages, loading up to page-concurrency pages at once.
+
+        Pages are handed out in order; pages that have loaded by the time the next batch is
+        requested are handed out together. Ends at the first page without new cards. Closing the
+        generator (time range or high-water mark reached) stops loading further pages.
+        """
+        template = get_page_url_template(website_config)
+        concurrency = get_page_concurrency(website_config)
+        project_list_selector = website_config["level1_search"]["project-list-selector"]
+        next_number = page_number(template, start_url) or page_number(template, website_config["level1_search"]["site_url"]) or 1
+        in_flight: Deque[Tuple[str, asyncio.Future]] = deque()
+        scraper_logger.info(f"Loading numbered pages from page {next_number}, {concurrency} at once")
+
+        try:
+            while True:
+                while len(in_flight) < concurrency:
+                    url = page_url(template, next_number)
+                    next_number += 1
+                    in_flight.append((url, asyncio.ensure_future(asyncio.to_thread(self._load_listing_page, url, project_list_selector))))
+
+                url, future = in_flight.popleft()
+                pages = [(url, await future)]
+                while in_flight and in_flight[0][1].done():
+                    url, future = in_flight.popleft()
+                    pages.append((url, future.result()))
+
+                project_cards = []
+                last_page_reached = False
+                for url, page_source in pages:
+                    await self._archive_page(url, page_source, "listing", website_config["level1_search"]["name"])
+                    page_cards = listing.cards_from_html(page_source)
+                    scraper_logger.info(f"Found {len(page_cards)} new project cards on {url}")
+                    if not page_cards:
+                        last_page_reached = True
+                        break
+                    project_cards.extend(page_cards)
+
+                if project_cards:
+                    if checkpoint:
+                        checkpoint.set_listing_url(pages[0][0])
+                    yield project_cards
+                if last_page_reached or self._is_cancelled(scan_id):
+                    return
+        finally:
+            # Pages still loading are not needed anymore; their browsers quit when the load returns
+            for _, future in in_flight:
+                if not future.cancel() and not future.cancelled():
+                    future.exception()  # A failed load of an unneeded page is not reported
+
+    def _is_cancelled(self, scan_id: str = None) -> bool:
+        if not scan_id:
+            return False
+        from backend.scan_service import scan_service
+        return scan_service.is_scan_cancelled(scan_id)
+
+    async def scan_website_stream(self, website_config: Dict[str, Any], time_range: int = 1, existing_project_data=None, scan_id: str = None, checkpoint=None,
+                                  high_water_mark=None, duplicate_index=None):
         """
         Scan a specific website for projects and yield results as they are found.
 
         Args:
             website_config (dict): Configuration for the website to scan
             time_range (int, optional): Number of days to look back for projects
-            existing_project_data (dict): Pre-collected existing projects data
+            existing_project_data (KnownProjectIndex or dict, optional): Index of stored projects;
+                                      a dict keyed by project URL is accepted as well
             scan_id (str, optional): Scan ID for cancellation checks
+            checkpoint (SiteCheckpoint, optional): Progress of an earlier, interrupted run of this scan;
+                                      updated while scanning. The consumer marks a yielded project
+                                      as processed once it has stored it.
+            high_water_mark (HighWaterMark, optional): High-water mark of the previous scan of this website;
+                                      when given (incremental scan), pagination stops after a streak of
+                                      already seen non-top projects. Updated with every card seen.
+            duplicate_index (DuplicateIndex, optional): Fingerprints of stored projects and of this scan's
+                                      projects; cards likely posted on another site as well skip the
+                                      level3 scan. Extracted projects are added.
 
         Yields:
             dict: Project data as it is found
         """
+        if isinstance(existing_project_data, KnownProjectIndex):
+            known_projects = existing_project_data
+        else:
+            known_projects = KnownProjectIndex.from_urls(existing_project_data or ())
+
         # Create structured logger for this scan
         if website_config['level1_search']['name']:
             scraper_logger = logging.getLogger(f"scan.{website_config['level1_search']['name']}.webscraper")
@@ -809,192 +1034,186 @@ class WebScraper:
             scraper_logger = logging.getLogger(__name__)
         scraper_logger.info(f"Scanning website {website_config['level1_search']['site_url']}")
 
-        # Initialize current_url with the site URL
-        current_url = website_config["level1_search"]["site_url"]
+        # Initialize current_url with the site URL (or the listing page of the last checkpoint)
+        current_url = (checkpoint and checkpoint.listing_url) or website_config["level1_search"]["site_url"]
         page_count = 0
         total_projects_processed = 0
         driver = None
-        processed_project_urls = set()
+        processed_project_urls = checkpoint.processed_urls if checkpoint else set()
+        batch_size = get_batch_settings()["max_projects"]
+        known_streak = 0  # Consecutive already seen non-top projects (incremental scans)
+        known_streak_to_stop = high_water_mark_service.get_known_streak_to_stop()
+        if high_water_mark:
+            high_water_mark.begin_scan(self._get_time_range_date(time_range))
+
+        if checkpoint and checkpoint.pending:
+            # Level3 queue of the interrupted run first
+            scraper_logger.info(f"Resuming {len(checkpoint.pending)} projects pending level3 scan")
+            # Projects stored before the interruption are not scanned again
+            resumed = [
+                (index, level2_data) for index, level2_data in enumerate(checkpoint.pending, 1)
+                if level2_data.get('url') not in processed_project_urls
+                and not known_projects.is_known(level2_data.get('url'), level2_data.get('project_id'))
+            ]
+            for consolidated_data in await self._process_pending(resumed, website_config, scan_id, scraper_logger, page_count, high_water_mark, duplicate_index):
+                total_projects_processed += 1
+                yield consolidated_data
+            checkpoint.set_pending([])
 
         try:
-            # Initialize driver for the entire scanning session
-            driver = self.setup_driver()
-            wait = WebDriverWait(driver, 10)
+            # Initialize driver for the entire scanning session (numbered pages bring their own)
+            page_template = get_page_url_template(website_config)
+            driver = None if page_template else self.setup_driver()
+            wait = WebDriverWait(driver, 10) if driver else None
             project_list_selector = website_config["level1_search"]["project-list-selector"]
             stop_pagination = False
+            # Counts cards in the browser and parses only newly appended card fragments
+            listing = ListingProcessor(driver, website_config, scraper_logger)
+            navigate = True
 
             # Second loop: Loop through each page with pagination support
             while not stop_pagination:
-                # Navigate to current page at the beginning of the loop
-                scraper_logger.info(f"Starting iteration with URL: {current_url}")
-                driver.get(current_url)
-
-                # Wait for project list to load
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, project_list_selector)))
-
-                if website_config['level1_search']['next-page-selector'] == "N/A":
+                if page_template:
+                    # Numbered pages are loaded concurrently in their own browsers; one pass covers all of them
                     stop_pagination = True
-                    scraper_logger.info("Pagination disabled (N/A), stopping after current page")
-
-                # Debug: Check if load-more-selector exists in config
-                scraper_logger.info(f"Checking for load-more-selector in config: {'load-more-selector' in website_config['level1_search']}")
-                if "load-more-selector" in website_config['level1_search']:
-                    scraper_logger.info(f"Load-more-selector found: {website_config['level1_search']['load-more-selector']}")
-
-                # Download all projects available with load more button
-                if "load-more-selector" in website_config['level1_search']:
-                    scraper_logger.info("Downloading all projects with load more button")
-                    load_more_selector = website_config['level1_search']['load-more-selector']
-
-                    # Keep clicking load more until no more projects can be loaded
-                    load_more_attempts = 0
-                    max_load_more_attempts = 50  # Prevent infinite loops
-
-                    while load_more_attempts < max_load_more_attempts:
-                        try:
-                            # Get current project count before clicking
-                            current_soup = BeautifulSoup(driver.page_source, 'html.parser')
-                            current_project_grid = current_soup.select_one(project_list_selector)
-                            current_project_count = len(current_project_grid.select(website_config["level1_search"]["project-entry-selector"])) if current_project_grid else 0
-
-                            scraper_logger.info(f"Current project count: {current_project_count}")
-
-                            # Debug: Check if load more button exists in the HTML
-                            load_more_elements = current_soup.select(load_more_selector)
-                            scraper_logger.info(f"Found {len(load_more_elements)} load more elements with selector: {load_more_selector}")
-
-                            if len(load_more_elements) == 0:
-                                scraper_logger.info("No load more button found in HTML, all projects loaded")
-                                break
-
-                            # Try to find and click the load more button using Selenium
+                    page_count += 1
+                    card_batches = self._fan_out_numbered_pages(listing, website_config, current_url, scraper_logger, scan_id, checkpoint)
+                else:
+                    if navigate:
+                        # Navigate to current page at the beginning of the loop
+                        scraper_logger.info(f"Starting iteration with URL: {current_url}")
+                        self._open_page(driver, current_url, "listing")
+                        listing.reset_page()
+                        if checkpoint:
+                            checkpoint.set_listing_url(current_url)
+
+                        # Wait for project list to load
+                        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, project_list_selector)))
+                    navigate = True
+
+                    if website_config['level1_search']['next-page-selector'] == "N/A":
+                        stop_pagination = True
+                        scraper_logger.info("Pagination disabled (N/A), stopping after current page")
+
+                    # Debug: Check if load-more-selector exists in config
+                    scraper_logger.info(f"Checking for load-more-selector in config: {'load-more-selector' in website_config['level1_search']}")
+                    if "load-more-selector" in website_config['level1_search']:
+                        scraper_logger.info(f"Load-more-selector found: {website_config['level1_search']['load-more-selector']}")
+
+                    page_count += 1
+                    scraper_logger.info(f"Scanning page/load {page_count}")
+
+                    # Cards are handed out in batches. With a load more button the next batch is loaded in
+                    # the background while the current one is processed, instead of loading everything first.
+                    if "load-more-selector" in website_config['level1_search']:
+                        scraper_logger.info("Downloading all projects with load more button")
+                        card_batches = self._expand_load_more(driver, listing, website_config, scraper_logger, scan_id)
+                    else:
+                        card_batches = self._current_cards(listing, scraper_logger)
+
+                cutoff_reached = False
+                project_index = 0
+                pending = []  # (project index, level2 data) of filtered projects awaiting level3
+                async with aclosing(card_batches):
+                    # Third (inner) loop: Process each project card as soon as its batch is available
+                    async for project_cards in card_batches:
+                        for project_card in project_cards:
+                            project_index += 1
                             try:
-                                load_more_button = driver.find_element(By.CSS_SELECTOR, load_more_selector)
-                                scraper_logger.info(f"Found load more button: {load_more_button.text}")
-
-                                if not load_more_button.is_displayed():
-                                    scraper_logger.info("Load more button is not visible, all projects loaded")
-                                    break
-
-                                # Click the load more button
-                                driver.execute_script("arguments[0].click();", load_more_button)
-                                scraper_logger.info(f"Clicked load more button (attempt {load_more_attempts + 1})")
+                                # Extract level 2 data
+                                project_level_2_data = await self.level2_scan(project_card, website_config, scan_id)
+                                if high_water_mark:
+                                    high_water_mark.list_card(project_level_2_data.get('url'))
+
+                                if project_level_2_data.get('url') in processed_project_urls:
+                                    if high_water_mark:
+                                        high_water_mark.observe(project_level_2_data.get('url'), project_level_2_data.get('release_date'))
+                                    scraper_logger.info(f"Page {page_count}, Project {project_index}: {project_level_2_data.get('title', 'Unknown')} processed before the scan was resumed, skipping")
+                                    continue
 
-                            except Exception as button_error:
-                                scraper_logger.warning(f"Error finding/clicking load more button: {button_error}")
-                                # Try alternative approach - find by text content
-                                try:
-                                    buttons = driver.find_elements(By.TAG_NAME, "button")
-                                    load_more_button = None
-                                    for button in buttons:
-                                        if "weitere Projekte laden" in button.text or "load more" in button.text.lower():
-                                            load_more_button = button
+                                # Check, based on the project_level_2_data, whether this project is already in the database
+                                # Do this BEFORE any level3 scans to avoid unnecessary AI calls
+                                is_known = known_projects.is_known(project_level_2_data.get('url'), project_level_2_data.get('project_id'))
+                                if is_known and high_water_mark:
+                                    high_water_mark.observe(project_level_2_data.get('url'), project_level_2_data.get('release_date'))
+
+                                # Incremental scan: everything below a streak of already seen projects was seen before.
+                                # Top projects are pinned to the top of the listing and say nothing about its order.
+                                if high_water_mark and not self._is_top_project(project_card):
+                                    if high_water_mark.is_seen(project_level_2_data.get('url'), project_level_2_data.get('release_date'), is_known):
+                                        known_streak += 1
+                                        if known_streak >= known_streak_to_stop:
+                                            scraper_logger.info(f"Page {page_count}, Project {project_index}: {known_streak} already seen projects in a row, reached the high-water mark - stopping pagination")
+                                            cutoff_reached = True
                                             break
-
-                                    if load_more_button and load_more_button.is_displayed():
-                                        driver.execute_script("arguments[0].click();", load_more_button)
-                                        scraper_logger.info(f"Clicked load more button by text (attempt {load_more_attempts + 1})")
                                     else:
-                                        scraper_logger.info("No load more button found by text, all projects loaded")
-                                        break
-                                except Exception as text_error:
-                                    scraper_logger.warning(f"Error with text-based button search: {text_error}")
-                                    break
-
-                            # Wait for new content to load
-                            time.sleep(3)
+                                        known_streak = 0
 
-                            # Check if new projects were loaded
-                            new_soup = BeautifulSoup(driver.page_source, 'html.parser')
-                            new_project_grid = new_soup.select_one(project_list_selector)
-                            new_project_count = len(new_project_grid.select(website_config["level1_search"]["project-entry-selector"])) if new_project_grid else 0
+                                if is_known:
+                                    scraper_logger.info(f"Page {page_count}, Project {project_index}: {project_level_2_data.get('title', 'Unknown')} already in database, skipping further processing")
+                                    continue  # Skip this project but continue with the next one
 
-                            scraper_logger.info(f"New project count: {new_project_count}")
+                                # Check if we have release_date from level2, if not we'll need level3
+                                release_date = project_level_2_data.get('release_date')
+                                title = project_level_2_data.get('title', 'Unknown')
 
-                            if new_project_count <= current_project_count:
-                                scraper_logger.info(f"No new projects loaded (prev: {current_project_count}, new: {new_project_count}), stopping load more")
-                                break
-                            else:
-                                scraper_logger.info(f"Successfully loaded {new_project_count - current_project_count} new projects")
+                                if release_date: # If we have a release date and its outside the time range, we can spare the level3 scan
+                                    if not self._is_within_time_range(release_date, time_range):
+                                        # Skip date-based filtering for top projects
+                                        if self._is_top_project(project_card):
+                                            scraper_logger.info(f"Page {page_count}, Project {project_index}: Found top project outside time range: {title} (release date: {release_date}) - including anyway")
+                                        else:
+                                            scraper_logger.info(f"Page {page_count}, Project {project_index}: Non-top project outside time range found: {title} (release date: {release_date}) - stopping pagination")
+                                            cutoff_reached = True
+                                            break  # Break out of the project loop immediately
+
+                                scraper_logger.info(f"Page {page_count}, Project {project_index}: Checking project: {title} with release date: {release_date}")
+
+                                if duplicate_index:
+                                    # Cross-site copies are dropped before the expensive level3 scan
+                                    duplicate = duplicate_index.find_duplicate(project_level_2_data)
+                                    if duplicate:
+                                        original, reason = duplicate
+                                        duplicate_index.record_suppressed(project_level_2_data, original, reason)
+                                        scraper_logger.info(f"Page {page_count}, Project {project_index}: {title} ({project_level_2_data.get('url')}) merged into {original.label} ({reason}), skipping level3 scan")
+                                        continue
+
+                                # Project passed filtering - the full level3 scan runs for several projects at once
+                                pending.append((project_index, project_level_2_data))
+                                if checkpoint:
+                                    checkpoint.set_pending([level2_data for _, level2_data in pending])
+                                if len(pending) >= batch_size:
+                                    for consolidated_data in await self._process_pending(pending, website_config, scan_id, scraper_logger, page_count, high_water_mark, duplicate_index):
+                                        total_projects_processed += 1
+                                        scraper_logger.info(f"Page {page_count}: Processed project {total_projects_processed}: {consolidated_data.get('title', 'Unknown')}")
+                                        yield consolidated_data
+                                    pending = []
+                                    if checkpoint:
+                                        checkpoint.set_pending([])
 
-                            load_more_attempts += 1
+                            except Exception as e:
+                                scraper_logger.error(f"Page {page_count}, Project {project_index}: Error processing project card: {e}")
+                                continue
 
-                        except Exception as e:
-                            scraper_logger.warning(f"Error during load more attempt {load_more_attempts + 1}: {e}")
+                        # Projects of a card batch are never held back until the next batch has loaded
+                        for consolidated_data in await self._process_pending(pending, website_config, scan_id, scraper_logger, page_count, high_water_mark, duplicate_index):
+                            total_projects_processed += 1
+                            scraper_logger.info(f"Page {page_count}: Processed project {total_projects_processed}: {consolidated_data.get('title', 'Unknown')}")
+                            yield consolidated_data
+                        pending = []
+                        if checkpoint:
+                            checkpoint.set_pending([])
+
+                        if cutoff_reached:
+                            # Closing the batch generator stops loading pages that would not be used
                             break
 
-                    scraper_logger.info(f"Load more process completed after {load_more_attempts} attempts")
-
-                page_count += 1
-                scraper_logger.info(f"Scanning page/load {page_count}")
-
-                # Get current page content
-                soup = BeautifulSoup(driver.page_source, 'html.parser')
-                project_grid = soup.select_one(project_list_selector)
-
-                try:
-                    project_cards = project_grid.select(website_config["level1_search"]["project-entry-selector"])
-                    scraper_logger.info(f"Found {len(project_cards)} project cards on current page")
-                except Exception as e:
-                    scraper_logger.error(f"Error finding project cards: {e}")
+                if cutoff_reached:
                     stop_pagination = True
-                    break
-
-                # Third (inner) loop: Process each project card on the current page
-                for project_index, project_card in enumerate(project_cards, 1):
-                    try:
-                        # Extract level 2 data
-                        project_level_2_data = await self.level2_scan(project_card, website_config, scan_id)
-
-                        # Check, based on the project_level_2_data, whether this project is already in the database
-                        # Do this BEFORE any level3 scans to avoid unnecessary AI calls
-                        if existing_project_data:
-                            project_url = project_level_2_data.get('url')
-                            if project_url and project_url in existing_project_data:
-                                db_project = existing_project_data[project_url]
-                                scraper_logger.info(f"Page {page_count}, Project {project_index}: {db_project['title']} already in database, skipping further processing")
-                                continue  # Skip this project but continue with the next one
-
-                        # Check if we have release_date from level2, if not we'll need level3
-                        release_date = project_level_2_data.get('release_date')
-                        title = project_level_2_data.get('title', 'Unknown')
-
-                        if release_date: # If we have a release date and its outside the time range, we can spare the level3 scan
-                            if not self._is_within_time_range(release_date, time_range):
-                                # Skip date-based filtering for top projects
-                                if self._is_top_project(project_card):
-                                    scraper_logger.info(f"Page {page_count}, Project {project_index}: Found top project outside time range: {title} (release date: {release_date}) - including anyway")
-                                else:
-                                    scraper_logger.info(f"Page {page_count}, Project {project_index}: Non-top project outside time range found: {title} (release date: {release_date}) - stopping pagination")
-                                    stop_pagination = True
-                                    break  # Break out of the project loop immediately
-
-                        scraper_logger.info(f"Page {page_count}, Project {project_index}: Checking project: {title} with release date: {release_date}")
-
-                        # Project passed filtering - now do the full level3 scan for all detailed data
-                        project_url = project_level_2_data.get('url')
-                        if project_url:
-                            project_level_3_data = await self.level3_scan(project_url, scan_id, website_config)
-                        else:
-                            project_level_3_data = {"requirements_tf": {}}
-
-                        # Consolidate all data (level2 + full level3)
-                        consolidated_data = self._consolidate_data(project_level_2_data, project_level_3_data, scan_id)
-                        if "url" not in consolidated_data and project_level_2_data.get('url'):
-                            consolidated_data["url"] = project_level_2_data['url']
-
-                        total_projects_processed += 1
-                        scraper_logger.info(f"Page {page_count}, Project {project_index}: Processed project {total_projects_processed}: {consolidated_data.get('title', 'Unknown')}")
-
-                        yield consolidated_data
-
-                    except Exception as e:
-                        scraper_logger.error(f"Page {page_count}, Project {project_index}: Error processing project card: {e}")
-                        continue
 
                 # Check if we need to stop pagination due to time range filtering
                 if stop_pagination:
-                    scraper_logger.info(f"Stopping pagination due to non-top project outside time range found on page {page_count}")
+                    scraper_logger.info(f"Stopping pagination due to the time range or high-water mark on page {page_count}")
                     break
 
 
@@ -1006,7 +1225,7 @@ class WebScraper:
                     break
 
                 # Get fresh soup for pagination check
-                soup = BeautifulSoup(driver.page_source, 'html.parser')
+                soup = BeautifulSoup(driver.page_source, HTML_PARSER)
 
                 # Special handling for Freelancermap pagination
                 if website_config['level1_search']['name'] == 'Freelancermap':
@@ -1068,7 +1287,7 @@ class WebScraper:
                     # Need session duplicate tracking to avoid reprocessing
                     scraper_logger.info("Detected LOAD MORE pagination")
 
-                    prev_project_count = len(project_cards)
+                    prev_project_count = listing.count_cards()
 
                     # Check if load more button is still visible and clickable
                     try:
@@ -1083,12 +1302,9 @@ class WebScraper:
                     # Try to load more projects
                     if await self._load_more_projects(website_config, driver):
                         # Add a small delay after loading more content
-                        time.sleep(2)
-                        # Get new project count and updated project list
-                        soup_after = BeautifulSoup(driver.page_source, 'html.parser')
-                        project_grid_after = soup_after.select_one(project_list_selector)
-                        project_cards_after = project_grid_after.select(website_config["level1_search"]["project-entry-selector"]) if project_grid_after else []
-                        new_project_count = len(project_cards_after)
+                        self._settle(2)
+                        # Get new project count without parsing the page
+                        new_project_count = listing.count_cards()
 
                         # Check if we actually got new projects
                         if new_project_count <= prev_project_count:
@@ -1096,10 +1312,8 @@ class WebScraper:
                             break
                         else:
                             scraper_logger.info(f"Successfully loaded {new_project_count - prev_project_count} new projects (prev: {prev_project_count}, new: {new_project_count})")
-                            # Update the project_cards list to include the newly loaded projects
-                            project_cards = project_cards_after
-                            # Continue the outer while loop to process the newly loaded projects
-                            # Session duplicate tracking will handle skipping already processed projects
+                            # Continue the outer while loop on the same page to process only the newly loaded projects
+                            navigate = False
                             continue
                     else:
                         scraper_logger.info("Load more button not found or not clickable, stopping")
@@ -1119,7 +1333,7 @@ class WebScraper:
                         # Update current_url for next iteration
                         current_url = next_page_url
                         # Add a small delay to ensure page is fully loaded
-                        time.sleep(2)
+                        self._settle(2)
                         # Break out of the inner loop to continue with the new URL in the outer loop
                         scraper_logger.info("Breaking inner loop to continue with new URL in outer loop")
                         scraper_logger.info(f"Will continue with URL: {current_url}")
@@ -1135,6 +1349,8 @@ class WebScraper:
 
             scraper_logger.info(f"Completed scanning {page_count} pages/loads, processed {total_projects_processed} projects")
             scraper_logger.info(f"Final stop_pagination value: {stop_pagination}")
+            if checkpoint:
+                checkpoint.set_status("done")
 
         except Exception as e:
             scraper_logger.error(f"Error during scanning: {e}")
@@ -1161,30 +1377,13 @@ class WebScraper:
             dict: Project data as it is found
         """
         try:
-            # Collect projects table content once at the beginning
-            from backend.models.core_models import Project
+            # Get the known-project index once at the beginning
             from backend.database import DatabaseHandler
+            from backend.project_index_service import project_index_service
 
             db_handler = DatabaseHandler()
             with db_handler.get_session() as session:
-                existing_projects = session.query(Project).all()
-                existing_project_data = {
-                    project.url: {
-                        'id': project.id,
-                        'title': project.title,
-                        'url': project.url,
-                        'release_date': project.release_date,
-                        'start_date': project.start_date,
-                        'duration': project.duration,
-                        'location': project.location,
-                        'tenderer': project.tenderer,
-                        'rate': project.rate,
-                        'description': project.description,
-                        'project_id': project.project_id,
-                        'budget': project.budget,
-                        'workload': project.workload
-                    } for project in existing_projects
-                }
+                existing_project_data = project_index_service.get_index(session)
 
             for website_config in self.config['websites']:
                 try:
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark matching, IDF updates and deduplication on a synthetic corpus and compare commits.
+
+    python benchmark_matching.py run [--projects 10000] [--embedding random] [--top-k 20]
+    python benchmark_matching.py compare benchmark_results/matching-<old>.json benchmark_results/matching-<new>.json
+
+Results are written to benchmark_results/matching-<commit>-<projects>-<embedding>.json unless --output is given.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from backend.matching_benchmark import (
+    DEFAULT_DIMENSIONS, EMBEDDING_MODES, OPERATIONS, compare_results, format_comparison, format_report,
+    load_result, run_matching_benchmark, save_result
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Matching benchmark on a synthetic corpus")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Generate a corpus and measure the operations on it")
+    run_parser.add_argument("--projects", type=int, default=1000, help="Number of projects")
+    run_parser.add_argument("--skills", type=int, default=None, help="Number of skills (default: projects / 20, at least 200)")
+    run_parser.add_argument("--employees", type=int, default=5, help="Number of employees (one match per employee)")
+    run_parser.add_argument("--embedding", choices=EMBEDDING_MODES, default="clustered", help="Skill embeddings")
+    run_parser.add_argument("--clusters", type=int, default=20, help="Number of skill clusters")
+    run_parser.add_argument("--dimensions", type=int, default=DEFAULT_DIMENSIONS, help="Embedding dimensions")
+    run_parser.add_argument("--duplicate-fraction", type=float, default=0.02, help="Fraction of duplicate projects")
+    run_parser.add_argument("--seed", type=int, default=42, help="Seed of the corpus generator")
+    run_parser.add_argument("--operation", action="append", choices=OPERATIONS, help="Operation to run (repeatable, default: all)")
+    run_parser.add_argument("--repeat", type=int, default=1, help="Runs of every operation")
+    run_parser.add_argument("--top-k", type=int, default=None, help="top_k of the matching")
+    run_parser.add_argument("--min-percentage", type=float, default=None, help="min_percentage of the matching")
+    run_parser.add_argument("--threshold", type=float, default=None, help="Matching threshold (default: configured)")
+    run_parser.add_argument("--database", help="SQLite file for the corpus, must not exist (default: temporary)")
+    run_parser.add_argument("--no-memory-trace", action="store_true", help="Do not trace the Python heap (faster)")
+    run_parser.add_argument("--output", help="Result file (default: benchmark_results/matching-<commit>-...json)")
+    run_parser.add_argument("--no-save", action="store_true", help="Only print the report")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two results; exits with 1 on regressions")
+    compare_parser.add_argument("baseline", help="Result of the reference commit")
+    compare_parser.add_argument("current", help="Result to check")
+    compare_parser.add_argument("--tolerance", type=float, default=0.1, help="Relative increase still accepted")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        baseline, current = load_result(args.baseline), load_result(args.current)
+        comparison = compare_results(baseline, current, args.tolerance)
+        print(format_comparison(comparison, baseline, current))
+        return 1 if any(entry["regression"] for entry in comparison) else 0
+
+    result = asyncio.run(run_matching_benchmark(
+        projects=args.projects,
+        skills=args.skills,
+        employees=args.employees,
+        embedding=args.embedding,
+        dimensions=args.dimensions,
+        operations=args.operation or OPERATIONS,
+        repeat=args.repeat,
+        top_k=args.top_k,
+        min_percentage=args.min_percentage,
+        threshold=args.threshold,
+        database_path=args.database,
+        trace_memory=not args.no_memory_trace,
+        seed=args.seed,
+        clusters=args.clusters,
+        duplicate_fraction=args.duplicate_fraction
+    ))
+    print(format_report(result))
+    if not args.no_save:
+        print(f"\nResult written to {save_result(result, args.output)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
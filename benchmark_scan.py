@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Record the configured sites once, then benchmark scans offline against the recording.
+
+    python benchmark_scan.py record [--site Etengo] [--time-range 7]
+    python benchmark_scan.py run [--site Etengo] [--mistral-latency 0.8] [--json result.json]
+
+Recording needs Chrome and the Mistral API key; running needs neither.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from backend.replay_harness import DEFAULT_FIXTURE_DIRECTORY, record_fixtures
+from backend.scan_benchmark import format_report, run_benchmark
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay scan benchmark")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Scan the sites live and record pages and API answers")
+    record_parser.add_argument("--time-range", type=int, default=7, help="Time range of the recorded scans in days")
+
+    run_parser = subparsers.add_parser("run", help="Scan the recorded sites offline and report the measurements")
+    run_parser.add_argument("--time-range", type=int, default=None, help="Time range in days (default: as recorded)")
+    run_parser.add_argument("--page-latency", type=float, default=0.0, help="Seconds until a replayed page is served")
+    run_parser.add_argument("--mistral-latency", type=float, default=0.0, help="Seconds until a replayed Mistral answer is served")
+    run_parser.add_argument("--no-memory-trace", action="store_true", help="Do not trace the Python heap (faster)")
+    run_parser.add_argument("--json", help="Also write the result to this JSON file")
+
+    for subparser in (record_parser, run_parser):
+        subparser.add_argument("--fixtures", default=DEFAULT_FIXTURE_DIRECTORY, help="Fixture directory")
+        subparser.add_argument("--site", action="append", help="Site name (repeatable, default: all)")
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        fixtures = asyncio.run(record_fixtures(args.fixtures, args.site, args.time_range))
+        print(f"Recorded {', '.join(fixtures.manifest['sites'])}: {fixtures.pages.stats()['fetches']} pages, "
+              f"{len(fixtures.mistral_responses)} Mistral answers, {len(fixtures.embeddings)} embeddings in {args.fixtures}")
+        return 0
+
+    result = asyncio.run(run_benchmark(
+        args.fixtures, args.site, args.time_range, args.page_latency, args.mistral_latency, not args.no_memory_trace
+    ))
+    print(format_report(result))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as result_file:
+            json.dump(result, result_file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
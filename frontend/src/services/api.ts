@@ -61,6 +61,7 @@ export class SSEStream {
   private preventReconnect = false; // New flag to prevent reconnection after completion
   private connectionAttempts = 0;
   private maxReconnectAttempts = 3;
+  private lastEventId: string | null = null; // Resume point of the scan job after a reconnect
 
   constructor(private url: string, private onEvent: SSEEventHandler) {}
 
@@ -81,8 +82,12 @@ export class SSEStream {
       return;
     }
 
-    console.log('SSE: Connecting to:', this.url);
-    this.eventSource = new EventSource(this.url);
+    // Reconnect to the running scan job instead of starting a new scan
+    const url = this.lastEventId
+      ? `${this.url}${this.url.includes('?') ? '&' : '?'}after=${encodeURIComponent(this.lastEventId)}`
+      : this.url;
+    console.log('SSE: Connecting to:', url);
+    this.eventSource = new EventSource(url);
     this.isConnected = true;
     this.hasCompleted = false;
     this.isDisconnecting = false;
@@ -90,6 +95,9 @@ export class SSEStream {
 
     this.eventSource.onmessage = (event) => {
       console.log('SSE: Raw message received:', event.data);
+      if (event.lastEventId) {
+        this.lastEventId = event.lastEventId;
+      }
       try {
         const data: SSEEvent = JSON.parse(event.data);
         console.log('SSE: Parsed event data:', data);
@@ -167,6 +175,7 @@ export class SSEStream {
     this.isDisconnecting = false;
     this.isConnected = false;
     this.connectionAttempts = 0;
+    this.lastEventId = null;
   }
 
   // Method to force disconnect and prevent reconnection
@@ -250,7 +259,7 @@ export const endpoints = {
   cancelScan: (scanId: string) => `/scan/cancel/${scanId}`,
 
   // Matching
-  matches: (employeeId: number) => `/matches/${employeeId}`,
+  matches: (employeeId: number, topK: number = 20) => `/matches/${employeeId}?top_k=${topK}`,
 
   // Embeddings
   rebuildEmbeddings: '/embeddings/rebuild',
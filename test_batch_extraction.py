@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test to verify that several project pages are extracted with one Mistral request.
+"""
+
+import sys
+import os
+import re
+import json
+import asyncio
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.batch_extraction import parse_batch_response, plan_batches
+from backend.mistral_client import MistralClientWrapper
+from backend.mistral_handler import MistralHandler
+
+SKILLS = ["Python", "Java", "SAP", "Kubernetes", "React"]
+
+
+def _project_page(skill):
+    return f"<html><body><main><h1>{skill} Entwickler</h1><p>Wir suchen Erfahrung mit {skill} für ein Kundenprojekt.</p></main></body></html>"
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeChoice:
+    def __init__(self, content):
+        self.message = FakeMessage(content)
+
+
+class FakeUsage:
+    prompt_tokens = 400
+    completion_tokens = 200
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.usage = FakeUsage()
+        self.choices = [FakeChoice(content)]
+
+
+class FakeChat:
+    """Answers batch prompts with one object per project tag, single prompts with one object."""
+
+    def __init__(self, drop_ids=()):
+        self.drop_ids = set(drop_ids)
+        self.batch_calls = 0
+        self.single_calls = 0
+
+    async def complete_async(self, model, messages, temperature, max_tokens, response_format=None):
+        prompt = messages[1]["content"]
+        projects = re.findall(r'<project id="([^"]+)">\n(.*?)\n</project>', prompt, re.DOTALL)
+        if projects:
+            self.batch_calls += 1
+            answer = [
+                {"id": project_id, "title": skill, "requirements_tf": {skill: 1}}
+                for project_id, text in projects if project_id not in self.drop_ids
+                for skill in SKILLS if skill.lower() in text.lower()
+            ]
+            # Fenced answer with a trailing comma, as models sometimes produce
+            return FakeResponse("```json\n" + json.dumps(answer)[:-1] + ",]\n```")
+        self.single_calls += 1
+        skill = next(skill for skill in SKILLS if skill.lower() in prompt.lower())
+        return FakeResponse(json.dumps({"title": skill, "requirements_tf": {skill: 1}}))
+
+
+class FakeClient:
+    def __init__(self, drop_ids=()):
+        self.chat = FakeChat(drop_ids)
+
+
+def _handler(drop_ids=()):
+    handler = MistralHandler(api_key="test-key")
+    handler.client = FakeClient(drop_ids)
+    handler.api = MistralClientWrapper(handler.client, {"requests_per_second": 1000, "burst": 10})
+    return handler
+
+
+def test_batch_extraction():
+    """Test batch planning, answer validation and the single-call fallback."""
+
+    print("=" * 60)
+    print("Testing Batch Mistral Extraction")
+    print("=" * 60)
+
+    print("\n1. Planning batches within token and size limits...")
+    items = [{"id": str(i), "tokens": 400, "schema": "full"} for i in range(7)]
+    items.insert(3, {"id": "r", "tokens": 100, "schema": "requirements"})
+    batches = plan_batches(items, max_tokens=1000, max_projects=5)
+    assert [[item["id"] for item in batch] for batch in batches] == [["0", "1"], ["2", "3"], ["4", "5"], ["6"], ["r"]]
+    batches = plan_batches(items, max_tokens=100000, max_projects=5)
+    assert [len(batch) for batch in batches] == [5, 2, 1]
+    print("   ✅ Token budget and batch size respected, schemas kept apart")
+
+    print("\n2. Validating batch answers per project...")
+    answer = """```json
+    [{"id": "a", "requirements_tf": {"Python": 1}},
+     {"id": "b", "requirements_tf": "Java"},
+     {"id": "c", "requirements_tf": {"SAP": 1}},
+     {"id": "c", "requirements_tf": {"ABAP": 1}},
+     {"id": "x", "requirements_tf": {"Go": 1}},]
+    ```"""
+    results = parse_batch_response(answer, ["a", "b", "c", "d"])
+    assert results == {"a": {"requirements_tf": {"Python": 1}}}, results
+    assert parse_batch_response("Sorry, I cannot help with that.", ["a"]) == {}
+    print("   ✅ Invalid, duplicated, unknown and missing ids left out")
+
+    print("\n3. Extracting five pages with one request...")
+    handler = _handler()
+    pages = [{"id": str(i), "html": _project_page(skill)} for i, skill in enumerate(SKILLS)]
+    results = asyncio.run(handler.extract_project_details_batch(pages))
+    assert handler.client.chat.batch_calls == 1 and handler.client.chat.single_calls == 0
+    assert [results[str(i)]["requirements_tf"] for i in range(len(SKILLS))] == [{skill: 1} for skill in SKILLS]
+    assert handler.token_usage["calls"] == 1
+    print("   ✅ One request for five projects, results matched by id")
+
+    print("\n4. Falling back to single calls for projects missing from the answer...")
+    handler = _handler(drop_ids={"2"})
+    results = asyncio.run(handler.extract_project_details_batch(pages))
+    assert handler.client.chat.batch_calls == 1 and handler.client.chat.single_calls == 1
+    assert results["2"]["requirements_tf"] == {"SAP": 1}
+    print("   ✅ Missing project extracted on its own")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_batch_extraction()
+    if success:
+        print("\n🎉 Batch extraction test completed successfully!")
+    else:
+        print("\n❌ Batch extraction test failed!")
+        sys.exit(1)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test to verify the rule-based detail field extraction and the Mistral fast path.
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.config_manager import config_manager
+from backend.detail_rules import get_detail_rules
+from backend.page_archive import PageArchive
+from backend.web_scraper import WebScraper
+
+DETAIL_PAGE = """
+<html><body>
+<nav><a href="/">Start</a><a href="/projekte">Projekte</a></nav>
+<main>
+  <h1>Senior Python Entwickler (m/w/d)</h1>
+  <p>Veröffentlicht am 2025-10-01 von Freelancermap</p>
+  <dl>
+    <dt>Start</dt><dd>ab 01.03.2026</dd>
+    <dt>Dauer</dt><dd>6 Monate +</dd>
+  </dl>
+  <ul>
+    <li><span>Ort:</span> München</li>
+    <li><strong>Auslastung:</strong> 100 %</li>
+  </ul>
+  <p>Stundensatz: 95 € / h</p>
+  <div><small>Projekt-ID</small><span>FM-12345</span></div>
+  <p>Wir suchen einen Entwickler mit Python, Django und PostgreSQL.</p>
+</main>
+</body></html>
+"""
+
+PAGE_WITHOUT_DATES = "<html><body><main><h1>Java Entwickler</h1><p>Start: ab sofort</p></main></body></html>"
+
+
+class FakeBrowser:
+    def __init__(self, page_source):
+        self.page_source = page_source
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        pass
+
+
+class FakeMistralHandler:
+    """Records which prompt was used."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def extract_project_details(self, text, scan_id=None, content_config=None):
+        self.calls.append("full")
+        return {"title": "Java Entwickler", "start_date": "15.04.2026", "release_date": "02.10.2025", "requirements_tf": {"Java": 1}}
+
+    async def extract_requirements_and_description(self, text, scan_id=None, content_config=None):
+        self.calls.append("requirements")
+        return {"description": "Python Backend", "requirements_tf": {"Python": 2, "Django": 1}}
+
+    async def extract_release_date(self, text, scan_id=None, content_config=None):
+        self.calls.append("release_date")
+        return {"release_date": "02.10.2025"}
+
+
+def test_detail_rules():
+    """Test labelled field extraction and that Mistral only gets the small prompt when rules succeed."""
+
+    print("=" * 60)
+    print("Testing Rule-Based Detail Extraction")
+    print("=" * 60)
+
+    freelancermap = next(w for w in config_manager.get_websites() if w["level1_search"]["name"] == "Freelancermap")
+
+    print("\n1. Extracting labelled fields...")
+    data = get_detail_rules(freelancermap).extract(DETAIL_PAGE)
+    assert data == {
+        "release_date": "01.10.2025",
+        "start_date": "01.03.2026",
+        "location": "München",
+        "workload": "100 %",
+        "rate": "95 € / h",
+        "duration": "6 Monate",
+        "project_id": "FM-12345"
+    }, data
+    print("   ✅ Dates normalized to DD.MM.YYYY, navigation labels ignored")
+
+    print("\n2. Using the small prompt when the rules find all required fields...")
+    scraper = WebScraper()
+    scraper.page_archive = PageArchive(tempfile.mkdtemp())
+    scraper.mistral_handler = FakeMistralHandler()
+    scraper.setup_driver = lambda: FakeBrowser(DETAIL_PAGE)
+    project = asyncio.run(scraper.level3_scan("https://www.freelancermap.de/projekt/1", website_config=freelancermap))
+    assert scraper.mistral_handler.calls == ["requirements"]
+    assert project["requirements_tf"] == {"Python": 2, "Django": 1}
+    assert project["start_date"] == "01.03.2026" and project["rate"] == "95 € / h"
+    print("   ✅ Structured fields from rules, only requirements and description from Mistral")
+
+    print("\n3. Falling back to the full prompt when the rules fail...")
+    scraper.mistral_handler = FakeMistralHandler()
+    scraper.setup_driver = lambda: FakeBrowser(PAGE_WITHOUT_DATES)
+    project = asyncio.run(scraper.level3_scan("https://www.freelancermap.de/projekt/2", website_config=freelancermap))
+    assert scraper.mistral_handler.calls == ["full"]
+    assert project["start_date"] == "15.04.2026"
+    print("   ✅ Full extraction used when a required field is missing")
+
+    print("\n4. Quick release-date checks without Mistral...")
+    scraper.mistral_handler = FakeMistralHandler()
+    scraper.setup_driver = lambda: FakeBrowser(DETAIL_PAGE)
+    result = asyncio.run(scraper.quick_level3_scan("https://www.freelancermap.de/projekt/1", website_config=freelancermap))
+    assert result == {"release_date": "01.10.2025"}
+    assert scraper.mistral_handler.calls == []
+    print("   ✅ Labelled release date found without an API call")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_detail_rules()
+    if success:
+        print("\n🎉 Rule-based detail extraction test completed successfully!")
+    else:
+        print("\n❌ Rule-based detail extraction test failed!")
+        sys.exit(1)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Test to verify that incremental scans stop paginating at the per-site high-water mark.
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.config_manager import config_manager
+from backend.high_water_mark_service import HighWaterMark, high_water_mark_service
+from backend.listing_processor import COUNT_CARDS_SCRIPT, CARD_FRAGMENTS_SCRIPT
+from backend.models.core_models import Base
+from backend.page_archive import PageArchive
+from backend.project_index_service import KnownProjectIndex
+from backend.web_scraper import WebScraper
+
+STREAK = 5
+
+
+def _card(number, top=False):
+    classes = "card card-project top-project" if top else "card card-project"
+    return (
+        f'<div class="{classes}"><h3 class="headline-4"><a href="/projekt/{number}">Projekt {number}</a></h3>'
+        f'<div class="box-50"><small>Pr.ID</small><span>{number}</span></div></div>'
+    )
+
+
+class FakeHiddenButton:
+    text = "weitere Projekte laden"
+
+    def is_displayed(self):
+        return False
+
+
+class FakeListingBrowser:
+    """WebDriver stand-in for a listing with the given cards and no further pages."""
+
+    def __init__(self, cards):
+        self.cards = cards
+        self.current_url = None
+
+    @property
+    def page_source(self):
+        return f'<html><body><div id="project-grid">{"".join(self.cards)}</div></body></html>'
+
+    def get(self, url):
+        self.current_url = url
+
+    def find_element(self, by, selector):
+        return FakeHiddenButton()
+
+    def find_elements(self, by, selector):
+        return []
+
+    def execute_script(self, script, *args):
+        if script == COUNT_CARDS_SCRIPT:
+            return len(self.cards)
+        if script == CARD_FRAGMENTS_SCRIPT:
+            return self.cards[args[2]:]
+        return None
+
+    def quit(self):
+        pass
+
+
+def _scraper(cards, level2_urls, level3_urls, failed=()):
+    scraper = WebScraper()
+    scraper.mistral_handler = None
+    scraper.page_archive = PageArchive(tempfile.mkdtemp())
+    scraper.setup_driver = lambda: FakeListingBrowser(cards)
+    level2_scan = scraper.level2_scan
+
+    async def counting_level2_scan(project_card, website_config, scan_id=None):
+        level2_data = await level2_scan(project_card, website_config, scan_id)
+        level2_urls.append(level2_data.get("url"))
+        return level2_data
+
+    async def level3_scan_batch(project_urls, scan_id=None, website_config=None):
+        level3_urls.extend(project_urls)
+        return [
+            {"requirements": [], "url": url, "extraction_failed": True} if url.endswith(failed) else {"requirements_tf": {"Python": 1}, "url": url}
+            for url in project_urls
+        ]
+
+    scraper.level2_scan = counting_level2_scan
+    scraper.level3_scan_batch = level3_scan_batch
+    return scraper
+
+
+def _scan(website_config, cards, known_projects, mark, failed=()):
+    level2_urls, level3_urls = [], []
+
+    async def scan():
+        stream = _scraper(cards, level2_urls, level3_urls, failed).scan_website_stream(website_config, 7, known_projects, None, None, mark)
+        return [project["url"] async for project in stream]
+
+    return asyncio.run(scan()), level2_urls, level3_urls
+
+
+def test_high_water_marks():
+    """Test the streak cutoff of incremental scans and storing the marks in AppState."""
+
+    print("=" * 60)
+    print("Testing Per-Site High-Water Marks")
+    print("=" * 60)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    etengo = next(w for w in config_manager.get_websites() if w["level1_search"]["name"] == "Etengo")
+    streak = config_manager.get("scanning.known_streak_to_stop")
+    config_manager.config.setdefault("scanning", {})["known_streak_to_stop"] = STREAK
+
+    try:
+        print("\n1. First scan of a site without high-water mark...")
+        first_cards = [_card(number) for number in range(12, 0, -1)]
+        mark = high_water_mark_service.load(db, "Etengo")
+        assert mark.recent_urls == [] and mark.release_date is None
+        stored, level2_urls, _ = _scan(etengo, first_cards, KnownProjectIndex.from_urls(()), mark)
+        assert len(stored) == 12 and len(level2_urls) == 12
+        print(f"   ✅ All {len(stored)} projects scanned")
+
+        print("\n2. Saving the mark...")
+        high_water_mark_service.save(db, mark)
+        mark = high_water_mark_service.load(db, "Etengo")
+        assert mark.recent_urls == level2_urls and mark.is_seen(stored[0])
+        assert mark.covered_from == (datetime.now() - timedelta(days=7)).strftime("%d.%m.%Y")
+        print(f"   ✅ Mark holds the {len(mark.recent_urls)} most recent URLs, newest first, and the covered window")
+
+        print("\n3. Incremental scan after three new postings...")
+        # Project 3 was promoted to a top project and moved to the top of the listing
+        new_cards = [_card(15), _card(14), _card(3, top=True), _card(13)]
+        cards = new_cards + [card for card in first_cards if card != _card(3)]
+        new_urls, level2_urls, level3_urls = _scan(etengo, cards, KnownProjectIndex.from_urls(stored), mark)
+        assert len(new_urls) == 3 and level3_urls == new_urls, "Only new postings are extracted"
+        assert all(url.endswith(("/15", "/14", "/13")) for url in new_urls)
+        assert len(level2_urls) == len(new_cards) + STREAK, "Pagination stops after the streak of known projects"
+        print(f"   ✅ Stopped after {len(level2_urls)} of {len(cards)} cards; the known top project did not count")
+
+        print("\n4. Full scan for comparison...")
+        _, full_level2_urls, full_level3_urls = _scan(etengo, cards, KnownProjectIndex.from_urls(stored), None)
+        assert len(full_level2_urls) == len(cards) and len(full_level3_urls) == 3
+        print(f"   ✅ Without a mark all {len(full_level2_urls)} cards are parsed")
+
+        print("\n5. Updating and capping the mark...")
+        high_water_mark_service.save(db, mark)
+        mark = high_water_mark_service.load(db, "Etengo")
+        assert mark.recent_urls[:4] == level2_urls[:4]
+        assert len(mark.recent_urls) == len(set(mark.recent_urls)) == 15
+        config_manager.config["scanning"]["high_water_recent_urls"] = 10
+        high_water_mark_service.save(db, mark)
+        assert len(high_water_mark_service.load(db, "Etengo").recent_urls) == 10
+        config_manager.config["scanning"]["high_water_recent_urls"] = 200
+        print("   ✅ New URLs go first, duplicates dropped, list capped")
+
+        print("\n6. Release dates and the covered window...")
+        data = {"release_date": "10.05.2026", "covered_from": "09.05.2026", "recent_urls": ["https://example.com/stored"]}
+        dated = HighWaterMark("Freelancermap", data)
+        assert dated.is_seen("https://example.com/stored", "09.05.2026")
+        assert dated.is_seen("https://example.com/known", "10.05.2026", is_known=True)
+        assert not dated.is_seen("https://example.com/unstored", "09.05.2026"), "An older date alone is not enough"
+        assert not dated.is_seen("https://example.com/known", "01.05.2026", is_known=True), "Outside the window of the daily scans"
+        assert not HighWaterMark("Freelancermap", {"recent_urls": ["https://example.com/stored"]}).is_seen("https://example.com/stored"), \
+            "Marks without covered window never stop a scan"
+        dated.begin_scan(datetime(2026, 4, 12))
+        dated.observe("https://example.com/new", "12.05.2026")
+        assert dated.to_dict(10)["release_date"] == "12.05.2026"
+        assert dated.to_dict(10)["covered_from"] == "12.04.2026", "The 30 day scan covered the daily window too"
+        gap = HighWaterMark("Freelancermap", data)
+        gap.begin_scan(datetime(2026, 5, 11))
+        assert gap.to_dict(10)["covered_from"] == "11.05.2026", "Windows with a gap are not merged"
+        print("   ✅ Only stored cards inside the covered window seen, windows merged when contiguous")
+
+        print("\n7. Failed extractions are not recorded...")
+        high_water_mark_service.reset(db)
+        mark = high_water_mark_service.load(db, "Etengo")
+        stored, level2_urls, _ = _scan(etengo, first_cards, KnownProjectIndex.from_urls(()), mark, failed=("/8", "/7"))
+        assert len(stored) == 10 and not any(url.endswith(("/8", "/7")) for url in mark.to_dict(200)["recent_urls"])
+        high_water_mark_service.save(db, mark)
+        retry_urls, level2_urls, _ = _scan(etengo, first_cards, KnownProjectIndex.from_urls(stored), high_water_mark_service.load(db, "Etengo"))
+        assert sorted(url.rsplit("/", 1)[-1] for url in retry_urls) == ["7", "8"], "Failed projects break the streak and are retried"
+        print("   ✅ Failed projects stay out of the mark and are picked up by the next incremental scan")
+
+        print("\n8. Resetting the marks...")
+        assert high_water_mark_service.reset(db) == 1
+        assert high_water_mark_service.load(db, "Etengo").recent_urls == []
+        print("   ✅ Marks deleted")
+    finally:
+        config_manager.config["scanning"]["known_streak_to_stop"] = streak
+        db.close()
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_high_water_marks()
+    if success:
+        print("\n🎉 High-water mark test completed successfully!")
+    else:
+        print("\n❌ High-water mark test failed!")
+        sys.exit(1)
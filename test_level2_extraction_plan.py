@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test to verify that compiled level2 extraction plans produce the expected card data.
+"""
+
+import sys
+import os
+import asyncio
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bs4 import BeautifulSoup
+from backend.config_manager import config_manager
+from backend.extraction_plan import get_level2_plan
+from backend.web_scraper import WebScraper
+
+ETENGO_CARD = """
+<div class="card card-project">
+  <h3 class="headline-4"><a href="/projekt/12345-python-entwickler">Python Entwickler (m/w/d)</a></h3>
+  <div class="box-50"><small>Pr.ID</small><span>12345</span></div>
+  <div class="box-50"><small>PLZ</small><span>80331 <em>München</em></span></div>
+  <div class="box-50"><small>Laufzeit</small><span>6 Monate</span></div>
+  <div class="box-50"><small>Start</small><span>01.09.2025</span></div>
+  <div class="box-100"><small>Branche</small><span>Automotive</span><span>IT</span></div>
+</div>
+"""
+
+FREELANCERMAP_CARD = """
+<div class="project-container">
+  <a class="project-title" href="https://www.freelancermap.de/projekt/java-architekt">Java Architekt</a>
+  <div class="company">ACME GmbH</div>
+  <div class="project-location"><span>Berlin</span><span>‐</span><span> Remote </span></div>
+  <span class="created-date">eingetragen am: 03.07.2025</span>
+  <div class="keywords-container"><span class="keyword">Java</span><span class="keyword">Spring</span><span class="keyword">+3</span></div>
+</div>
+"""
+
+RANDSTAD_CARD = """
+<div class="job">
+  <h1><a href="/projekte/data-engineer/">Data Engineer</a></h1>
+  <small class="time-ago">vor 2 Tagen</small>
+  <ul>
+    <li><small>Einsatzort:</small><span>Hamburg</span></li>
+    <li><small>Startdatum:</small><span>asap</span></li>
+    <li><small>Projektanbieter:</small><span>Randstad Professional</span></li>
+  </ul>
+  <div class="skills"><span class="label">SQL</span><span class="label">Python</span></div>
+</div>
+"""
+
+# Output of the original per-field level2_scan implementation for the cards above
+EXPECTED = {
+    "Etengo": {
+        'title': 'Python Entwickler (m/w/d)', 'url': 'https://www.etengo.de/projekt/12345-python-entwickler',
+        'project_id': '12345', 'location': '80331München', 'duration': '6 Monate', 'start_date': '01.09.2025',
+        'industry': 'Automotive', 'tenderer': 'Etengo', 'rate': 'N/A'
+    },
+    "Freelancermap": {
+        'title': 'Java Architekt', 'url': 'https://www.freelancermap.de/projekt/java-architekt',
+        'location': 'Berlin, Remote', 'release_date': '03.07.2025', 'industry': 'Java, Spring',
+        'tenderer': 'ACME GmbH', 'rate': 'N/A'
+    },
+    "Randstad": {
+        'title': 'Data Engineer', 'url': 'https://www.gulp.de/projekte/data-engineer/', 'location': 'Hamburg',
+        'start_date': 'asap', 'release_date': 'vor 2 Tagen', 'industry': 'SQL, Python',
+        'tenderer': 'Randstad Professional', 'rate': 'N/A'
+    },
+}
+
+
+def test_level2_extraction_plan():
+    """Test level2 extraction for every configured website."""
+
+    print("=" * 60)
+    print("Testing Level2 Extraction Plans")
+    print("=" * 60)
+
+    websites = {website["level1_search"]["name"]: website for website in config_manager.get_websites()}
+    cards = {"Etengo": ETENGO_CARD, "Freelancermap": FREELANCERMAP_CARD, "Randstad": RANDSTAD_CARD}
+    scraper = WebScraper()
+
+    for step, (name, html) in enumerate(cards.items(), 1):
+        print(f"\n{step}. Extracting a {name} card...")
+        card = BeautifulSoup(html, 'html.parser').div
+        data = asyncio.run(scraper.level2_scan(card, websites[name]))
+        assert list(data.items()) == list(EXPECTED[name].items()), data
+        print(f"   ✅ {data}")
+
+    print("\n4. Plans are compiled once per website...")
+    etengo = websites["Etengo"]
+    plan = get_level2_plan(etengo)
+    assert get_level2_plan(etengo) is plan
+    assert len(plan.compiled_selectors) == 3, "Shared selectors should be compiled once"
+    print("   ✅ Plan reused, shared selectors grouped")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_level2_extraction_plan()
+    if success:
+        print("\n🎉 Level2 extraction plan test completed successfully!")
+    else:
+        print("\n❌ Level2 extraction plan test failed!")
+        sys.exit(1)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test to verify that load-more listings are processed incrementally, parsing every card once.
+"""
+
+import sys
+import os
+import asyncio
+import copy
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.config_manager import config_manager
+from backend.listing_processor import COUNT_CARDS_SCRIPT, CARD_FRAGMENTS_SCRIPT
+from backend.web_scraper import WebScraper
+
+CARDS_PER_LOAD = 10
+RECENT_CARDS = 35
+
+
+def _card(number):
+    # The first RECENT_CARDS projects are new, all later ones are older than the scanned time range
+    days_ago = 0 if number < RECENT_CARDS else 30
+    release_date = (datetime.now() - timedelta(days=days_ago)).strftime("%d.%m.%Y")
+    return (
+        f'<div class="card card-project"><h3 class="headline-4"><a href="/projekt/{number}">Projekt {number}</a></h3>'
+        f'<div class="box-50"><small>Pr.ID</small><span>{number}</span></div>'
+        f'<span class="release">{release_date}</span></div>'
+    )
+
+
+class FakeButton:
+    def __init__(self, browser):
+        self.browser = browser
+        self.text = "weitere Projekte laden"
+
+    def is_displayed(self):
+        return self.browser.loads < self.browser.max_loads
+
+
+class FakeEtengoBrowser:
+    """Minimal WebDriver stand-in for an Etengo listing that grows with every load-more click."""
+
+    def __init__(self, max_loads):
+        self.max_loads = max_loads
+        self.loads = 0
+        self.cards = [_card(i) for i in range(CARDS_PER_LOAD)]
+        self.cards.append(_card(0))  # Same project listed twice (e.g. as top project)
+        self.next_number = CARDS_PER_LOAD
+        self.fragments_transferred = 0
+        self.page_source_reads = 0
+        self.current_url = "https://www.etengo.de/it-projektsuche/"
+
+    @property
+    def page_source(self):
+        self.page_source_reads += 1
+        return f'<html><body><div id="project-grid">{"".join(self.cards)}</div></body></html>'
+
+    def get(self, url):
+        self.current_url = url
+
+    def find_element(self, by, selector):
+        return FakeButton(self)
+
+    def find_elements(self, by, selector):
+        button = FakeButton(self)
+        return [button] if button.is_displayed() else []
+
+    def execute_script(self, script, *args):
+        if script == COUNT_CARDS_SCRIPT:
+            return len(self.cards)
+        if script == CARD_FRAGMENTS_SCRIPT:
+            fragments = self.cards[args[2]:]
+            self.fragments_transferred += len(fragments)
+            return fragments
+        if script == "arguments[0].click();":
+            if self.loads < self.max_loads:
+                self.loads += 1
+                self.cards.extend(_card(self.next_number + i) for i in range(CARDS_PER_LOAD))
+                self.next_number += CARDS_PER_LOAD
+            return None
+        raise AssertionError(f"Unexpected script: {script}")
+
+    def quit(self):
+        pass
+
+
+def test_listing_processor():
+    """Test that a 50-load listing session transfers and parses each card exactly once."""
+
+    print("=" * 60)
+    print("Testing Incremental Listing Processing")
+    print("=" * 60)
+
+    etengo = next(w for w in config_manager.get_websites() if w["level1_search"]["name"] == "Etengo")
+    browser = FakeEtengoBrowser(max_loads=49)
+
+    scraper = WebScraper()
+    scraper.mistral_handler = None
+    scraper.setup_driver = lambda: browser
+
+    print("\n1. Scanning a listing growing to 50 loads...")
+    projects = asyncio.run(scraper.scan_website(etengo, time_range=1))
+    total_cards = len(browser.cards)
+    print(f"   Cards in listing: {total_cards}, projects yielded: {len(projects)}")
+
+    assert browser.loads == 49
+    assert browser.fragments_transferred == total_cards, "Every card should be transferred exactly once"
+    assert browser.page_source_reads == 0, "The growing page should never be re-parsed"
+    print("   ✅ Each card transferred and parsed once, page source never parsed")
+
+    print("\n2. Duplicate cards are skipped...")
+    urls = [project["url"] for project in projects]
+    assert len(urls) == len(set(urls)) == total_cards - 1
+    print("   ✅ The repeated project was yielded only once")
+
+    return True
+
+
+def test_load_more_early_dispatch():
+    """Test that cards are dispatched while loading and that the cutoff stops the expansion."""
+
+    print("=" * 60)
+    print("Testing Load-More Early Dispatch")
+    print("=" * 60)
+
+    etengo = next(w for w in config_manager.get_websites() if w["level1_search"]["name"] == "Etengo")
+    etengo = copy.deepcopy(etengo)
+    etengo["level2_search"]["release-date-selector"] = "span.release"
+    browser = FakeEtengoBrowser(max_loads=49)
+
+    scraper = WebScraper()
+    scraper.mistral_handler = None
+    scraper.setup_driver = lambda: browser
+
+    async def scan():
+        loads_at_first_project = None
+        projects = []
+        async for project in scraper.scan_website_stream(etengo, time_range=7):
+            if loads_at_first_project is None:
+                loads_at_first_project = browser.loads
+            projects.append(project)
+        return loads_at_first_project, projects
+
+    print("\n1. Scanning until the release-date cutoff...")
+    loads_at_first_project, projects = asyncio.run(scan())
+    print(f"   First project after {loads_at_first_project} loads, {browser.loads} loads in total")
+
+    assert loads_at_first_project <= 1, "The first project should be dispatched before the listing is fully loaded"
+    print("   ✅ Projects are dispatched while the listing is still expanding")
+
+    assert len(projects) == RECENT_CARDS
+    assert browser.loads <= RECENT_CARDS // CARDS_PER_LOAD + 1, "Loading should stop once the cutoff is passed"
+    print("   ✅ Expansion stops right after the release-date cutoff")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_listing_processor() and test_load_more_early_dispatch()
+    if success:
+        print("\n🎉 Listing processor test completed successfully!")
+    else:
+        print("\n❌ Listing processor test failed!")
+        sys.exit(1)
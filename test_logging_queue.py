@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test to verify the queue-based logging setup, scan.* rate limiting and JSON lines.
+"""
+
+import sys
+import os
+import json
+import logging
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend import logger_config
+from backend.config_manager import config_manager
+from backend.logger_config import JsonFormatter, RateLimitFilter, setup_logging
+
+
+def _record(name, level=logging.INFO, msg="message"):
+    return logging.LogRecord(name, level, __file__, 1, msg, None, None)
+
+
+def test_logging_queue():
+    """Test rate limiting, sampling, JSON formatting and the background writer."""
+
+    print("=" * 60)
+    print("Testing Queue-Based Logging")
+    print("=" * 60)
+
+    print("\n1. Rate limiting scan.* records...")
+    rate_filter = RateLimitFilter("scan", records_per_second=3)
+    passed = [rate_filter.filter(_record("scan.abc.project.1")) for _ in range(10)]
+    assert passed.count(True) == 3
+    assert rate_filter.filter(_record("scan.abc", logging.WARNING)), "Warnings must always pass"
+    assert rate_filter.filter(_record("backend.matching_service")), "Other loggers are not limited"
+    assert rate_filter.filter(_record("scanner")), "Only the scan hierarchy is limited"
+    rate_filter._window_start -= 1.0  # Next window
+    record = _record("scan.abc")
+    assert rate_filter.filter(record)
+    assert record.suppressed == 7
+    print("   ✅ At most 3 records per second, suppressed count reported")
+
+    print("\n2. Sampling scan.* records...")
+    sample_filter = RateLimitFilter("scan", sample_rate=0.25)
+    passed = [sample_filter.filter(_record("scan.abc")) for _ in range(100)]
+    assert passed.count(True) == 25
+    print("   ✅ Every fourth record kept")
+
+    print("\n3. Formatting JSON lines...")
+    entry = json.loads(JsonFormatter().format(_record("scan.abc", msg="Ünïcode")))
+    assert entry["logger"] == "scan.abc"
+    assert entry["level"] == "INFO"
+    assert entry["message"] == "Ünïcode"
+    print("   ✅ Records are written as JSON objects")
+
+    print("\n4. Writing through the background listener...")
+    root_logger = logging.getLogger()
+    previous_handlers = list(root_logger.handlers)
+    previous_level = root_logger.level
+    log_config = config_manager.config["logging"]
+    previous_config = dict(log_config)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_file = os.path.join(tmp_dir, "app.log")
+        log_config.update({"file": log_file, "json": True, "queue": True})
+        os.environ.pop("LOG_FILE", None)
+        try:
+            setup_logging()
+            assert isinstance(root_logger.handlers[0], logging.handlers.QueueHandler)
+            logging.getLogger("test.logging_queue").info("Queued message")
+            logger_config._stop_queue_listener()  # Flushes the queue
+            for handler in root_logger.handlers:
+                root_logger.removeHandler(handler)
+
+            with open(log_file, encoding="utf-8") as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+            assert any(e["message"] == "Queued message" for e in entries)
+            print("   ✅ Records reach the file handler as JSON lines")
+        finally:
+            logger_config._stop_queue_listener()
+            log_config.clear()
+            log_config.update(previous_config)
+            root_logger.handlers[:] = previous_handlers
+            root_logger.setLevel(previous_level)
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_logging_queue()
+    if success:
+        print("\n🎉 Queue-based logging test completed successfully!")
+    else:
+        print("\n❌ Queue-based logging test failed!")
+        sys.exit(1)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test to verify match explanations and that normal matching does no per-requirement logging.
+"""
+
+import sys
+import os
+import asyncio
+import logging
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.models.core_models import Base, Project, Employee, Skill
+from backend.models.schemas import EmployeeMatchResponse
+from backend.matching_service import MatchingService
+from backend.requirements_service import requirements_service
+from backend.skill_index_service import skill_index_service
+
+EMBEDDINGS = {
+    "Python": [1.0, 0.0, 0.0],
+    "Python 3": [0.99, 0.05, 0.0],
+    "SQL": [0.0, 1.0, 0.0],
+    "Deutsch": [0.5, 0.5, 0.5],
+    "Deutschkenntnisse": [-0.5, 0.5, -0.5],
+    "Kommunikation": [1.0, 0.0, 0.0],
+}
+
+
+class FakeOpenAIHandler:
+    """Embedding handler returning the fixed embeddings above."""
+
+    async def get_embedding(self, text):
+        return EMBEDDINGS.get(text, [])
+
+
+class RecordingHandler(logging.Handler):
+    """Logging handler collecting all records."""
+
+    def __init__(self):
+        super().__init__(level=logging.DEBUG)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_match_explain():
+    """Test that explanations are only recorded on request."""
+
+    print("=" * 60)
+    print("Testing Match Explanations")
+    print("=" * 60)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    skill_index_service.invalidate()
+
+    logger = logging.getLogger("backend.matching_service")
+    handler = RecordingHandler()
+    previous_level = logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    try:
+        for title, requirements_tf in (
+            ("Backend", {"Python 3": 2, "SQL": 1, "Kommunikation": 1}),
+            ("German", {"Deutschkenntnisse": 1, "SQL": 1}),
+        ):
+            project = Project(title=title, tenderer="Test")
+            requirements_service.set_project_requirements(db, project, requirements_tf)
+            db.add(project)
+        db.commit()
+        for skill in db.query(Skill).all():
+            skill.set_embedding(EMBEDDINGS[skill.skill_name])
+        employee = Employee(name="Test Employee")
+        employee.set_skill_list(["Python", "Deutsch"])
+        db.add(employee)
+        db.commit()
+
+        matching_service = MatchingService()
+        matching_service.openai_handler = FakeOpenAIHandler()
+
+        print("\n1. Matching without explain...")
+        asyncio.run(matching_service.match_employee_to_projects(db, employee.id, threshold=0.9))  # Stores employee embeddings
+        handler.records.clear()
+        result = asyncio.run(matching_service.match_employee_to_projects(db, employee.id, threshold=0.9))
+        assert all("explanation" not in match for match in result["matches"])
+        messages = [record.getMessage() for record in handler.records]
+        for name in ("Python 3", "SQL", "Kommunikation", "Deutschkenntnisse", "Backend", "German"):
+            assert not any(name in message for message in messages), messages
+        print("   ✅ No explanation and no per-project or per-requirement log records")
+
+        print("\n2. Matching with explain...")
+        explained = asyncio.run(
+            matching_service.match_employee_to_projects(db, employee.id, threshold=0.9, explain=True)
+        )
+        by_title = {match["project_title"]: match for match in explained["matches"]}
+        decisions = {d["requirement"]: d for d in by_title["Backend"]["explanation"]["decisions"]}
+        assert decisions["Python 3"]["decision"] == "match"
+        assert decisions["Python 3"]["match_type"] == "cosine"
+        assert decisions["Python 3"]["employee_skill"] == "Python"
+        assert decisions["SQL"]["decision"] == "no_match"
+        assert decisions["Kommunikation"]["match_type"] == "soft_skill"
+        german = {d["requirement"]: d for d in by_title["German"]["explanation"]["decisions"]}
+        assert german["Deutschkenntnisse"]["match_type"] == "synonym"
+        print("   ✅ Decisions recorded for every requirement")
+
+        print("\n3. Scores are identical with and without explain...")
+        for plain, match in zip(result["matches"], explained["matches"]):
+            assert plain == {key: value for key, value in match.items() if key != "explanation"}
+        response = EmployeeMatchResponse(**result).model_dump(exclude_none=True)
+        assert "explanation" not in response["matches"][0]
+        print("   ✅ Explain does not change results")
+
+        return True
+
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(previous_level)
+        skill_index_service.invalidate()
+        db.close()
+
+
+if __name__ == "__main__":
+    success = test_match_explain()
+    if success:
+        print("\n🎉 Match explanation test completed successfully!")
+    else:
+        print("\n❌ Match explanation test failed!")
+        sys.exit(1)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test to verify the synthetic corpus generator and the matching benchmark.
+"""
+
+import sys
+import os
+import json
+import asyncio
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.models.core_models import Base, Project, ProjectRequirement, Skill, Employee
+from backend.matching_benchmark import (
+    compare_results, default_results_path, format_comparison, format_report, generate_corpus, load_result,
+    run_matching_benchmark, save_result
+)
+
+CORPUS = {"projects": 80, "skills": 60, "employees": 2, "dimensions": 16, "duplicate_fraction": 0.05, "seed": 7}
+
+
+def _generate(embedding):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    corpus = generate_corpus(db, embedding=embedding, **CORPUS)
+    return db, corpus
+
+
+def _cosine(vector1, vector2):
+    return sum(a * b for a, b in zip(vector1, vector2))
+
+
+def test_matching_benchmark():
+    """Test corpus generation, the measured operations and comparing results."""
+
+    print("=" * 60)
+    print("Testing Matching Benchmark")
+    print("=" * 60)
+
+    print("\n1. Generating corpora...")
+    db, corpus = _generate("clustered")
+    assert db.query(Project).count() == CORPUS["projects"]
+    assert db.query(Skill).count() == CORPUS["skills"]
+    assert db.query(Employee).count() == CORPUS["employees"]
+    assert db.query(ProjectRequirement).count() == corpus["requirements"]
+    assert corpus["duplicates"] > 0
+    for project in db.query(Project).limit(20):
+        assert sorted(project.get_requirements_list()) == sorted(req.skill.skill_name for req in project.requirements)
+    clustered = {skill.skill_name: skill.get_embedding() for skill in db.query(Skill)}
+    assert all(len(embedding) == CORPUS["dimensions"] for embedding in clustered.values())
+    rows = [(p.title, p.url, p.requirements_tf) for p in db.query(Project).order_by(Project.id)]
+    db.close()
+
+    db, _ = _generate("clustered")
+    assert rows == [(p.title, p.url, p.requirements_tf) for p in db.query(Project).order_by(Project.id)], "Same seed, same corpus"
+    db.close()
+
+    db, _ = _generate("random")
+    random_embeddings = {skill.skill_name: skill.get_embedding() for skill in db.query(Skill)}
+    db.close()
+    # Skill names carry their cluster: skill-<cluster>-<number>
+    same_cluster = [("skill-000-00000", "skill-000-00020"), ("skill-001-00001", "skill-001-00021")]
+    assert all(_cosine(clustered[a], clustered[b]) > 0.7 for a, b in same_cluster)
+    assert all(_cosine(random_embeddings[a], random_embeddings[b]) < 0.7 for a, b in same_cluster)
+    print(f"   ✅ {corpus['requirements']} requirements, {corpus['duplicates']} duplicates, clustered embeddings close within a cluster")
+
+    print("\n2. Running the benchmark...")
+    result = asyncio.run(run_matching_benchmark(embedding="clustered", **CORPUS))
+    operations = result["operations"]
+    assert list(operations) == ["tfidf", "matching", "deduplication"]
+    assert operations["matching"]["calls"] == CORPUS["employees"]
+    assert operations["matching"]["matches_per_call"] > 0
+    assert result["embedding_requests"] == 0, "Every corpus skill has an embedding"
+    assert operations["tfidf"]["skills_updated"] == CORPUS["skills"]
+    assert operations["deduplication"]["removed"] >= 1
+    for stats in operations.values():
+        assert stats["latency"]["p50"] <= stats["latency"]["p95"] <= stats["latency"]["max"]
+        assert stats["queries_per_call"] > 0
+        assert stats["peak_memory_mb"] is not None
+    report = format_report(result)
+    assert "queries/call" in report and "matching" in report
+    print(f"   ✅ Matching p50 {operations['matching']['latency']['p50'] * 1000:.0f} ms, "
+          f"{operations['matching']['queries_per_call']:.0f} queries per match")
+
+    print("\n3. Storing and comparing results...")
+    directory = tempfile.mkdtemp()
+    path = save_result(result, default_results_path(result, directory))
+    assert os.path.basename(path).startswith("matching-") and load_result(path) == json.loads(json.dumps(result))
+    slower = json.loads(json.dumps(result))
+    slower["operations"]["matching"]["latency"]["p95"] *= 2
+    slower["operations"]["tfidf"]["queries_per_call"] += 100
+    comparison = compare_results(result, slower)
+    regressions = {(entry["operation"], entry["metric"]) for entry in comparison if entry["regression"]}
+    assert regressions == {("matching", "latency.p95"), ("tfidf", "queries_per_call")}
+    assert not any(entry["regression"] for entry in compare_results(result, result))
+    assert "REGRESSION" in format_comparison(comparison, result, slower)
+    other_corpus = json.loads(json.dumps(result))
+    other_corpus["corpus"]["projects"] = 1000
+    try:
+        compare_results(result, other_corpus)
+        assert False, "Results of different corpora must not be compared"
+    except ValueError:
+        pass
+    print("   ✅ Regressions of latency and query count detected, different corpora refused")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_matching_benchmark()
+    if success:
+        print("\n🎉 Matching benchmark test completed successfully!")
+    else:
+        print("\n❌ Matching benchmark test failed!")
+        sys.exit(1)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test to verify the rate-limited, retrying Mistral client against a local fake Mistral server.
+"""
+
+import sys
+import os
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.mistral_client import MistralClientWrapper, MistralUnavailableError
+from backend.mistral_handler import MistralHandler
+
+FAST_RETRIES = {"backoff_base_seconds": 0.01, "backoff_max_seconds": 0.05, "requests_per_second": 1000, "burst": 10}
+
+PROJECT_JSON = {"title": "Python Entwickler", "requirements_tf": {"Python": 2, "Django": 1}}
+
+
+class FakeMistralServer(ThreadingHTTPServer):
+    """Serves chat completions, failing the first `failures` requests with `failure_status`."""
+
+    def __init__(self, failures=0, failure_status=429, delay=0.0):
+        super().__init__(("127.0.0.1", 0), FakeMistralRequestHandler)
+        self.failures = failures
+        self.failure_status = failure_status
+        self.delay = delay
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FakeMistralRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with server.lock:
+            server.requests += 1
+            request_number = server.requests
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delay)
+            if request_number <= server.failures:
+                self._send(server.failure_status, {"message": "Requests rate limit exceeded"}, {"Retry-After": "0"})
+                return
+            self._send(200, {
+                "id": f"cmpl-{request_number}",
+                "object": "chat.completion",
+                "model": "mistral-large-latest",
+                "created": 0,
+                "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": json.dumps(PROJECT_JSON)}
+                }]
+            })
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+def _start(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _handler(server, config):
+    handler = MistralHandler(api_key="test-key", server_url=server.url)
+    handler.api = MistralClientWrapper(handler.client, config)
+    return handler
+
+
+def test_mistral_client():
+    """Test retries on 429/5xx, bounded concurrency, rate limiting and the final error."""
+
+    print("=" * 60)
+    print("Testing Async Mistral Client Wrapper")
+    print("=" * 60)
+
+    print("\n1. Retrying rate-limited requests...")
+    server = _start(FakeMistralServer(failures=3, failure_status=429))
+    try:
+        handler = _handler(server, {**FAST_RETRIES, "max_retries": 5})
+        result = asyncio.run(handler.extract_project_details("<html><body><p>Python Entwickler gesucht</p></body></html>"))
+        assert result == PROJECT_JSON, "Requirements must not be lost to throttling"
+        assert server.requests == 4 and handler.api.retries == 3
+        assert handler.token_usage["prompt_tokens"] == 100
+    finally:
+        server.shutdown()
+    print("   ✅ Three 429 responses retried, requirements extracted")
+
+    print("\n2. Bounding concurrency of parallel extractions...")
+    server = _start(FakeMistralServer(delay=0.1))
+    try:
+        handler = _handler(server, {**FAST_RETRIES, "max_concurrency": 2})
+
+        async def extract_all():
+            return await asyncio.gather(*[handler.extract_project_details(f"<p>Projekt {i}</p>") for i in range(6)])
+
+        results = asyncio.run(extract_all())
+        assert all(result == PROJECT_JSON for result in results)
+        assert server.max_in_flight == 2, f"{server.max_in_flight} requests in flight"
+    finally:
+        server.shutdown()
+    print("   ✅ Never more than 2 requests in flight")
+
+    print("\n3. Limiting the request rate...")
+    server = _start(FakeMistralServer())
+    try:
+        handler = _handler(server, {**FAST_RETRIES, "requests_per_second": 20, "burst": 1, "max_concurrency": 10})
+
+        async def extract_all():
+            started = time.perf_counter()
+            await asyncio.gather(*[handler.extract_release_date(f"<p>Projekt {i}</p>") for i in range(5)])
+            return time.perf_counter() - started
+
+        elapsed = asyncio.run(extract_all())
+        assert elapsed >= 0.18, f"5 requests at 20/s took only {elapsed:.3f}s"
+    finally:
+        server.shutdown()
+    print(f"   ✅ 5 requests at 20 requests/s took {elapsed:.2f}s")
+
+    print("\n4. Giving up after the retries...")
+    server = _start(FakeMistralServer(failures=100, failure_status=503))
+    try:
+        handler = _handler(server, {**FAST_RETRIES, "max_retries": 2})
+        try:
+            asyncio.run(handler.extract_project_details("<p>Projekt</p>"))
+            raise AssertionError("MistralUnavailableError expected")
+        except MistralUnavailableError:
+            pass
+        assert server.requests == 3
+    finally:
+        server.shutdown()
+    print("   ✅ MistralUnavailableError raised instead of an empty result")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_mistral_client()
+    if success:
+        print("\n🎉 Mistral client test completed successfully!")
+    else:
+        print("\n❌ Mistral client test failed!")
+        sys.exit(1)
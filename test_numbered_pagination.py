@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test to verify that numbered listing pages are loaded concurrently and the fan-out stops at the time range.
+"""
+
+import sys
+import os
+import time
+import asyncio
+import tempfile
+import threading
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.config_manager import config_manager
+from backend.numbered_pagination import get_page_url_template, page_url, page_number
+from backend.page_archive import PageArchive
+from backend.web_scraper import WebScraper
+
+PAGES = 10
+CARDS_PER_PAGE = 4
+CONCURRENCY = 3
+PAGE_LOAD_SECONDS = 0.1
+
+
+def _page_html(number, release_date):
+    cards = "".join(
+        f'<div class="project-container"><a class="project-title" href="https://www.freelancermap.de/projekt/p{number}-{card}">'
+        f'Projekt {number}-{card}</a><span class="created-date">eingetragen am: {release_date}</span></div>'
+        for card in range(1, CARDS_PER_PAGE + 1)
+    )
+    return f'<html><body><div class="project-list">{cards}</div></body></html>'
+
+
+class FakeListingPages:
+    """Stands in for loading listing pages in the browser; pages from old_from on are a month old."""
+
+    def __init__(self, template, pages=PAGES, old_from=None):
+        self.template = template
+        self.pages = pages
+        self.old_from = old_from
+        self.loaded = []
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, url, project_list_selector):
+        with self._lock:
+            self.loaded.append(page_number(self.template, url))
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            time.sleep(PAGE_LOAD_SECONDS)
+            number = page_number(self.template, url)
+            if number > self.pages:
+                return ""
+            age = 30 if self.old_from and number >= self.old_from else 0
+            return _page_html(number, (datetime.now() - timedelta(days=age)).strftime("%d.%m.%Y"))
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def _scan(website_config, pages):
+    level3_urls = []
+    scraper = WebScraper()
+    scraper.mistral_handler = None
+    scraper.page_archive = PageArchive(tempfile.mkdtemp())
+    scraper._load_listing_page = pages
+
+    def no_session_browser():
+        raise AssertionError("Numbered pages do not use the session's browser")
+
+    async def level3_scan_batch(project_urls, scan_id=None, website_config=None):
+        level3_urls.extend(project_urls)
+        return [{"requirements_tf": {"Python": 1}, "url": url} for url in project_urls]
+
+    scraper.setup_driver = no_session_browser
+    scraper.level3_scan_batch = level3_scan_batch
+
+    async def scan():
+        return [project["url"] async for project in scraper.scan_website_stream(website_config, 7)]
+
+    return asyncio.run(scan()), level3_urls
+
+
+def test_numbered_pagination():
+    """Test page URL templates, concurrent page loading and stopping at the time range."""
+
+    print("=" * 60)
+    print("Testing Numbered Page Fan-Out")
+    print("=" * 60)
+
+    freelancermap = next(w for w in config_manager.get_websites() if w["level1_search"]["name"] == "Freelancermap")
+    freelancermap = {**freelancermap, "level1_search": {**freelancermap["level1_search"], "page-concurrency": CONCURRENCY}}
+    template = get_page_url_template(freelancermap)
+
+    print("\n1. Deriving page URLs...")
+    assert page_url(template, 3) == "https://www.freelancermap.de/projektboerse.html?pagenr=3"
+    assert page_number(template, page_url(template, 12)) == 12
+    assert page_number(template, "https://www.freelancermap.de/projektboerse.html") is None
+    etengo = next(w for w in config_manager.get_websites() if w["level1_search"]["name"] == "Etengo")
+    assert get_page_url_template(etengo) is None, "Load-more sites keep their pagination"
+    print("   ✅ Page URLs built from and matched against the template")
+
+    print("\n2. Scanning until the last page...")
+    pages = FakeListingPages(template, pages=5)
+    started = time.monotonic()
+    projects, level3_urls = _scan(freelancermap, pages)
+    elapsed = time.monotonic() - started
+    assert len(projects) == 5 * CARDS_PER_PAGE and level3_urls == projects
+    assert [url.split("/p")[-1] for url in projects][:CARDS_PER_PAGE + 1] == ["1-1", "1-2", "1-3", "1-4", "2-1"], "Cards keep page order"
+    assert 1 < pages.max_running <= CONCURRENCY
+    assert elapsed < 6 * PAGE_LOAD_SECONDS, "Pages load concurrently"
+    print(f"   ✅ {len(projects)} projects from 5 pages, up to {pages.max_running} pages loading at once ({elapsed:.2f}s)")
+
+    print("\n3. Stopping at the time range...")
+    pages = FakeListingPages(template, old_from=4)
+    projects, level3_urls = _scan(freelancermap, pages)
+    assert len(projects) == 3 * CARDS_PER_PAGE and level3_urls == projects
+    assert max(pages.loaded) < 4 + CONCURRENCY, "No further pages are requested after the cutoff"
+    print(f"   ✅ Stopped after page 4 of {PAGES}; pages loaded: {sorted(pages.loaded)}")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_numbered_pagination()
+    if success:
+        print("\n🎉 Numbered page fan-out test completed successfully!")
+    else:
+        print("\n❌ Numbered page fan-out test failed!")
+        sys.exit(1)
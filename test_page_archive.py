@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test to verify the compressed page archive and re-extraction of stored projects from it.
+"""
+
+import sys
+import os
+import json
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.config_manager import config_manager
+from backend.models.core_models import Base, Project
+from backend.page_archive import INDEX_FILE, PageArchive
+from backend.refresh_service import RefreshService
+from backend.requirements_service import requirements_service
+from backend.web_scraper import WebScraper
+
+PROJECTS = 7
+
+
+def _page(number, version=1):
+    return f"<html><body><main><h1>Projekt {number}</h1><p>Version {version}: Python, Kubernetes</p></main></body></html>"
+
+
+class FakeBrowser:
+    """WebDriver stand-in serving one page."""
+
+    def __init__(self, html):
+        self.page_source = html
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        pass
+
+
+class FakeMistralHandler:
+    """Extracts the project number from the page and counts batches running at once."""
+
+    def __init__(self):
+        self.batches = []
+        self.running = 0
+        self.max_running = 0
+
+    @staticmethod
+    def _extract(html):
+        title = html.split("<h1>")[1].split("</h1>")[0]
+        return {"title": f"{title} (re-extracted)", "workload": "40", "requirements_tf": {"Python": 2, "Kubernetes": 1}}
+
+    async def extract_project_details_batch(self, pages, scan_id=None):
+        self.batches.append(len(pages))
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.05)
+        self.running -= 1
+        return {page["id"]: self._extract(page["html"]) for page in pages}
+
+    async def extract_project_details(self, page_source, scan_id=None, content_config=None):
+        self.batches.append(1)
+        return self._extract(page_source)
+
+    extract_requirements_and_description = extract_project_details
+
+
+def test_page_archive():
+    """Test content-addressed storage, the URL index and offline re-extraction."""
+
+    print("=" * 60)
+    print("Testing Page Archive And Re-Extraction")
+    print("=" * 60)
+
+    archive = PageArchive(tempfile.mkdtemp())
+
+    print("\n1. Storing pages content-addressed and compressed...")
+    url = "https://www.etengo.de/projekt/1"
+    first = archive.store(url, _page(1), "detail", "Etengo")
+    assert archive.store("https://etengo.de/projekt/1/", _page(1), "detail", "Etengo") == first, "Same content, same address"
+    second = archive.store(url, _page(1, version=2), "detail", "Etengo")
+    stats = archive.stats()
+    assert stats["fetches"] == 3 and stats["urls"] == 1 and stats["blobs"] == 2
+    assert stats["compressed_bytes"] > 0 and stats["codec"] in ("zstd", "gzip")
+    assert archive.load(first) == _page(1)
+    print(f"   ✅ 3 fetches stored as {stats['blobs']} {stats['codec']} blobs ({stats['compressed_bytes']} bytes)")
+
+    print("\n2. Looking pages up by URL and fetch time...")
+    history = archive.history(url)
+    assert [record["sha256"] for record in history] == [second, first, first]
+    assert archive.latest(url) == _page(1, version=2)
+    assert archive.latest(url, kind="listing") is None
+    assert PageArchive(str(archive.directory)).latest(url) == _page(1, version=2), "Index read back from disk"
+    print("   ✅ Latest fetch wins, index survives a restart")
+
+    print("\n3. Archiving pages fetched by the scraper...")
+    scraper = WebScraper()
+    scraper.page_archive = archive
+    scraper.mistral_handler = FakeMistralHandler()
+    scraper.setup_driver = lambda: FakeBrowser(_page(99))
+    asyncio.run(scraper._extract_project_data_with_mistral("https://www.etengo.de/projekt/99", None, {"level1_search": {"name": "Etengo"}}))
+    assert archive.history("https://www.etengo.de/projekt/99")[0]["site"] == "Etengo"
+    print("   ✅ Detail page archived (in a worker thread) when loaded")
+
+    print("\n4. Re-extracting stored projects from the archive...")
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    for number in range(2, PROJECTS + 2):
+        project = Project(title=f"Projekt {number}", url=f"https://www.etengo.de/projekt/{number}", tenderer="Etengo")
+        requirements_service.set_project_requirements(db, project, {"Python": 1})
+        db.add(project)
+        if number <= PROJECTS:
+            archive.store(project.url, _page(number), "detail", "Etengo")  # The last project was never archived
+    db.commit()
+
+    def no_browser():
+        raise AssertionError("Re-extraction does not load pages")
+
+    scraper.setup_driver = no_browser
+    scraper.mistral_handler = FakeMistralHandler()
+    batch_max_projects = config_manager.get("mistral.batch_max_projects")
+    config_manager.config["mistral"]["batch_max_projects"] = 2
+    try:
+        result = asyncio.run(RefreshService(web_scraper=scraper, archive=archive).reextract_projects(db))
+    finally:
+        config_manager.config["mistral"]["batch_max_projects"] = batch_max_projects
+    assert result["checked"] == PROJECTS and result["updated"] == PROJECTS - 1 and result["missing"] == 1
+    assert scraper.mistral_handler.batches == [2, 2, 2]
+    assert scraper.mistral_handler.max_running == 2, "Batches run in parallel up to the configured concurrency"
+    project = db.query(Project).filter(Project.url == "https://www.etengo.de/projekt/3").one()
+    assert project.title == "Projekt 3 (re-extracted)" and project.workload == "40"
+    assert sorted(project.get_requirements_list()) == ["Kubernetes", "Python"]
+    db.close()
+    print(f"   ✅ {result['updated']} projects re-extracted in {len(scraper.mistral_handler.batches)} batches, {result['missing']} without archived page")
+
+    print("\n5. Pruning fetches by age and size...")
+    archive = PageArchive(tempfile.mkdtemp())
+    digests = [archive.store(f"https://www.etengo.de/projekt/{number}", _page(number), "detail", "Etengo") for number in range(4)]
+    archive.store("https://www.etengo.de/projekt/3", _page(3), "detail", "Etengo")  # Refetch keeps its blob alive
+    index_path = archive.directory / INDEX_FILE
+    records = [json.loads(line) for line in index_path.read_text(encoding="utf-8").splitlines()]
+    for age_days, record in zip([200, 60, 30, 20, 0], records):
+        record["fetched_at"] = (datetime.now() - timedelta(days=age_days)).isoformat()
+    index_path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+    archive._index = None
+
+    assert archive.prune(max_bytes=0, max_age_days=0) == {"removed_fetches": 0, "removed_blobs": 0, "freed_bytes": 0}
+    result = archive.prune(max_bytes=0, max_age_days=90)
+    assert result["removed_fetches"] == 1 and result["removed_blobs"] == 1 and result["freed_bytes"] > 0
+    assert archive.history("https://www.etengo.de/projekt/0") == [] and archive.load(digests[0]) is None
+    max_bytes = archive.stats()["compressed_bytes"] - 1
+    result = archive.prune(max_bytes=max_bytes, max_age_days=0)
+    assert result["removed_fetches"] == 1 and result["removed_blobs"] == 1, "Oldest fetches go until the blobs fit"
+    assert archive.latest("https://www.etengo.de/projekt/1") is None and archive.latest("https://www.etengo.de/projekt/2") == _page(2)
+    assert PageArchive(str(archive.directory)).history("https://www.etengo.de/projekt/3")[0]["sha256"] == digests[3]
+    print(f"   ✅ Old fetches dropped, archive kept within {max_bytes} bytes")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_page_archive()
+    if success:
+        print("\n🎉 Page archive test completed successfully!")
+    else:
+        print("\n❌ Page archive test failed!")
+        sys.exit(1)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test to verify the known-project index: URL normalization and updates on commit/rollback.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.models.core_models import Base, Project
+from backend.project_index_service import KnownProjectIndex, project_index_service
+from backend.utils.url_utils import normalize_project_url
+
+
+def _create_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def test_project_index():
+    """Test URL variants, project id lookups and event-driven index updates."""
+
+    print("=" * 60)
+    print("Testing Known-Project Index")
+    print("=" * 60)
+
+    print("\n1. Normalizing URL variants...")
+    base = normalize_project_url("https://www.etengo.de/projekt/123")
+    assert normalize_project_url("https://www.etengo.de/projekt/123/") == base
+    assert normalize_project_url("http://etengo.de/projekt/123?utm_source=mail&utm_medium=x#top") == base
+    assert normalize_project_url("https://WWW.ETENGO.DE:443/projekt/123") == base
+    assert normalize_project_url("https://www.etengo.de/projekt/124") != base
+    assert normalize_project_url("https://site.de/p?id=2&page=1") == normalize_project_url("https://site.de/p?page=1&id=2&gclid=abc")
+    assert normalize_project_url("/projekt/123") is None
+    print("   ✅ Tracking parameters, trailing slashes, case and fragments are ignored")
+
+    print("\n2. Looking up projects by URL and site project id...")
+    index = KnownProjectIndex()
+    index.add("https://www.etengo.de/projekt/123", "123")
+    assert index.is_known("https://etengo.de/projekt/123/?utm_campaign=new")
+    assert index.is_known("https://www.etengo.de/projekt/123-renamed-slug", "123")
+    assert not index.is_known("https://www.freelancermap.de/projekt/abc", "123"), "Project ids are per site"
+    assert not index.is_known(None)
+    index.discard("https://www.etengo.de/projekt/123", "123")
+    assert not index.is_known("https://www.etengo.de/projekt/123", "123")
+    print("   ✅ Known projects found by URL variant or project id on the same site")
+
+    print("\n3. Keeping the index current from database changes...")
+    db = _create_session()
+    project_index_service.invalidate()
+    try:
+        db.add(Project(title="Stored", url="https://www.etengo.de/projekt/1", project_id="1"))
+        db.commit()
+        known = project_index_service.get_index(db)
+        assert len(known) == 1
+
+        db.add(Project(title="New", url="https://www.etengo.de/projekt/2", project_id="2"))
+        db.flush()
+        assert not known.is_known("https://www.etengo.de/projekt/2"), "Uncommitted inserts are not known yet"
+        db.commit()
+        assert known.is_known("https://www.etengo.de/projekt/2/")
+        print("   ✅ Committed inserts are added")
+
+        db.add(Project(title="Rolled back", url="https://www.etengo.de/projekt/3"))
+        db.flush()
+        db.rollback()
+        assert not known.is_known("https://www.etengo.de/projekt/3")
+        print("   ✅ Rolled back inserts are discarded")
+
+        project = db.query(Project).filter(Project.project_id == "2").one()
+        project.url = "https://www.etengo.de/projekt/22"
+        project.project_id = "22"
+        db.commit()
+        assert not known.is_known("https://www.etengo.de/projekt/2")
+        assert known.is_known("https://www.etengo.de/projekt/22")
+        print("   ✅ Updated URLs are re-keyed")
+
+        db.delete(project)
+        db.commit()
+        assert not known.is_known("https://www.etengo.de/projekt/22")
+        assert known.is_known("https://www.etengo.de/projekt/1")
+        print("   ✅ Deleted projects are removed")
+    finally:
+        db.close()
+        project_index_service.invalidate()
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_project_index()
+    if success:
+        print("\n🎉 Known-project index test completed successfully!")
+    else:
+        print("\n❌ Known-project index test failed!")
+        sys.exit(1)
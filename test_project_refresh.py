@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test to verify that a refresh only re-extracts projects whose page content changed.
+"""
+
+import sys
+import os
+import json
+import asyncio
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.models.core_models import Base, Project
+from backend.refresh_service import RefreshService
+from backend.scan_job_service import ScanJobService
+from backend.requirements_service import requirements_service
+from backend.utils.content_utils import content_hash
+
+PAGE_TEXT = "Senior Python Entwickler gesucht. " * 10
+
+
+def _page(text, markup="p"):
+    return f"<html><head><script>var t = {len(text)};</script></head><body><{markup}>{text}</{markup}></body></html>"
+
+
+class FakeScraper:
+    """Level3 scraper stand-in counting the (expensive) extractions."""
+
+    def __init__(self):
+        self.extractions = []
+
+    async def level3_scan(self, project_url, scan_id=None, website_config=None):
+        self.extractions.append(project_url)
+        return {"title": "Python Lead", "rate": 110, "requirements_tf": {"Python": 3, "Kubernetes": 1}}
+
+
+class FakeRefreshService(RefreshService):
+    """Refresh service serving pages from a dict instead of the network."""
+
+    def __init__(self, pages):
+        super().__init__(web_scraper=FakeScraper())
+        self.pages = pages
+        self.rendered_pages = {}
+        self.requests = []
+
+    def _fetch_browser(self, url):
+        return self.rendered_pages[url]
+
+    def _fetch_http(self, url, etag, last_modified):
+        self.requests.append((url, etag))
+        html, page_etag = self.pages[url]
+        if etag and etag == page_etag:
+            return {"status": 304, "html": None, "etag": None, "last_modified": None}
+        return {"status": 200, "html": html, "etag": page_etag, "last_modified": None}
+
+
+def _create_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def test_project_refresh():
+    """Test baseline hashing, conditional requests, hash comparison and re-extraction."""
+
+    print("=" * 60)
+    print("Testing Project Refresh With Change Detection")
+    print("=" * 60)
+
+    db = _create_session()
+    urls = [f"https://www.etengo.de/projekt/{i}" for i in range(3)]
+    for i, url in enumerate(urls):
+        project = Project(title=f"Project {i}", url=url, tenderer="Etengo", rate="N/A")
+        requirements_service.set_project_requirements(db, project, {"Python": 1})
+        db.add(project)
+    db.commit()
+
+    pages = {url: (_page(PAGE_TEXT), f'"v1-{i}"') for i, url in enumerate(urls)}
+    service = FakeRefreshService(pages)
+
+    print("\n1. First refresh records baselines without extraction...")
+    result = asyncio.run(service.refresh_projects(db))
+    assert result["baseline"] == 3 and result["updated"] == 0
+    assert not service.web_scraper.extractions
+    assert all(p.content_hash == content_hash(_page(PAGE_TEXT)) and p.content_hash_source == "http" for p in db.query(Project).all())
+    print("   ✅ Content hashes stored, no Mistral calls")
+
+    print("\n2. Unchanged pages are detected without extraction...")
+    pages[urls[1]] = (_page(PAGE_TEXT, markup="div"), '"v2-1"')  # Markup-only change, new ETag
+    service.requests.clear()
+    result = asyncio.run(service.refresh_projects(db))
+    assert [etag for _, etag in service.requests] == ['"v1-0"', '"v1-1"', '"v1-2"'], "Stored ETags are sent"
+    assert result["unchanged"] == 3 and result["updated"] == 0
+    assert not service.web_scraper.extractions
+    print("   ✅ 304 responses and markup-only changes skip re-extraction")
+
+    print("\n3. Changed content is re-extracted and updated...")
+    pages[urls[2]] = (_page(PAGE_TEXT + " Kubernetes erforderlich."), '"v2-2"')
+    result = asyncio.run(service.refresh_projects(db))
+    assert result["updated"] == 1 and result["unchanged"] == 2
+    assert service.web_scraper.extractions == [urls[2]]
+
+    changed = db.query(Project).filter(Project.url == urls[2]).one()
+    assert changed.title == "Python Lead"
+    assert changed.rate == "110"
+    assert changed.tenderer == "Etengo", "Fields missing from the extraction are kept"
+    assert changed.get_requirements_tf() == {"Python": 3, "Kubernetes": 1}
+    assert {req.skill.skill_name for req in changed.requirements} == {"Python", "Kubernetes"}
+    assert changed.http_etag == '"v2-2"'
+    print("   ✅ Only the changed project was re-extracted and updated")
+
+    print("\n4. Limiting a refresh to the stalest projects...")
+    result = asyncio.run(service.refresh_projects(db, limit=1))
+    assert result["checked"] == 1
+    print("   ✅ Refresh limited to one project")
+
+    print("\n5. Switching between plain and rendered pages...")
+    pages[urls[0]] = ("<html><body>Bitte JavaScript aktivieren</body></html>", '"v2-0"')  # Too little text for HTTP
+    service.rendered_pages[urls[0]] = _page("Projektdetails: " + PAGE_TEXT)
+    result = asyncio.run(service.refresh_projects(db))
+    switched = db.query(Project).filter(Project.url == urls[0]).one()
+    assert result["baseline"] == 1 and result["updated"] == 0
+    assert switched.content_hash_source == "browser" and switched.content_hash == content_hash(service.rendered_pages[urls[0]])
+    result = asyncio.run(service.refresh_projects(db))
+    assert result["unchanged"] == 3 and result["updated"] == 0
+    assert service.web_scraper.extractions == [urls[2]], "No re-extraction because the fetch source changed"
+    print("   ✅ Hash of the other fetch source replaced by a baseline, not compared")
+
+    print("\n6. Running the refresh as a background job...")
+
+    async def run_job():
+        job_service = ScanJobService(session_factory=sessionmaker(bind=db.get_bind()), refresh_service=service)
+        job = job_service.start_refresh_job(limit=2)
+        await job.task
+        return job, [json.loads(payload) for _, payload in job.events]
+
+    job, events = asyncio.run(run_job())
+    assert job.status == "complete" and job.to_dict()["kind"] == "refresh"
+    assert [event["type"] for event in events] == ["start", "project_refreshed", "project_refreshed", "complete"]
+    assert events[-1]["checked"] == 2 and events[-1]["scan_id"] == job.scan_id
+    print(f"   ✅ Refresh job {job.scan_id} published {len(events)} events")
+
+    db.close()
+    return True
+
+
+if __name__ == "__main__":
+    success = test_project_refresh()
+    if success:
+        print("\n🎉 Project refresh test completed successfully!")
+    else:
+        print("\n❌ Project refresh test failed!")
+        sys.exit(1)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test to verify the normalized project_requirements join table.
+"""
+
+import sys
+import os
+import math
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.models.core_models import Base, Project, ProjectRequirement, Skill
+from backend.requirements_service import requirements_service
+from backend.tfidf_service import tfidf_service
+
+
+def _create_session():
+    """Create a session on a fresh in-memory database."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def _add_project(db, title, requirements_tf):
+    project = Project(title=title, tenderer="Test")
+    requirements_service.set_project_requirements(db, project, requirements_tf)
+    db.add(project)
+    db.commit()
+    return project
+
+
+def test_project_requirements_table():
+    """Test writing, reading and document frequencies of normalized requirements."""
+
+    print("=" * 60)
+    print("Testing project_requirements Join Table")
+    print("=" * 60)
+
+    db = _create_session()
+    try:
+        print("\n1. Writing requirements...")
+        p1 = _add_project(db, "Project 1", {"Python": 3, "SQL": 2})
+        p2 = _add_project(db, "Project 2", {"Python": 1, "Kubernetes": 4})
+        p3 = _add_project(db, "Project 3", ["Java", "SQL"])  # Old list format
+
+        assert db.query(ProjectRequirement).count() == 6
+        assert db.query(Skill).count() == 4
+        assert p3.get_requirements_tf() == {"Java": 1, "SQL": 1}, "JSON mirror should be written"
+        print("   ✅ Join rows and JSON mirror written")
+
+        print("\n2. Reading requirements map...")
+        requirements_map = requirements_service.get_requirements_map(db)
+        assert requirements_map[p1.id] == {"Python": 3, "SQL": 2}
+        assert requirements_map[p2.id] == {"Kubernetes": 4, "Python": 1}
+        print("   ✅ Requirements map matches")
+
+        print("\n3. Looking up projects by skill...")
+        assert requirements_service.get_project_ids_for_skills(db, ["Kubernetes"]) == {p2.id}
+        assert requirements_service.get_project_ids_for_skills(db, ["SQL", "Java"]) == {p1.id, p3.id}
+        print("   ✅ Skill lookups return the right projects")
+
+        print("\n4. Calculating IDF factors with GROUP BY...")
+        idf_factors = tfidf_service.calculate_idf_factors(db)
+        assert math.isclose(idf_factors["Python"], math.log(3 / 2))
+        assert math.isclose(idf_factors["Kubernetes"], math.log(3))
+        print(f"   ✅ IDF factors: {idf_factors}")
+
+        print("\n5. Updating requirements of an existing project...")
+        requirements_service.set_project_requirements(db, p1, {"Python": 5, "Docker": 1})
+        db.commit()
+        assert requirements_service.get_requirements_map(db, [p1.id])[p1.id] == {"Python": 5, "Docker": 1}
+        assert requirements_service.get_project_ids_for_skills(db, ["SQL"]) == {p3.id}
+        print("   ✅ Stale requirements removed, new ones added")
+
+        print("\n6. Deleting a project removes its requirements...")
+        db.delete(p2)
+        db.commit()
+        assert requirements_service.get_project_ids_for_skills(db, ["Kubernetes"]) == set()
+        print("   ✅ Requirements cascade with the project")
+
+        print("\n7. Rebuilding the join table from JSON...")
+        db.query(ProjectRequirement).delete()
+        db.commit()
+        assert requirements_service.rebuild_from_json(db) == 2
+        assert requirements_service.get_requirements_map(db)[p3.id] == {"Java": 1, "SQL": 1}
+        print("   ✅ Migration from the JSON column works")
+
+        print("\n8. Backfilling projects stored before the join table...")
+        legacy = Project(title="Legacy Project", tenderer="Test", requirements_tf='{"Python": 2, "Go": 1}')
+        db.add_all([legacy, Project(title="Empty Project", tenderer="Test", requirements_tf="{}")])
+        db.commit()
+        assert requirements_service.get_unmigrated_project_ids(db) == {legacy.id}
+        assert requirements_service.backfill_from_json(db) == 1
+        assert requirements_service.get_unmigrated_project_ids(db) == set()
+        assert requirements_service.get_requirements_map(db, [legacy.id])[legacy.id] == {"Python": 2, "Go": 1}
+        assert requirements_service.backfill_from_json(db) == 0, "Migrated projects are left alone"
+        assert math.isclose(tfidf_service.calculate_idf_factors(db)["Go"], math.log(3)), "Backfilled project counts for IDF"
+        print("   ✅ Only projects without join rows backfilled, IDF counts them")
+
+        return True
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    success = test_project_requirements_table()
+    if success:
+        print("\n🎉 project_requirements test completed successfully!")
+    else:
+        print("\n❌ project_requirements test failed!")
+        sys.exit(1)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test to verify that project pages are compacted to their content region within the token budget.
+"""
+
+import sys
+import os
+import asyncio
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.mistral_client import MistralClientWrapper
+from backend.mistral_handler import MistralHandler
+from backend.prompt_compactor import compact_page, estimate_tokens
+
+POSTING = "Für unseren Kunden suchen wir einen Python Entwickler mit Erfahrung in Django und PostgreSQL. " * 5
+BOILERPLATE = (
+    '<header><nav>Start Projekte Kontakt Über uns Karriere Login</nav></header>'
+    '<div class="cookie-banner">Wir verwenden Cookies, um Ihnen das beste Erlebnis zu bieten. Akzeptieren Ablehnen</div>'
+    '<aside class="related-projects">' + "Weitere Projekte: Java Entwickler, SAP Berater, Scrum Master. " * 10 + '</aside>'
+    '<footer>Impressum Datenschutz AGB © 2025</footer>'
+)
+
+
+def _page(content):
+    return f'<html><head><script>tracking()</script></head><body>{BOILERPLATE}<main>{content}</main></body></html>'
+
+
+class FakeUsage:
+    prompt_tokens = 321
+    completion_tokens = 45
+
+
+class FakeMessage:
+    content = '{"title": "Python Entwickler", "requirements_tf": {"Python": 2}}'
+
+
+class FakeChoice:
+    message = FakeMessage()
+
+
+class FakeResponse:
+    usage = FakeUsage()
+    choices = [FakeChoice()]
+
+
+class FakeChat:
+    def __init__(self):
+        self.prompts = []
+
+    async def complete_async(self, model, messages, temperature, max_tokens, response_format=None):
+        self.prompts.append(messages[1]["content"])
+        return FakeResponse()
+
+
+class FakeClient:
+    def __init__(self):
+        self.chat = FakeChat()
+
+
+def test_prompt_compaction():
+    """Test region selection, boilerplate fallback, token budget and usage recording."""
+
+    print("=" * 60)
+    print("Testing Prompt Compaction")
+    print("=" * 60)
+
+    html = _page(f'<div class="breadcrumb">Start / Projekte</div><div class="project-detail">{POSTING}</div>')
+    content_config = {"content-region-selectors": [".project-detail", "main"]}
+
+    print("\n1. Using the configured content region...")
+    page = compact_page(html, content_config, max_tokens=3000)
+    assert page.source == "region"
+    assert page.text == POSTING.strip()
+    assert page.tokens < page.original_tokens / 2
+    print(f"   ✅ ~{page.tokens} instead of ~{page.original_tokens} tokens")
+
+    print("\n2. Falling back to boilerplate removal...")
+    page = compact_page(html, {"content-region-selectors": [".missing"]}, max_tokens=3000)
+    assert page.source == "boilerplate_removed"
+    assert "Python Entwickler" in page.text
+    for noise in ("Impressum", "Cookies", "Weitere Projekte", "Login", "Start / Projekte", "tracking"):
+        assert noise not in page.text, f"Boilerplate left in text: {noise}"
+    print("   ✅ Navigation, banners, teasers and footers removed")
+
+    print("\n3. Keeping pages wrapped in a form...")
+    page = compact_page(f"<html><body><form>{POSTING}</form></body></html>", max_tokens=3000)
+    assert page.source == "full_text" and "Django" in page.text
+    print("   ✅ Full text kept when boilerplate removal would drop everything")
+
+    print("\n4. Enforcing the token budget...")
+    page = compact_page(_page(POSTING * 20), content_config, max_tokens=100)
+    assert page.truncated
+    assert estimate_tokens(page.text) <= 100
+    assert not page.text.endswith(" ")
+    print(f"   ✅ Text cut to ~{page.tokens} tokens")
+
+    print("\n5. Recording token counts per call...")
+    handler = MistralHandler(api_key="test-key")
+    handler.client = FakeClient()
+    handler.api = MistralClientWrapper(handler.client)
+    result = asyncio.run(handler.extract_project_details(html, content_config=content_config))
+    assert result["title"] == "Python Entwickler"
+    prompt = handler.client.chat.prompts[0]
+    assert "impressum" not in prompt and "django" in prompt
+    assert handler.token_usage["calls"] == 1
+    assert handler.token_usage["prompt_tokens"] == 321
+    assert handler.token_usage["completion_tokens"] == 45
+    print("   ✅ Prompt contains only the posting, token usage recorded")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_prompt_compaction()
+    if success:
+        print("\n🎉 Prompt compaction test completed successfully!")
+    else:
+        print("\n❌ Prompt compaction test failed!")
+        sys.exit(1)
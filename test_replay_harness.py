@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Test to verify recording scans, replaying them offline and the scan benchmark.
+"""
+
+import sys
+import os
+import re
+import json
+import asyncio
+import tempfile
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.config_manager import config_manager
+from backend.mistral_handler import MistralHandler
+from backend.page_archive import PageArchive
+from backend.replay_harness import FixtureSet, ReplayBrowser, ReplayServer, record_fixtures, replay_openai_handler, replay_scraper
+from backend.scan_benchmark import format_report, run_benchmark
+from backend.web_scraper import WebScraper
+
+SKILLS = [["Python", "Kubernetes"], ["Java", "Spring"], ["SAP", "ABAP"]]
+FREELANCERMAP_PAGES = 2
+CARDS_PER_PAGE = 4
+ETENGO_CARDS = 15
+ETENGO_CARDS_PER_LOAD = 5
+RANDSTAD_CARDS = 3
+LISTING_PAGES = 10
+MISTRAL_LATENCY = 0.05
+
+
+def _detail(number, title):
+    skills = ", ".join(SKILLS[number % len(SKILLS)])
+    return f"<html><body><main><h1>{title}</h1><p>Ort: Berlin</p><p>Gesucht: {skills}</p></main></body></html>"
+
+
+def _live_site(directory):
+    """Fixtures standing in for the live sites: listings and detail pages of all three configured sites."""
+    live = FixtureSet(directory)
+    today = datetime.now().strftime("%d.%m.%Y")
+    expected = {}
+
+    for page in range(1, LISTING_PAGES + 1):  # Pages after the last one have an empty list
+        cards = ""
+        for card in range(CARDS_PER_PAGE if page <= FREELANCERMAP_PAGES else 0):
+            number = page * 10 + card
+            url = f"https://www.freelancermap.de/projekt/fm-{number}"
+            cards += (f'<div class="project-container"><a class="project-title" href="{url}">Freelancermap Projekt {number}</a>'
+                      f'<div class="company">Kunde {number}</div><span class="created-date">eingetragen am: {today}</span></div>')
+            live.add_page(url, _detail(number, f"Freelancermap Projekt {number}"), "Freelancermap")
+            expected[url] = SKILLS[number % len(SKILLS)]
+        live.add_page(f"https://www.freelancermap.de/projektboerse.html?pagenr={page}",
+                      f'<html><body><div class="project-list">{cards}</div></body></html>', "Freelancermap")
+
+    cards = ""
+    for number in range(ETENGO_CARDS):
+        url = f"https://www.etengo.de/projekt/{number}"
+        cards += (f'<div class="card card-project"><h3 class="headline-4"><a href="{url}">Etengo Projekt {number}</a></h3>'
+                  f'<div class="box-50"><small>Pr.ID</small><span>{number}</span></div></div>')
+        live.add_page(url, _detail(number, f"Etengo Projekt {number}"), "Etengo")
+        expected[url] = SKILLS[number % len(SKILLS)]
+    live.add_page("https://www.etengo.de/it-projektsuche/",
+                  f'<html><body><div id="project-grid">{cards}</div>'
+                  f'<div class="loadMore project-load-more"><button>weitere Projekte laden</button></div></body></html>',
+                  "Etengo", {"initial_cards": ETENGO_CARDS_PER_LOAD, "cards_per_click": ETENGO_CARDS_PER_LOAD})
+
+    for page in range(1, LISTING_PAGES + 1):
+        cards = ""
+        for number in range(RANDSTAD_CARDS if page == 1 else 0):
+            url = f"https://www.gulp.de/gulp2/g/projekte/agentur/R{number}"
+            external_url = f"https://jobs.example.com/r{number}"
+            cards += (f'<li><div class="list-result-item"><h1><a href="{url}">Randstad Projekt {number}</a></h1>'
+                      f'<ul><li><span>Einsatzort: Hamburg</span></li></ul></div></li>')
+            live.add_page(url, f'<html><body><a class="apply-button" href="https://www.gulp.de/apply?project_url={quote(external_url, safe="")}">'
+                               f'Bewerben</a></body></html>', "Randstad")
+            live.add_page(external_url, _detail(number, f"Randstad Projekt {number}"))
+            expected[external_url] = SKILLS[number % len(SKILLS)]  # Projects keep the URL of the page they were extracted from
+        live.add_page(f"https://www.gulp.de/gulp2/g/projekte?page={page}",
+                      f'<html><body><div class="paginated-list-container"><ul>{cards}</ul></div></body></html>', "Randstad")
+    return live, expected
+
+
+class FakeMistralServer(ThreadingHTTPServer):
+    """Answers every extraction with the skills named in the page text; counts requests."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeMistralRequestHandler)
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+def _project_answer(text):
+    skills = [skill for group in SKILLS for skill in group if skill.lower() in text.lower()]
+    return {"title": "Projekt", "release_date": datetime.now().strftime("%d.%m.%Y"), "requirements_tf": {skill: 1 for skill in skills}}
+
+
+class FakeMistralRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        with self.server.lock:
+            self.server.requests += 1
+        text = request["messages"][-1]["content"]
+        projects = re.findall(r'<project id="([^"]+)">(.*?)</project>', text, re.S)
+        answer = {"projects": [{"id": project_id, **_project_answer(project_text)} for project_id, project_text in projects]} if projects else _project_answer(text)
+        payload = json.dumps({
+            "id": "cmpl", "object": "chat.completion", "model": request["model"], "created": 0,
+            "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": json.dumps(answer)}}]
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def _scan(scraper, website_config, time_range=7):
+    async def scan():
+        return {project["url"]: sorted(project["requirements_tf"]) async for project in scraper.scan_website_stream(website_config, time_range)}
+    return asyncio.run(scan())
+
+
+def _record_replay_and_benchmark():
+    websites = {website["level1_search"]["name"]: website for website in config_manager.get_websites()}
+    live, expected = _live_site(tempfile.mkdtemp())
+    recorded_directory = tempfile.mkdtemp()
+
+    print("\n1. Recording scans of all three sites...")
+    mistral = FakeMistralServer()
+    threading.Thread(target=mistral.serve_forever, daemon=True).start()
+    with ReplayServer(live) as live_server:
+        scraper = WebScraper()
+        scraper.setup_driver = lambda: ReplayBrowser(live_server.url)
+        scraper.mistral_handler = MistralHandler(api_key="test-key", server_url=mistral.url)
+        scraper.page_archive = PageArchive(tempfile.mkdtemp())
+        scraper.page_settle_seconds = 0
+        recorded = asyncio.run(record_fixtures(recorded_directory, list(websites), 7, scraper))
+    mistral.shutdown()
+    assert sorted(recorded.manifest["sites"]) == ["Etengo", "Freelancermap", "Randstad"]
+    assert list(recorded.manifest["load_more"].values()) == [{"initial_cards": ETENGO_CARDS_PER_LOAD, "cards_per_click": ETENGO_CARDS_PER_LOAD}]
+    answers = [record for record in recorded.mistral_responses.values() if "content" in record]
+    assert len(answers) == mistral.requests
+    print(f"   ✅ {recorded.pages.stats()['fetches']} pages and {len(answers)} Mistral answers recorded")
+
+    print("\n2. Replaying the scans from the recording...")
+    fixtures = FixtureSet(recorded_directory)
+    with ReplayServer(fixtures) as server:
+        scraper = replay_scraper(server)
+        projects = {}
+        for website_config in websites.values():
+            projects.update(_scan(scraper, website_config))
+        assert projects == {url: sorted(skills) for url, skills in expected.items()}, "Replay returns the recorded projects"
+        assert server.stats["mistral_misses"] == 0
+    print(f"   ✅ {len(projects)} projects replayed with their requirements, no unrecorded Mistral requests")
+
+    print("\n3. Answering differently composed batches from the recorded projects...")
+    messages = [{"role": "system", "content": "Extract"}, {"role": "user", "content": '<project id="0">\nPython Kubernetes\n</project>\n\n<project id="1">\nJava Spring\n</project>'}]
+    batch = FixtureSet(tempfile.mkdtemp())
+    batch.add_mistral_response("mistral-large-latest", messages, json.dumps({"projects": [
+        {"id": "0", "requirements_tf": {"Python": 1}}, {"id": "1", "requirements_tf": {"Java": 1}}
+    ]}), {"prompt_tokens": 200, "completion_tokens": 40})
+    regrouped = [messages[0], {"role": "user", "content": '<project id="0">\nJava Spring\n</project>'}]
+    answer = batch.mistral_response("mistral-large-latest", regrouped)
+    assert json.loads(answer["content"]) == {"projects": [{"id": "0", "requirements_tf": {"Java": 1}}]}
+    assert answer["usage"] == {"prompt_tokens": 100, "completion_tokens": 20}
+    assert batch.mistral_response("mistral-large-latest", [messages[0], {"role": "user", "content": '<project id="0">\nSAP\n</project>'}]) is None
+    print("   ✅ Batch answered from the projects' recorded results")
+
+    print("\n4. Serving recorded embeddings...")
+    fixtures.add_embedding("Python", [0.25, 0.5, 0.75])
+    with ReplayServer(fixtures) as server:
+        handler = replay_openai_handler(server)
+        assert asyncio.run(handler.get_embedding("Python")) == [0.25, 0.5, 0.75]
+        assert asyncio.run(handler.get_embedding("Cobol")) == []
+        assert server.stats["embedding_misses"] == 1
+    print("   ✅ Recorded embedding served, unknown text answered like a failed request")
+
+    print("\n5. Benchmarking the replayed scans...")
+    result = asyncio.run(run_benchmark(recorded_directory, mistral_latency=MISTRAL_LATENCY))
+    assert result["projects"] == len(expected) and result["projects_per_minute"] > 0
+    assert {site: site_result["projects"] for site, site_result in result["sites"].items()} == {
+        "Etengo": ETENGO_CARDS, "Freelancermap": FREELANCERMAP_PAGES * CARDS_PER_PAGE, "Randstad": RANDSTAD_CARDS
+    }
+    stages = result["stages"]
+    assert {"page_fetch", "listing_page", "level2", "level3_batch", "external_url", "detail_page", "mistral_call"} <= set(stages)
+    assert stages["mistral_call"]["count"] == result["server"]["mistral_calls"]
+    assert stages["mistral_call"]["p50"] >= MISTRAL_LATENCY, "Configured latency is applied"
+    assert stages["level2"]["count"] >= len(expected)
+    assert result["peak_memory_mb"] > 0
+    report = format_report(result)
+    assert "projects/minute" in report and "mistral_call" in report
+    print(f"   ✅ {result['projects_per_minute']:.0f} projects/minute, {len(stages)} stages, peak heap {result['peak_memory_mb']:.1f} MB")
+
+    return True
+
+
+def test_replay_harness():
+    """Test recording through the harness, replaying without network access and the benchmark report."""
+
+    print("=" * 60)
+    print("Testing Record/Replay Harness And Scan Benchmark")
+    print("=" * 60)
+
+    # The configured Mistral rate limit would dominate the run time of the test
+    mistral_config = dict(config_manager.config["mistral"])
+    config_manager.config["mistral"].update({"requests_per_second": 100, "burst": 10})
+    try:
+        return _record_replay_and_benchmark()
+    finally:
+        config_manager.config["mistral"] = mistral_config
+
+
+if __name__ == "__main__":
+    success = test_replay_harness()
+    if success:
+        print("\n🎉 Record/replay harness test completed successfully!")
+    else:
+        print("\n❌ Record/replay harness test failed!")
+        sys.exit(1)
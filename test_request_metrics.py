@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test to verify the request timing middleware, the Server-Timing header and the Prometheus metrics.
+"""
+
+import sys
+import os
+import asyncio
+import re
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from backend.models.core_models import Base, Project
+from backend.metrics_service import metrics_service, TimingMiddleware
+from backend.mistral_client import MistralClientWrapper
+from backend.web_scraper import WebScraper
+
+
+class FakeUsage:
+    prompt_tokens = 120
+    completion_tokens = 30
+
+
+class FakeResponse:
+    usage = FakeUsage()
+
+
+class FakeChat:
+    async def complete_async(self, **kwargs):
+        await asyncio.sleep(0.01)
+        return FakeResponse()
+
+
+class FakeMistralClient:
+    chat = FakeChat()
+
+
+class FakeDriver:
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url):
+        self.urls.append(url)
+
+
+def _create_app():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    metrics_service.instrument_engine(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.add_middleware(TimingMiddleware)
+    api = MistralClientWrapper(FakeMistralClient(), {"requests_per_second": 100, "burst": 10})
+    scraper = WebScraper()
+
+    @app.get("/projects/{project_id}")
+    async def get_project(project_id: int, db=Depends(get_db)):
+        db.add(Project(title=f"Project {project_id}"))
+        db.commit()
+        return {"projects": db.query(Project).count()}
+
+    @app.post("/extract")
+    async def extract():
+        await api.complete(model="mistral-large-latest", messages=[])
+        scraper._open_page(FakeDriver(), "https://example.com/projekt/1", "detail")
+        return {"status": "ok"}
+
+    return app
+
+
+def _sample(metrics, line_start):
+    values = [float(line.rsplit(" ", 1)[1]) for line in metrics.splitlines() if line.startswith(line_start)]
+    assert values, f"No sample {line_start}"
+    return values[0]
+
+
+def _request(app, method, path):
+    async def request():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.request(method, path)
+    return asyncio.run(request())
+
+
+def test_request_metrics():
+    """Test Server-Timing headers, per-route histograms, query counts and component counters."""
+
+    print("=" * 60)
+    print("Testing Request Metrics")
+    print("=" * 60)
+
+    metrics_service.reset()
+    app = _create_app()
+
+    print("\n1. Timing requests with database queries...")
+    for project_id in (1, 2, 3):
+        response = _request(app, "GET", f"/projects/{project_id}")
+        assert response.status_code == 200
+    server_timing = response.headers["server-timing"]
+    assert re.match(r'app;dur=[\d.]+, db;desc="queries: \d+";dur=[\d.]+$', server_timing), server_timing
+    assert metrics_service.get_counter("http_requests_total", method="GET", route="/projects/{project_id}", status=200) == 3
+    assert metrics_service.get_counter("db_queries_total") >= 6
+    print(f"   ✅ Server-Timing: {server_timing}")
+
+    print("\n2. Counting LLM calls, tokens and page loads...")
+    response = _request(app, "POST", "/extract")
+    server_timing = response.headers["server-timing"]
+    assert 'llm;desc="LLM calls: 1"' in server_timing and 'browser;desc="page loads: 1"' in server_timing
+    assert "db;" not in server_timing
+    assert metrics_service.get_counter("llm_requests_total", provider="mistral", outcome="ok") == 1
+    assert metrics_service.get_counter("llm_tokens_total", provider="mistral", type="prompt") == 120
+    assert metrics_service.get_counter("llm_tokens_total", provider="mistral", type="completion") == 30
+    assert metrics_service.get_counter("browser_page_loads_total", kind="detail") == 1
+    print(f"   ✅ Server-Timing: {server_timing}")
+
+    print("\n3. Rendering the Prometheus text format...")
+    _request(app, "GET", "/unknown/path")
+    metrics_service.record_embedding_lookup(hit=True)
+    metrics_service.record_embedding_lookup(hit=False)
+    metrics = metrics_service.render_prometheus()
+    assert "# TYPE http_request_duration_seconds histogram" in metrics
+    route = 'method="GET",route="/projects/{project_id}"'
+    assert _sample(metrics, f"http_request_duration_seconds_count{{{route}}}") == 3
+    assert _sample(metrics, f'http_request_duration_seconds_bucket{{{route},le="+Inf"}}') == 3
+    assert _sample(metrics, f"http_request_db_queries_count{{{route}}}") == 3
+    assert _sample(metrics, 'http_requests_total{method="GET",route="unmatched",status="404"}') == 1
+    assert _sample(metrics, 'embedding_cache_lookups_total{result="hit"}') == 1
+    assert _sample(metrics, 'llm_request_duration_seconds_bucket{provider="mistral",le="0.005"}') == 0
+    assert _sample(metrics, 'llm_request_duration_seconds_bucket{provider="mistral",le="1"}') == 1
+    buckets = [float(line.rsplit(" ", 1)[1]) for line in metrics.splitlines()
+               if line.startswith(f"http_request_duration_seconds_bucket{{{route}")]
+    assert buckets == sorted(buckets), "Buckets are cumulative"
+    print(f"   ✅ {len(metrics.splitlines())} lines of metrics, unmatched paths collapsed into one route label")
+
+    metrics_service.reset()
+    return True
+
+
+if __name__ == "__main__":
+    success = test_request_metrics()
+    if success:
+        print("\n🎉 Request metrics test completed successfully!")
+    else:
+        print("\n❌ Request metrics test failed!")
+        sys.exit(1)
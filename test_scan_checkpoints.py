@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Test to verify that an interrupted scan resumes from its per-site checkpoint.
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.config_manager import config_manager
+from backend.listing_processor import COUNT_CARDS_SCRIPT, CARD_FRAGMENTS_SCRIPT
+from backend.models.core_models import Base
+from backend.page_archive import PageArchive
+from backend.project_index_service import KnownProjectIndex
+from backend.requirements_service import requirements_service
+from backend.scan_checkpoint_service import scan_checkpoint_service
+from backend.scan_service import ScanService
+from backend.web_scraper import WebScraper
+
+CARDS = 12
+SCAN_ID = "c0ffee42"
+
+
+class FakeHiddenButton:
+    text = "weitere Projekte laden"
+
+    def is_displayed(self):
+        return False
+
+
+class FakeListingBrowser:
+    """WebDriver stand-in for a listing with CARDS projects and no further pages."""
+
+    def __init__(self):
+        self.cards = [
+            f'<div class="card card-project"><h3 class="headline-4"><a href="/projekt/{number}">Projekt {number}</a></h3>'
+            f'<div class="box-50"><small>Pr.ID</small><span>{number}</span></div></div>'
+            for number in range(1, CARDS + 1)
+        ]
+        self.current_url = None
+
+    @property
+    def page_source(self):
+        return f'<html><body><div id="project-grid">{"".join(self.cards)}</div></body></html>'
+
+    def get(self, url):
+        self.current_url = url
+
+    def find_element(self, by, selector):
+        return FakeHiddenButton()
+
+    def find_elements(self, by, selector):
+        return []
+
+    def execute_script(self, script, *args):
+        if script == COUNT_CARDS_SCRIPT:
+            return len(self.cards)
+        if script == CARD_FRAGMENTS_SCRIPT:
+            return self.cards[args[2]:]
+        return None
+
+    def quit(self):
+        pass
+
+
+def _scraper(level3_urls):
+    scraper = WebScraper()
+    scraper.mistral_handler = None
+    scraper.page_archive = PageArchive(tempfile.mkdtemp())
+    scraper.setup_driver = FakeListingBrowser
+
+    async def level3_scan_batch(project_urls, scan_id=None, website_config=None):
+        level3_urls.extend(project_urls)
+        return [{"requirements_tf": {"Python": 1}, "url": url} for url in project_urls]
+
+    scraper.level3_scan_batch = level3_scan_batch
+    return scraper
+
+
+class StoringScraper(WebScraper):
+    """Yields two projects per website and records which of them the consumer marked as processed."""
+
+    def __init__(self):
+        super().__init__()
+        self.processed = {}
+
+    async def scan_website_stream(self, website_config, time_range, existing_project_data=None, scan_id=None,
+                                  site_checkpoint=None, high_water_mark=None, duplicate_index=None):
+        site = website_config["level1_search"]["name"]
+        for number in range(2):
+            yield {"title": f"{site} {number}", "url": f"https://{site.lower()}.example/projekt/{number}", "requirements_tf": {"Python": 1}}
+        self.processed[site] = set(site_checkpoint.processed_urls)
+
+
+def test_scan_checkpoints():
+    """Test that checkpoints record progress and that a resumed scan skips finished work."""
+
+    print("=" * 60)
+    print("Testing Resumable Scan Checkpoints")
+    print("=" * 60)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    etengo = next(w for w in config_manager.get_websites() if w["level1_search"]["name"] == "Etengo")
+    interval = config_manager.get("scan_jobs.checkpoint_interval_seconds")
+    config_manager.config.setdefault("scan_jobs", {})["checkpoint_interval_seconds"] = 0
+
+    try:
+        print("\n1. Interrupting a scan after 7 projects, one of them not saved...")
+        level3_urls = []
+        checkpoint = scan_checkpoint_service.create(db, SCAN_ID, 7)
+        site = checkpoint.site("Etengo")
+        site.set_status("running")  # As set by the scan service
+
+        async def interrupted_scan():
+            stored = []
+            failed = None
+            stream = _scraper(level3_urls).scan_website_stream(etengo, 7, None, None, site)
+            async for project in stream:
+                if failed is None and len(stored) == 2:
+                    failed = project["url"]  # Saving the 3rd project fails
+                    continue
+                stored.append(project["url"])
+                if len(stored) == 7:
+                    break  # Backend stops while the 7th project is being stored
+                site.mark_processed(project["url"])  # As the scan service does after the commit
+            await stream.aclose()
+            return stored, failed
+
+        stored, failed = asyncio.run(interrupted_scan())
+        record = scan_checkpoint_service.load(db, SCAN_ID)
+        saved_site = record.site("Etengo")
+        assert record.status == "running" and saved_site.status == "running"
+        assert saved_site.listing_url == etengo["level1_search"]["site_url"]
+        assert saved_site.processed_urls == set(stored[:6]), "Only saved projects are processed"
+        assert [level2_data["url"] for level2_data in saved_site.pending] == level3_urls[5:10]
+        print(f"   ✅ Checkpoint holds {len(saved_site.processed_urls)} processed cards and {len(saved_site.pending)} pending level3 scans")
+
+        print("\n2. Listing resumable scans...")
+        records = scan_checkpoint_service.list_records(db)
+        assert records[0]["scan_id"] == SCAN_ID and records[0]["resumable"]
+        assert records[0]["websites"]["Etengo"]["pending"] == 5
+        print("   ✅ Interrupted scan listed as resumable")
+
+        print("\n3. Resuming from the checkpoint...")
+        resumed_level3_urls = []
+        known_projects = KnownProjectIndex.from_urls(stored)
+
+        async def resumed_scan():
+            resumed = []
+            stream = _scraper(resumed_level3_urls).scan_website_stream(etengo, 7, known_projects, None, saved_site)
+            async for project in stream:
+                resumed.append(project["url"])
+                saved_site.mark_processed(project["url"])
+            return resumed
+
+        resumed = asyncio.run(resumed_scan())
+        assert len(resumed) == CARDS - 7 and not set(resumed) & set(stored)
+        assert failed in resumed, "The project whose save failed is scanned again"
+        assert resumed_level3_urls == resumed, "Stored projects must not be extracted again"
+        assert resumed[:2] == level3_urls[8:10], "The pending level3 queue goes first"
+        assert saved_site.status == "done" and saved_site.pending == []
+        print(f"   ✅ Only the {len(resumed)} remaining projects scanned, pending queue first")
+
+        print("\n4. Compacting the record of a completed scan...")
+        record = scan_checkpoint_service.load(db, SCAN_ID)
+        record.set_status("complete")
+        records = scan_checkpoint_service.list_records(db)
+        assert records[0]["status"] == "complete" and not records[0]["resumable"]
+        assert scan_checkpoint_service.load(db, SCAN_ID).site("Etengo").processed_urls == set()
+        print("   ✅ Completed scan no longer resumable, card lists dropped")
+
+        print("\n5. Marking projects processed only once the scan service stored them...")
+        service = ScanService()
+        service.web_scraper = StoringScraper()
+        set_project_requirements = requirements_service.set_project_requirements
+
+        def failing_set_project_requirements(db, project, requirements_data):
+            if project.url.endswith("/0"):
+                raise ValueError("Saving failed")
+            return set_project_requirements(db, project, requirements_data)
+
+        async def scan():
+            return [message async for message in service.scan_projects_stream(7, db, "c0ffee43", incremental=False)]
+
+        requirements_service.set_project_requirements = failing_set_project_requirements
+        try:
+            asyncio.run(scan())
+        finally:
+            requirements_service.set_project_requirements = set_project_requirements
+        assert service.web_scraper.processed
+        for site, processed_urls in service.web_scraper.processed.items():
+            assert processed_urls == {f"https://{site.lower()}.example/projekt/1"}, "A project whose save failed stays unprocessed"
+        print(f"   ✅ Failed saves left unprocessed on {len(service.web_scraper.processed)} websites")
+    finally:
+        config_manager.config["scan_jobs"]["checkpoint_interval_seconds"] = interval
+        db.close()
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_scan_checkpoints()
+    if success:
+        print("\n🎉 Scan checkpoint test completed successfully!")
+    else:
+        print("\n❌ Scan checkpoint test failed!")
+        sys.exit(1)
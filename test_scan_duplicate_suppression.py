@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test to verify that likely cross-site duplicates are skipped before their level3 scan.
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+from datetime import datetime
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.config_manager import config_manager
+from backend.duplicate_index import DuplicateIndex, build_duplicate_index, normalize_text
+from backend.models.core_models import Base, Project
+from backend.page_archive import PageArchive
+from backend.web_scraper import WebScraper
+
+
+def _card(slug, title, company, release_date, base="https://www.freelancermap.de/projekt"):
+    return (
+        f'<div class="project-container"><a class="project-title" href="{base}/{slug}">{title}</a>'
+        f'<div class="company">{company}</div><span class="created-date">eingetragen am: {release_date}</span></div>'
+    )
+
+
+def test_scan_duplicate_suppression():
+    """Test fingerprint matching and skipping duplicates during a scan."""
+
+    print("=" * 60)
+    print("Testing Scan-Time Duplicate Suppression")
+    print("=" * 60)
+
+    print("\n1. Normalizing titles...")
+    assert normalize_text("Senior Java-Entwickler (m/w/d)") == normalize_text("senior java entwickler (w/m/d)") == "senior java entwickler"
+    assert normalize_text("N/A") == ""
+    assert normalize_text("C++ Entwickler") != normalize_text("C# Entwickler")
+    assert normalize_text(".NET Entwickler") != normalize_text("NET Entwickler")
+    print("   ✅ Case, punctuation and gender markers ignored, C++/C#/.NET kept apart")
+
+    print("\n2. Matching fingerprints...")
+    index = DuplicateIndex(0.9)
+    index.add({"title": "Data Engineer (m/w/d)", "tenderer": "ACME GmbH", "location": "Hamburg", "start_date": "01.11.2026", "url": "https://www.gulp.de/p/1"})
+    original, reason = index.find_duplicate({"title": "Data Engineer (w/m/d)", "tenderer": "acme gmbh", "url": "https://www.freelancermap.de/projekt/1"})
+    assert original.label == "'Data Engineer (m/w/d)' (https://www.gulp.de/p/1)" and reason == "same title and tenderer"
+    _, reason = index.find_duplicate({"title": "Data Engineers", "tenderer": "Other AG", "location": "hamburg", "start_date": "01.11.2026"})
+    assert reason == "similar title and same location and start date"
+    assert index.find_duplicate({"title": "Data Engineer", "tenderer": "Other AG"}) is None, "Title alone is not enough"
+    assert index.find_duplicate({"title": "Frontend Developer", "tenderer": "ACME GmbH"}) is None
+    assert index.find_duplicate({"title": "Data Engineers", "tenderer": "ACME GmbH"}) is None, "Similar title needs location and start date"
+    print("   ✅ Exact titles matched with tenderer, similar titles only with location and start date")
+
+    print("\n3. Keeping distinct listings of one site...")
+    index = DuplicateIndex(0.9, ["Etengo", "Freelancermap"])
+    fi = {"title": "SAP S/4HANA FI Berater", "tenderer": "Etengo", "location": "Remote", "start_date": "01.12.2026", "url": "https://www.etengo.de/projekt/1"}
+    co = dict(fi, title="SAP S/4HANA CO Berater", url="https://www.etengo.de/projekt/2")
+    python = {"title": "Python Developer", "tenderer": "Beta AG", "location": "Berlin", "start_date": "asap", "url": "https://www.etengo.de/projekt/3"}
+    index.add(fi)
+    index.add(python)
+    assert index.find_duplicate(co) is None, "Same site, similar title"
+    assert index.find_duplicate(dict(python, title="Python Developer II", url="https://www.etengo.de/projekt/4")) is None
+    assert index.find_duplicate(dict(fi, url="https://www.etengo.de/projekt/5")) is None, "Same site, same title"
+    index.add({"title": "C++ Entwickler", "tenderer": "ACME GmbH", "location": "München", "start_date": "01.01.2027", "url": "https://www.gulp.de/p/2"})
+    assert index.find_duplicate({"title": "C# Entwickler", "tenderer": "ACME GmbH", "location": "München", "start_date": "01.01.2027", "url": "https://www.freelancermap.de/projekt/2"}) is None
+    index.add({"title": "Platform Engineer", "tenderer": "Etengo", "url": "https://www.etengo.de/projekt/6"})
+    assert index.find_duplicate({"title": "Platform Engineer", "tenderer": "Freelancermap", "url": "https://www.freelancermap.de/projekt/3"}) is None, "Site default tenderers are no key"
+    _, reason = index.find_duplicate(dict(co, url="https://www.freelancermap.de/projekt/4"))
+    assert reason == "similar title and same location and start date", "Other sites are still compared"
+    print("   ✅ Same-site near-identical titles, C++/C# and site default tenderers not merged")
+
+    print("\n4. Skipping duplicates of stored projects and reporting them...")
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Project(title="Cloud Architekt (m/w/d)", tenderer="ACME GmbH", url="https://www.gulp.de/gulp2/g/projekte/agentur/C1"))
+    db.commit()
+    duplicate_index = build_duplicate_index(db)
+    db.close()
+
+    today = datetime.now().strftime("%d.%m.%Y")
+    page = (
+        '<html><body><div class="project-list">'
+        + _card("cloud", "Cloud-Architekt (w/m/d)", "ACME GmbH", today)
+        + _card("python", "Python Entwickler", "Beta AG", today)
+        + _card("python-2", "Python-Entwickler", "Beta AG", today)
+        + _card("devops", "DevOps Engineer", "Beta AG", today)
+        + '</div></body></html>'
+    )
+    freelancermap = next(w for w in config_manager.get_websites() if w["level1_search"]["name"] == "Freelancermap")
+    level3_urls = []
+    scraper = WebScraper()
+    scraper.mistral_handler = None
+    scraper.page_archive = PageArchive(tempfile.mkdtemp())
+    scraper._load_listing_page = lambda url, selector: page if url.endswith("pagenr=1") else ""
+
+    async def level3_scan_batch(project_urls, scan_id=None, website_config=None):
+        level3_urls.extend(project_urls)
+        return [{"requirements_tf": {"Python": 1}, "url": url} for url in project_urls]
+
+    scraper.level3_scan_batch = level3_scan_batch
+
+    async def scan():
+        stream = scraper.scan_website_stream(freelancermap, 7, None, None, None, None, duplicate_index)
+        return [project["url"] async for project in stream]
+
+    stored = asyncio.run(scan())
+    assert [url.rsplit("/", 1)[-1] for url in stored] == ["python", "python-2", "devops"], "Cards of the same site are all extracted"
+    assert level3_urls == stored, "Duplicates are not extracted"
+    assert duplicate_index.suppressed == 1
+    assert duplicate_index.suppressed_details == [{
+        "title": "Cloud-Architekt (w/m/d)", "url": "https://www.freelancermap.de/projekt/cloud",
+        "duplicate_of": "'Cloud Architekt (m/w/d)' (https://www.gulp.de/gulp2/g/projekte/agentur/C1)",
+        "reason": "same title and tenderer"
+    }]
+    print(f"   ✅ {duplicate_index.suppressed} of 4 cards skipped before level3 and reported")
+
+    print("\n5. Extracting a cross-site copy of a project whose extraction failed...")
+    duplicate_index = DuplicateIndex(0.9)
+    pages = {
+        "freelancermap": '<html><body><div class="project-list">' + _card("kotlin", "Kotlin Entwickler", "Gamma GmbH", today) + '</div></body></html>',
+        "mirror": '<html><body><div class="project-list">' + _card("kotlin", "Kotlin Entwickler", "Gamma GmbH", today, "https://www.mirror.example/projekt") + '</div></body></html>'
+    }
+    listing = {"page": pages["freelancermap"]}
+    scraper._load_listing_page = lambda url, selector: listing["page"] if url.endswith("pagenr=1") else ""
+    level3_urls.clear()
+
+    async def failing_level3_scan_batch(project_urls, scan_id=None, website_config=None):
+        level3_urls.extend(project_urls)
+        return [{"requirements_tf": {}, "url": url, "extraction_failed": "freelancermap" in url} for url in project_urls]
+
+    scraper.level3_scan_batch = failing_level3_scan_batch
+    assert asyncio.run(scan()) == [], "Failed extraction is not stored"
+    listing["page"] = pages["mirror"]
+    assert asyncio.run(scan()) == ["https://www.mirror.example/projekt/kotlin"]
+    assert level3_urls == ["https://www.freelancermap.de/projekt/kotlin", "https://www.mirror.example/projekt/kotlin"]
+    assert duplicate_index.suppressed == 0
+    print("   ✅ Only extracted projects enter the index, the copy on the other site is stored")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_scan_duplicate_suppression()
+    if success:
+        print("\n🎉 Scan duplicate suppression test completed successfully!")
+    else:
+        print("\n❌ Scan duplicate suppression test failed!")
+        sys.exit(1)
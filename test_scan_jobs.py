@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test to verify that scans run as background jobs watched by any number of SSE subscribers.
+"""
+
+import sys
+import os
+import json
+import asyncio
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.config_manager import config_manager
+from backend.scan_job_service import ScanJobService
+
+PROJECTS = 12
+
+
+class FakeSession:
+    def close(self):
+        pass
+
+
+class FakeScanService:
+    """Streams a start event, one event per project and a complete event."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+
+    async def scan_projects_stream(self, time_range, db, scan_id=None, resume=False, incremental=None):
+        yield f"data: {json.dumps({'type': 'start', 'message': 'Scan started', 'scan_id': scan_id})}\n\n"
+        for number in range(1, PROJECTS + 1):
+            await asyncio.sleep(self.delay)
+            yield f"data: {json.dumps({'type': 'project', 'data': {'id': number}})}\n\n"
+        yield f"data: {json.dumps({'type': 'complete', 'total_projects': PROJECTS})}\n\n"
+
+
+def _parse(message):
+    lines = dict(line.split(": ", 1) for line in message.strip().split("\n"))
+    return lines["id"], json.loads(lines["data"])
+
+
+async def _collect(subscription, limit=None):
+    events = []
+    async for message in subscription:
+        events.append(_parse(message))
+        if limit and len(events) == limit:
+            break
+    return events
+
+
+def _service(delay=0.01):
+    return ScanJobService(scan_service=FakeScanService(delay), session_factory=FakeSession)
+
+
+def test_scan_jobs():
+    """Test broadcast to several subscribers, replay after a reconnect and independence from clients."""
+
+    print("=" * 60)
+    print("Testing Background Scan Jobs")
+    print("=" * 60)
+
+    print("\n1. Broadcasting to two subscribers...")
+
+    async def two_tabs():
+        service = _service()
+        job = service.start_job(8)
+        assert service.start_job(8) is job, "A second tab attaches to the running scan"
+        return job, await asyncio.gather(_collect(job.subscribe()), _collect(job.subscribe()))
+
+    job, (first, second) = asyncio.run(two_tabs())
+    assert first == second and len(first) == PROJECTS + 2
+    assert [event_id for event_id, _ in first] == [f"{job.scan_id}-{n}" for n in range(1, PROJECTS + 3)]
+    assert first[0][1]["scan_id"] == job.scan_id and first[-1][1]["type"] == "complete"
+    assert job.status == "complete"
+    print(f"   ✅ Both subscribers got all {len(first)} events with sequential ids")
+
+    print("\n2. Resuming after a reconnect with Last-Event-ID...")
+
+    async def reconnect():
+        service = _service()
+        job = service.start_job(8)
+        before = await _collect(job.subscribe(), limit=5)  # Connection drops after 5 events
+        resumed_job, sequence = service.parse_event_id(before[-1][0])
+        assert resumed_job is job
+        after = await _collect(resumed_job.subscribe(sequence))
+        return before, after
+
+    before, after = asyncio.run(reconnect())
+    project_ids = [data["data"]["id"] for _, data in before + after if data["type"] == "project"]
+    assert project_ids == list(range(1, PROJECTS + 1))
+    assert len(before) + len(after) == PROJECTS + 2
+    assert after[0][0].endswith("-6") and after[-1][1]["type"] == "complete"
+    print("   ✅ No events lost or repeated after the reconnect")
+
+    print("\n3. Scanning on without any listening client...")
+
+    async def no_reader():
+        service = _service()
+        job = service.start_job(8)
+        subscription = job.subscribe()
+        await subscription.__anext__()
+        await subscription.aclose()  # Client disconnects after the first event
+        await asyncio.wait_for(job.task, timeout=5)
+        return job
+
+    job = asyncio.run(no_reader())
+    assert job.status == "complete" and job.last_sequence == PROJECTS + 2
+    print("   ✅ Scan completed after its only client disconnected")
+
+    print("\n4. Bounding the event buffer...")
+    buffer_size = config_manager.get("scan_jobs.event_buffer_size")
+    config_manager.config.setdefault("scan_jobs", {})["event_buffer_size"] = 5
+    try:
+        async def late_reader():
+            service = _service(delay=0)
+            job = service.start_job(8)
+            await job.task
+            return job, await _collect(job.subscribe())
+
+        job, events = asyncio.run(late_reader())
+    finally:
+        config_manager.config["scan_jobs"]["event_buffer_size"] = buffer_size
+    assert len(job.events) == 5
+    assert [event_id for event_id, _ in events] == [f"{job.scan_id}-{n}" for n in range(PROJECTS - 2, PROJECTS + 3)]
+    print("   ✅ Late subscriber gets the last 5 buffered events")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_scan_jobs()
+    if success:
+        print("\n🎉 Scan job test completed successfully!")
+    else:
+        print("\n❌ Scan job test failed!")
+        sys.exit(1)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Test to verify per-phase scan telemetry: stats events in the scan stream and the scan_runs history.
+"""
+
+import sys
+import os
+import json
+import time
+import asyncio
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.config_manager import config_manager
+from backend.models.core_models import Base, ScanRun
+from backend.scan_job_service import ScanJobService
+from backend.scan_service import ScanService
+from backend.scan_telemetry_service import scan_telemetry_service
+from backend.web_scraper import WebScraper
+
+PROJECTS_PER_SITE = 2
+SLOW_PROJECT = "https://etengo.example/projekt/1"
+SITE_PHASES = {"listing_load", "settle", "detail_fetch", "llm_extraction", "persist"}
+
+
+class FakeBrowser:
+    def get(self, url):
+        if url == SLOW_PROJECT:
+            time.sleep(0.05)
+
+
+class FakeMistralHandler:
+    async def extract_project_details(self, page_source, scan_id=None, content_config=None):
+        return {"title": "Projekt", "requirements_tf": {"Python": 1, "Docker": 1}}
+
+
+class FakeScraper(WebScraper):
+    """Loads pages and extracts projects through the instrumented scraper methods, without a browser."""
+
+    def __init__(self):
+        super().__init__()
+        self.mistral_handler = FakeMistralHandler()
+        self.page_settle_seconds = 0
+
+    async def scan_website_stream(self, website_config, time_range, existing_project_data=None, scan_id=None,
+                                  site_checkpoint=None, high_water_mark=None, duplicate_index=None):
+        site = website_config["level1_search"]["name"]
+        driver = FakeBrowser()
+        self._open_page(driver, f"https://{site.lower()}.example/projekte", "listing")
+        self._settle(1)
+        for number in range(PROJECTS_PER_SITE):
+            url = f"https://{site.lower()}.example/projekt/{number}"
+            with scan_telemetry_service.project(url):
+                self._open_page(driver, url, "detail")
+                project_data = await self._extract_page_details("<html></html>", "full", scan_id)
+            yield {**project_data, "title": f"{site} Projekt {number}", "url": url, "tenderer": site}
+
+
+def _scan(service, db, scan_id, stop_after=None):
+    async def scan():
+        events = []
+        stream = service.scan_projects_stream(7, db, scan_id, incremental=False)
+        async for message in stream:
+            events.append(json.loads(message[len("data: "):]))
+            if stop_after and events[-1]["type"] == stop_after:
+                break
+        await stream.aclose()
+        return events
+    return asyncio.run(scan())
+
+
+class TelemetryScanService:
+    """Records a phase on an active telemetry run, then completes after a pause."""
+
+    async def scan_projects_stream(self, time_range, db, scan_id=None, resume=False, incremental=None):
+        run = scan_telemetry_service.start(scan_id, time_range)
+        run.start_site("Etengo")
+        with scan_telemetry_service.phase("listing_load"):
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+        scan_telemetry_service.active = None
+        yield f"data: {json.dumps({'type': 'complete', 'total_projects': 0})}\n\n"
+
+
+class FakeSession:
+    def close(self):
+        pass
+
+
+def test_scan_telemetry():
+    """Test stats events, stored scan runs and periodic stats of scan jobs."""
+
+    print("=" * 60)
+    print("Testing Per-Phase Scan Telemetry")
+    print("=" * 60)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    sites = [website["level1_search"]["name"] for website in config_manager.get_websites()]
+    service = ScanService()
+    service.web_scraper = FakeScraper()
+
+    print("\n1. Streaming stats events during a scan...")
+    events = _scan(service, db, "7e1e0001")
+    types = [event["type"] for event in events]
+    stats = [event for event in events if event["type"] == "stats"]
+    assert len(stats) == len(sites) + 1, "One stats event after each website and one before complete"
+    for index, event_type in enumerate(types):
+        if event_type == "website_complete":
+            assert types[index + 1] == "stats"
+    assert types[-2:] == ["stats", "complete"]
+    final = stats[-1]
+    assert final["scan_id"] == "7e1e0001" and final["projects"] == PROJECTS_PER_SITE * len(sites)
+    assert final["projects_per_minute"] > 0 and final["current_site"] is None
+    assert set(final["sites"]) == set(sites)
+    for site_stats in final["sites"].values():
+        assert site_stats["projects"] == PROJECTS_PER_SITE
+        assert SITE_PHASES <= set(site_stats["phases"])
+        assert site_stats["phases"]["detail_fetch"]["count"] == PROJECTS_PER_SITE
+        assert site_stats["phases"]["persist"]["count"] == 2 * PROJECTS_PER_SITE, "Store and commit of each project"
+    assert {"dedup", "idf"} <= set(final["phases"])
+    assert final["phases"]["llm_extraction"]["count"] == PROJECTS_PER_SITE * len(sites)
+    print(f"   ✅ {len(stats)} stats events, {len(final['phases'])} phases over {len(final['sites'])} sites")
+
+    print("\n2. Attributing phases to projects...")
+    slowest = final["slowest_projects"]
+    assert len(slowest) == PROJECTS_PER_SITE * len(sites)
+    assert slowest[0]["url"] == SLOW_PROJECT and slowest[0]["site"] == "Etengo"
+    assert slowest[0]["phases"]["detail_fetch"] >= 0.05
+    assert [project["seconds"] for project in slowest] == sorted((project["seconds"] for project in slowest), reverse=True)
+    for project in slowest:
+        assert {"detail_fetch", "llm_extraction", "persist"} <= set(project["phases"])
+    run = scan_telemetry_service.start("7e1e0000")
+    with scan_telemetry_service.project("https://a.example/1", "https://a.example/2"):
+        run.add("llm_extraction", 1.0)
+    assert [project["phases"]["llm_extraction"] for project in run.to_dict()["slowest_projects"]] == [0.5, 0.5], "Batch split evenly"
+    scan_telemetry_service.active = None
+    print(f"   ✅ Slowest project {slowest[0]['url']} identified ({slowest[0]['seconds']}s)")
+
+    print("\n3. Storing the finished run in scan_runs...")
+    assert scan_telemetry_service.active is None
+    scan_run = db.query(ScanRun).filter(ScanRun.scan_id == "7e1e0001").one()
+    assert scan_run.status == "complete" and scan_run.projects == final["projects"]
+    assert scan_run.duration_seconds >= final["elapsed_seconds"] and scan_run.incremental is False
+    assert set(scan_run.get_telemetry()["sites"]) == set(sites)
+    assert scan_run.get_telemetry()["slowest_projects"][0]["url"] == SLOW_PROJECT
+    print(f"   ✅ Run stored: {scan_run.projects} projects, {scan_run.projects_per_minute:.0f} projects/minute")
+
+    print("\n4. Recording a scan whose stream was closed as interrupted...")
+    events = _scan(service, db, "7e1e0002", stop_after="project")
+    assert events[-1]["type"] == "project"
+    runs = scan_telemetry_service.list_runs(db)
+    assert [run["scan_id"] for run in runs] == ["7e1e0002", "7e1e0001"], "Newest first"
+    assert runs[0]["status"] == "interrupted" and runs[0]["projects"] == 1
+    assert runs[1]["sites"] == scan_run.get_telemetry()["sites"]
+    assert scan_telemetry_service.list_runs(db, limit=1, scan_id="7e1e0001")[0]["status"] == "complete"
+    assert not service.is_scan_active()
+    print("   ✅ Closed stream stored as interrupted, runs listed newest first")
+
+    print("\n5. Recording phases outside a scan...")
+    with scan_telemetry_service.phase("persist"):
+        pass
+    assert scan_telemetry_service.active is None
+    print("   ✅ No-op without an active scan run")
+
+    print("\n6. Publishing periodic stats events of a scan job...")
+    interval = config_manager.get("scan_jobs.stats_interval_seconds")
+    config_manager.config.setdefault("scan_jobs", {})["stats_interval_seconds"] = 0.02
+    try:
+        async def run_job():
+            job_service = ScanJobService(scan_service=TelemetryScanService(), session_factory=FakeSession)
+            job = job_service.start_job(7)
+            await job.task
+            return [json.loads(payload) for _, payload in job.events]
+
+        job_events = asyncio.run(run_job())
+    finally:
+        config_manager.config["scan_jobs"]["stats_interval_seconds"] = interval
+    periodic = [event for event in job_events if event["type"] == "stats"]
+    assert periodic and job_events[-1]["type"] == "complete"
+    assert periodic[-1]["current_site"] == "Etengo" and periodic[-1]["sites"]["Etengo"]["phases"]["listing_load"]["count"] == 1
+    print(f"   ✅ {len(periodic)} periodic stats events while the job ran")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_scan_telemetry()
+    if success:
+        print("\n🎉 Scan telemetry test completed successfully!")
+    else:
+        print("\n❌ Scan telemetry test failed!")
+        sys.exit(1)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test to verify that the inverted skill index pre-filter returns the same matches as a full scan.
+"""
+
+import sys
+import os
+import asyncio
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.models.core_models import Base, Project, Employee, Skill
+from backend.matching_service import MatchingService
+from backend.requirements_service import requirements_service
+from backend.skill_index_service import skill_index_service
+
+# Tiny embeddings: skills pointing in the same direction are neighbours
+EMBEDDINGS = {
+    "Python": [1.0, 0.0, 0.0],
+    "Python 3": [0.99, 0.05, 0.0],
+    "SQL": [0.0, 1.0, 0.0],
+    "Java": [0.0, 0.0, 1.0],
+    "Kotlin": [0.0, 0.1, 0.99],
+    "Deutsch": [0.5, 0.5, 0.5],
+    "Deutschkenntnisse": [-0.5, 0.5, -0.5],
+}
+
+
+class FakeOpenAIHandler:
+    """Embedding handler returning the fixed embeddings above."""
+
+    async def get_embedding(self, text):
+        return EMBEDDINGS.get(text, [])
+
+
+def _create_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def _populate(db):
+    projects = [
+        ("Python Backend", {"Python 3": 2, "SQL": 1}),
+        ("Java Services", {"Java": 3}),
+        ("Kotlin App", {"Kotlin": 2, "Java": 1}),
+        ("German Support", {"Deutschkenntnisse": 1, "SQL": 1}),
+        ("Unrelated", {"Java": 1}),
+    ]
+    for title, requirements_tf in projects:
+        project = Project(title=title, tenderer="Test")
+        requirements_service.set_project_requirements(db, project, requirements_tf)
+        db.add(project)
+    db.commit()
+
+    for skill in db.query(Skill).all():
+        skill.set_embedding(EMBEDDINGS[skill.skill_name])
+    employee = Employee(name="Test Employee")
+    employee.set_skill_list(["Python", "Deutsch"])
+    db.add(employee)
+    db.commit()
+    return employee
+
+
+def test_skill_index_prefilter():
+    """Test that pre-filtered matching equals full matching restricted to min_percentage."""
+
+    print("=" * 60)
+    print("Testing Skill Index Pre-Filter")
+    print("=" * 60)
+
+    db = _create_session()
+    skill_index_service.invalidate()
+    try:
+        employee = _populate(db)
+        matching_service = MatchingService()
+        matching_service.openai_handler = FakeOpenAIHandler()
+
+        full = asyncio.run(matching_service.match_employee_to_projects(db, employee.id, threshold=0.9))
+        filtered = asyncio.run(matching_service.match_employee_to_projects(db, employee.id, threshold=0.9, min_percentage=1))
+
+        expected = [m for m in full["matches"] if m["match_percentage"] >= 1]
+        print(f"   Full matches: {[(m['project_title'], m['match_percentage']) for m in full['matches']]}")
+        print(f"   Filtered matches: {[(m['project_title'], m['match_percentage']) for m in filtered['matches']]}")
+
+        assert filtered["matches"] == expected, "Pre-filtered matches should equal the full matches above min_percentage"
+        assert {m["project_title"] for m in filtered["matches"]} == {"Python Backend", "German Support"}
+        assert filtered["total_projects_checked"] == 5
+        print("   ✅ Pre-filter returns exactly the matches above min_percentage")
+
+        print("\n2. Incremental update with a new neighbour skill...")
+        project = Project(title="Python Data", tenderer="Test")
+        requirements_service.set_project_requirements(db, project, {"PySpark": 1})
+        db.add(project)
+        db.commit()
+        pyspark = db.query(Skill).filter(Skill.skill_name == "PySpark").first()
+        pyspark.set_embedding([0.98, 0.1, 0.0])
+        db.commit()
+        candidate_ids = skill_index_service.get_candidate_project_ids(
+            db, ["python"], {"python": EMBEDDINGS["Python"]}, 0.9
+        )
+        assert project.id in candidate_ids
+        print("   ✅ New project is found without reloading the index")
+
+        print("\n3. Rolled back skill changes...")
+        ghost = Skill(skill_name="Ghost")
+        ghost.set_embedding([0.97, 0.0, 0.1])
+        db.add(ghost)
+        db.flush()
+        ghost_id = ghost.id
+        db.rollback()
+        assert skill_index_service.get_neighbour_skill_ids(db, EMBEDDINGS["Python"], 0.9).isdisjoint({ghost_id})
+        assert not skill_index_service.get_skill_ids_by_names(db, ["ghost"])
+        print("   ✅ Flushed but rolled back skill never reaches the index")
+
+        print("\n4. Reading requirements from the join table while matching...")
+        parses = []
+        get_requirements_tf = Project.get_requirements_tf
+        Project.get_requirements_tf = lambda project: parses.append(project.id) or get_requirements_tf(project)
+        try:
+            again = asyncio.run(matching_service.match_employee_to_projects(db, employee.id, threshold=0.9))
+            top = asyncio.run(matching_service.match_employee_to_projects(db, employee.id, threshold=0.9, top_k=2))
+        finally:
+            Project.get_requirements_tf = get_requirements_tf
+        assert parses == [], "No requirements_tf JSON is parsed on the matching path"
+        assert [m["project_title"] for m in top["matches"]] == [m["project_title"] for m in again["matches"][:2]]
+        print("   ✅ Full and top-k matching use one requirements query instead of the JSON column")
+
+        print("\n5. Pre-filtering projects without join table rows...")
+        legacy = Project(title="Legacy Python", tenderer="Test", requirements_tf='{"Python 3": 1}')
+        db.add(legacy)
+        db.commit()
+        full = asyncio.run(matching_service.match_employee_to_projects(db, employee.id, threshold=0.9))
+        filtered = asyncio.run(matching_service.match_employee_to_projects(db, employee.id, threshold=0.9, min_percentage=1))
+        assert filtered["matches"] == [m for m in full["matches"] if m["match_percentage"] >= 1]
+        assert "Legacy Python" in {m["project_title"] for m in filtered["matches"]}
+        print("   ✅ Projects only in the JSON column stay candidates until they are backfilled")
+
+        return True
+
+    finally:
+        skill_index_service.invalidate()
+        db.close()
+
+
+if __name__ == "__main__":
+    success = test_skill_index_prefilter()
+    if success:
+        print("\n🎉 Skill index pre-filter test completed successfully!")
+    else:
+        print("\n❌ Skill index pre-filter test failed!")
+        sys.exit(1)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test to verify structured JSON output requests and tolerant parsing of Mistral answers.
+"""
+
+import sys
+import os
+import json
+import asyncio
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.mistral_client import MistralClientWrapper
+from backend.mistral_handler import MistralHandler
+from backend.structured_output import PROJECT_DETAILS_SCHEMA, parse_json_response
+
+PROJECT = {"title": "Python Entwickler", "requirements_tf": {"Python": 2, "Django": 1}}
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeChoice:
+    def __init__(self, content):
+        self.message = FakeMessage(content)
+
+
+class FakeUsage:
+    prompt_tokens = 200
+    completion_tokens = 50
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.usage = FakeUsage()
+        self.choices = [FakeChoice(content)]
+
+
+class FakeRejectedFormat(Exception):
+    """Like the SDK error of an API that does not support a response format."""
+    status_code = 422
+
+
+class FakeBadRequest(Exception):
+    """Like the SDK error of a request the API rejects for another reason."""
+    status_code = 400
+
+
+class FakeChat:
+    def __init__(self, answer, rejected_types=(), rejection_message="response_format not supported"):
+        self.answer = answer
+        self.rejected_types = set(rejected_types)
+        self.rejection_message = rejection_message
+        self.response_formats = []
+
+    async def complete_async(self, model, messages, temperature, max_tokens, response_format=None):
+        self.response_formats.append(response_format)
+        if "oversized" in messages[-1]["content"].lower():
+            raise FakeBadRequest("Prompt contains too many tokens")
+        if response_format and response_format["type"] in self.rejected_types:
+            raise FakeRejectedFormat(self.rejection_message)
+        return FakeResponse(self.answer)
+
+
+class FakeClient:
+    def __init__(self, answer, rejected_types=(), rejection_message="response_format not supported"):
+        self.chat = FakeChat(answer, rejected_types, rejection_message)
+
+
+def _handler(answer, rejected_types=(), rejection_message="response_format not supported"):
+    handler = MistralHandler(api_key="test-key")
+    handler.client = FakeClient(answer, rejected_types, rejection_message)
+    handler.api = MistralClientWrapper(handler.client, {"requests_per_second": 1000, "burst": 10})
+    return handler
+
+
+def test_structured_output():
+    """Test the tolerant parser, the declared schema and the response format fallback."""
+
+    print("=" * 60)
+    print("Testing Structured JSON Output")
+    print("=" * 60)
+
+    print("\n1. Parsing wrapped, broken and truncated answers...")
+    answers = {
+        "plain": json.dumps(PROJECT),
+        "fenced with prose": "Hier das Ergebnis:\n```json\n" + json.dumps(PROJECT) + "\n```\nViel Erfolg!",
+        "trailing commas": '{"title": "Python Entwickler", "requirements_tf": {"Python": 2, "Django": 1,},}',
+        "truncated in a value": '{"title": "Python Entwickler", "requirements_tf": {"Python": 2, "Django": 1}, "description": "Backend mit Dj',
+        "truncated in a key": '{"title": "Python Entwickler", "requirements_tf": {"Python": 2, "Django": 1}, "descr',
+    }
+    for name, answer in answers.items():
+        parsed = parse_json_response(answer)
+        assert parsed["title"] == PROJECT["title"] and parsed["requirements_tf"] == PROJECT["requirements_tf"], (name, parsed)
+    assert parse_json_response('{"text": "a } in a string", "n": 1}') == {"text": "a } in a string", "n": 1}
+    assert parse_json_response("Keine Projektdaten gefunden.") is None
+    print(f"   ✅ {len(answers)} answer variants parsed")
+
+    print("\n2. Requesting JSON with the declared schema...")
+    handler = _handler(json.dumps(PROJECT))
+    result = asyncio.run(handler.extract_project_details("<main><p>Python Entwickler mit Django gesucht</p></main>"))
+    assert result == PROJECT
+    response_format = handler.client.chat.response_formats[0]
+    assert response_format["type"] == "json_schema"
+    assert response_format["json_schema"]["schema"] == PROJECT_DETAILS_SCHEMA
+    print("   ✅ response_format json_schema sent with the project details schema")
+
+    print("\n3. Falling back when the API rejects the response format...")
+    handler = _handler(json.dumps(PROJECT), rejected_types={"json_schema"})
+    for _ in range(2):
+        result = asyncio.run(handler.extract_project_details("<main><p>Python Entwickler</p></main>"))
+        assert result == PROJECT
+    assert [rf["type"] for rf in handler.client.chat.response_formats] == ["json_schema", "json_object", "json_object"]
+    assert handler.response_format_mode == "json_object"
+    print("   ✅ JSON mode without schema used from then on")
+
+    print("\n4. Keeping the response format after errors about the request...")
+    handler = _handler(json.dumps(PROJECT))
+    result = asyncio.run(handler.extract_project_details("<main><p>OVERSIZED Python Entwickler</p></main>"))
+    assert result == {}, "The request fails in every mode"
+    assert handler.response_format_mode == "json_schema" and handler.response_format_rejections == 0
+    assert asyncio.run(handler.extract_project_details("<main><p>Python Entwickler</p></main>")) == PROJECT
+    assert handler.client.chat.response_formats[-1]["type"] == "json_schema"
+    handler = _handler(json.dumps(PROJECT), rejected_types={"json_schema"}, rejection_message="Bad Request")
+    for attempt in range(3):
+        assert asyncio.run(handler.extract_project_details("<main><p>Python Entwickler</p></main>")) == PROJECT
+        assert handler.response_format_mode == ("json_schema" if attempt < 2 else "json_object")
+    print("   ✅ Unrelated errors leave the mode alone, unexplained rejections drop it after 3 calls")
+
+    print("\n5. Counting answers without usable JSON...")
+    handler = _handler("Leider konnte ich keine Daten finden.")
+    result = asyncio.run(handler.extract_requirements_and_description("<main><p>Projekt</p></main>"))
+    assert result == {} and handler.parse_failures == 1
+    print("   ✅ Parse failure counted")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_structured_output()
+    if success:
+        print("\n🎉 Structured output test completed successfully!")
+    else:
+        print("\n❌ Structured output test failed!")
+        sys.exit(1)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test to verify that top-K matching returns exactly the top K of the full match list.
+"""
+
+import sys
+import os
+import asyncio
+import random
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.models.core_models import Base, Project, Employee, Skill
+from backend.matching_service import MatchingService
+from backend.requirements_service import requirements_service
+from backend.skill_index_service import skill_index_service
+
+EMPLOYEE_SKILLS = ["Python", "SQL", "Deutsch", "Docker"]
+
+
+class FakeOpenAIHandler:
+    """Embedding handler that never creates new embeddings."""
+
+    async def get_embedding(self, text):
+        return []
+
+
+def _create_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def _populate(db, rng):
+    """Create a random corpus where some skills are embedding neighbours of employee skills."""
+    base_vectors = {name: [rng.gauss(0, 1) for _ in range(8)] for name in EMPLOYEE_SKILLS}
+    embeddings = dict(base_vectors)
+    for name, vector in base_vectors.items():
+        embeddings[f"{name} Expert"] = [v + rng.gauss(0, 0.05) for v in vector]
+    for i in range(30):
+        embeddings[f"Skill {i}"] = [rng.gauss(0, 1) for _ in range(8)]
+    embeddings["Deutschkenntnisse"] = [rng.gauss(0, 1) for _ in range(8)]
+    embeddings["Kommunikation"] = list(base_vectors["Python"])  # Soft skill, never an embedding match
+    embeddings["No Embedding"] = []
+
+    names = list(embeddings)
+    for i in range(120):
+        requirements_tf = {name: rng.randint(1, 3) for name in rng.sample(names, rng.randint(1, 6))}
+        project = Project(title=f"Project {i}", tenderer="Test")
+        requirements_service.set_project_requirements(db, project, requirements_tf)
+        db.add(project)
+    db.add(Project(title="Without Requirements", tenderer="Test"))
+    db.commit()
+
+    for skill in db.query(Skill).all():
+        skill.set_embedding(embeddings[skill.skill_name])
+    employee = Employee(name="Test Employee")
+    employee.set_skill_list(EMPLOYEE_SKILLS)
+    db.add(employee)
+    db.commit()
+    return employee
+
+
+def test_top_k_matching():
+    """Test that top_k/min_percentage results equal the head of the full computation."""
+
+    print("=" * 60)
+    print("Testing Top-K Matching")
+    print("=" * 60)
+
+    db = _create_session()
+    skill_index_service.invalidate()
+    try:
+        employee = _populate(db, random.Random(42))
+        matching_service = MatchingService()
+        matching_service.openai_handler = FakeOpenAIHandler()
+
+        def run(**kwargs):
+            return asyncio.run(matching_service.match_employee_to_projects(db, employee.id, threshold=0.9, **kwargs))
+
+        print("\n1. Computing the full match list...")
+        full = run()["matches"]
+        assert len(full) > 20
+        print(f"   ✅ {len(full)} matches, best: {full[0]['match_percentage']}%")
+
+        print("\n2. Comparing top-K results...")
+        for top_k in (1, 5, 20, 500):
+            top = run(top_k=top_k)
+            assert top["matches"] == full[:top_k], f"top_k={top_k} differs from the full computation"
+            assert top["total_projects_checked"] == 121
+        print("   ✅ top_k results equal the head of the full list")
+
+        print("\n3. Comparing top-K results with min_percentage...")
+        for top_k, min_percentage in ((5, 30), (20, 50), (10, 101)):
+            expected = [m for m in full if m["match_percentage"] >= min_percentage][:top_k]
+            assert run(top_k=top_k, min_percentage=min_percentage)["matches"] == expected
+        print("   ✅ min_percentage is applied before taking the top K")
+
+        return True
+
+    finally:
+        skill_index_service.invalidate()
+        db.close()
+
+
+if __name__ == "__main__":
+    success = test_top_k_matching()
+    if success:
+        print("\n🎉 Top-K matching test completed successfully!")
+    else:
+        print("\n❌ Top-K matching test failed!")
+        sys.exit(1)